@@ -2,8 +2,21 @@
 
 import app
 import serverless_wsgi
+from library.facades import storage
+from open_alchemy import package_database
 
 
 def main(event, context):
-    """Handle request."""
-    return serverless_wsgi.handle_request(app.app, event, context)
+    """Handle request and log the calls to the database and the spec cache it made."""
+    spec_cache = storage.get_spec_cache()
+    spec_cache_reads = spec_cache.hits + spec_cache.misses
+    with package_database.instrumentation.summarize() as summary:
+        response = serverless_wsgi.handle_request(app.app, event, context)
+    path = event.get("path")
+    if summary.metrics:
+        database_summary = summary.as_dict()
+        print(f"database calls, {path=}, {database_summary=}")  # allow-print
+    if spec_cache.hits + spec_cache.misses != spec_cache_reads:
+        spec_cache_summary = spec_cache.as_dict()
+        print(f"spec cache, {path=}, {spec_cache_summary=}")  # allow-print
+    return response
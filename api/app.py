@@ -14,4 +14,5 @@ flask_cors.CORS(
     resources="*",
     origins=config.get().access_control_allow_origin,
     allow_headers=config.get().access_control_allow_headers,
+    expose_headers="X-NEXT-CURSOR",
 )
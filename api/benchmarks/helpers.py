@@ -0,0 +1,116 @@
+"""Helpers for the benchmarks."""
+
+import os
+import statistics
+import time
+import typing
+
+from library import config
+
+
+class TResult(typing.NamedTuple):
+    """
+    The result of a benchmark.
+
+    Attrs:
+        name: The name of the benchmark.
+        iterations: The number of times the operation was executed.
+        mean: The mean duration of the operation in seconds.
+        median: The median duration of the operation in seconds.
+        p95: The 95th percentile duration of the operation in seconds.
+
+    """
+
+    name: str
+    iterations: int
+    mean: float
+    median: float
+    p95: float
+
+
+def measure(
+    *, name: str, func: typing.Callable[[int], typing.Any], iterations: int
+) -> TResult:
+    """
+    Measure the duration of an operation.
+
+    Args:
+        name: The name of the benchmark.
+        func: The operation, called with the index of the iteration.
+        iterations: The number of times to execute the operation.
+
+    Returns:
+        Statistics about the duration of the operation.
+
+    """
+    durations: typing.List[float] = []
+    for idx in range(iterations):
+        start = time.perf_counter()
+        func(idx)
+        durations.append(time.perf_counter() - start)
+
+    durations.sort()
+    return TResult(
+        name=name,
+        iterations=len(durations),
+        mean=statistics.mean(durations),
+        median=statistics.median(durations),
+        p95=durations[min(int(len(durations) * 0.95), len(durations) - 1)],
+    )
+
+
+def print_results(results: typing.Iterable[TResult]) -> None:
+    """Print the results of benchmarks."""
+    for result in results:
+        print(  # allow-print
+            f"{result.name}: iterations={result.iterations}, "
+            f"mean={result.mean * 1000:.2f}ms, median={result.median * 1000:.2f}ms, "
+            f"p95={result.p95 * 1000:.2f}ms"
+        )
+
+
+def calc_spec(*, model_count: int) -> typing.Dict[str, typing.Any]:
+    """
+    Construct a spec with a number of models.
+
+    Each model has a primary key, a few columns and a many-to-one relationship to
+    the previous model so that the spec resembles specs of customers.
+
+    Args:
+        model_count: The number of models in the spec.
+
+    Returns:
+        The spec.
+
+    """
+    schemas: typing.Dict[str, typing.Any] = {}
+    for idx in range(model_count):
+        properties: typing.Dict[str, typing.Any] = {
+            "id": {"type": "integer", "x-primary-key": True},
+            "name": {"type": "string", "maxLength": 255, "description": "The name."},
+            "count": {"type": "integer", "nullable": True},
+            "created_at": {"type": "string", "format": "date-time"},
+        }
+        if idx > 0:
+            properties["parent"] = {"$ref": f"#/components/schemas/Model{idx - 1}"}
+        schemas[f"Model{idx}"] = {
+            "type": "object",
+            "x-tablename": f"model_{idx}",
+            "description": f"Model number {idx}.",
+            "properties": properties,
+        }
+
+    return {
+        "info": {"title": "Benchmark", "version": "1.0.0"},
+        "components": {"schemas": schemas},
+    }
+
+
+def use_memory_storage() -> None:
+    """Use the memory implementation of the storage."""
+    config.get().stage = config.Stage.TEST
+
+
+def use_memory_database() -> None:
+    """Use the memory implementation of the database, call before it is used."""
+    os.environ["DATABASE_BACKEND"] = "MEMORY"
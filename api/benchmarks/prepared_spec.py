@@ -0,0 +1,96 @@
+"""
+Benchmark retrieving a spec in the form that is returned to the user.
+
+Compares preparing the stored spec on every retrieval, which is what happens for
+specs stored before prepared specs were stored, with serving the prepared spec
+that is stored when the spec is created or updated. The memory storage is used so
+that only the work done by the API is measured.
+
+Run from the api directory using:
+
+    python -m benchmarks.prepared_spec
+    python -m benchmarks.prepared_spec --models 500 --iterations 50
+
+"""
+
+import argparse
+import json
+import typing
+
+from library.facades import storage
+from library.helpers import spec
+
+from . import helpers
+
+USER = "benchmark prepared spec"
+
+
+def run(*, models: int, iterations: int) -> typing.List[helpers.TResult]:
+    """
+    Measure retrieving a spec with and without its prepared form.
+
+    Args:
+        models: The number of models in the spec.
+        iterations: The number of times to retrieve the spec.
+
+    Returns:
+        The statistics of retrieving the spec.
+
+    """
+    spec_info = spec.process(
+        spec_str=json.dumps(helpers.calc_spec(model_count=models)), language="JSON"
+    )
+    storage_facade = storage.get_storage_facade()
+    for name in ("fallback", "prepared"):
+        storage_facade.create_update_spec(
+            user=USER, name=name, version=spec_info.version, spec_str=spec_info.spec_str
+        )
+    storage_facade.create_update_prepared_spec(
+        user=USER,
+        name="prepared",
+        version=spec_info.version,
+        prepared_spec_str=spec.prepare(
+            spec_str=spec_info.spec_str, version=spec_info.version
+        ),
+    )
+
+    def retrieve(name: str) -> typing.Callable[[int], str]:
+        """Construct the operation that retrieves a prepared spec."""
+        return lambda _: spec.retrieve_prepared(
+            user=USER, name=name, version=spec_info.version
+        )
+
+    try:
+        return [
+            helpers.measure(
+                name=f"retrieve_prepared {name} {models=}",
+                func=retrieve(name),
+                iterations=iterations,
+            )
+            for name in ("fallback", "prepared")
+        ]
+    finally:
+        for name in ("fallback", "prepared"):
+            storage_facade.delete_spec(user=USER, name=name)
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, nargs="+", default=[10, 500])
+    parser.add_argument("--iterations", type=int, default=20)
+    parsed_args = parser.parse_args(args)
+
+    helpers.use_memory_storage()
+    for models in parsed_args.models:
+        helpers.print_results(run(models=models, iterations=parsed_args.iterations))
+
+
+if __name__ == "__main__":
+    main()
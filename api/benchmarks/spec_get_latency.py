@@ -0,0 +1,127 @@
+"""
+Benchmark the latency of retrieving a version of a spec when I/O is slow.
+
+Compares retrieving the version while revalidating using an If-None-Match header
+that does not match, which reads the database and then the storage, with
+retrieving it without the header, which reads the storage at the same time as the
+database. The memory database and storage are used with a delay injected into
+every read so that the latency is dominated by the I/O, as it is for DynamoDB and
+S3. The cache of the storage facade is cleared before every retrieval.
+
+Run from the api directory using:
+
+    python -m benchmarks.spec_get_latency
+    python -m benchmarks.spec_get_latency --delay-ms 5 50 --iterations 50
+
+"""
+
+import argparse
+import contextlib
+import time
+import typing
+
+import flask
+from library.facades import storage
+from library.facades.storage import cache
+from library.specs import versions
+from open_alchemy import package_database
+
+from . import helpers
+
+USER = "benchmark spec get latency"
+NAME = "spec 1"
+VERSION = "1"
+
+
+@contextlib.contextmanager
+def delayed(*, obj: typing.Any, name: str, delay: float) -> typing.Iterator[None]:
+    """Delay every call to a method of an object."""
+    func = getattr(obj, name)
+
+    def inner(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        """Wait and then call the method."""
+        time.sleep(delay)
+        return func(*args, **kwargs)
+
+    setattr(obj, name, inner)
+    try:
+        yield
+    finally:
+        setattr(obj, name, func)
+
+
+def run(*, delay_ms: float, iterations: int) -> typing.List[helpers.TResult]:
+    """
+    Measure retrieving a version of a spec with and without revalidating.
+
+    Args:
+        delay_ms: The delay of every read of the database and storage.
+        iterations: The number of times to retrieve the version.
+
+    Returns:
+        The statistics of retrieving the version.
+
+    """
+    delay = delay_ms / 1000
+    app = flask.Flask(__name__)
+
+    def get(headers: typing.Dict[str, str]) -> typing.Callable[[int], None]:
+        """Construct the operation that retrieves the version with headers."""
+
+        def inner(_: int) -> None:
+            """Retrieve the version with a cold cache."""
+            storage.get_spec_cache().clear()
+            with app.test_request_context(headers=headers):
+                response = versions.get(user=USER, spec_name=NAME, version=VERSION)
+            assert response.status_code == 200, response.data
+
+        return inner
+
+    scenarios: typing.List[typing.Tuple[str, typing.Dict[str, str]]] = [
+        ("sequential", {"If-None-Match": '"other"'}),
+        ("concurrent", {}),
+    ]
+    with delayed(
+        obj=package_database.get(), name="get_latest_spec", delay=delay
+    ), delayed(obj=storage.get_storage(), name="get", delay=delay):
+        return [
+            helpers.measure(
+                name=f"get {name} {delay_ms=}",
+                func=get(headers),
+                iterations=iterations,
+            )
+            for name, headers in scenarios
+        ]
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=float, nargs="+", default=[5, 20])
+    parser.add_argument("--iterations", type=int, default=20)
+    parsed_args = parser.parse_args(args)
+
+    helpers.use_memory_storage()
+    helpers.use_memory_database()
+    package_database.get().create_update_spec(
+        sub=USER, name=NAME, version=VERSION, model_count=1
+    )
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=USER, name=NAME, version=VERSION, prepared_spec_str="prepared 1"
+    )
+    # Specs read within the margin after they were updated are read again, wait so
+    # that the spec was not updated recently, which is the common case
+    time.sleep(cache.READ_AFTER_WRITE_MARGIN / cache.MICROSECONDS)
+
+    for delay_ms in parsed_args.delay_ms:
+        helpers.print_results(run(delay_ms=delay_ms, iterations=parsed_args.iterations))
+
+
+if __name__ == "__main__":
+    main()
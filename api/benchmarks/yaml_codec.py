@@ -0,0 +1,93 @@
+"""
+Benchmark loading and dumping the YAML of specs using the YAML codec.
+
+Compares yaml.safe_load and yaml.dump, the pure Python implementations, with the
+YAML codec, which uses libyaml if it is available, for specs of different sizes.
+Also checks that the codec loads the same spec and dumps the same YAML.
+
+Run from the api directory using:
+
+    python -m benchmarks.yaml_codec
+    python -m benchmarks.yaml_codec --models 10 100 2000 --iterations 5
+
+"""
+
+import argparse
+import json
+import typing
+
+import yaml
+from library.helpers import yaml_codec
+
+from . import helpers
+
+
+def run(*, models: int, iterations: int) -> typing.List[helpers.TResult]:
+    """
+    Measure loading and dumping a spec with a number of models.
+
+    Args:
+        models: The number of models in the spec.
+        iterations: The number of times to load and dump the spec.
+
+    Returns:
+        The statistics of loading and dumping the spec.
+
+    """
+    spec = json.loads(json.dumps(helpers.calc_spec(model_count=models)))
+    spec_str = yaml.dump(spec)
+    if yaml_codec.load(spec_str) != spec:
+        raise AssertionError("the codec loaded a different spec")
+    if yaml_codec.dump(spec) != spec_str:
+        raise AssertionError("the codec dumped different YAML")
+
+    return [
+        helpers.measure(
+            name=f"yaml.safe_load {models=}",
+            func=lambda _: yaml.safe_load(spec_str),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name=f"yaml_codec.load {models=}",
+            func=lambda _: yaml_codec.load(spec_str),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name=f"yaml.dump {models=}",
+            func=lambda _: yaml.dump(spec),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name=f"yaml_codec.dump {models=}",
+            func=lambda _: yaml_codec.dump(spec),
+            iterations=iterations,
+        ),
+    ]
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, nargs="+", default=[10, 100, 2000])
+    parser.add_argument("--iterations", type=int, default=5)
+    parsed_args = parser.parse_args(args)
+
+    print(f"libyaml available: {yaml.__with_libyaml__}")  # allow-print
+    for models in parsed_args.models:
+        results = run(models=models, iterations=parsed_args.iterations)
+        helpers.print_results(results)
+        load_python, load_codec, dump_python, dump_codec = results
+        print(  # allow-print
+            f"speedup {models=}: load {load_python.median / load_codec.median:.1f}x, "
+            f"dump {dump_python.median / dump_codec.median:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Main function for the lambda that compacts the versions of specs."""
+
+import dataclasses
+
+from library import compact
+from open_alchemy import package_database
+
+
+def main(_event, _context):
+    """Handle scheduled event."""
+    with package_database.instrumentation.summarize() as summary:
+        counts = compact.compact()
+    database_summary = summary.as_dict()
+    print(f"compacted specs, {counts=}, {database_summary=}")  # allow-print
+    return dataclasses.asdict(counts)
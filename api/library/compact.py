@@ -0,0 +1,90 @@
+"""Remove the versions of specs that are not kept by the retention policy."""
+
+import dataclasses
+import time
+import typing
+
+from open_alchemy import package_database
+
+from . import config
+from .facades import storage
+
+# Stored specs modified within this many seconds before the compaction of a spec
+# started are kept, a request that stores the same version may still be writing it
+# to the database. It is the maximum run time of a lambda function.
+RECENT_OBJECT_SECONDS = 15 * 60
+
+
+@dataclasses.dataclass
+class CompactCounts:
+    """
+    The outcome of compacting the specs of all users.
+
+    Attrs:
+        specs: The number of specs that were compacted.
+        deleted_versions: The number of versions deleted from the database.
+        deleted_objects: The number of stored specs that were deleted.
+        errors: The number of specs that could not be compacted.
+
+    """
+
+    specs: int = 0
+    deleted_versions: int = 0
+    deleted_objects: int = 0
+    errors: int = 0
+
+
+def compact(
+    *, retention: typing.Optional[package_database.types.SpecRetention] = None
+) -> CompactCounts:
+    """
+    Compact the versions of the specs of all users.
+
+    For each spec, the versions that are not kept are deleted from the database and
+    then the stored specs of the versions that are no longer referred to are
+    deleted, unless they were modified within RECENT_OBJECT_SECONDS before the
+    compaction of the spec started. A spec that could not be compacted is counted as
+    an error and the remaining specs are still compacted.
+
+    Args:
+        retention: Which versions to keep, defaults to the configuration.
+
+    Returns:
+        The counts of the compaction.
+
+    """
+    if retention is None:
+        retention = config.get().spec_retention
+    counts = CompactCounts()
+    if retention.keep_last is None and retention.max_age_days is None:
+        return counts
+
+    database = package_database.get()
+    for user in database.list_spec_subs():
+        for spec_info in database.iter_specs(sub=user):
+            name = spec_info["name"]
+            started_at = time.time()
+            try:
+                compaction = database.compact_spec_versions(
+                    sub=user, name=name, retention=retention
+                )
+                storage.get_storage_facade().delete_spec_versions(
+                    user=user,
+                    name=name,
+                    versions=compaction.expired_versions,
+                    modified_before=started_at - RECENT_OBJECT_SECONDS,
+                )
+            except (
+                package_database.exceptions.BaseError,
+                storage.exceptions.StorageError,
+            ) as exc:
+                print(  # allow-print
+                    f"could not compact spec {name=} for {user=}, {exc}"
+                )
+                counts.errors += 1
+                continue
+            counts.specs += 1
+            counts.deleted_versions += compaction.deleted
+            counts.deleted_objects += len(compaction.expired_versions)
+
+    return counts
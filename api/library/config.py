@@ -5,6 +5,8 @@ import enum
 import os
 import typing
 
+from open_alchemy import package_database
+
 
 class Stage(str, enum.Enum):
     """The stage the API is running in."""
@@ -15,6 +17,24 @@ class Stage(str, enum.Enum):
 
 _STAGES = {item.value for item in Stage}
 
+# The default maximum total length of the specs cached by the storage facade
+DEFAULT_SPEC_CACHE_SIZE = 16 * 1024 * 1024
+
+
+class TSpecSettings(typing.NamedTuple):
+    """
+    The configuration of the stored versions of specs.
+
+    Attrs:
+        retention: Which versions of specs are kept by the compaction job.
+        cache_size: The maximum total length of the specs that are cached by the
+            storage facade.
+
+    """
+
+    retention: typing.Optional[package_database.types.SpecRetention] = None
+    cache_size: typing.Optional[int] = None
+
 
 @dataclasses.dataclass
 class TConfig:
@@ -27,6 +47,9 @@ class TConfig:
         access_control_allow_origin: The CORS origin response.
         access_control_allow_headers: The CORS headers response.
         free_tier_model_count: The number of models allowed in the free tier.
+        spec_retention: Which versions of specs are kept by the compaction job.
+        spec_cache_size: The maximum total length of the specs that are cached by
+            the storage facade, 0 disables the cache.
 
     """
 
@@ -36,6 +59,7 @@ class TConfig:
     _access_control_allow_headers: typing.Optional[str] = None
     _default_credentials_id: typing.Optional[str] = None
     _free_tier_model_count: typing.Optional[int] = None
+    _spec_settings: TSpecSettings = TSpecSettings()
 
     @staticmethod
     def _get_env(key: str) -> str:
@@ -142,6 +166,61 @@ class TConfig:
         """Set the free_tier_model_count."""
         self._free_tier_model_count = value
 
+    @staticmethod
+    def _get_opt_count_env(key: str) -> typing.Optional[int]:
+        """Get the optional environment variable that is a count."""
+        value_str = os.getenv(key)
+        if value_str is None:
+            return None
+        try:
+            value = int(value_str)
+        except ValueError as exc:
+            raise AssertionError(
+                f"the {key} environment variable value must be an integer, "
+                f"{value_str=}"
+            ) from exc
+        assert value >= 0, (
+            f"the {key} environment variable value must not be negative, "
+            f"{value_str=}"
+        )
+        return value
+
+    @property
+    def spec_retention(self) -> package_database.types.SpecRetention:
+        """Retrieve the spec_retention configuration."""
+        if self._spec_settings.retention is None:
+            self.spec_retention = package_database.types.SpecRetention(
+                keep_last=self._get_opt_count_env("SPEC_RETENTION_KEEP_LAST"),
+                max_age_days=self._get_opt_count_env("SPEC_RETENTION_MAX_AGE_DAYS"),
+            )
+
+        assert self._spec_settings.retention is not None
+        return self._spec_settings.retention
+
+    @spec_retention.setter
+    def spec_retention(self, value: package_database.types.SpecRetention) -> None:
+        """Set the spec_retention."""
+        self._spec_settings = self._spec_settings._replace(retention=value)
+
+    @property
+    def spec_cache_size(self) -> int:
+        """Retrieve the spec_cache_size configuration."""
+        if self._spec_settings.cache_size is None:
+            spec_cache_size = self._get_opt_count_env("SPEC_CACHE_SIZE")
+            self.spec_cache_size = (
+                spec_cache_size
+                if spec_cache_size is not None
+                else DEFAULT_SPEC_CACHE_SIZE
+            )
+
+        assert self._spec_settings.cache_size is not None
+        return self._spec_settings.cache_size
+
+    @spec_cache_size.setter
+    def spec_cache_size(self, value: int) -> None:
+        """Set the spec_cache_size."""
+        self._spec_settings = self._spec_settings._replace(cache_size=value)
+
 
 def _construct() -> TConfig:
     """Construct the configuration."""
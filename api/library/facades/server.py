@@ -1,7 +1,26 @@
 """Facade for the server."""
 
+import typing
+
 import connexion
 import flask as _flask
 
 Request = connexion
 Response = _flask.Response
+
+
+def get_header(name: str) -> typing.Optional[str]:
+    """
+    Retrieve a header of the request that is being handled.
+
+    Args:
+        name: The name of the header.
+
+    Returns:
+        The value of the header or None if it is not set or no request is being
+        handled.
+
+    """
+    if not _flask.has_request_context():
+        return None
+    return Request.request.headers.get(name)
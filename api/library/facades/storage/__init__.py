@@ -1,12 +1,18 @@
 """Storage facade."""
 
 import typing
+from concurrent import futures
 
 from packaging import utils
 
 from ... import config
 from ... import types as library_types
-from . import exceptions, memory, s3, types
+from . import cache, exceptions, memory, s3, types
+
+# The maximum number of objects S3 deletes in a single request
+DELETE_ALL_MAX_KEYS = 1000
+# The maximum number of calls that run at the same time on the shared pool of threads
+MAX_WORKERS = 8
 
 
 def _construct_storage() -> types.TStorage:
@@ -26,9 +32,11 @@ class TCache(typing.TypedDict, total=True):
     """Cache for storage."""
 
     storage: typing.Optional[types.TStorage]
+    spec_cache: typing.Optional[cache.Cache]
+    executor: typing.Optional[futures.ThreadPoolExecutor]
 
 
-_CACHE: TCache = {"storage": None}
+_CACHE: TCache = {"storage": None, "spec_cache": None, "executor": None}
 
 
 def get_storage() -> types.TStorage:
@@ -39,6 +47,24 @@ def get_storage() -> types.TStorage:
     return _CACHE["storage"]
 
 
+def get_spec_cache() -> cache.Cache:
+    """Return the cache of the specs read from the storage."""
+    if _CACHE["spec_cache"] is None:
+        _CACHE["spec_cache"] = cache.Cache(max_size=config.get().spec_cache_size)
+    assert _CACHE["spec_cache"] is not None
+    return _CACHE["spec_cache"]
+
+
+def get_executor() -> futures.ThreadPoolExecutor:
+    """Return the pool of threads that is shared by all requests of the process."""
+    if _CACHE["executor"] is None:
+        _CACHE["executor"] = futures.ThreadPoolExecutor(
+            max_workers=MAX_WORKERS, thread_name_prefix="package-storage"
+        )
+    assert _CACHE["executor"] is not None
+    return _CACHE["executor"]
+
+
 class _StorageFacade:
     """Facade for the storage that exposes important functionality."""
 
@@ -47,6 +73,30 @@ class _StorageFacade:
         """Calculate the id of a spec."""
         return utils.canonicalize_name(name)
 
+    @staticmethod
+    def _get(
+        *, key: types.TKey, version_time: typing.Optional[cache.TVersionTime]
+    ) -> types.TValue:
+        """Read an object, using the cache if the version time of the spec is known."""
+        if version_time is None:
+            return get_storage().get(key=key)
+        return get_spec_cache().get(
+            key=key, version_time=version_time, load=lambda: get_storage().get(key=key)
+        )
+
+    @staticmethod
+    def _prefetch(*, key: types.TKey) -> bool:
+        """Read an object into the cache and return whether it exists."""
+        return get_spec_cache().prefetch(
+            key=key, load=lambda: get_storage().get(key=key)
+        )
+
+    @staticmethod
+    def _set(*, key: types.TKey, value: types.TValue) -> None:
+        """Write an object and remove it from the cache."""
+        get_storage().set(key=key, value=value)
+        get_spec_cache().invalidate(keys=[key])
+
     @classmethod
     def create_update_spec(
         cls,
@@ -67,10 +117,7 @@ class _StorageFacade:
 
         """
         id_ = cls.cal_id(name)
-        get_storage().set(
-            key=f"{user}/{id_}/{version}-spec.json",
-            value=spec_str,
-        )
+        cls._set(key=f"{user}/{id_}/{version}-spec.json", value=spec_str)
 
     @classmethod
     def get_spec(
@@ -79,18 +126,127 @@ class _StorageFacade:
         user: library_types.TUser,
         name: library_types.TSpecName,
         version: library_types.TSpecVersion,
+        version_time: typing.Optional[cache.TVersionTime] = None,
     ) -> library_types.TSpecValue:
         """
-        Create or update a spec.
+        Retrieve a spec.
+
+        The spec is cached if the version time of the spec is supplied.
+
+        Args:
+            user: The user that owns the spec.
+            name: The display name of the spec.
+            version: The version of the spec.
+            version_time: The time the latest version of the spec was written in
+                microseconds since epoch according to the database.
+
+        """
+        id_ = cls.cal_id(name)
+        return cls._get(
+            key=f"{user}/{id_}/{version}-spec.json", version_time=version_time
+        )
+
+    @classmethod
+    def prefetch_spec(
+        cls,
+        *,
+        user: library_types.TUser,
+        name: library_types.TSpecName,
+        version: library_types.TSpecVersion,
+    ) -> bool:
+        """
+        Read a spec into the cache before the time the spec was updated is known.
+
+        Args:
+            user: The user that owns the spec.
+            name: The display name of the spec.
+            version: The version of the spec.
+
+        Returns:
+            Whether the spec exists.
+
+        """
+        id_ = cls.cal_id(name)
+        return cls._prefetch(key=f"{user}/{id_}/{version}-spec.json")
+
+    @classmethod
+    def create_update_prepared_spec(
+        cls,
+        *,
+        user: library_types.TUser,
+        name: library_types.TSpecName,
+        version: library_types.TSpecVersion,
+        prepared_spec_str: library_types.TSpecValue,
+    ) -> None:
+        """
+        Create or update the form of a spec that is returned to the user.
+
+        The prepared spec is stored next to the spec so that it does not have to be
+        prepared every time the spec is retrieved.
+
+        Args:
+            user: The user that owns the spec.
+            name: The display name of the spec.
+            version: The version of the spec.
+            prepared_spec_str: The spec in the form that is returned to the user.
+
+        """
+        id_ = cls.cal_id(name)
+        cls._set(key=f"{user}/{id_}/{version}-spec.yaml", value=prepared_spec_str)
+
+    @classmethod
+    def get_prepared_spec(
+        cls,
+        *,
+        user: library_types.TUser,
+        name: library_types.TSpecName,
+        version: library_types.TSpecVersion,
+        version_time: typing.Optional[cache.TVersionTime] = None,
+    ) -> library_types.TSpecValue:
+        """
+        Retrieve the form of a spec that is returned to the user.
+
+        Raises ObjectNotFoundError if the prepared spec was not stored, for example
+        for specs stored before prepared specs were stored. The prepared spec is
+        cached if the version time of the spec is supplied.
 
         Args:
             user: The user that owns the spec.
             name: The display name of the spec.
             version: The version of the spec.
+            version_time: The time the latest version of the spec was written in
+                microseconds since epoch according to the database.
 
         """
         id_ = cls.cal_id(name)
-        return get_storage().get(key=f"{user}/{id_}/{version}-spec.json")
+        return cls._get(
+            key=f"{user}/{id_}/{version}-spec.yaml", version_time=version_time
+        )
+
+    @classmethod
+    def prefetch_prepared_spec(
+        cls,
+        *,
+        user: library_types.TUser,
+        name: library_types.TSpecName,
+        version: library_types.TSpecVersion,
+    ) -> bool:
+        """
+        Read the prepared form of a spec into the cache.
+
+        Used before the time the spec was updated is known.
+
+        Args:
+            user: The user that owns the spec.
+            name: The display name of the spec.
+            version: The version of the spec.
+
+        Returns:
+            Whether the prepared spec exists.
+
+        """
+        id_ = cls.cal_id(name)
+        return cls._prefetch(key=f"{user}/{id_}/{version}-spec.yaml")
 
     @classmethod
     def delete_spec(
@@ -112,6 +268,51 @@ class _StorageFacade:
         if not delete_keys:
             raise exceptions.StorageError("no keys to delete")
         get_storage().delete_all(keys=delete_keys)
+        get_spec_cache().invalidate(keys=delete_keys)
+
+    @classmethod
+    def delete_spec_versions(
+        cls,
+        *,
+        user: library_types.TUser,
+        name: library_types.TSpecName,
+        versions: library_types.TSpecVersions,
+        modified_before: typing.Optional[float] = None,
+    ) -> None:
+        """
+        Delete particular versions of a spec.
+
+        Deletes the prepared specs of the versions as well. Versions stored before
+        prepared specs were stored do not have one, so only the keys that exist are
+        deleted.
+
+        Args:
+            user: The user that owns the spec.
+            name: The display name of the spec.
+            versions: The versions of the spec to delete.
+            modified_before: Only objects last modified before this Unix time are
+                deleted.
+
+        """
+        if not versions:
+            return
+
+        id_ = cls.cal_id(name)
+        delete_keys = {
+            f"{user}/{id_}/{version}-spec.{extension}"
+            for version in versions
+            for extension in ("json", "yaml")
+        }
+        keys = [
+            key
+            for key in get_storage().list(
+                prefix=f"{user}/{id_}/", modified_before=modified_before
+            )
+            if key in delete_keys
+        ]
+        for start in range(0, len(keys), DELETE_ALL_MAX_KEYS):
+            get_storage().delete_all(keys=keys[start : start + DELETE_ALL_MAX_KEYS])
+        get_spec_cache().invalidate(keys=keys)
 
     @classmethod
     def get_spec_versions(
@@ -0,0 +1,217 @@
+"""Process local cache of the objects in the storage."""
+
+import collections
+import threading
+import time
+import typing
+
+from . import exceptions, types
+
+# The time the latest version of a spec was written in microseconds since epoch
+TVersionTime = int
+
+MICROSECONDS = 1_000_000
+# The time in microseconds after the version time of a spec after which reads of
+# the storage are certain to include the write. The spec is written to the storage
+# before its version time is calculated and the clocks of processes can differ
+# slightly.
+READ_AFTER_WRITE_MARGIN = 100_000
+
+
+class _Entry(typing.NamedTuple):
+    """
+    A cached object, the version time of the spec and when the object was read.
+
+    A value of None means that the object did not exist. The version time is None
+    for objects that were prefetched. The time the object was read is in
+    microseconds since epoch.
+    """
+
+    version_time: typing.Optional[TVersionTime]
+    read_at: int
+    value: typing.Optional[types.TValue]
+    size: int
+
+    def is_current(self, version_time: TVersionTime) -> bool:
+        """Check whether the object is current for the version time of the spec."""
+        return (
+            self.version_time == version_time
+            or self.read_at >= version_time + READ_AFTER_WRITE_MARGIN
+        )
+
+
+class Cache:
+    """
+    Least recently used cache of objects in the storage bounded by their size.
+
+    Objects are cached together with the version time of the spec they belong to
+    according to the database, which changes with every write of the spec, even
+    within the same second. A cached object is only returned if it was cached for
+    the same version time or read long enough after it, so an object is not stale
+    after a write to the spec, including writes by other processes. The spec is
+    written to the storage before the database so that reads of the storage after
+    the version time include the write. Objects can be prefetched before the
+    version time is known, for example while the database is read. That an
+    object does not exist is cached as well so that specs stored before their
+    prepared form was stored do not read the missing object every time.
+
+    Attrs:
+        max_size: The maximum total length of the cached keys and objects.
+        size: The total length of the cached keys and objects.
+        hits: The number of reads that were served from the cache.
+        misses: The number of reads that were not served from the cache.
+        evictions: The number of objects removed to stay within the maximum size.
+
+    """
+
+    def __init__(self, *, max_size: int) -> None:
+        """Construct."""
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "collections.OrderedDict[types.TKey, _Entry]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        *,
+        key: types.TKey,
+        version_time: TVersionTime,
+        load: typing.Callable[[], types.TValue],
+    ) -> types.TValue:
+        """
+        Retrieve an object from the cache or load it if it is not cached.
+
+        Raises ObjectNotFoundError if the object does not exist.
+
+        Args:
+            key: The key of the object.
+            version_time: The version time of the spec the object belongs to.
+            load: Reads the object from the storage.
+
+        Returns:
+            The value of the object.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.is_current(version_time):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if entry.value is None:
+                    raise exceptions.ObjectNotFoundError(
+                        f"could not find object at key {key}"
+                    )
+                return entry.value
+            self.misses += 1
+
+        value = self._load(key=key, version_time=version_time, load=load)
+        if value is None:
+            raise exceptions.ObjectNotFoundError(f"could not find object at key {key}")
+        return value
+
+    def prefetch(
+        self, *, key: types.TKey, load: typing.Callable[[], types.TValue]
+    ) -> bool:
+        """
+        Load an object into the cache before the version time of the spec is known.
+
+        Objects that are already cached are not loaded again, whether they are
+        current is checked once they are retrieved.
+
+        Args:
+            key: The key of the object.
+            load: Reads the object from the storage.
+
+        Returns:
+            Whether the object exists.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry.value is not None
+            self.misses += 1
+
+        return self._load(key=key, version_time=None, load=load) is not None
+
+    def _load(
+        self,
+        *,
+        key: types.TKey,
+        version_time: typing.Optional[TVersionTime],
+        load: typing.Callable[[], types.TValue],
+    ) -> typing.Optional[types.TValue]:
+        """Load an object and cache it, returning None if it does not exist."""
+        read_at = int(time.time() * MICROSECONDS)
+        value: typing.Optional[types.TValue]
+        try:
+            value = load()
+        except exceptions.ObjectNotFoundError:
+            value = None
+
+        self._set(key=key, version_time=version_time, read_at=read_at, value=value)
+        return value
+
+    def _set(
+        self,
+        *,
+        key: types.TKey,
+        version_time: typing.Optional[TVersionTime],
+        read_at: int,
+        value: typing.Optional[types.TValue],
+    ) -> None:
+        """Cache an object, evicting the least recently used objects if required."""
+        size = len(key) + (len(value) if value is not None else 0)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_size:
+                return
+
+            self._entries[key] = _Entry(
+                version_time=version_time, read_at=read_at, value=value, size=size
+            )
+            self.size += size
+            while self.size > self.max_size:
+                _, evicted_entry = self._entries.popitem(last=False)
+                self.size -= evicted_entry.size
+                self.evictions += 1
+
+    def _remove(self, key: types.TKey) -> None:
+        """Remove an object from the cache, the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def invalidate(self, *, keys: types.TKeys) -> None:
+        """
+        Remove objects from the cache.
+
+        Args:
+            keys: The keys of the objects to remove.
+
+        """
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def as_dict(self) -> typing.Dict[str, int]:
+        """Return the statistics of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self.size,
+            }
+
+    def clear(self) -> None:
+        """Remove all objects from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
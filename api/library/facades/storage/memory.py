@@ -1,5 +1,6 @@
 """Memory implementation for the storage facade."""
 
+import time
 import typing
 
 from . import exceptions, types
@@ -11,11 +12,13 @@ class Storage:
     def __init__(self) -> None:
         """Construct."""
         self.storage: typing.Dict[types.TKey, types.TValue] = {}
+        self.modified_at: typing.Dict[types.TKey, float] = {}
 
     def list(
         self,
         prefix: typing.Optional[types.TPrefix] = None,
         suffix: typing.Optional[types.TSuffix] = None,
+        modified_before: typing.Optional[float] = None,
     ) -> types.TKeys:
         """
         List available objects.
@@ -23,9 +26,12 @@ class Storage:
         Args:
             prefix: The prefix any keys must match.
             suffix: The suffix any keys must match.
+            modified_before: The Unix time any objects must have been last modified
+                before.
 
         Returns:
-            All keys that match the prefix and suffix if they were supplied.
+            All keys that match the prefix, suffix and modification time if they
+            were supplied.
 
         """
         all_keys = self.storage.keys()
@@ -35,7 +41,13 @@ class Storage:
         prefix_suffix_match_keys = filter(
             lambda key: suffix is None or key.endswith(suffix), prefix_match_keys
         )
-        return list(prefix_suffix_match_keys)
+        return list(
+            filter(
+                lambda key: modified_before is None
+                or self.modified_at[key] < modified_before,
+                prefix_suffix_match_keys,
+            )
+        )
 
     def _check_exists(self, key: types.TKey) -> None:
         """
@@ -76,6 +88,7 @@ class Storage:
 
         """
         self.storage[key] = value
+        self.modified_at[key] = time.time()
 
     def delete(self, *, key: types.TKey) -> None:
         """
@@ -89,6 +102,7 @@ class Storage:
         """
         self._check_exists(key)
         del self.storage[key]
+        del self.modified_at[key]
 
     def delete_all(self, *, keys: types.TKeys) -> None:
         """
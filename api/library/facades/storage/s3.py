@@ -16,7 +16,9 @@ class Storage:
         self.bucket = bucket
         self.client = boto3.client("s3")
 
-    def _list_generator(self, prefix: str) -> typing.Generator[str, None, None]:
+    def _list_generator(
+        self, prefix: str, modified_before: typing.Optional[float]
+    ) -> typing.Generator[str, None, None]:
         """Create key generator."""
         paginator = self.client.get_paginator("list_objects_v2")
         for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
@@ -26,12 +28,18 @@ class Storage:
                 break
 
             for obj in contents:
+                if (
+                    modified_before is not None
+                    and obj["LastModified"].timestamp() >= modified_before
+                ):
+                    continue
                 yield obj["Key"]
 
     def list(
         self,
         prefix: typing.Optional[types.TPrefix] = None,
         suffix: typing.Optional[types.TPrefix] = None,
+        modified_before: typing.Optional[float] = None,
     ) -> types.TKeys:
         """
         List available objects.
@@ -39,14 +47,18 @@ class Storage:
         Args:
             prefix: The prefix any keys must match.
             suffix: The suffix any keys must match.
+            modified_before: The Unix time any objects must have been last modified
+                before.
 
         Returns:
-            All keys that match the prefix and suffix if they were supplied.
+            All keys that match the prefix, suffix and modification time if they
+            were supplied.
 
         """
         try:
             prefix_keys = self._list_generator(
-                prefix=prefix if prefix is not None else ""
+                prefix=prefix if prefix is not None else "",
+                modified_before=modified_before,
             )
             prefix_suffix_keys = filter(
                 lambda key: suffix is None or key.endswith(suffix), prefix_keys
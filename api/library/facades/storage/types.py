@@ -16,6 +16,7 @@ class TStorage(typing.Protocol):
         self,
         prefix: typing.Optional[TPrefix] = None,
         suffix: typing.Optional[TSuffix] = None,
+        modified_before: typing.Optional[float] = None,
     ) -> TKeys:
         """
         List available objects.
@@ -23,9 +24,12 @@ class TStorage(typing.Protocol):
         Args:
             prefix: The prefix any keys must match.
             suffix: The suffix any keys must match.
+            modified_before: The Unix time any objects must have been last modified
+                before.
 
         Returns:
-            All keys that match the prefix and suffix if they were supplied.
+            All keys that match the prefix, suffix and modification time if they
+            were supplied.
 
         """
         ...
@@ -0,0 +1,65 @@
+"""Helpers for the entity tags of specs."""
+
+import hashlib
+import json
+import typing
+
+from open_alchemy import package_database
+
+from .. import types
+
+
+def calc(
+    *,
+    user: types.TUser,
+    version: types.TSpecVersion,
+    info: package_database.types.TSpecInfo,
+    version_time: int,
+) -> str:
+    """
+    Calculate the strong entity tag of a spec from the information in the database.
+
+    The tag depends on the user, the version that is returned, the information about
+    the spec, which is also returned, and the version time of the latest version.
+    The stored spec of a version can be written again, for example by storing the
+    same version with a different body. The version time changes with every write
+    of the spec, unlike updated_at which is in whole seconds, so the tag changes
+    even if the spec is written more than once within a second.
+
+    Args:
+        user: The user the spec belongs to.
+        version: The version of the spec that is returned.
+        info: The information about the spec that is returned.
+        version_time: The time the latest version of the spec was written in
+            microseconds since epoch.
+
+    Returns:
+        The quoted entity tag.
+
+    """
+    value = json.dumps(
+        [user, version, info, version_time], sort_keys=True, separators=(",", ":")
+    )
+    return f'"{hashlib.sha256(value.encode()).hexdigest()[:32]}"'
+
+
+def matches(*, etag: str, if_none_match: typing.Optional[str]) -> bool:
+    """
+    Check whether an If-None-Match header matches an entity tag.
+
+    Uses the weak comparison as required for If-None-Match.
+
+    Args:
+        etag: The entity tag of the spec.
+        if_none_match: The value of the If-None-Match header, if any.
+
+    Returns:
+        Whether the client already has the spec.
+
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
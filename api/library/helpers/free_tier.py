@@ -1,10 +1,44 @@
 """Helper for managing the free tier."""
 
+import contextvars
 import typing
 
 from open_alchemy import package_database
 
 from .. import config, types
+from ..facades import storage
+
+
+def _get_model_counts(
+    *, user: types.TUser, spec_name: types.TSpecName
+) -> typing.Tuple[types.TSpecModelCount, types.TSpecModelCount]:
+    """
+    Retrieve the model count of a spec and of the user at the same time.
+
+    The spec is retrieved on the pool of threads that is shared by all requests
+    while the model count of the user is retrieved.
+
+    Args:
+        user: The user to retrieve the model counts for
+        spec_name: The name of the spec
+
+    Returns:
+        The model count of the spec, 0 if it could not be retrieved, and of the
+        user.
+
+    """
+    database = package_database.get()
+    spec_info_future = storage.get_executor().submit(
+        contextvars.copy_context().run, database.get_spec, sub=user, name=spec_name
+    )
+    user_model_count = database.count_customer_models(sub=user)
+    try:
+        spec_info = typing.cast(
+            package_database.types.TSpecInfo, spec_info_future.result()
+        )
+    except package_database.exceptions.BaseError:
+        return 0, user_model_count
+    return spec_info["model_count"], user_model_count
 
 
 def check_within_limit(
@@ -14,9 +48,9 @@ def check_within_limit(
     Check whether adding a spec would exceed the free tier limit.
 
     Algorithm:
-        1. retrieve the information for the spec,
-        2. retrieve the model count for the user and
-        3. return whether the user model count plus the new model count minus the
+        1. retrieve the information for the spec and the model count for the user
+            at the same time and
+        2. return whether the user model count plus the new model count minus the
             existing model count would exceed the free tier.
 
     Args:
@@ -28,13 +62,9 @@ def check_within_limit(
         The result and the reason if the result is true.
 
     """
-    current_spec_model_count = 0
-    try:
-        spec_info = package_database.get().get_spec(sub=user, name=spec_name)
-        current_spec_model_count = spec_info["model_count"]
-    except package_database.exceptions.BaseError:
-        pass
-    user_model_count = package_database.get().count_customer_models(sub=user)
+    current_spec_model_count, user_model_count = _get_model_counts(
+        user=user, spec_name=spec_name
+    )
 
     new_user_model_count = user_model_count + model_count - current_spec_model_count
 
@@ -5,12 +5,13 @@ import json
 import typing
 
 import open_alchemy
-import yaml
-from open_alchemy import build
+from open_alchemy import build, package_database
 from packaging import version as packaging_version
 from yaml import parser, scanner
 
-from .. import exceptions, types
+from .. import config, exceptions, types
+from ..facades import server, storage
+from . import etag, free_tier, yaml_codec
 
 TSpec = typing.Dict[str, typing.Any]
 
@@ -31,7 +32,7 @@ def load(*, spec_str: str, language: str) -> TSpec:
     """
     if language == "YAML":
         try:
-            return yaml.safe_load(spec_str)
+            return yaml_codec.load(spec_str)
         except (parser.ParserError, scanner.ScannerError) as exc:
             raise exceptions.LoadSpecError("body must be valid YAML") from exc
     elif language == "JSON":
@@ -131,4 +132,209 @@ def prepare(*, spec_str: str, version: str) -> str:
     if "info" in spec:
         info = {**info, **spec["info"]}
     components = spec["components"]
-    return yaml.dump({"info": info}) + yaml.dump({"components": components})
+    return yaml_codec.dump({"info": info}) + yaml_codec.dump({"components": components})
+
+
+def create_update_response(
+    *, user: types.TUser, name: types.TSpecName, spec_info: TSpecInfo
+) -> server.Response:
+    """
+    Store a processed spec and construct the response for the user.
+
+    Returns 402 if the free tier is exceeded.
+    Returns 409 if the spec was changed by another request at the same time.
+    Returns 500 if something went wrong.
+
+    Args:
+        user: The user that owns the spec.
+        name: The display name of the spec.
+        spec_info: The processed spec.
+
+    Returns:
+        The response to the request.
+
+    """
+    try:
+        # Check that the maximum number of models hasn't been exceeded
+        within_free_tier_result = free_tier.check_within_limit(
+            user=user, spec_name=name, model_count=spec_info.model_count
+        )
+        if not within_free_tier_result.value:
+            return server.Response(
+                within_free_tier_result.reason,
+                status=402,
+                mimetype="text/plain",
+            )
+
+        # Store the spec and the form of the spec that is returned to the user
+        storage.get_storage_facade().create_update_spec(
+            user=user,
+            name=name,
+            version=spec_info.version,
+            spec_str=spec_info.spec_str,
+        )
+        storage.get_storage_facade().create_update_prepared_spec(
+            user=user,
+            name=name,
+            version=spec_info.version,
+            prepared_spec_str=prepare(
+                spec_str=spec_info.spec_str, version=spec_info.version
+            ),
+        )
+
+        # Write an update into the database, checking the free tier again in case
+        # of concurrent writes
+        package_database.get().create_update_spec(
+            sub=user,
+            name=name,
+            version=spec_info.version,
+            title=spec_info.title,
+            description=spec_info.description,
+            model_count=spec_info.model_count,
+            max_model_count=config.get().free_tier_model_count,
+        )
+
+        return server.Response(status=204)
+
+    except storage.exceptions.StorageError as exc:
+        print(exc)  # allow-print
+        return server.Response(
+            "something went wrong whilst storing the spec",
+            status=500,
+            mimetype="text/plain",
+        )
+    except package_database.exceptions.ModelCountExceededError:
+        return server.Response(
+            "with this spec the maximum number of "
+            f"{config.get().free_tier_model_count} models for the free tier would "
+            "be exceeded",
+            status=402,
+            mimetype="text/plain",
+        )
+    except package_database.exceptions.ConflictError:
+        return server.Response(
+            "the spec was changed by another request at the same time, try again",
+            status=409,
+            mimetype="text/plain",
+        )
+    except package_database.exceptions.BaseError:
+        return server.Response(
+            "something went wrong whilst updating the database",
+            status=500,
+            mimetype="text/plain",
+        )
+
+
+def retrieve_prepared(
+    *,
+    user: types.TUser,
+    name: types.TSpecName,
+    version: types.TSpecVersion,
+    version_time: typing.Optional[int] = None,
+) -> str:
+    """
+    Retrieve a stored spec in the form that is returned to the user.
+
+    Serves the prepared spec stored with the spec and falls back to preparing the
+    spec for specs stored before prepared specs were stored.
+
+    Raises ObjectNotFoundError if the spec does not exist.
+
+    Args:
+        user: The user that owns the spec.
+        name: The display name of the spec.
+        version: The version of the spec.
+        version_time: The time the latest version of the spec was written in
+            microseconds since epoch according to the database, the spec is read
+            from the cache of the storage facade if supplied.
+
+    Returns:
+        The spec in a user friendly form.
+
+    """
+    storage_facade = storage.get_storage_facade()
+    try:
+        return storage_facade.get_prepared_spec(
+            user=user, name=name, version=version, version_time=version_time
+        )
+    except storage.exceptions.ObjectNotFoundError:
+        pass
+
+    spec_str = storage_facade.get_spec(
+        user=user, name=name, version=version, version_time=version_time
+    )
+    return prepare(spec_str=spec_str, version=version)
+
+
+def get_response(
+    *,
+    user: types.TUser,
+    name: types.TSpecName,
+    version: types.TSpecVersion,
+    info: package_database.types.TSpecInfo,
+    version_time: int,
+    if_none_match: typing.Optional[str],
+) -> server.Response:
+    """
+    Construct the response that returns a version of a spec to the user.
+
+    Returns 304 without reading the spec from the storage if the If-None-Match
+    header matches the ETag of the version.
+
+    Raises ObjectNotFoundError if the spec does not exist.
+
+    Args:
+        user: The user that owns the spec.
+        name: The display name of the spec.
+        version: The version of the spec.
+        info: The information about the spec from the database.
+        version_time: The time the latest version of the spec was written in
+            microseconds since epoch.
+        if_none_match: The value of the If-None-Match header, if any.
+
+    Returns:
+        The response with the ETag of the version.
+
+    """
+    spec_etag = etag.calc(
+        user=user, version=version, info=info, version_time=version_time
+    )
+    if etag.matches(etag=spec_etag, if_none_match=if_none_match):
+        return server.Response(status=304, headers={"ETag": spec_etag})
+
+    prepared_spec_str = retrieve_prepared(
+        user=user, name=name, version=version, version_time=version_time
+    )
+    return server.Response(
+        json.dumps({**info, "value": prepared_spec_str}),
+        status=200,
+        mimetype="application/json",
+        headers={"ETag": spec_etag},
+    )
+
+
+def prefetch_prepared(
+    *, user: types.TUser, name: types.TSpecName, version: types.TSpecVersion
+) -> None:
+    """
+    Read a stored spec into the cache of the storage facade before it is retrieved.
+
+    Used to read the storage at the same time as the database, whether the spec is
+    current is checked once it is retrieved using retrieve_prepared. The spec is
+    only read if the prepared spec does not exist. Errors are not raised because the
+    storage is read again by retrieve_prepared, which raises them.
+
+    Args:
+        user: The user that owns the spec.
+        name: The display name of the spec.
+        version: The version of the spec.
+
+    """
+    storage_facade = storage.get_storage_facade()
+    try:
+        if not storage_facade.prefetch_prepared_spec(
+            user=user, name=name, version=version
+        ):
+            storage_facade.prefetch_spec(user=user, name=name, version=version)
+    except storage.exceptions.StorageError:
+        pass
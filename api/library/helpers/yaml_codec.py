@@ -0,0 +1,69 @@
+"""
+YAML codec that uses libyaml when it is available.
+
+The C implementations of the loader and dumper are many times faster than the pure
+Python implementations. They construct the same values and emit the same YAML except
+that the C emitter folds long strings that are not printable ASCII differently and
+represents empty keys and documents that are a scalar differently. Such data is
+dumped using the pure Python implementation so that the output does not change.
+"""
+
+import typing
+
+import yaml
+
+# The C implementations only exist if PyYAML was built against libyaml
+_LOADER: typing.Type[typing.Any] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_C_DUMPER: typing.Optional[typing.Type[typing.Any]] = getattr(yaml, "CSafeDumper", None)
+
+
+def load(value: str) -> typing.Any:
+    """
+    Load YAML like yaml.safe_load.
+
+    Raises the same YAMLError subclasses as yaml.safe_load if loading fails.
+
+    Args:
+        value: The YAML to load.
+
+    Returns:
+        The loaded value.
+
+    """
+    return yaml.load(value, Loader=_LOADER)  # nosec
+
+
+def _c_dumper_compatible(data: typing.Any) -> bool:
+    """Check whether the C dumper emits the same YAML for data as the Python one."""
+    if not isinstance(data, (dict, list)):
+        return False
+
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if "" in value:
+                return False
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, str) and not (value.isascii() and value.isprintable()):
+            return False
+    return True
+
+
+def dump(data: typing.Any) -> str:
+    """
+    Dump data to YAML like yaml.dump.
+
+    Args:
+        data: The data to dump, made up of the values that JSON supports.
+
+    Returns:
+        The YAML of the data.
+
+    """
+    if _C_DUMPER is not None and _c_dumper_compatible(data):
+        return yaml.dump(data, Dumper=_C_DUMPER)
+    return yaml.dump(data, Dumper=yaml.SafeDumper)
@@ -1,31 +1,77 @@
 """Handle specs endpoint."""
 
 import json
+import typing
 
 from open_alchemy import package_database
 
 from .. import exceptions, types
 from ..facades import server, storage
-from ..helpers import free_tier, spec
+from ..helpers import spec
 
 
-def list_(user: types.TUser) -> server.Response:
+def list_(
+    user: types.TUser,
+    limit: typing.Optional[int] = None,
+    cursor: typing.Optional[str] = None,
+    names: typing.Optional[typing.List[types.TSpecName]] = None,
+) -> server.Response:
     """
-    Accept a spec and store it.
+    List the specs for a user.
+
+    If a limit or cursor is supplied, a page of specs is returned and the cursor for
+    the next page is returned in the X-NEXT-CURSOR header. If names are supplied,
+    only the specs with those names are returned using a single batch read.
 
     Args:
         user: The user from the token.
+        limit: The maximum number of specs to return.
+        cursor: The cursor returned with the previous page.
+        names: The names of the specs to return.
 
     Returns:
         The response to the request.
 
     """
-    try:
+    if names is not None and (limit is not None or cursor is not None):
         return server.Response(
-            json.dumps(package_database.get().list_specs(sub=user)),
+            "names cannot be combined with limit or cursor",
+            status=400,
+            mimetype="text/plain",
+        )
+
+    try:
+        if names is not None:
+            return server.Response(
+                json.dumps(package_database.get().get_specs(sub=user, names=names)),
+                status=200,
+                mimetype="application/json",
+            )
+
+        if limit is None and cursor is None:
+            return server.Response(
+                package_database.get().list_specs_json(sub=user),
+                status=200,
+                mimetype="application/json",
+            )
+
+        page = package_database.get().list_specs_page(
+            sub=user, limit=limit, cursor=cursor
+        )
+        response = server.Response(
+            json.dumps(page.items),
             status=200,
             mimetype="application/json",
         )
+        if page.cursor is not None:
+            response.headers["X-NEXT-CURSOR"] = page.cursor
+        return response
+    except package_database.exceptions.InvalidCursorError:
+        return server.Response(
+            "the cursor is not valid",
+            status=400,
+            mimetype="text/plain",
+        )
     except package_database.exceptions.BaseError:
         return server.Response(
             "something went wrong whilst reading from the database",
@@ -38,6 +84,9 @@ def get(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
     """
     Retrieve a spec for a user.
 
+    Returns 304 without reading the spec from the storage if the If-None-Match
+    header matches the ETag of the spec.
+
     Args:
         spec_name: The id of the spec.
         user: The user from the token.
@@ -47,21 +96,14 @@ def get(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
 
     """
     try:
-        version = package_database.get().get_latest_spec_version(
-            sub=user, name=spec_name
-        )
-        spec_str = storage.get_storage_facade().get_spec(
-            user=user, name=spec_name, version=version
-        )
-        prepared_spec_str = spec.prepare(spec_str=spec_str, version=version)
-        spec_info = package_database.get().get_spec(sub=user, name=spec_name)
-
-        response_data = json.dumps({**spec_info, "value": prepared_spec_str})
-
-        return server.Response(
-            response_data,
-            status=200,
-            mimetype="application/json",
+        latest_spec = package_database.get().get_latest_spec(sub=user, name=spec_name)
+        return spec.get_response(
+            user=user,
+            name=spec_name,
+            version=latest_spec.version,
+            info=latest_spec.info,
+            version_time=latest_spec.version_time,
+            if_none_match=server.get_header("If-None-Match"),
         )
     except package_database.exceptions.NotFoundError:
         return server.Response(
@@ -97,6 +139,7 @@ def put(
 
     Returns 400 if the spec is not valid.
     Returns 402 if the free tier is exceeded.
+    Returns 409 if the spec could not be written due to concurrent writes.
     Returns 500 if something went wrong.
 
     Args:
@@ -114,56 +157,15 @@ def put(
         # Check whether spec is valid
         spec_info = spec.process(spec_str=body.decode(), language=language)
 
-        # Check that the maximum number of models hasn't been exceeded
-        within_free_tier_result = free_tier.check_within_limit(
-            user=user, spec_name=spec_name, model_count=spec_info.model_count
+        return spec.create_update_response(
+            user=user, name=spec_name, spec_info=spec_info
         )
-        if not within_free_tier_result.value:
-            return server.Response(
-                within_free_tier_result.reason,
-                status=402,
-                mimetype="text/plain",
-            )
-
-        # Store the spec
-        storage.get_storage_facade().create_update_spec(
-            user=user,
-            name=spec_name,
-            version=spec_info.version,
-            spec_str=spec_info.spec_str,
-        )
-
-        # Write an update into the database
-        package_database.get().create_update_spec(
-            sub=user,
-            name=spec_name,
-            version=spec_info.version,
-            title=spec_info.title,
-            description=spec_info.description,
-            model_count=spec_info.model_count,
-        )
-
-        return server.Response(status=204)
-
     except exceptions.LoadSpecError as exc:
         return server.Response(
             f"the spec is not valid, {exc}",
             status=400,
             mimetype="text/plain",
         )
-    except storage.exceptions.StorageError as exc:
-        print(exc)  # allow-print
-        return server.Response(
-            "something went wrong whilst storing the spec",
-            status=500,
-            mimetype="text/plain",
-        )
-    except package_database.exceptions.BaseError:
-        return server.Response(
-            "something went wrong whilst updating the database",
-            status=500,
-            mimetype="text/plain",
-        )
 
 
 def delete(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
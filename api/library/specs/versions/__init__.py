@@ -1,40 +1,71 @@
 """Handle specs versions endpoint."""
 
+import contextvars
 import json
+import typing
 
 from open_alchemy import package_database
 
 from ... import exceptions, types
 from ...facades import server, storage
-from ...helpers import free_tier, spec
+from ...helpers import spec
 
 
-def list_(spec_name: types.TSpecId, user: types.TUser) -> server.Response:
+def list_(
+    spec_name: types.TSpecId,
+    user: types.TUser,
+    limit: typing.Optional[int] = None,
+    cursor: typing.Optional[str] = None,
+) -> server.Response:
     """
     List all available versions of a spec.
 
+    If a limit or cursor is supplied, a page of versions is returned and the cursor
+    for the next page is returned in the X-NEXT-CURSOR header.
+
     Args:
         spec_name: The id of the spec.
         user: The user from the token.
+        limit: The maximum number of versions to return.
+        cursor: The cursor returned with the previous page.
 
     Returns:
         The response to the request.
 
     """
     try:
-        return server.Response(
-            json.dumps(
-                package_database.get().list_spec_versions(sub=user, name=spec_name)
-            ),
+        if limit is None and cursor is None:
+            return server.Response(
+                json.dumps(
+                    package_database.get().list_spec_versions(sub=user, name=spec_name)
+                ),
+                status=200,
+                mimetype="application/json",
+            )
+
+        page = package_database.get().list_spec_versions_page(
+            sub=user, name=spec_name, limit=limit, cursor=cursor
+        )
+        response = server.Response(
+            json.dumps(page.items),
             status=200,
             mimetype="application/json",
         )
+        if page.cursor is not None:
+            response.headers["X-NEXT-CURSOR"] = page.cursor
+        return response
     except package_database.exceptions.NotFoundError:
         return server.Response(
             f"could not find spec with id {spec_name}",
             status=404,
             mimetype="text/plain",
         )
+    except package_database.exceptions.InvalidCursorError:
+        return server.Response(
+            "the cursor is not valid",
+            status=400,
+            mimetype="text/plain",
+        )
     except package_database.exceptions.BaseError:
         return server.Response(
             "something went wrong whilst reading from the database",
@@ -49,6 +80,17 @@ def get(
     """
     Retrieve a version of a spec for a user.
 
+    Returns 304 without reading the spec from the storage if the If-None-Match
+    header matches the ETag of the version.
+
+    Algorithm:
+        1. if there is no If-None-Match header, retrieve the information about the
+            spec from the database and read the spec from the storage into the cache
+            at the same time, otherwise only retrieve the information,
+        2. return 304 if the If-None-Match header matches the ETag of the version and
+        3. retrieve the spec, which is served from the cache if it was read after it
+            was last updated.
+
     Args:
         spec_name: The id of the spec.
         version: The version of the spec.
@@ -59,20 +101,33 @@ def get(
 
     """
     try:
-        spec_str = storage.get_storage_facade().get_spec(
-            user=user, name=spec_name, version=version
+        if_none_match = server.get_header("If-None-Match")
+        prefetch = (
+            storage.get_executor().submit(
+                contextvars.copy_context().run,
+                spec.prefetch_prepared,
+                user=user,
+                name=spec_name,
+                version=version,
+            )
+            if if_none_match is None
+            else None
         )
-        prepared_spec_str = spec.prepare(spec_str=spec_str, version=version)
-        spec_info = package_database.get().get_spec(sub=user, name=spec_name)
-
-        response_data = json.dumps({**spec_info, "value": prepared_spec_str})
-
-        return server.Response(
-            response_data,
-            status=200,
-            mimetype="application/json",
+        latest_spec = package_database.get().get_latest_spec(sub=user, name=spec_name)
+        if prefetch is not None:
+            prefetch.result()
+        return spec.get_response(
+            user=user,
+            name=spec_name,
+            version=version,
+            info=latest_spec.info,
+            version_time=latest_spec.version_time,
+            if_none_match=if_none_match,
         )
-    except storage.exceptions.ObjectNotFoundError:
+    except (
+        package_database.exceptions.NotFoundError,
+        storage.exceptions.ObjectNotFoundError,
+    ):
         return server.Response(
             f"could not find the spec with id {spec_name}",
             status=404,
@@ -104,6 +159,7 @@ def put(
     Returns 400 if the spec is not valid.
     Returns 400 if the requested version does not match the calculated version.
     Returns 402 if the free tier is exceeded.
+    Returns 409 if the spec was changed by another request at the same time.
     Returns 500 if something went wrong.
 
     Args:
@@ -131,52 +187,12 @@ def put(
                 mimetype="text/plain",
             )
 
-        # Check that the maximum number of models hasn't been exceeded
-        within_free_tier_result = free_tier.check_within_limit(
-            user=user, spec_name=spec_name, model_count=spec_info.model_count
-        )
-        if not within_free_tier_result.value:
-            return server.Response(
-                within_free_tier_result.reason,
-                status=402,
-                mimetype="text/plain",
-            )
-
-        # Store the spec
-        storage.get_storage_facade().create_update_spec(
-            user=user,
-            name=spec_name,
-            version=spec_info.version,
-            spec_str=spec_info.spec_str,
-        )
-
-        # Write an update into the database
-        package_database.get().create_update_spec(
-            sub=user,
-            name=spec_name,
-            version=spec_info.version,
-            title=spec_info.title,
-            description=spec_info.description,
-            model_count=spec_info.model_count,
+        return spec.create_update_response(
+            user=user, name=spec_name, spec_info=spec_info
         )
-
-        return server.Response(status=204)
-
     except exceptions.LoadSpecError as exc:
         return server.Response(
             f"the spec is not valid, {exc}",
             status=400,
             mimetype="text/plain",
         )
-    except storage.exceptions.StorageError as exc:
-        return server.Response(
-            "something went wrong whilst storing the spec",
-            status=500,
-            mimetype="text/plain",
-        )
-    except package_database.exceptions.BaseError:
-        return server.Response(
-            "something went wrong whilst updating the database",
-            status=500,
-            mimetype="text/plain",
-        )
@@ -19,12 +19,13 @@ def preset_config():
 
 @pytest.fixture(autouse=True)
 def clean_storage():
-    """Delete all objects from the storage."""
+    """Delete all objects from the storage and the cache of the storage."""
     yield
 
     keys = storage.get_storage().list()
 
     storage.get_storage().delete_all(keys=keys)
+    storage.get_spec_cache().clear()
 
 
 @pytest.fixture(autouse=True)
@@ -0,0 +1,221 @@
+"""Tests for the cache of the storage."""
+
+from unittest import mock
+
+import pytest
+from library.facades.storage import cache, exceptions
+
+
+@pytest.mark.storage
+def test_get(monkeypatch):
+    """
+    GIVEN empty cache
+    WHEN get is called multiple times for a key with the same and a different version
+        time within the same second
+    THEN the object is only loaded again for a different version time.
+    """
+    monkeypatch.setattr(cache.time, "time", lambda: 0)
+    cache_instance = cache.Cache(max_size=100)
+    load = mock.MagicMock(side_effect=["value 1", "value 2"])
+
+    assert cache_instance.get(key="key 1", version_time=1, load=load) == "value 1"
+    assert cache_instance.get(key="key 1", version_time=1, load=load) == "value 1"
+    assert load.call_count == 1
+    assert cache_instance.get(key="key 1", version_time=2, load=load) == "value 2"
+    assert load.call_count == 2
+
+    assert cache_instance.as_dict() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "entries": 1,
+        "size": len("key 1") + len("value 2"),
+    }
+
+
+@pytest.mark.storage
+def test_get_not_found():
+    """
+    GIVEN empty cache
+    WHEN get is called multiple times for a key of an object that does not exist
+    THEN ObjectNotFoundError is raised and the object is only loaded once.
+    """
+    cache_instance = cache.Cache(max_size=100)
+    load = mock.MagicMock(side_effect=exceptions.ObjectNotFoundError("not found"))
+
+    for _ in range(2):
+        with pytest.raises(exceptions.ObjectNotFoundError):
+            cache_instance.get(key="key 1", version_time=1, load=load)
+
+    assert load.call_count == 1
+    assert cache_instance.hits == 1
+
+
+@pytest.mark.storage
+def test_get_error():
+    """
+    GIVEN empty cache
+    WHEN get is called and loading the object fails
+    THEN the error is raised and nothing is cached.
+    """
+    cache_instance = cache.Cache(max_size=100)
+    load = mock.MagicMock(side_effect=exceptions.StorageError("failed"))
+
+    with pytest.raises(exceptions.StorageError):
+        cache_instance.get(key="key 1", version_time=1, load=load)
+
+    assert cache_instance.as_dict()["entries"] == 0
+
+
+@pytest.mark.storage
+def test_get_evict():
+    """
+    GIVEN cache that can hold two objects with two cached objects
+    WHEN the first object is read and a third object is cached
+    THEN the least recently used second object is evicted.
+    """
+    cache_instance = cache.Cache(max_size=2 * len("key 1value 1"))
+    for key in ("key 1", "key 2", "key 1", "key 3"):
+        cache_instance.get(key=key, version_time=1, load=lambda: "value 1")
+    load = mock.MagicMock(return_value="value 1")
+
+    for key in ("key 1", "key 3", "key 2"):
+        cache_instance.get(key=key, version_time=1, load=load)
+
+    assert load.call_count == 1
+    assert cache_instance.evictions == 2
+    assert cache_instance.size == cache_instance.max_size
+
+
+@pytest.mark.storage
+def test_get_too_large(monkeypatch):
+    """
+    GIVEN cache with a cached object
+    WHEN an object larger than the cache is read for the same key
+    THEN the object is not cached and the previous object is removed.
+    """
+    monkeypatch.setattr(cache.time, "time", lambda: 0)
+    cache_instance = cache.Cache(max_size=20)
+    cache_instance.get(key="key 1", version_time=1, load=lambda: "value 1")
+
+    cache_instance.get(key="key 1", version_time=2, load=lambda: "value 1" * 10)
+
+    assert cache_instance.as_dict()["entries"] == 0
+    assert cache_instance.size == 0
+    assert cache_instance.evictions == 0
+
+
+@pytest.mark.storage
+def test_invalidate_clear():
+    """
+    GIVEN cache with cached objects
+    WHEN invalidate is called with some of the keys and then clear is called
+    THEN the objects are loaded again.
+    """
+    cache_instance = cache.Cache(max_size=100)
+    for key in ("key 1", "key 2"):
+        cache_instance.get(key=key, version_time=1, load=lambda: "value 1")
+    load = mock.MagicMock(return_value="value 1")
+
+    cache_instance.invalidate(keys=["key 1", "key 3"])
+
+    cache_instance.get(key="key 1", version_time=1, load=load)
+    cache_instance.get(key="key 2", version_time=1, load=load)
+    assert load.call_count == 1
+
+    cache_instance.clear()
+
+    assert cache_instance.size == 0
+    cache_instance.get(key="key 2", version_time=1, load=load)
+    assert load.call_count == 2
+
+
+@pytest.mark.storage
+def test_get_read_after_write_margin(monkeypatch):
+    """
+    GIVEN cache with an object cached for a version time
+    WHEN get is called for a later version time that is and then is not within the
+        margin of when the object was read
+    THEN the object is loaded again only while the version time is within the
+        margin.
+    """
+    monkeypatch.setattr(cache.time, "time", lambda: 10)
+    read_at = 10 * cache.MICROSECONDS
+    cache_instance = cache.Cache(max_size=100)
+    cache_instance.get(key="key 1", version_time=1, load=lambda: "value 1")
+    load = mock.MagicMock(return_value="value 2")
+
+    assert (
+        cache_instance.get(
+            key="key 1",
+            version_time=read_at - cache.READ_AFTER_WRITE_MARGIN + 1,
+            load=load,
+        )
+        == "value 2"
+    )
+    assert load.call_count == 1
+    assert (
+        cache_instance.get(
+            key="key 1",
+            version_time=read_at - cache.READ_AFTER_WRITE_MARGIN,
+            load=load,
+        )
+        == "value 2"
+    )
+    assert load.call_count == 1
+
+
+@pytest.mark.storage
+def test_prefetch(monkeypatch):
+    """
+    GIVEN empty cache
+    WHEN prefetch is called for an object and get is called for a version time
+        outside and within the margin
+    THEN the object is loaded once by prefetch and again only for the version time
+        within the margin.
+    """
+    monkeypatch.setattr(cache.time, "time", lambda: 10)
+    version_time = 10 * cache.MICROSECONDS - cache.READ_AFTER_WRITE_MARGIN
+    cache_instance = cache.Cache(max_size=100)
+    load = mock.MagicMock(side_effect=["value 1", "value 2"])
+
+    assert cache_instance.prefetch(key="key 1", load=load) is True
+    assert cache_instance.prefetch(key="key 1", load=load) is True
+    assert load.call_count == 1
+    assert (
+        cache_instance.get(key="key 1", version_time=version_time, load=load)
+        == "value 1"
+    )
+    assert load.call_count == 1
+    assert (
+        cache_instance.get(key="key 1", version_time=version_time + 1, load=load)
+        == "value 2"
+    )
+    assert load.call_count == 2
+
+    assert cache_instance.as_dict() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 0,
+        "entries": 1,
+        "size": len("key 1") + len("value 2"),
+    }
+
+
+@pytest.mark.storage
+def test_prefetch_not_found():
+    """
+    GIVEN empty cache
+    WHEN prefetch is called for an object that does not exist and then get is called
+    THEN False is returned, ObjectNotFoundError is raised and the object is only
+        loaded once.
+    """
+    cache_instance = cache.Cache(max_size=100)
+    load = mock.MagicMock(side_effect=exceptions.ObjectNotFoundError("not found"))
+
+    assert cache_instance.prefetch(key="key 1", load=load) is False
+    assert cache_instance.prefetch(key="key 1", load=load) is False
+    with pytest.raises(exceptions.ObjectNotFoundError):
+        cache_instance.get(key="key 1", version_time=0, load=load)
+
+    assert load.call_count == 1
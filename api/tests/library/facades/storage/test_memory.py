@@ -218,6 +218,23 @@ def test_list(class_, set_args, prefix, suffix, expected_keys):
     assert returned_keys == expected_keys
 
 
+@pytest.mark.parametrize("class_", CLASSES)
+@pytest.mark.storage
+def test_list_modified_before(monkeypatch, class_):
+    """
+    GIVEN storage class with objects set at different times
+    WHEN list is called with a modification time
+    THEN only the keys of the objects modified before the time are returned.
+    """
+    storage_instance = class_()
+    for modified_at, key in ((1, "key 1"), (2, "key 2"), (3, "key 1")):
+        monkeypatch.setattr(storage.memory.time, "time", lambda at=modified_at: at)
+        storage_instance.set(key=key, value="value 1")
+
+    assert storage_instance.list(modified_before=3) == ["key 2"]
+    assert storage_instance.list(modified_before=4) == ["key 1", "key 2"]
+
+
 @pytest.mark.parametrize("class_", CLASSES)
 @pytest.mark.storage
 def test_delete_all_no_set(class_):
@@ -1,5 +1,6 @@
 """tests for s3 torage facade."""
 
+import datetime
 from unittest import mock
 
 import pytest
@@ -92,6 +93,31 @@ def test_list(response, suffix, prefix, expected_prefix, expected_keys):
     assert returned_keys == expected_keys
 
 
+@pytest.mark.storage
+def test_list_modified_before():
+    """
+    GIVEN stubbed s3 client with objects modified at different times
+    WHEN list is called with a modification time
+    THEN only the keys of the objects modified before the time are returned.
+    """
+    bucket = "bucket1"
+    s3_instance = storage.s3.Storage(bucket)
+    stubber = stub.Stubber(s3_instance.client)
+    response = {
+        "Contents": [
+            {"Key": "key 1", "LastModified": datetime.datetime.fromtimestamp(1)},
+            {"Key": "key 2", "LastModified": datetime.datetime.fromtimestamp(2)},
+        ]
+    }
+    stubber.add_response("list_objects_v2", response, {"Bucket": bucket, "Prefix": ""})
+    stubber.activate()
+
+    returned_keys = s3_instance.list(modified_before=2)
+
+    stubber.assert_no_pending_responses()
+    assert returned_keys == ["key 1"]
+
+
 @pytest.mark.storage
 def test_list_multi_page():
     """
@@ -1,5 +1,7 @@
 """Tests for the storage facade."""
 
+from unittest import mock
+
 import pytest
 from library.facades import storage
 
@@ -67,6 +69,157 @@ def test_get_spec():
     )
 
 
+@pytest.mark.storage
+def test_get_prepared_spec():
+    """
+    GIVEN user, name, version, spec str and prepared spec str
+    WHEN create_update_spec and create_update_prepared_spec are called and then
+        get_prepared_spec is called with a canonically identical name
+    THEN the prepared spec str is returned or ObjectNotFoundError is raised.
+    """
+    user = "user 1"
+    name = "name 1"
+    version = "version 1"
+    storage_instance = storage.get_storage_facade()
+    storage_instance.create_update_spec(
+        user=user, name=name, version=version, spec_str="spec str 1"
+    )
+
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage_instance.get_prepared_spec(user=user, name=name, version=version)
+
+    storage_instance.create_update_prepared_spec(
+        user=user, name=name, version=version, prepared_spec_str="prepared 1"
+    )
+
+    assert (
+        storage_instance.get_prepared_spec(
+            user=user, name=name.upper(), version=version
+        )
+        == "prepared 1"
+    )
+    assert (
+        storage_instance.get_spec(user=user, name=name, version=version) == "spec str 1"
+    )
+    assert storage_instance.get_spec_versions(user=user, name=name) == [version]
+
+
+@pytest.mark.storage
+def test_get_spec_cache(monkeypatch):
+    """
+    GIVEN spec without its prepared form in storage
+    WHEN get_spec and get_prepared_spec are called repeatedly with and without the
+        version time of the spec and after the spec is updated and deleted
+    THEN the storage is only read if the spec is not cached.
+    """
+    monkeypatch.setattr(storage.cache.time, "time", lambda: 0)
+    user = "user 1"
+    name = "name 1"
+    version = "version 1"
+    storage_instance = storage.get_storage_facade()
+    storage_instance.create_update_spec(
+        user=user, name=name, version=version, spec_str="spec str 1"
+    )
+    mock_get = mock.MagicMock(side_effect=storage.get_storage().get)
+    monkeypatch.setattr(storage.get_storage(), "get", mock_get)
+
+    for _ in range(2):
+        assert (
+            storage_instance.get_spec(
+                user=user, name=name, version=version, version_time=1
+            )
+            == "spec str 1"
+        )
+        with pytest.raises(storage.exceptions.ObjectNotFoundError):
+            storage_instance.get_prepared_spec(
+                user=user, name=name, version=version, version_time=1
+            )
+    assert mock_get.call_count == 2
+
+    storage_instance.get_spec(user=user, name=name, version=version)
+    storage_instance.get_spec(user=user, name=name, version=version, version_time=2)
+    assert mock_get.call_count == 4
+
+    storage_instance.create_update_spec(
+        user=user, name=name, version=version, spec_str="spec str 2"
+    )
+    storage_instance.create_update_prepared_spec(
+        user=user, name=name, version=version, prepared_spec_str="prepared 2"
+    )
+
+    assert (
+        storage_instance.get_spec(user=user, name=name, version=version, version_time=2)
+        == "spec str 2"
+    )
+    assert (
+        storage_instance.get_prepared_spec(
+            user=user, name=name, version=version, version_time=1
+        )
+        == "prepared 2"
+    )
+
+    storage_instance.delete_spec_versions(user=user, name=name, versions=[version])
+
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage_instance.get_spec(user=user, name=name, version=version, version_time=2)
+
+    storage_instance.create_update_spec(
+        user=user, name=name, version=version, spec_str="spec str 3"
+    )
+    storage_instance.get_spec(user=user, name=name, version=version, version_time=3)
+    storage_instance.delete_spec(user=user, name=name)
+
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage_instance.get_spec(user=user, name=name, version=version, version_time=3)
+
+
+@pytest.mark.storage
+def test_prefetch(monkeypatch):
+    """
+    GIVEN spec without its prepared form in storage
+    WHEN prefetch_spec and prefetch_prepared_spec are called repeatedly and then
+        get_spec and get_prepared_spec are called
+    THEN whether the objects exist is returned and the storage is only read once per
+        object.
+    """
+    monkeypatch.setattr(storage.cache.time, "time", lambda: 1)
+    user = "user 1"
+    name = "name 1"
+    version = "version 1"
+    storage_instance = storage.get_storage_facade()
+    storage_instance.create_update_spec(
+        user=user, name=name, version=version, spec_str="spec str 1"
+    )
+    mock_get = mock.MagicMock(side_effect=storage.get_storage().get)
+    monkeypatch.setattr(storage.get_storage(), "get", mock_get)
+
+    for _ in range(2):
+        assert storage_instance.prefetch_spec(user=user, name=name, version=version)
+        assert not storage_instance.prefetch_prepared_spec(
+            user=user, name=name, version=version
+        )
+
+    assert (
+        storage_instance.get_spec(user=user, name=name, version=version, version_time=1)
+        == "spec str 1"
+    )
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage_instance.get_prepared_spec(
+            user=user, name=name, version=version, version_time=1
+        )
+    assert mock_get.call_count == 2
+
+
+@pytest.mark.storage
+def test_get_executor():
+    """
+    GIVEN storage facade
+    WHEN get_executor is called multiple times
+    THEN the same pool of threads is returned.
+    """
+    assert storage.get_executor() is storage.get_executor()
+
+
 @pytest.mark.storage
 def test_delete_spec():
     """
@@ -171,3 +324,41 @@ def test_get_spec_versions():
     with pytest.raises(storage.exceptions.ObjectNotFoundError) as exc:
         storage_instance.get_spec_versions(user=user, name="name 2")
     assert "name 2" in str(exc)
+
+
+@pytest.mark.storage
+def test_delete_spec_versions(monkeypatch):
+    """
+    GIVEN multiple versions of a spec and a small maximum number of keys per delete
+    WHEN delete_spec_versions is called with some of the versions
+    THEN only those versions are deleted.
+    """
+    monkeypatch.setattr(storage, "DELETE_ALL_MAX_KEYS", 2)
+    user = "user 1"
+    name = "name 1"
+    storage_instance = storage.get_storage_facade()
+    for version in ("1", "2", "3", "4"):
+        storage_instance.create_update_spec(
+            user=user, name=name, version=version, spec_str=f"spec str {version}"
+        )
+    # Versions stored before prepared specs were stored do not have one
+    for version in ("2", "4"):
+        storage_instance.create_update_prepared_spec(
+            user=user,
+            name=name,
+            version=version,
+            prepared_spec_str=f"prepared spec str {version}",
+        )
+
+    storage_instance.delete_spec_versions(user=user, name=name, versions=[])
+    storage_instance.delete_spec_versions(
+        user=user, name=name.upper(), versions=["1", "2", "3"]
+    )
+
+    assert storage_instance.get_spec_versions(user=user, name=name) == ["4"]
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        storage_instance.get_prepared_spec(user=user, name=name, version="2")
+    assert (
+        storage_instance.get_prepared_spec(user=user, name=name, version="4")
+        == "prepared spec str 4"
+    )
@@ -0,0 +1,67 @@
+"""Tests for the entity tag helpers."""
+
+import pytest
+from library.helpers import etag
+
+INFO = {
+    "name": "spec 1",
+    "id": "spec-1",
+    "updated_at": 1,
+    "version": "1",
+    "model_count": 1,
+}
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"user": "user 2"}, id="user"),
+        pytest.param({"version": "2"}, id="version"),
+        pytest.param({"info": {**INFO, "updated_at": 2}}, id="updated_at"),
+        pytest.param({"info": {**INFO, "version": "2"}}, id="latest version"),
+        pytest.param({"info": {**INFO, "id": "spec-2"}}, id="id"),
+        pytest.param({"version_time": 1_000_001}, id="version_time"),
+    ],
+)
+@pytest.mark.helpers
+def test_calc_changes(kwargs):
+    """
+    GIVEN user, version, information and version time of a spec
+    WHEN calc is called with a different user, version, information or version time
+    THEN a different quoted entity tag is returned.
+    """
+    default_kwargs = {
+        "user": "user 1",
+        "version": "1",
+        "info": INFO,
+        "version_time": 1_000_000,
+    }
+
+    returned_etag = etag.calc(**default_kwargs)
+
+    assert returned_etag.startswith('"') and returned_etag.endswith('"')
+    assert returned_etag == etag.calc(**default_kwargs)
+    assert returned_etag != etag.calc(**{**default_kwargs, **kwargs})
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected_result",
+    [
+        pytest.param(None, False, id="not set"),
+        pytest.param('"tag 2"', False, id="different"),
+        pytest.param('"tag 1"', True, id="same"),
+        pytest.param('W/"tag 1"', True, id="weak"),
+        pytest.param('"tag 2", "tag 1"', True, id="multiple"),
+        pytest.param("*", True, id="any"),
+    ],
+)
+@pytest.mark.helpers
+def test_matches(if_none_match, expected_result):
+    """
+    GIVEN entity tag and If-None-Match header
+    WHEN matches is called with the entity tag and header
+    THEN the expected result is returned.
+    """
+    returned_result = etag.matches(etag='"tag 1"', if_none_match=if_none_match)
+
+    assert returned_result == expected_result
@@ -1,5 +1,7 @@
 """Tests for the free tier helper."""
 
+from unittest import mock
+
 import pytest
 from library import config
 from library.helpers import free_tier
@@ -223,3 +225,25 @@ def test_check_within_limit(
         assert str(free_tier_model_count) in returned_result.reason
         for content in expected_contents:
             assert content in returned_result.reason
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        pytest.param("count_customer_models", id="count_customer_models"),
+        pytest.param("get_spec", id="get_spec"),
+    ],
+)
+@pytest.mark.helpers
+def test_check_within_limit_error(monkeypatch, method, _clean_specs_table):
+    """
+    GIVEN database that raises an unexpected error when reading the model counts
+    WHEN check_within_limit is called
+    THEN the error is raised.
+    """
+    monkeypatch.setattr(
+        package_database.get(), method, mock.MagicMock(side_effect=ValueError)
+    )
+
+    with pytest.raises(ValueError):
+        free_tier.check_within_limit(user="user 1", spec_name="name 1", model_count=1)
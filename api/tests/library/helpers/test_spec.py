@@ -1,9 +1,11 @@
 """Tests for the helpers."""
 
 import json
+from unittest import mock
 
 import pytest
 from library import exceptions
+from library.facades import storage
 from library.helpers import spec
 
 LOAD_ERROR_TESTS = [
@@ -320,3 +322,122 @@ def test_prepare(version, spec_dict, expected_spec_str):
     returned_spec_str = spec.prepare(spec_str=spec_str, version=version)
 
     assert returned_spec_str == expected_spec_str
+
+
+@pytest.mark.helpers
+def test_retrieve_prepared():
+    """
+    GIVEN storage with a spec with and a spec without its prepared form
+    WHEN retrieve_prepared is called for each spec and a spec that does not exist
+    THEN the stored prepared spec, the prepared spec or ObjectNotFoundError is
+        returned.
+    """
+    user = "user 1"
+    spec_str = json.dumps({"components": {}})
+    storage_facade = storage.get_storage_facade()
+    for name in ("name 1", "name 2"):
+        storage_facade.create_update_spec(
+            user=user, name=name, version="1", spec_str=spec_str
+        )
+    storage_facade.create_update_prepared_spec(
+        user=user, name="name 1", version="1", prepared_spec_str="prepared 1"
+    )
+
+    assert spec.retrieve_prepared(user=user, name="name 1", version="1") == "prepared 1"
+    assert spec.retrieve_prepared(
+        user=user, name="name 2", version="1"
+    ) == spec.prepare(spec_str=spec_str, version="1")
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        spec.retrieve_prepared(user=user, name="name 3", version="1")
+
+
+@pytest.mark.helpers
+def test_get_response():
+    """
+    GIVEN storage with a prepared spec and the information about the spec
+    WHEN get_response is called without and with the returned ETag
+    THEN the spec with the ETag and 304 without the spec are returned.
+    """
+    user = "user 1"
+    info = {"name": "name 1", "id": "name-1", "updated_at": 1, "version": "1"}
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=user, name="name 1", version="1", prepared_spec_str="prepared 1"
+    )
+
+    response = spec.get_response(
+        user=user,
+        name="name 1",
+        version="1",
+        info=info,
+        version_time=1_000_000,
+        if_none_match=None,
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.data.decode()) == {**info, "value": "prepared 1"}
+    spec_etag = response.headers["ETag"]
+
+    response = spec.get_response(
+        user=user,
+        name="name 1",
+        version="1",
+        info=info,
+        version_time=1_000_000,
+        if_none_match=spec_etag,
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == spec_etag
+    assert response.data == b""
+
+
+@pytest.mark.helpers
+def test_prefetch_prepared(monkeypatch):
+    """
+    GIVEN storage with a spec with and a spec without its prepared form
+    WHEN prefetch_prepared is called for each spec and a spec that does not exist
+    THEN the objects that are read by retrieve_prepared are cached.
+    """
+    monkeypatch.setattr(storage.cache.time, "time", lambda: 1)
+    user = "user 1"
+    spec_str = json.dumps({"components": {}})
+    storage_facade = storage.get_storage_facade()
+    for name in ("name 1", "name 2"):
+        storage_facade.create_update_spec(
+            user=user, name=name, version="1", spec_str=spec_str
+        )
+    storage_facade.create_update_prepared_spec(
+        user=user, name="name 1", version="1", prepared_spec_str="prepared 1"
+    )
+    mock_get = mock.MagicMock(side_effect=storage.get_storage().get)
+    monkeypatch.setattr(storage.get_storage(), "get", mock_get)
+
+    for name in ("name 1", "name 2", "name 3"):
+        spec.prefetch_prepared(user=user, name=name, version="1")
+    assert mock_get.call_count == 5
+
+    assert (
+        spec.retrieve_prepared(user=user, name="name 1", version="1", version_time=1)
+        == "prepared 1"
+    )
+    assert spec.retrieve_prepared(
+        user=user, name="name 2", version="1", version_time=1
+    ) == spec.prepare(spec_str=spec_str, version="1")
+    with pytest.raises(storage.exceptions.ObjectNotFoundError):
+        spec.retrieve_prepared(user=user, name="name 3", version="1", version_time=1)
+    assert mock_get.call_count == 5
+
+
+@pytest.mark.helpers
+def test_prefetch_prepared_error(monkeypatch):
+    """
+    GIVEN storage that raises an error
+    WHEN prefetch_prepared is called
+    THEN the error is not raised.
+    """
+    mock_get = mock.MagicMock(side_effect=storage.exceptions.StorageError("failed"))
+    monkeypatch.setattr(storage.get_storage(), "get", mock_get)
+
+    spec.prefetch_prepared(user="user 1", name="name 1", version="1")
+
+    mock_get.assert_called_once()
@@ -0,0 +1,88 @@
+"""Tests for the YAML codec."""
+
+import pytest
+import yaml
+from library.helpers import yaml_codec
+
+DUMP_TESTS = [
+    pytest.param({}, id="empty"),
+    pytest.param(
+        {"key": "value", "integer": 1, "number": 1.5, "boolean": True, "null": None},
+        id="scalars",
+    ),
+    pytest.param({"key": ["value 1", {"nested": [1, 2]}, []]}, id="nested"),
+    pytest.param(["value 1", "value 2"], id="list"),
+    pytest.param({"key": "yes", "other": "a: b #c"}, id="strings needing quotes"),
+    pytest.param({"key": "word " * 50}, id="long string"),
+    pytest.param({"key": "wörd\t" * 50}, id="long string not printable ASCII"),
+    pytest.param({"key": "line 1\nline 2\n" * 10}, id="long string multiple lines"),
+    pytest.param({"": "value"}, id="empty key"),
+    pytest.param("value", id="scalar"),
+]
+
+
+@pytest.mark.parametrize("data", DUMP_TESTS)
+@pytest.mark.helpers
+def test_dump(data):
+    """
+    GIVEN data
+    WHEN dump is called with the data
+    THEN the same YAML as yaml.dump is returned.
+    """
+    assert yaml_codec.dump(data) == yaml.dump(data)
+
+
+@pytest.mark.parametrize("data", DUMP_TESTS)
+@pytest.mark.helpers
+def test_dump_without_libyaml(monkeypatch, data):
+    """
+    GIVEN PyYAML without libyaml and data
+    WHEN dump is called with the data
+    THEN the same YAML as yaml.dump is returned.
+    """
+    monkeypatch.setattr(yaml_codec, "_C_DUMPER", None)
+
+    assert yaml_codec.dump(data) == yaml.dump(data)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        pytest.param("key: value", id="mapping"),
+        pytest.param("- 1\n- 1.5\n- true\n- null\n- '1'", id="list"),
+        pytest.param("key: &anchor value\nother: *anchor", id="anchor"),
+    ],
+)
+@pytest.mark.parametrize("loader", [None, yaml.SafeLoader], ids=["default", "python"])
+@pytest.mark.helpers
+def test_load(monkeypatch, value, loader):
+    """
+    GIVEN YAML and the default or the pure Python loader
+    WHEN load is called with the YAML
+    THEN the same value as yaml.safe_load is returned.
+    """
+    if loader is not None:
+        monkeypatch.setattr(yaml_codec, "_LOADER", loader)
+
+    assert yaml_codec.load(value) == yaml.safe_load(value)
+
+
+@pytest.mark.parametrize(
+    "value, expected_exception",
+    [
+        pytest.param("key: value: other", yaml.scanner.ScannerError, id="scanner"),
+        pytest.param("[1, 2", yaml.parser.ParserError, id="parser"),
+        pytest.param(
+            "!!python/name:os.system", yaml.constructor.ConstructorError, id="unsafe"
+        ),
+    ],
+)
+@pytest.mark.helpers
+def test_load_error(value, expected_exception):
+    """
+    GIVEN YAML that is not valid or not safe
+    WHEN load is called with the YAML
+    THEN the same exception as yaml.safe_load is raised.
+    """
+    with pytest.raises(expected_exception):
+        yaml_codec.load(value)
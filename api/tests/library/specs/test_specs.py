@@ -3,8 +3,9 @@
 import json
 from unittest import mock
 
+import flask
 import pytest
-from library import specs
+from library import config, specs
 from library.facades import server, storage
 from open_alchemy import package_database
 
@@ -66,12 +67,12 @@ def test_list_database_error(monkeypatch):
     THEN a 500 is returned.
     """
     user = "user 1"
-    mock_database_list_specs = mock.MagicMock()
-    mock_database_list_specs.side_effect = package_database.exceptions.BaseError
+    mock_database_list_specs_json = mock.MagicMock()
+    mock_database_list_specs_json.side_effect = package_database.exceptions.BaseError
     monkeypatch.setattr(
         package_database.get(),
-        "list_specs",
-        mock_database_list_specs,
+        "list_specs_json",
+        mock_database_list_specs_json,
     )
 
     response = specs.list_(user=user)
@@ -81,6 +82,115 @@ def test_list_database_error(monkeypatch):
     assert "database" in response.data.decode()
 
 
+@pytest.mark.specs
+def test_list_page(_clean_specs_table):
+    """
+    GIVEN user and database with multiple specs
+    WHEN list_ is called with the user and a limit until there is no cursor
+    THEN all the specs stored on the user are returned in pages.
+    """
+    user = "user 1"
+    for idx in range(3):
+        package_database.get().create_update_spec(
+            sub=user, name=f"spec name {idx}", version="1", model_count=1
+        )
+
+    names = []
+    cursor = None
+    while True:
+        response = specs.list_(user=user, limit=2, cursor=cursor)
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        spec_infos = json.loads(response.data.decode())
+        assert len(spec_infos) <= 2
+        names.extend(spec_info["name"] for spec_info in spec_infos)
+        cursor = response.headers.get("X-NEXT-CURSOR")
+        if cursor is None:
+            break
+
+    assert names == ["spec name 0", "spec name 1", "spec name 2"]
+
+
+@pytest.mark.specs
+def test_list_page_invalid_cursor(_clean_specs_table):
+    """
+    GIVEN user and invalid cursor
+    WHEN list_ is called with the user and cursor
+    THEN a 400 is returned.
+    """
+    response = specs.list_(user="user 1", limit=1, cursor="invalid")
+
+    assert response.status_code == 400
+    assert response.mimetype == "text/plain"
+    assert "cursor" in response.data.decode()
+
+
+@pytest.mark.specs
+def test_list_names(_clean_specs_table):
+    """
+    GIVEN user and database with multiple specs
+    WHEN list_ is called with the user and names including a missing spec
+    THEN the existing specs with the names are returned in the order of the names.
+    """
+    user = "user 1"
+    for idx in range(3):
+        package_database.get().create_update_spec(
+            sub=user, name=f"spec name {idx}", version="1", model_count=1
+        )
+
+    response = specs.list_(
+        user=user, names=["spec name 2", "spec name 3", "spec name 0"]
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    spec_infos = json.loads(response.data.decode())
+    assert [spec_info["name"] for spec_info in spec_infos] == [
+        "spec name 2",
+        "spec name 0",
+    ]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"limit": 1}, id="limit"),
+        pytest.param({"cursor": "cursor 1"}, id="cursor"),
+    ],
+)
+@pytest.mark.specs
+def test_list_names_page(kwargs):
+    """
+    GIVEN user and names with a limit or cursor
+    WHEN list_ is called with the user, names and limit or cursor
+    THEN a 400 is returned.
+    """
+    response = specs.list_(user="user 1", names=["spec name 1"], **kwargs)
+
+    assert response.status_code == 400
+    assert response.mimetype == "text/plain"
+    assert "names" in response.data.decode()
+
+
+@pytest.mark.specs
+def test_list_names_database_error(monkeypatch):
+    """
+    GIVEN user and database that raises a DatabaseError
+    WHEN list_ is called with the user and names
+    THEN a 500 is returned.
+    """
+    mock_database_get_specs = mock.MagicMock()
+    mock_database_get_specs.side_effect = package_database.exceptions.BaseError
+    monkeypatch.setattr(package_database.get(), "get_specs", mock_database_get_specs)
+
+    response = specs.list_(user="user 1", names=["spec name 1"])
+
+    assert response.status_code == 500
+    assert response.mimetype == "text/plain"
+    assert "database" in response.data.decode()
+
+
 @pytest.mark.specs
 def test_get(_clean_specs_table):
     """
@@ -111,6 +221,138 @@ def test_get(_clean_specs_table):
     assert "components: {}" in response_data_json["value"]
     assert response_data_json["name"] == spec_name
     assert response_data_json["version"] == version
+    assert response.headers["ETag"]
+
+
+@pytest.mark.specs
+def test_get_prepared(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and database and storage with a single spec and its prepared form
+    WHEN get is called with the user and spec id
+    THEN the prepared spec is returned without preparing the spec.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=user, name=spec_name, version=version, prepared_spec_str="prepared 1"
+    )
+    mock_storage_get_spec = mock.MagicMock()
+    monkeypatch.setattr(storage.get_storage_facade(), "get_spec", mock_storage_get_spec)
+
+    response = specs.get(user=user, spec_name=spec_name)
+
+    assert response.status_code == 200
+    assert json.loads(response.data.decode())["value"] == "prepared 1"
+    mock_storage_get_spec.assert_not_called()
+
+
+@pytest.mark.specs
+def test_get_cached(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and database and storage with a spec
+    WHEN get is called multiple times with the user and spec id
+    THEN the storage is only read the first time.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=user, name=spec_name, version=version, prepared_spec_str="prepared 1"
+    )
+    mock_storage_get = mock.MagicMock(side_effect=storage.get_storage().get)
+    monkeypatch.setattr(storage.get_storage(), "get", mock_storage_get)
+
+    for _ in range(2):
+        response = specs.get(user=user, spec_name=spec_name)
+
+        assert response.status_code == 200
+        assert json.loads(response.data.decode())["value"] == "prepared 1"
+    assert mock_storage_get.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected_status",
+    [
+        pytest.param(lambda etag: etag, 304, id="same"),
+        pytest.param(lambda etag: f'"other", W/{etag}', 304, id="multiple"),
+        pytest.param(lambda _: '"other"', 200, id="different"),
+    ],
+)
+@pytest.mark.specs
+def test_get_if_none_match(
+    _clean_specs_table, monkeypatch, if_none_match, expected_status
+):
+    """
+    GIVEN user and database and storage with a single spec and the ETag of the spec
+    WHEN get is called with the user and spec id and an If-None-Match header
+    THEN a 304 is returned without reading the storage if the header matches and
+        the spec otherwise.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_spec(
+        user=user,
+        name=spec_name,
+        version=version,
+        spec_str=json.dumps({"components": {}}, separators=(",", ":")),
+    )
+    etag = specs.get(user=user, spec_name=spec_name).headers["ETag"]
+    storage_get_spec = storage.get_storage_facade().get_spec
+    mock_storage_get_spec = mock.MagicMock(side_effect=storage_get_spec)
+    monkeypatch.setattr(storage.get_storage_facade(), "get_spec", mock_storage_get_spec)
+
+    with flask.Flask(__name__).test_request_context(
+        headers={"If-None-Match": if_none_match(etag)}
+    ):
+        response = specs.get(user=user, spec_name=spec_name)
+
+    assert response.status_code == expected_status
+    assert response.headers["ETag"] == etag
+    assert mock_storage_get_spec.called == (expected_status == 200)
+
+
+@pytest.mark.specs
+def test_get_if_none_match_updated(_clean_specs_table):
+    """
+    GIVEN user and database and storage with a spec that was updated after its ETag
+        was retrieved
+    WHEN get is called with the user and spec id and the ETag in If-None-Match
+    THEN the updated spec is returned with a different ETag.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    for version in ("1", "2"):
+        storage.get_storage_facade().create_update_spec(
+            user=user,
+            name=spec_name,
+            version=version,
+            spec_str=json.dumps({"components": {}}, separators=(",", ":")),
+        )
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version="1", model_count=1
+    )
+    etag = specs.get(user=user, spec_name=spec_name).headers["ETag"]
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version="2", model_count=1
+    )
+
+    with flask.Flask(__name__).test_request_context(headers={"If-None-Match": etag}):
+        response = specs.get(user=user, spec_name=spec_name)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert json.loads(response.data.decode())["version"] == "2"
 
 
 @pytest.mark.specs
@@ -122,14 +364,12 @@ def test_get_database_error(_clean_specs_table, monkeypatch):
     """
     user = "user 1"
     spec_name = "spec name 1"
-    mock_database_get_latest_spec_version = mock.MagicMock()
-    mock_database_get_latest_spec_version.side_effect = (
-        package_database.exceptions.BaseError
-    )
+    mock_database_get_latest_spec = mock.MagicMock()
+    mock_database_get_latest_spec.side_effect = package_database.exceptions.BaseError
     monkeypatch.setattr(
         package_database.get(),
-        "get_latest_spec_version",
-        mock_database_get_latest_spec_version,
+        "get_latest_spec",
+        mock_database_get_latest_spec,
     )
 
     response = specs.get(user=user, spec_name=spec_name)
@@ -242,6 +482,11 @@ def test_put(monkeypatch, _clean_specs_table):
     assert '"Schema"' in spec_str
     assert '"x-tablename"' in spec_str
     assert '"schema"' in spec_str
+    prepared_spec_str = storage.get_storage_facade().get_prepared_spec(
+        user=user, name=spec_name, version=version
+    )
+    assert f"version: '{version}'" in prepared_spec_str
+    assert "x-tablename: schema" in prepared_spec_str
 
     assert package_database.get().count_customer_models(sub=user) == 1
     spec_infos = package_database.get().list_specs(sub=user)
@@ -448,6 +693,69 @@ def test_put_database_update_error(monkeypatch, _clean_specs_table):
     assert "database" in response.data.decode()
 
 
+@pytest.mark.parametrize(
+    "exception, expected_status_code, expected_message",
+    [
+        pytest.param(
+            package_database.exceptions.ModelCountExceededError,
+            402,
+            "exceeded",
+            id="model count exceeded",
+        ),
+        pytest.param(
+            package_database.exceptions.ConflictError,
+            409,
+            "another request",
+            id="conflict",
+        ),
+    ],
+)
+@pytest.mark.specs
+def test_put_database_update_concurrent_error(
+    monkeypatch, _clean_specs_table, exception, expected_status_code, expected_message
+):
+    """
+    GIVEN body and spec id and database that raises an error due to a concurrent
+        write
+    WHEN put is called with the body and spec id
+    THEN the expected status code is returned.
+    """
+    mock_request = mock.MagicMock()
+    mock_headers = {"X-LANGUAGE": "JSON"}
+    mock_request.headers = mock_headers
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    body = json.dumps(
+        {
+            "info": {"version": "1"},
+            "components": {
+                "schemas": {
+                    "Schema": {
+                        "type": "object",
+                        "x-tablename": "schema",
+                        "properties": {"id": {"type": "integer"}},
+                    }
+                }
+            },
+        }
+    )
+    mock_database_create_update_spec = mock.MagicMock(side_effect=exception)
+    monkeypatch.setattr(
+        package_database.get(),
+        "create_update_spec",
+        mock_database_create_update_spec,
+    )
+
+    response = specs.put(body=body.encode(), spec_name="id 1", user="user 1")
+
+    assert (
+        mock_database_create_update_spec.call_args.kwargs["max_model_count"]
+        == config.get().free_tier_model_count
+    )
+    assert response.status_code == expected_status_code
+    assert response.mimetype == "text/plain"
+    assert expected_message in response.data.decode()
+
+
 @pytest.mark.specs
 def test_delete(_clean_specs_table):
     """
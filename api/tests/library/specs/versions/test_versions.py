@@ -1,9 +1,13 @@
 """Tests for the specs endpoint."""
 
 import json
+import threading
+import time
 from unittest import mock
 
+import flask
 import pytest
+from library import config
 from library.facades import server, storage
 from library.specs import versions
 from open_alchemy import package_database
@@ -79,6 +83,74 @@ def test_list_database_error(monkeypatch):
     assert "database" in response.data.decode()
 
 
+@pytest.mark.specs_versions
+def test_list_page(monkeypatch, _clean_specs_table):
+    """
+    GIVEN user, spec id and database with multiple versions of the spec
+    WHEN list_ is called with the user, spec id and a limit until there is no cursor
+    THEN all the versions of the spec are returned in pages.
+    """
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+    user = "user 1"
+    spec_name = "spec name 1"
+    for idx in range(3):
+        mock_time.return_value = 1000000 * (idx + 1)
+        package_database.get().create_update_spec(
+            sub=user, name=spec_name, version=f"{idx}", model_count=1
+        )
+
+    versions_ = []
+    cursor = None
+    while True:
+        response = versions.list_(
+            user=user, spec_name=spec_name, limit=2, cursor=cursor
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        spec_infos = json.loads(response.data.decode())
+        assert len(spec_infos) <= 2
+        versions_.extend(spec_info["version"] for spec_info in spec_infos)
+        cursor = response.headers.get("X-NEXT-CURSOR")
+        if cursor is None:
+            break
+
+    assert versions_ == ["0", "1", "2"]
+
+
+@pytest.mark.specs_versions
+def test_list_page_not_found(_clean_specs_table):
+    """
+    GIVEN user, spec id and empty database
+    WHEN list_ is called with the user, spec id and a limit
+    THEN 404 is returned.
+    """
+    spec_name = "spec name 1"
+
+    response = versions.list_(user="user 1", spec_name=spec_name, limit=1)
+
+    assert response.status_code == 404
+    assert response.mimetype == "text/plain"
+    assert spec_name in response.data.decode()
+
+
+@pytest.mark.specs_versions
+def test_list_page_invalid_cursor(_clean_specs_table):
+    """
+    GIVEN user, spec id and invalid cursor
+    WHEN list_ is called with the user, spec id and cursor
+    THEN 400 is returned.
+    """
+    response = versions.list_(
+        user="user 1", spec_name="spec name 1", limit=1, cursor="invalid"
+    )
+
+    assert response.status_code == 400
+    assert response.mimetype == "text/plain"
+    assert "cursor" in response.data.decode()
+
+
 @pytest.mark.specs_versions
 def test_get(_clean_specs_table):
     """
@@ -112,11 +184,240 @@ def test_get(_clean_specs_table):
 
 
 @pytest.mark.specs_versions
-def test_get_database_miss():
+def test_get_prepared(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and database and storage with a spec and its prepared form
+    WHEN get is called with the user, spec id and version
+    THEN the prepared spec is returned without preparing the spec.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=user, name=spec_name, version=version, prepared_spec_str="prepared 1"
+    )
+    mock_storage_get_spec = mock.MagicMock()
+    monkeypatch.setattr(storage.get_storage_facade(), "get_spec", mock_storage_get_spec)
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == 200
+    assert json.loads(response.data.decode())["value"] == "prepared 1"
+    mock_storage_get_spec.assert_not_called()
+
+
+@pytest.mark.specs_versions
+def test_get_cached(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and database and storage with a spec
+    WHEN get is called multiple times with the user and spec id
+    THEN the storage is only read the first time.
+    """
+    monkeypatch.setattr(storage.cache, "READ_AFTER_WRITE_MARGIN", 0)
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=user, name=spec_name, version=version, prepared_spec_str="prepared 1"
+    )
+    mock_storage_get = mock.MagicMock(side_effect=storage.get_storage().get)
+    monkeypatch.setattr(storage.get_storage(), "get", mock_storage_get)
+
+    for _ in range(2):
+        response = versions.get(user=user, spec_name=spec_name, version=version)
+
+        assert response.status_code == 200
+        assert json.loads(response.data.decode())["value"] == "prepared 1"
+    assert mock_storage_get.call_count == 1
+
+
+
+@pytest.mark.specs_versions
+def test_get_cached_written_by_other_process(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and database and storage with a spec that is retrieved and then
+        written again by another process within the same second
+    WHEN get is called with the user, spec id and version
+    THEN the spec from the second write is returned.
+    """
+    monkeypatch.setattr(time, "time", lambda: 1000.5)
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    key = f"{user}/{storage.get_storage_facade().cal_id(spec_name)}/{version}-spec.yaml"
+    for prepared_spec_str in ("prepared 1", "prepared 2"):
+        # Write the storage directly like another process, which does not remove
+        # the object from the cache of this process
+        storage.get_storage().set(key=key, value=prepared_spec_str)
+        package_database.get().create_update_spec(
+            sub=user, name=spec_name, version=version, model_count=1
+        )
+
+        response = versions.get(user=user, spec_name=spec_name, version=version)
+
+        assert response.status_code == 200
+        assert json.loads(response.data.decode())["value"] == prepared_spec_str
+
+@pytest.mark.specs_versions
+def test_get_concurrent(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and database and storage with a spec where reading each waits for the
+        other to be read
+    WHEN get is called with the user, spec id and version
+    THEN the spec is returned.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_prepared_spec(
+        user=user, name=spec_name, version=version, prepared_spec_str="prepared 1"
+    )
+    monkeypatch.setattr(storage.cache, "READ_AFTER_WRITE_MARGIN", 0)
+    barrier = threading.Barrier(2, timeout=10)
+
+    def wait_then(func):
+        """Wait for the other read to start before reading."""
+
+        def inner(**kwargs):
+            barrier.wait()
+            return func(**kwargs)
+
+        return inner
+
+    monkeypatch.setattr(
+        package_database.get(),
+        "get_latest_spec",
+        wait_then(package_database.get().get_latest_spec),
+    )
+    monkeypatch.setattr(
+        storage.get_storage(), "get", wait_then(storage.get_storage().get)
+    )
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == 200
+    assert json.loads(response.data.decode())["value"] == "prepared 1"
+
+
+@pytest.mark.specs_versions
+def test_get_prefetch_error(_clean_specs_table, monkeypatch):
     """
-    GIVEN user and version and databasewithout and storage with a single spec
+    GIVEN user and database with a spec and reading the spec into the cache fails
+        unexpectedly
+    WHEN get is called with the user, spec id and version
+    THEN the error is raised.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    monkeypatch.setattr(
+        versions.spec, "prefetch_prepared", mock.MagicMock(side_effect=RuntimeError)
+    )
+
+    with pytest.raises(RuntimeError):
+        versions.get(user=user, spec_name=spec_name, version=version)
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected_status",
+    [
+        pytest.param(lambda etag: etag, 304, id="same"),
+        pytest.param(lambda _: "*", 304, id="any"),
+        pytest.param(lambda _: '"other"', 200, id="different"),
+    ],
+)
+@pytest.mark.specs_versions
+def test_get_if_none_match(
+    _clean_specs_table, monkeypatch, if_none_match, expected_status
+):
+    """
+    GIVEN user and version and database and storage with a single spec and the
+        ETag of the version
+    WHEN get is called with the user, spec id and version and an If-None-Match
+        header
+    THEN a 304 is returned without reading the storage if the header matches and
+        the spec otherwise.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
+    storage.get_storage_facade().create_update_spec(
+        user=user,
+        name=spec_name,
+        version=version,
+        spec_str=json.dumps({"components": {}}, separators=(",", ":")),
+    )
+    etag = versions.get(user=user, spec_name=spec_name, version=version).headers["ETag"]
+    storage_get_spec = storage.get_storage_facade().get_spec
+    mock_storage_get_spec = mock.MagicMock(side_effect=storage_get_spec)
+    monkeypatch.setattr(storage.get_storage_facade(), "get_spec", mock_storage_get_spec)
+
+    with flask.Flask(__name__).test_request_context(
+        headers={"If-None-Match": if_none_match(etag)}
+    ):
+        response = versions.get(user=user, spec_name=spec_name, version=version)
+
+    assert response.status_code == expected_status
+    assert response.headers["ETag"] == etag
+    assert mock_storage_get_spec.called == (expected_status == 200)
+
+
+@pytest.mark.specs_versions
+def test_get_if_none_match_same_second(_clean_specs_table, monkeypatch):
+    """
+    GIVEN user and version and database and storage with a spec that is written
+        again with a different body within the same second
+    WHEN get is called with the ETag from before the second write
+    THEN the spec from the second write is returned with a different ETag.
+    """
+    monkeypatch.setattr(time, "time", lambda: 1000.5)
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    etags = []
+    for prepared_spec_str in ("prepared 1", "prepared 2"):
+        storage.get_storage_facade().create_update_prepared_spec(
+            user=user,
+            name=spec_name,
+            version=version,
+            prepared_spec_str=prepared_spec_str,
+        )
+        package_database.get().create_update_spec(
+            sub=user, name=spec_name, version=version, model_count=1
+        )
+        with flask.Flask(__name__).test_request_context(
+            headers={"If-None-Match": etags[-1]} if etags else {}
+        ):
+            response = versions.get(user=user, spec_name=spec_name, version=version)
+
+        assert response.status_code == 200
+        assert json.loads(response.data.decode())["value"] == prepared_spec_str
+        etags.append(response.headers["ETag"])
+
+    assert etags[0] != etags[1]
+
+
+@pytest.mark.specs_versions
+def test_get_database_miss(_clean_specs_table):
+    """
+    GIVEN user and version and database without and storage with a single spec
     WHEN get is called with the user and spec id
-    THEN 500 is returned.
+    THEN 404 is returned without reading the storage.
     """
     user = "user 1"
     spec_name = "spec name 1"
@@ -131,13 +432,37 @@ def test_get_database_miss():
 
     response = versions.get(user=user, spec_name=spec_name, version=version)
 
+    assert response.status_code == 404
+    assert response.mimetype == "text/plain"
+    assert spec_name in response.data.decode()
+    assert "not find" in response.data.decode()
+
+
+@pytest.mark.specs_versions
+def test_get_database_error(monkeypatch):
+    """
+    GIVEN user and version and database that raises an error
+    WHEN get is called with the user and spec id
+    THEN 500 is returned.
+    """
+    user = "user 1"
+    spec_name = "spec name 1"
+    version = "1"
+    mock_database_get_latest_spec = mock.MagicMock()
+    mock_database_get_latest_spec.side_effect = package_database.exceptions.BaseError
+    monkeypatch.setattr(
+        package_database.get(), "get_latest_spec", mock_database_get_latest_spec
+    )
+
+    response = versions.get(user=user, spec_name=spec_name, version=version)
+
     assert response.status_code == 500
     assert response.mimetype == "text/plain"
     assert "database" in response.data.decode()
 
 
 @pytest.mark.specs_versions
-def test_get_storage_facade_error(monkeypatch):
+def test_get_storage_facade_error(monkeypatch, _clean_specs_table):
     """
     GIVEN user and database with a spec but storage that raises an error
     WHEN get is called with the user and spec id
@@ -146,6 +471,9 @@ def test_get_storage_facade_error(monkeypatch):
     user = "user 1"
     spec_name = "spec name 1"
     version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
     mock_storage_get_spec = mock.MagicMock()
     mock_storage_get_spec.side_effect = storage.exceptions.StorageError
     monkeypatch.setattr(storage.get_storage_facade(), "get_spec", mock_storage_get_spec)
@@ -167,6 +495,9 @@ def test_get_storage_facade_miss(_clean_specs_table):
     user = "user 1"
     spec_name = "spec name 1"
     version = "1"
+    package_database.get().create_update_spec(
+        sub=user, name=spec_name, version=version, model_count=1
+    )
 
     response = versions.get(user=user, spec_name=spec_name, version=version)
 
@@ -217,6 +548,11 @@ def test_put(monkeypatch, _clean_specs_table):
     assert '"Schema"' in spec_str
     assert '"x-tablename"' in spec_str
     assert '"schema"' in spec_str
+    prepared_spec_str = storage.get_storage_facade().get_prepared_spec(
+        user=user, name=spec_name, version=version
+    )
+    assert f"version: '{version}'" in prepared_spec_str
+    assert "x-tablename: schema" in prepared_spec_str
 
     assert package_database.get().count_customer_models(sub=user) == 1
     spec_infos = package_database.get().list_specs(sub=user)
@@ -468,3 +804,69 @@ def test_put_database_update_error(monkeypatch, _clean_specs_table):
     assert response.status_code == 500
     assert response.mimetype == "text/plain"
     assert "database" in response.data.decode()
+
+
+@pytest.mark.parametrize(
+    "exception, expected_status_code, expected_message",
+    [
+        pytest.param(
+            package_database.exceptions.ModelCountExceededError,
+            402,
+            "exceeded",
+            id="model count exceeded",
+        ),
+        pytest.param(
+            package_database.exceptions.ConflictError,
+            409,
+            "another request",
+            id="conflict",
+        ),
+    ],
+)
+@pytest.mark.specs_versions
+def test_put_database_update_concurrent_error(
+    monkeypatch, _clean_specs_table, exception, expected_status_code, expected_message
+):
+    """
+    GIVEN body, spec id and version and database that raises an error due to a
+        concurrent write
+    WHEN put is called with the body, spec id and version
+    THEN the expected status code is returned.
+    """
+    mock_request = mock.MagicMock()
+    mock_headers = {"X-LANGUAGE": "JSON"}
+    mock_request.headers = mock_headers
+    monkeypatch.setattr(server.Request, "request", mock_request)
+    version = "1"
+    body = json.dumps(
+        {
+            "info": {"version": version},
+            "components": {
+                "schemas": {
+                    "Schema": {
+                        "type": "object",
+                        "x-tablename": "schema",
+                        "properties": {"id": {"type": "integer"}},
+                    }
+                }
+            },
+        }
+    )
+    mock_database_create_update_spec = mock.MagicMock(side_effect=exception)
+    monkeypatch.setattr(
+        package_database.get(),
+        "create_update_spec",
+        mock_database_create_update_spec,
+    )
+
+    response = versions.put(
+        body=body.encode(), spec_name="id 1", version=version, user="user 1"
+    )
+
+    assert (
+        mock_database_create_update_spec.call_args.kwargs["max_model_count"]
+        == config.get().free_tier_model_count
+    )
+    assert response.status_code == expected_status_code
+    assert response.mimetype == "text/plain"
+    assert expected_message in response.data.decode()
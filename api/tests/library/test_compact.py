@@ -0,0 +1,175 @@
+"""Tests for the compaction job."""
+
+from unittest import mock
+
+import pytest
+from library import compact, config
+from library.facades import storage
+from open_alchemy import package_database
+
+
+def _create_spec(*, user, name, versions):
+    """Store versions of a spec in the storage and the database."""
+    for version in versions:
+        storage.get_storage_facade().create_update_spec(
+            user=user, name=name, version=version, spec_str=f"spec {version}"
+        )
+        package_database.get().create_update_spec(
+            sub=user, name=name, version=version, model_count=1
+        )
+
+
+@pytest.fixture
+def _no_recent_objects(monkeypatch):
+    """Delete the stored specs of expired versions regardless of when they were set."""
+    monkeypatch.setattr(compact, "RECENT_OBJECT_SECONDS", 0)
+
+
+def _stored_versions(*, user, name):
+    """Retrieve the stored versions of a spec."""
+    return sorted(storage.get_storage_facade().get_spec_versions(user=user, name=name))
+
+
+@pytest.mark.compact
+def test_compact(_clean_specs_table, _no_recent_objects):
+    """
+    GIVEN specs with multiple versions for multiple users
+    WHEN compact is called keeping the last 2 versions
+    THEN the older versions are removed from the database and the storage.
+    """
+    _create_spec(user="user 1", name="spec1", versions=["1", "2", "3"])
+    _create_spec(user="user 1", name="spec2", versions=["1"])
+    _create_spec(user="user 2", name="spec1", versions=["1", "2", "3", "4"])
+
+    counts = compact.compact(
+        retention=package_database.types.SpecRetention(keep_last=2)
+    )
+
+    assert counts == compact.CompactCounts(
+        specs=3, deleted_versions=3, deleted_objects=3, errors=0
+    )
+    assert _stored_versions(user="user 1", name="spec1") == ["2", "3"]
+    assert _stored_versions(user="user 1", name="spec2") == ["1"]
+    assert _stored_versions(user="user 2", name="spec1") == ["3", "4"]
+    assert [
+        info["version"]
+        for info in package_database.get().list_spec_versions(
+            sub="user 2", name="spec1"
+        )
+    ] == ["3", "4"]
+
+
+@pytest.mark.compact
+def test_compact_config(monkeypatch, _clean_specs_table, _no_recent_objects):
+    """
+    GIVEN spec with multiple versions and retention configuration
+    WHEN compact is called without a retention
+    THEN the retention from the configuration is used.
+    """
+    _create_spec(user="user 1", name="spec1", versions=["1", "2"])
+    monkeypatch.setattr(
+        config.get(),
+        "spec_retention",
+        package_database.types.SpecRetention(keep_last=1),
+    )
+
+    counts = compact.compact()
+
+    assert counts.deleted_versions == 1
+    assert _stored_versions(user="user 1", name="spec1") == ["2"]
+
+
+@pytest.mark.compact
+def test_compact_recent_objects_kept(monkeypatch, _clean_specs_table):
+    """
+    GIVEN spec with versions stored long ago and a version that is stored again
+        while it is compacted
+    WHEN compact is called keeping the last version
+    THEN the expired versions are removed from the database and only the stored
+        spec of the version that was not stored again is removed.
+    """
+    _create_spec(user="user 1", name="spec1", versions=["1", "2", "3"])
+    modified_at = storage.get_storage().modified_at
+    for key in modified_at:
+        modified_at[key] -= compact.RECENT_OBJECT_SECONDS + 1
+    original_compact_spec_versions = package_database.get().compact_spec_versions
+
+    def compact_spec_versions(**kwargs):
+        """Store version 2 again as if by a concurrent request."""
+        storage.get_storage_facade().create_update_spec(
+            user="user 1", name="spec1", version="2", spec_str="spec 2"
+        )
+        return original_compact_spec_versions(**kwargs)
+
+    monkeypatch.setattr(
+        package_database.get(), "compact_spec_versions", compact_spec_versions
+    )
+
+    counts = compact.compact(
+        retention=package_database.types.SpecRetention(keep_last=1)
+    )
+
+    assert counts.deleted_versions == 2
+    assert _stored_versions(user="user 1", name="spec1") == ["2", "3"]
+
+
+@pytest.mark.compact
+def test_compact_no_retention(monkeypatch):
+    """
+    GIVEN retention that keeps all versions
+    WHEN compact is called
+    THEN the database is not read.
+    """
+    mock_list_spec_subs = mock.MagicMock()
+    monkeypatch.setattr(package_database.get(), "list_spec_subs", mock_list_spec_subs)
+
+    counts = compact.compact(retention=package_database.types.SpecRetention())
+
+    assert counts == compact.CompactCounts()
+    mock_list_spec_subs.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "facade, method_name, exception",
+    [
+        pytest.param(
+            package_database.get,
+            "compact_spec_versions",
+            package_database.exceptions.BaseError,
+            id="database",
+        ),
+        pytest.param(
+            storage.get_storage_facade,
+            "delete_spec_versions",
+            storage.exceptions.StorageError,
+            id="storage",
+        ),
+    ],
+)
+@pytest.mark.compact
+def test_compact_error(monkeypatch, _clean_specs_table, facade, method_name, exception):
+    """
+    GIVEN specs and a facade that raises an error for the first spec
+    WHEN compact is called
+    THEN the error is counted and the other spec is compacted.
+    """
+    _create_spec(user="user 1", name="spec1", versions=["1", "2"])
+    _create_spec(user="user 1", name="spec2", versions=["1", "2"])
+    original_method = getattr(facade(), method_name)
+    calls = []
+
+    def method(**kwargs):
+        """Raise the exception for the first call."""
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise exception
+        return original_method(**kwargs)
+
+    monkeypatch.setattr(facade(), method_name, method)
+
+    counts = compact.compact(
+        retention=package_database.types.SpecRetention(keep_last=1)
+    )
+
+    assert counts.errors == 1
+    assert counts.specs == 1
@@ -2,6 +2,7 @@
 
 import pytest
 from library import config
+from open_alchemy import package_database
 
 
 @pytest.mark.parametrize(
@@ -58,6 +59,12 @@ def test_config_env_missing(monkeypatch, env_name, config_name):
             "free_tier_model_count",
             id="free_tier_model_count invalid",
         ),
+        pytest.param(
+            "SPEC_CACHE_SIZE",
+            "-1",
+            "spec_cache_size",
+            id="spec_cache_size negative",
+        ),
     ],
 )
 @pytest.mark.config
@@ -112,6 +119,13 @@ def test_config_env_invalid(monkeypatch, env_name, env_value, config_name):
             1,
             id="free_tier_model_count",
         ),
+        pytest.param(
+            "SPEC_CACHE_SIZE",
+            "0",
+            "spec_cache_size",
+            0,
+            id="spec_cache_size",
+        ),
     ],
 )
 @pytest.mark.config
@@ -164,6 +178,12 @@ def test_config_env_set(monkeypatch, env_name, env_value, config_name, expected_
             1,
             id="free_tier_model_count",
         ),
+        pytest.param(
+            "SPEC_CACHE_SIZE",
+            "spec_cache_size",
+            1,
+            id="spec_cache_size",
+        ),
     ],
 )
 @pytest.mark.config
@@ -181,3 +201,73 @@ def test_config_value_set(monkeypatch, env_name, config_name, config_value):
     returned_value = getattr(config_instance, config_name)
 
     assert returned_value == config_value
+
+
+@pytest.mark.parametrize(
+    "keep_last, max_age_days, expected_retention",
+    [
+        pytest.param(None, None, package_database.types.SpecRetention(), id="unset"),
+        pytest.param(
+            "2", None, package_database.types.SpecRetention(keep_last=2), id="keep_last"
+        ),
+        pytest.param(
+            None,
+            "30",
+            package_database.types.SpecRetention(max_age_days=30),
+            id="max_age_days",
+        ),
+    ],
+)
+@pytest.mark.config
+def test_config_spec_retention(
+    monkeypatch, keep_last, max_age_days, expected_retention
+):
+    """
+    GIVEN optional retention environment variables
+    WHEN spec_retention is accessed
+    THEN the expected retention is returned.
+    """
+    for env_name, env_value in (
+        ("SPEC_RETENTION_KEEP_LAST", keep_last),
+        ("SPEC_RETENTION_MAX_AGE_DAYS", max_age_days),
+    ):
+        if env_value is None:
+            monkeypatch.delenv(env_name, raising=False)
+        else:
+            monkeypatch.setenv(env_name, env_value)
+
+    returned_retention = (
+        config._construct().spec_retention
+    )  # pylint: disable=protected-access
+
+    assert returned_retention == expected_retention
+
+
+@pytest.mark.parametrize("env_value", ["invalid", "-1"])
+@pytest.mark.config
+def test_config_spec_retention_invalid(monkeypatch, env_value):
+    """
+    GIVEN retention environment variable that is not a count
+    WHEN spec_retention is accessed
+    THEN AssertionError is raised.
+    """
+    monkeypatch.setenv("SPEC_RETENTION_KEEP_LAST", env_value)
+
+    with pytest.raises(AssertionError):
+        config._construct().spec_retention  # pylint: disable=protected-access
+
+
+@pytest.mark.config
+def test_config_spec_cache_size_unset(monkeypatch):
+    """
+    GIVEN spec cache size environment variable that is not set
+    WHEN spec_cache_size is accessed
+    THEN the default size is returned.
+    """
+    monkeypatch.delenv("SPEC_CACHE_SIZE", raising=False)
+
+    returned_size = (
+        config._construct().spec_cache_size
+    )  # pylint: disable=protected-access
+
+    assert returned_size == config.DEFAULT_SPEC_CACHE_SIZE
@@ -0,0 +1 @@
+"""Benchmarks for the database facade."""
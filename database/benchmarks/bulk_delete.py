@@ -0,0 +1,79 @@
+"""
+Benchmark deleting all items of a customer.
+
+Compares deleting the items through a single sequential batch write with deleting
+them using the concurrent bulk delete.
+
+Requires DynamoDB to be running at http://localhost:8000, run using:
+
+    STAGE=TEST python -m benchmarks.bulk_delete
+
+"""
+
+import argparse
+import typing
+
+from open_alchemy.package_database import bulk_delete, factory, models
+
+from . import helpers
+
+
+def seed(*, sub: str, count: int) -> None:
+    """Write items for a customer."""
+    with models.Spec.batch_write() as batch:
+        for idx in range(count):
+            batch.save(factory.SpecFactory(sub=sub, updated_at_id=f"{idx}#name"))
+
+
+def delete_sequential(*, sub: str) -> None:
+    """Delete the items of a customer using a single sequential batch write."""
+    items = models.Spec.query(
+        hash_key=sub, attributes_to_get=list(models.Spec.KEY_ATTRIBUTES)
+    )
+    with models.Spec.batch_write() as batch:
+        for item in items:
+            batch.delete(item)
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=bulk_delete.DEFAULT_WORKERS)
+    parsed_args = parser.parse_args(args)
+
+    with helpers.specs_table():
+        seed(sub="benchmark sequential", count=parsed_args.items)
+        seed(sub="benchmark bulk", count=parsed_args.items)
+
+        results = [
+            helpers.measure(
+                name="sequential batch write",
+                func=lambda _: delete_sequential(sub="benchmark sequential"),
+                iterations=1,
+            ),
+            helpers.measure(
+                name=f"bulk delete with {parsed_args.workers} workers",
+                func=lambda _: bulk_delete.delete(
+                    model=models.Spec,
+                    items=models.Spec.query(
+                        hash_key="benchmark bulk",
+                        attributes_to_get=list(models.Spec.KEY_ATTRIBUTES),
+                    ),
+                    workers=parsed_args.workers,
+                ),
+                iterations=1,
+            ),
+        ]
+
+    helpers.print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Stress test concurrent writes of the same specs.
+
+Many writers create versions of a few specs of a customer at the same time, each
+with a different model count. Afterwards checks that every successful write left
+a version, that the latest items point to the last version of their spec and that
+the model count aggregate matches the latest items and does not exceed the
+maximum model count. Exits with an error if any of the checks fail.
+
+Requires DynamoDB to be running at http://localhost:8000, run using:
+
+    STAGE=TEST python -m benchmarks.concurrent_writes
+    STAGE=TEST python -m benchmarks.concurrent_writes --max-model-count 50
+
+"""
+
+import argparse
+import collections
+import sys
+import threading
+import typing
+
+from open_alchemy.package_database import exceptions, models
+from open_alchemy.package_database import versions as package_versions
+
+from . import helpers
+
+SUB = "benchmark concurrent writes"
+
+
+def check(
+    *,
+    writes: typing.Mapping[str, int],
+    max_model_count: typing.Optional[int],
+) -> typing.List[str]:
+    """
+    Check the specs after the writes.
+
+    Args:
+        writes: The number of successful writes of each spec.
+        max_model_count: The maximum model count of the customer.
+
+    Returns:
+        A description of each failed check.
+
+    """
+    problems: typing.List[str] = []
+    for name, count in writes.items():
+        versions = list(
+            package_versions.query(
+                model=models.Spec, sub=SUB, name=name, consistent_read=True
+            )
+        )
+        if len(versions) != count:
+            problems.append(f"{name=} has {len(versions)} versions, expected {count}")
+        if not versions:
+            continue
+        latest = models.Spec.get(
+            hash_key=SUB,
+            range_key=models.Spec.calc_index_values(
+                updated_at=models.Spec.UPDATED_AT_LATEST,
+                id_=models.Spec.calc_id(name),
+            ).updated_at_id,
+            consistent_read=True,
+        )
+        if latest.version != versions[-1].version:
+            problems.append(
+                f"the latest item of {name=} is a copy of {latest.version}, "
+                f"expected the last version {versions[-1].version}"
+            )
+
+    aggregate_model_count = models.Spec.count_customer_models(sub=SUB)
+    latest_model_count = models.Spec.sum_customer_models(sub=SUB)
+    if aggregate_model_count != latest_model_count:
+        problems.append(
+            f"the model count aggregate is {aggregate_model_count}, the latest "
+            f"items add up to {latest_model_count}"
+        )
+    if max_model_count is not None and aggregate_model_count > max_model_count:
+        problems.append(
+            f"the model count {aggregate_model_count} exceeds {max_model_count=}"
+        )
+    return problems
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the stress test.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--specs", type=int, default=3)
+    parser.add_argument("--max-model-count", type=int, default=None)
+    parsed_args = parser.parse_args(args)
+
+    writes: typing.Counter[str] = collections.Counter()
+    errors: typing.Counter[str] = collections.Counter()
+    lock = threading.Lock()
+
+    def write(idx: int) -> None:
+        """Write a version of a spec and record the outcome."""
+        name = f"spec {idx % parsed_args.specs}"
+        try:
+            models.Spec.create_update_item(
+                sub=SUB,
+                name=name,
+                version=f"version {idx}",
+                model_count=idx % 7,
+                max_model_count=parsed_args.max_model_count,
+            )
+        except exceptions.BaseError as exc:
+            with lock:
+                errors[type(exc).__name__] += 1
+            return
+        with lock:
+            writes[name] += 1
+
+    with helpers.specs_table():
+        try:
+            result = helpers.measure_concurrent(
+                name="concurrent create_update_item",
+                func=write,
+                iterations=parsed_args.writes,
+                workers=parsed_args.writers,
+            )
+            problems = check(writes=writes, max_model_count=parsed_args.max_model_count)
+        finally:
+            models.Spec.delete_all(sub=SUB)
+
+    helpers.print_results([result])
+    print(f"{dict(writes)=}, {dict(errors)=}")  # allow-print
+    for problem in problems:
+        print(problem)  # allow-print
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark the latency of creating or updating a spec.
+
+Compares reading the previous latest item, writing the versioned and latest items
+and updating the model count aggregate using sequential requests with reading in
+a single transactional get and writing in a single transaction.
+
+Requires DynamoDB to be running at http://localhost:8000, run using:
+
+    STAGE=TEST python -m benchmarks.create_update_spec
+
+"""
+
+import argparse
+import time
+import typing
+
+from open_alchemy.package_database import models
+
+from . import helpers
+
+
+def create_update_sequential(
+    *,
+    sub: str,
+    name: str,
+    version: str,
+    model_count: int,
+) -> None:
+    """Write the versioned and latest items using sequential requests."""
+    id_ = models.Spec.calc_id(name)
+    previous_model_count = 0
+    try:
+        previous_model_count = int(
+            models.Spec.get(
+                hash_key=sub,
+                range_key=models.Spec.calc_index_values(
+                    updated_at=models.Spec.UPDATED_AT_LATEST, id_=id_
+                ).updated_at_id,
+                consistent_read=True,
+            ).model_count
+        )
+    except models.Spec.DoesNotExist:
+        pass
+
+    updated_at = str(int(time.time()))
+    for index_updated_at in (updated_at, models.Spec.UPDATED_AT_LATEST):
+        index_values = models.Spec.calc_index_values(
+            updated_at=index_updated_at, id_=id_
+        )
+        models.Spec(
+            sub=sub,
+            id=id_,
+            name=name,
+            updated_at=updated_at,
+            version=version,
+            model_count=model_count,
+            updated_at_id=index_values.updated_at_id,
+            id_updated_at=index_values.id_updated_at,
+        ).save()
+
+    # pylint: disable=protected-access
+    models.Spec._update_customer_models(
+        sub=sub, delta=model_count - previous_model_count
+    )
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parsed_args = parser.parse_args(args)
+
+    with helpers.specs_table():
+        results = [
+            helpers.measure(
+                name="sequential requests",
+                func=lambda idx: create_update_sequential(
+                    sub="benchmark sequential",
+                    name=f"spec {idx % 10}",
+                    version=f"version {idx}",
+                    model_count=idx % 5,
+                ),
+                iterations=parsed_args.iterations,
+            ),
+            helpers.measure(
+                name="transaction",
+                func=lambda idx: models.Spec.create_update_item(
+                    sub="benchmark transaction",
+                    name=f"spec {idx % 10}",
+                    version=f"version {idx}",
+                    model_count=idx % 5,
+                ),
+                iterations=parsed_args.iterations,
+            ),
+        ]
+        models.Spec.delete_all(sub="benchmark sequential")
+        models.Spec.delete_all(sub="benchmark transaction")
+
+    helpers.print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Benchmark the operations of the database facade at different data sizes.
+
+For each size, seeds a customer with that many spec items and the credentials
+table with that many credentials using the model factories. Then measures the
+latency and throughput of list_specs, list_specs_json, list_spec_versions,
+get_specs, count_customer_models, get_user, delete_spec and create_update_spec.
+
+The DynamoDB backend requires DynamoDB to be running at http://localhost:8000, the
+memory backend does not require a database server. Run using:
+
+    STAGE=TEST python -m benchmarks.database --output results.json
+    STAGE=TEST python -m benchmarks.database --backend MEMORY --sizes 10 1000
+    STAGE=TEST python -m benchmarks.database --catalog
+
+With --catalog, the spec catalog of the customer is rebuilt after seeding so that
+the specs are listed from the catalog if they fit into it.
+
+The results are written as JSON so that they can be compared between commits.
+
+"""
+
+import argparse
+import dataclasses
+import json
+import subprocess
+import typing
+
+from open_alchemy.package_database import catalog as package_catalog
+from open_alchemy.package_database import (
+    config,
+    credentials,
+    dynamodb,
+    factory,
+    memory,
+    models,
+    types,
+)
+
+from . import helpers
+
+SIZES = (10, 1000, 100000)
+VERSIONS_PER_SPEC = 10
+
+
+@dataclasses.dataclass
+class Dataset:
+    """
+    The seeded data for a size.
+
+    Attrs:
+        sub: The customer the specs were seeded for.
+        names: The names of the seeded specs.
+        public_keys: The public keys of the seeded credentials.
+
+    """
+
+    sub: types.TSub
+    names: typing.List[types.TSpecName]
+    public_keys: typing.List[types.TCredentialsPublicKey]
+
+
+def _spec_items(*, sub: types.TSub, size: int) -> typing.Iterator[models.Spec]:
+    """Create spec items with VERSIONS_PER_SPEC items for each spec."""
+    for idx in range(size):
+        name = f"spec-{idx // VERSIONS_PER_SPEC}"
+        version_idx = idx % VERSIONS_PER_SPEC
+        updated_at = (
+            models.Spec.UPDATED_AT_LATEST
+            if version_idx == VERSIONS_PER_SPEC - 1
+            else str(1000 + version_idx)
+        )
+        index_values = models.Spec.calc_index_values(
+            updated_at=updated_at, id_=models.Spec.calc_id(name)
+        )
+        yield typing.cast(
+            models.Spec,
+            factory.SpecFactory(
+                sub=sub,
+                id=models.Spec.calc_id(name),
+                name=name,
+                updated_at=str(1000 + version_idx),
+                version=str(version_idx),
+                updated_at_id=index_values.updated_at_id,
+                id_updated_at=index_values.id_updated_at,
+            ),
+        )
+
+
+def _credentials_items(*, size: int) -> typing.Iterator[credentials.Credentials]:
+    """Create credentials items, one for each customer."""
+    for idx in range(size):
+        yield typing.cast(
+            credentials.Credentials,
+            factory.CredentialsFactory(
+                sub=f"benchmark credentials {size} {idx}",
+                public_key=f"benchmark public key {size} {idx}",
+            ),
+        )
+
+
+def seed_dynamodb(*, size: int, catalog: bool) -> Dataset:
+    """Seed DynamoDB with spec and credentials items."""
+    sub = f"benchmark {size}"
+    with models.Spec.batch_write() as batch:
+        for spec_item in _spec_items(sub=sub, size=size):
+            batch.save(spec_item)
+    if catalog:
+        package_catalog.rebuild(model=models.Spec, sub=sub)
+    else:
+        models.Spec.reconcile_customer_models(sub=sub)
+
+    public_keys = []
+    with credentials.Credentials.batch_write() as credentials_batch:
+        for credentials_item in _credentials_items(size=size):
+            credentials_batch.save(credentials_item)
+            credentials_batch.save(
+                credentials.CredentialsPublicKey.from_credentials(credentials_item)
+            )
+            public_keys.append(credentials_item.public_key)
+
+    return Dataset(
+        sub=sub,
+        names=sorted({item["name"] for item in models.Spec.list_(sub=sub)}),
+        public_keys=public_keys,
+    )
+
+
+def seed_memory(*, database: memory.Database, size: int) -> Dataset:
+    """Seed the memory database with spec and credentials items."""
+    # pylint: disable=protected-access
+    sub = f"benchmark {size}"
+    customer_specs = memory._TABLES.specs.setdefault(sub, {})
+    for spec_item in _spec_items(sub=sub, size=size):
+        customer_specs[spec_item.updated_at_id] = memory._SpecItem(
+            sub=spec_item.sub,
+            id=spec_item.id,
+            name=spec_item.name,
+            updated_at=spec_item.updated_at,
+            version=spec_item.version,
+            title=spec_item.title,
+            description=spec_item.description,
+            model_count=int(spec_item.model_count),
+            updated_at_id=spec_item.updated_at_id,
+            id_updated_at=spec_item.id_updated_at,
+        )
+
+    public_keys = []
+    for credentials_item in _credentials_items(size=size):
+        database.create_update_credentials(
+            sub=credentials_item.sub,
+            id_=credentials_item.id,
+            public_key=credentials_item.public_key,
+            secret_key_hash=credentials_item.secret_key_hash,
+            salt=credentials_item.salt,
+        )
+        public_keys.append(credentials_item.public_key)
+
+    return Dataset(
+        sub=sub,
+        names=sorted({item["name"] for item in database.list_specs(sub=sub)}),
+        public_keys=public_keys,
+    )
+
+
+def run_size(
+    *, database: types.TDatabase, dataset: Dataset, size: int, iterations: int
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Measure all operations for a seeded size.
+
+    Args:
+        database: The database facade to measure.
+        dataset: The data that was seeded.
+        size: The number of seeded items.
+        iterations: The number of times to execute each operation.
+
+    Returns:
+        The results of the operations.
+
+    """
+    sub = dataset.sub
+    names = dataset.names
+    public_keys = dataset.public_keys
+
+    def restore_spec(idx: int) -> None:
+        """Make sure the spec that is about to be deleted exists."""
+        database.create_update_spec(
+            sub=sub, name=names[idx % len(names)], version="restored", model_count=1
+        )
+
+    results = [
+        helpers.measure(
+            name="list_specs",
+            func=lambda _: database.list_specs(sub=sub),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="list_specs_json",
+            func=lambda _: database.list_specs_json(sub=sub),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="list_spec_versions",
+            func=lambda idx: database.list_spec_versions(
+                sub=sub, name=names[idx % len(names)]
+            ),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="get_specs",
+            func=lambda _: database.get_specs(sub=sub, names=names[:100]),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="count_customer_models",
+            func=lambda _: database.count_customer_models(sub=sub),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="get_user",
+            func=lambda idx: database.get_user(
+                public_key=public_keys[(idx * 7919) % len(public_keys)]
+            ),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="create_update_spec",
+            func=lambda idx: database.create_update_spec(
+                sub=sub,
+                name=names[idx % len(names)],
+                version=f"benchmark {idx}",
+                model_count=idx % 5,
+            ),
+            iterations=iterations,
+        ),
+        helpers.measure(
+            name="delete_spec",
+            func=lambda idx: database.delete_spec(
+                sub=sub, name=names[idx % len(names)]
+            ),
+            iterations=iterations,
+            setup=restore_spec,
+        ),
+    ]
+    helpers.print_results(results)
+
+    return [
+        {
+            "size": size,
+            "operation": result.name,
+            "iterations": result.iterations,
+            "mean_ms": result.mean * 1000,
+            "median_ms": result.median * 1000,
+            "p95_ms": result.p95 * 1000,
+            "throughput_per_s": 1 / result.mean,
+        }
+        for result in results
+    ]
+
+
+def _git_commit() -> typing.Optional[str]:
+    """Retrieve the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--backend",
+        choices=[backend.value for backend in config.Backend],
+        default=config.get().backend.value,
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--catalog", action="store_true")
+    parsed_args = parser.parse_args(args)
+    backend = config.Backend(parsed_args.backend)
+
+    results: typing.List[typing.Dict[str, typing.Any]] = []
+    if backend == config.Backend.MEMORY:
+        for size in parsed_args.sizes:
+            print(f"size {size}:")  # allow-print
+            memory_database = memory.Database()
+            dataset = seed_memory(database=memory_database, size=size)
+            results.extend(
+                run_size(
+                    database=memory_database,
+                    dataset=dataset,
+                    size=size,
+                    iterations=parsed_args.iterations,
+                )
+            )
+    else:
+        with helpers.specs_table(), helpers.credentials_table():
+            dynamodb_database = dynamodb.Database()
+            for size in parsed_args.sizes:
+                print(f"size {size}:")  # allow-print
+                dataset = seed_dynamodb(size=size, catalog=parsed_args.catalog)
+                try:
+                    results.extend(
+                        run_size(
+                            database=dynamodb_database,
+                            dataset=dataset,
+                            size=size,
+                            iterations=parsed_args.iterations,
+                        )
+                    )
+                finally:
+                    models.Spec.delete_all(sub=dataset.sub)
+                    for credentials_item in _credentials_items(size=size):
+                        credentials.Credentials.delete_all(sub=credentials_item.sub)
+
+    if parsed_args.output is not None:
+        with open(parsed_args.output, "w") as out_file:
+            json.dump(
+                {
+                    "commit": _git_commit(),
+                    "backend": backend.value,
+                    "results": results,
+                },
+                out_file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark the latency of retrieving a user by the public key of their credentials.
+
+Compares querying the public key global secondary index with reading the lookup
+item of the public key using a strongly consistent GetItem, with different
+numbers of concurrent requests.
+
+Requires DynamoDB to be running at http://localhost:8000, run using:
+
+    STAGE=TEST python -m benchmarks.get_user
+
+"""
+
+import argparse
+import typing
+
+from open_alchemy.package_database import credentials, factory, types
+
+from . import helpers
+
+
+def get_user_index(
+    *, public_key: types.TCredentialsPublicKey
+) -> typing.Optional[types.CredentialsAuthInfo]:
+    """Retrieve the user by querying the public key index."""
+    item = next(
+        credentials.Credentials.public_key_index.query(hash_key=public_key), None
+    )
+    if item is None:
+        return None
+    return types.CredentialsAuthInfo(
+        sub=item.sub, secret_key_hash=item.secret_key_hash, salt=item.salt
+    )
+
+
+def seed(*, count: int) -> typing.List[types.TCredentialsPublicKey]:
+    """Write credentials and their lookup items."""
+    public_keys: typing.List[types.TCredentialsPublicKey] = []
+    with credentials.Credentials.batch_write() as batch:
+        for idx in range(count):
+            item = typing.cast(
+                credentials.Credentials,
+                factory.CredentialsFactory(
+                    sub=f"benchmark {idx}", public_key=f"benchmark public key {idx}"
+                ),
+            )
+            batch.save(item)
+            batch.save(credentials.CredentialsPublicKey.from_credentials(item))
+            public_keys.append(item.public_key)
+    return public_keys
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--credentials", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parsed_args = parser.parse_args(args)
+
+    with helpers.credentials_table():
+        public_keys = seed(count=parsed_args.credentials)
+
+        def public_key(idx: int) -> types.TCredentialsPublicKey:
+            """Spread the requests over the credentials."""
+            return public_keys[(idx * 7919) % len(public_keys)]
+
+        results = []
+        for workers in parsed_args.workers:
+            results.extend(
+                [
+                    helpers.measure_concurrent(
+                        name=f"index query with {workers} workers",
+                        func=lambda idx: get_user_index(public_key=public_key(idx)),
+                        iterations=parsed_args.iterations,
+                        workers=workers,
+                    ),
+                    helpers.measure_concurrent(
+                        name=f"lookup item get with {workers} workers",
+                        func=lambda idx: credentials.Credentials.get_user(
+                            public_key=public_key(idx)
+                        ),
+                        iterations=parsed_args.iterations,
+                        workers=workers,
+                    ),
+                ]
+            )
+
+        for idx in range(parsed_args.credentials):
+            credentials.Credentials.delete_all(sub=f"benchmark {idx}")
+
+    helpers.print_results(results)
+
+
+if __name__ == "__main__":
+    main()
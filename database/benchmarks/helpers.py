@@ -0,0 +1,142 @@
+"""Helpers for the benchmarks."""
+
+import contextlib
+import statistics
+import time
+import typing
+from concurrent import futures
+
+from open_alchemy.package_database import credentials, models
+from pynamodb import models as pynamodb_models
+
+
+class TResult(typing.NamedTuple):
+    """
+    The result of a benchmark.
+
+    Attrs:
+        name: The name of the benchmark.
+        iterations: The number of times the operation was executed.
+        mean: The mean duration of the operation in seconds.
+        median: The median duration of the operation in seconds.
+        p95: The 95th percentile duration of the operation in seconds.
+
+    """
+
+    name: str
+    iterations: int
+    mean: float
+    median: float
+    p95: float
+
+
+def measure(
+    *,
+    name: str,
+    func: typing.Callable[[int], typing.Any],
+    iterations: int,
+    setup: typing.Optional[typing.Callable[[int], typing.Any]] = None,
+) -> TResult:
+    """
+    Measure the duration of an operation.
+
+    Args:
+        name: The name of the benchmark.
+        func: The operation, called with the index of the iteration.
+        iterations: The number of times to execute the operation.
+        setup: Called with the index of the iteration before the operation without
+            being measured.
+
+    Returns:
+        Statistics about the duration of the operation.
+
+    """
+    durations: typing.List[float] = []
+    for idx in range(iterations):
+        if setup is not None:
+            setup(idx)
+        start = time.perf_counter()
+        func(idx)
+        durations.append(time.perf_counter() - start)
+
+    return _result(name=name, durations=durations)
+
+
+def measure_concurrent(
+    *,
+    name: str,
+    func: typing.Callable[[int], typing.Any],
+    iterations: int,
+    workers: int,
+) -> TResult:
+    """
+    Measure the duration of an operation while it is executed concurrently.
+
+    Args:
+        name: The name of the benchmark.
+        func: The operation, called with the index of the iteration.
+        iterations: The number of times to execute the operation.
+        workers: The number of threads that execute the operation concurrently.
+
+    Returns:
+        Statistics about the duration of the operation.
+
+    """
+
+    def timed(idx: int) -> float:
+        """Execute the operation and return its duration."""
+        start = time.perf_counter()
+        func(idx)
+        return time.perf_counter() - start
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        durations = list(executor.map(timed, range(iterations)))
+
+    return _result(name=name, durations=durations)
+
+
+def _result(*, name: str, durations: typing.List[float]) -> TResult:
+    """Calculate the statistics of the durations of an operation."""
+    durations = sorted(durations)
+    return TResult(
+        name=name,
+        iterations=len(durations),
+        mean=statistics.mean(durations),
+        median=statistics.median(durations),
+        p95=durations[min(int(len(durations) * 0.95), len(durations) - 1)],
+    )
+
+
+def print_results(results: typing.Iterable[TResult]) -> None:
+    """Print the results of benchmarks."""
+    for result in results:
+        print(  # allow-print
+            f"{result.name}: iterations={result.iterations}, "
+            f"mean={result.mean * 1000:.2f}ms, median={result.median * 1000:.2f}ms, "
+            f"p95={result.p95 * 1000:.2f}ms"
+        )
+
+
+@contextlib.contextmanager
+def table(model: typing.Type[pynamodb_models.Model]) -> typing.Iterator[None]:
+    """Create the table of a model if it does not exist and delete it afterwards."""
+    created = False
+    if not model.exists():
+        model.create_table(read_capacity_units=1, write_capacity_units=1, wait=True)
+        created = True
+
+    try:
+        yield
+    finally:
+        if created:
+            model.delete_table()
+
+
+def specs_table() -> typing.ContextManager[None]:
+    """Create the specs table if it does not exist and delete it afterwards."""
+    return table(models.Spec)
+
+
+def credentials_table() -> typing.ContextManager[None]:
+    """Create the credentials table if it does not exist and delete it afterwards."""
+    return table(credentials.Credentials)
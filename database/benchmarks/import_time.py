@@ -0,0 +1,118 @@
+"""
+Benchmark the time it takes to import the database facade.
+
+Runs the import in fresh interpreters using python -X importtime and reports the
+cumulative import time of the facade and of the slowest modules it imports. Does
+not require DynamoDB to be running, run using:
+
+    python -m benchmarks.import_time
+
+Exits with a non-zero status if the median import time exceeds --max-ms.
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import typing
+
+MODULE = "open_alchemy.package_database"
+
+
+class TImport(typing.NamedTuple):
+    """
+    The time it took to import a module.
+
+    Attrs:
+        name: The name of the module.
+        self_us: The time spent importing the module itself in microseconds.
+        cumulative_us: The time spent importing the module and the modules it
+            imports in microseconds.
+
+    """
+
+    name: str
+    self_us: int
+    cumulative_us: int
+
+
+def measure_imports(*, statement: str) -> typing.List[TImport]:
+    """
+    Measure the import time of modules by running a statement in a new interpreter.
+
+    Args:
+        statement: The Python statement to run.
+
+    Returns:
+        The import time of all modules that were imported.
+
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    imports: typing.List[TImport] = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        imports.append(
+            TImport(
+                name=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return imports
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parsed_args = parser.parse_args(args)
+
+    durations: typing.List[float] = []
+    imports: typing.List[TImport] = []
+    for _ in range(parsed_args.iterations):
+        imports = measure_imports(statement=f"import {MODULE}")
+        durations.append(
+            next(item.cumulative_us for item in imports if item.name == MODULE) / 1000
+        )
+
+    median = statistics.median(durations)
+    print(  # allow-print
+        f"import {MODULE}: iterations={parsed_args.iterations}, "
+        f"median={median:.2f}ms, min={min(durations):.2f}ms, "
+        f"max={max(durations):.2f}ms"
+    )
+    print("slowest modules of the last iteration:")  # allow-print
+    for item in sorted(imports, key=lambda item: item.self_us, reverse=True)[
+        : parsed_args.top
+    ]:
+        print(  # allow-print
+            f"  {item.name}: self={item.self_us / 1000:.2f}ms, "
+            f"cumulative={item.cumulative_us / 1000:.2f}ms"
+        )
+
+    if parsed_args.max_ms is not None and median > parsed_args.max_ms:
+        sys.exit(
+            f"the median import time {median:.2f}ms exceeds {parsed_args.max_ms}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark how write throughput scales with the number of shards of a customer.
+
+For each number of shards, a customer is sharded and many writers create versions
+of different specs at the same time. Reports the write throughput and latency and
+the latency of listing the versions of a spec, which queries every shard.
+
+The writes of a customer that is not sharded all go to a single partition, so the
+throughput is expected to scale with the number of shards until the table rather
+than the partition limits it. DynamoDB running locally does not limit the
+throughput of partitions, use it to measure the overhead of sharding.
+
+Requires DynamoDB to be running at http://localhost:8000, run using:
+
+    STAGE=TEST python -m benchmarks.shards
+    STAGE=TEST python -m benchmarks.shards --shards 1 4 16 --writes 2000
+
+"""
+
+import argparse
+import time
+import typing
+
+from open_alchemy.package_database import models
+from open_alchemy.package_database import shards as package_shards
+
+from . import helpers
+
+SUB = "benchmark shards"
+
+
+def run(
+    *, shards: int, writes: int, writers: int, specs: int
+) -> typing.Tuple[float, typing.List[helpers.TResult]]:
+    """
+    Measure the writes and reads of a customer with a number of shards.
+
+    Args:
+        shards: The number of shards of the customer.
+        writes: The number of versions to write.
+        writers: The number of threads writing at the same time.
+        specs: The number of specs the versions are spread over.
+
+    Returns:
+        The throughput of the writes in writes per second and the statistics of the
+        writes and reads.
+
+    """
+    sub = f"{SUB} {shards}"
+    models.Spec.create_update_item(sub=sub, name="spec 0", version="0", model_count=1)
+    package_shards.shard_versions(model=models.Spec, sub=sub, shards=shards)
+
+    def write(idx: int) -> None:
+        """Write a version of a spec."""
+        models.Spec.create_update_item(
+            sub=sub,
+            name=f"spec {idx % specs}",
+            version=f"version {idx}",
+            model_count=1,
+        )
+
+    try:
+        start = time.perf_counter()
+        write_result = helpers.measure_concurrent(
+            name=f"create_update_item {shards=}",
+            func=write,
+            iterations=writes,
+            workers=writers,
+        )
+        throughput = writes / (time.perf_counter() - start)
+        read_result = helpers.measure(
+            name=f"list_versions {shards=}",
+            func=lambda idx: models.Spec.list_versions(
+                sub=sub, name=f"spec {idx % specs}"
+            ),
+            iterations=min(writes, 100),
+        )
+    finally:
+        models.Spec.delete_all(sub=sub)
+
+    return throughput, [write_result, read_result]
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Run the benchmark.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--specs", type=int, default=50)
+    parsed_args = parser.parse_args(args)
+    # No other process reads the customers of the benchmark
+    package_shards.COUNT_CACHE_SECONDS = 0
+
+    with helpers.specs_table():
+        for shards in parsed_args.shards:
+            throughput, results = run(
+                shards=shards,
+                writes=parsed_args.writes,
+                writers=parsed_args.writers,
+                specs=parsed_args.specs,
+            )
+            print(f"{shards=}: {throughput:.1f} writes/s")  # allow-print
+            helpers.print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,67 @@
 """Package database facade."""
 
-from . import dynamodb, exceptions, types
+import typing
+
+from . import config, exceptions, instrumentation, types
 
 
 def _construct() -> types.TDatabase:
-    """Construct the database facade."""
+    """
+    Construct the database facade.
+
+    The implementations are imported here so that PynamoDB and the models are only
+    imported once the database is used.
+
+    """
+    config_instance = config.get()
+
+    if config_instance.backend == config.Backend.MEMORY:
+        # pylint: disable=import-outside-toplevel
+        from . import memory
+
+        return memory.Database()
+
+    if config_instance.cache_size > 0:
+        # pylint: disable=import-outside-toplevel
+        from . import cache
+
+        return cache.Database()
+
+    # pylint: disable=import-outside-toplevel
+    from . import dynamodb
+
     return dynamodb.Database()
 
 
-_DATABASE = _construct()
+class TCache(typing.TypedDict, total=True):
+    """Cache for the database facade."""
+
+    database: typing.Optional[types.TDatabase]
+    async_database: typing.Optional[types.TAsyncDatabase]
+
+
+_CACHE: TCache = {"database": None, "async_database": None}
 
 
 def get() -> types.TDatabase:
-    """Return a facade for the database."""
-    return _DATABASE
+    """Return a facade for the database, constructing it on first use."""
+    if _CACHE["database"] is None:
+        _CACHE["database"] = _construct()
+    assert _CACHE["database"] is not None
+    return _CACHE["database"]
+
+
+def get_async() -> types.TAsyncDatabase:
+    """
+    Return an asynchronous facade for the database, constructing it on first use.
+
+    The calls are made to the facade returned by get.
+
+    """
+    if _CACHE["async_database"] is None:
+        # pylint: disable=import-outside-toplevel
+        from . import aio
+
+        _CACHE["async_database"] = aio.Database(database=get())
+    assert _CACHE["async_database"] is not None
+    return _CACHE["async_database"]
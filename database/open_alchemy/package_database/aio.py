@@ -0,0 +1,277 @@
+"""Asynchronous implementation of the database facade."""
+
+import asyncio
+import contextvars
+import typing
+from concurrent import futures
+
+from . import config, types
+
+TResult = typing.TypeVar("TResult")
+
+_EXHAUSTED = object()
+
+
+class Database:  # pylint: disable=too-many-public-methods
+    """
+    Asynchronous interface for the database.
+
+    The calls are made to a blocking database facade on a pool of threads, which
+    lets independent calls be awaited at the same time, for example using
+    asyncio.gather. The pool has as many threads as there are connections to
+    DynamoDB so that concurrent calls do not wait for a connection. Each call runs
+    in a copy of the context of the caller so that it is included in the
+    instrumentation of the caller.
+
+    Attrs:
+        database: The blocking database facade the calls are made to.
+
+    """
+
+    def __init__(
+        self, *, database: types.TDatabase, max_workers: typing.Optional[int] = None
+    ) -> None:
+        """
+        Construct.
+
+        Args:
+            database: The blocking database facade the calls are made to.
+            max_workers: The maximum number of concurrent calls, defaults to the
+                maximum number of connections to DynamoDB.
+
+        """
+        self.database = database
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=max_workers or config.get().connection.max_pool_connections,
+            thread_name_prefix="package-database",
+        )
+
+    async def _run(
+        self,
+        func: typing.Callable[..., TResult],
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> TResult:
+        """Call a function on the pool of threads and wait for the result."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+
+        def call() -> TResult:
+            """Call the function in the context of the caller."""
+            return context.run(func, *args, **kwargs)
+
+        return await loop.run_in_executor(self._executor, call)
+
+    async def _iterate(
+        self,
+        func: typing.Callable[..., typing.Iterator[TResult]],
+        **kwargs: typing.Any,
+    ) -> typing.AsyncIterator[TResult]:
+        """Retrieve the items of an iterator one by one on the pool of threads."""
+        iterator = await self._run(func, **kwargs)
+        while True:
+            item = await self._run(next, iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield typing.cast(TResult, item)
+
+    def close(self) -> None:
+        """Wait for the pending calls and release the resources of the facade."""
+        self._executor.shutdown(wait=True)
+
+    async def count_customer_models(self, *, sub: types.TSub) -> int:
+        """Count the number of models a customer has stored."""
+        return await self._run(self.database.count_customer_models, sub=sub)
+
+    async def create_update_spec(
+        self,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        version: types.TSpecVersion,
+        model_count: types.TSpecModelCount,
+        title: types.TOptSpecTitle = None,
+        description: types.TOptSpecDescription = None,
+        max_model_count: types.TOptMaxModelCount = None,
+    ) -> None:
+        """Create or update a spec."""
+        await self._run(
+            self.database.create_update_spec,
+            sub=sub,
+            name=name,
+            version=version,
+            model_count=model_count,
+            title=title,
+            description=description,
+            max_model_count=max_model_count,
+        )
+
+    async def get_latest_spec_version(
+        self, *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecVersion:
+        """Get the latest version for a spec."""
+        return await self._run(
+            self.database.get_latest_spec_version, sub=sub, name=name
+        )
+
+    async def list_specs(self, *, sub: types.TSub) -> types.TSpecInfoList:
+        """List all available specs for a customer."""
+        return await self._run(self.database.list_specs, sub=sub)
+
+    async def list_specs_json(self, *, sub: types.TSub) -> str:
+        """List all available specs for a customer serialized as JSON."""
+        return await self._run(self.database.list_specs_json, sub=sub)
+
+    async def list_specs_page(
+        self,
+        *,
+        sub: types.TSub,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """List a page of the available specs for a customer."""
+        return await self._run(
+            self.database.list_specs_page, sub=sub, limit=limit, cursor=cursor
+        )
+
+    def iter_specs(self, *, sub: types.TSub) -> types.TSpecInfoAsyncIterator:
+        """Iterate over all available specs for a customer."""
+        return self._iterate(self.database.iter_specs, sub=sub)
+
+    async def get_spec(
+        self, *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecInfo:
+        """Retrieve a spec from the database."""
+        return await self._run(self.database.get_spec, sub=sub, name=name)
+
+    async def get_specs(
+        self, *, sub: types.TSub, names: typing.Sequence[types.TSpecName]
+    ) -> types.TSpecInfoList:
+        """Retrieve multiple specs from the database."""
+        return await self._run(self.database.get_specs, sub=sub, names=names)
+
+    async def get_latest_spec(
+        self, *, sub: types.TSub, name: types.TSpecName
+    ) -> types.LatestSpecInfo:
+        """Retrieve the latest version of a spec and information about it."""
+        return await self._run(self.database.get_latest_spec, sub=sub, name=name)
+
+    async def delete_spec(
+        self,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
+        """Delete a spec from the database."""
+        return await self._run(
+            self.database.delete_spec, sub=sub, name=name, on_progress=on_progress
+        )
+
+    async def list_spec_versions(
+        self, *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecInfoList:
+        """List all available versions for a spec for a customer."""
+        return await self._run(self.database.list_spec_versions, sub=sub, name=name)
+
+    async def list_spec_versions_page(
+        self,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """List a page of the available versions for a spec for a customer."""
+        return await self._run(
+            self.database.list_spec_versions_page,
+            sub=sub,
+            name=name,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    def iter_spec_versions(
+        self, *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecInfoAsyncIterator:
+        """Iterate over all available versions for a spec for a customer."""
+        return self._iterate(self.database.iter_spec_versions, sub=sub, name=name)
+
+    async def delete_all_specs(
+        self,
+        *,
+        sub: types.TSub,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
+        """Delete all the specs for a user."""
+        return await self._run(
+            self.database.delete_all_specs, sub=sub, on_progress=on_progress
+        )
+
+    async def list_spec_subs(self) -> typing.List[types.TSub]:
+        """List all customers that have specs."""
+        return await self._run(self.database.list_spec_subs)
+
+    async def compact_spec_versions(
+        self,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        retention: types.SpecRetention,
+    ) -> types.SpecCompaction:
+        """Delete the versions of a spec that are not kept by the retention policy."""
+        return await self._run(
+            self.database.compact_spec_versions,
+            sub=sub,
+            name=name,
+            retention=retention,
+        )
+
+    async def list_credentials(self, *, sub: types.TSub) -> types.TCredentialsInfoList:
+        """List all available credentials for a user."""
+        return await self._run(self.database.list_credentials, sub=sub)
+
+    async def create_update_credentials(
+        self,
+        *,
+        sub: types.TSub,
+        id_: types.TCredentialsId,
+        public_key: types.TCredentialsPublicKey,
+        secret_key_hash: types.TCredentialsSecretKeyHash,
+        salt: types.TCredentialsSalt,
+    ) -> None:
+        """Create or update credentials."""
+        await self._run(
+            self.database.create_update_credentials,
+            sub=sub,
+            id_=id_,
+            public_key=public_key,
+            secret_key_hash=secret_key_hash,
+            salt=salt,
+        )
+
+    async def get_credentials(
+        self, *, sub: types.TSub, id_: types.TCredentialsId
+    ) -> typing.Optional[types.TCredentialsInfo]:
+        """Retrieve credentials."""
+        return await self._run(self.database.get_credentials, sub=sub, id_=id_)
+
+    async def get_user(
+        self, *, public_key: types.TCredentialsPublicKey
+    ) -> typing.Optional[types.CredentialsAuthInfo]:
+        """Retrieve a user and information to authenticate the user."""
+        return await self._run(self.database.get_user, public_key=public_key)
+
+    async def delete_credentials(
+        self, *, sub: types.TSub, id_: types.TCredentialsId
+    ) -> None:
+        """Delete the credentials."""
+        await self._run(self.database.delete_credentials, sub=sub, id_=id_)
+
+    async def delete_all_credentials(self, *, sub: types.TSub) -> None:
+        """Delete all the credentials for a user."""
+        await self._run(self.database.delete_all_credentials, sub=sub)
+
+    async def delete_all(self, *, sub: types.TSub) -> None:
+        """Delete all the items for a user."""
+        await self._run(self.database.delete_all, sub=sub)
@@ -0,0 +1,181 @@
+"""Delete many items using concurrent and retrying batch writes."""
+
+import contextvars
+import random
+import threading
+import time
+import typing
+from concurrent import futures
+
+from pynamodb import constants
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import models
+
+from . import exceptions, types
+
+BATCH_SIZE = constants.BATCH_WRITE_PAGE_LIMIT
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_RETRIES = 8
+DEFAULT_BASE_BACKOFF = 0.05
+
+TKey = typing.Dict[str, typing.Any]
+TKeys = typing.List[TKey]
+
+
+class _Tracker:
+    """Keep track of the counts of a bulk delete across workers."""
+
+    def __init__(
+        self, *, on_progress: typing.Optional[types.TBulkDeleteProgressCallback]
+    ) -> None:
+        """Construct."""
+        self.counts = types.BulkDeleteCounts()
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+
+    def record(self, *, queued: int = 0, deleted: int = 0, retries: int = 0) -> None:
+        """Add to the counts and report the progress."""
+        with self._lock:
+            self.counts.queued += queued
+            self.counts.deleted += deleted
+            self.counts.retries += retries
+            if deleted:
+                self.counts.batches += 1
+            counts = types.BulkDeleteCounts(**vars(self.counts))
+        if self.on_progress is not None:
+            self.on_progress(counts)
+
+
+def _delete_batch(
+    *,
+    model: typing.Type[models.Model],
+    keys: TKeys,
+    tracker: _Tracker,
+    max_retries: int,
+    base_backoff: float,
+) -> None:
+    """
+    Delete a batch of items, retrying unprocessed items with exponential backoff.
+
+    Raises BulkDeleteError if the items could not be deleted.
+
+    Args:
+        model: The model of the items.
+        keys: The keys of the items, at most BATCH_SIZE.
+        tracker: Records the counts of the bulk delete.
+        max_retries: The maximum number of times unprocessed items are retried.
+        base_backoff: The maximum delay in seconds before the first retry which is
+            doubled for every following retry.
+
+    """
+    connection = model._get_connection()  # pylint: disable=protected-access
+    table_name = model.Meta.table_name
+
+    retries = 0
+    while True:
+        try:
+            data = connection.batch_write_item(delete_items=keys)
+        except pynamodb_exceptions.PutError as exc:
+            raise exceptions.BulkDeleteError(
+                f"failed to delete items from {table_name}"
+            ) from exc
+        unprocessed_items = data.get(constants.UNPROCESSED_ITEMS, {}).get(
+            table_name, []
+        )
+        tracker.record(deleted=len(keys) - len(unprocessed_items))
+        if not unprocessed_items:
+            return
+
+        if retries >= max_retries:
+            raise exceptions.BulkDeleteError(
+                f"could not delete {len(unprocessed_items)} items from {table_name} "
+                f"after {retries} retries"
+            )
+        time.sleep(random.uniform(0, base_backoff * 2**retries))
+        retries += 1
+        tracker.record(retries=1)
+        keys = [
+            item[constants.DELETE_REQUEST][constants.KEY] for item in unprocessed_items
+        ]
+
+
+def _batch_keys(items: typing.Iterable[models.Model]) -> typing.Iterator[TKeys]:
+    """Group the keys of the items into batches as the items are retrieved."""
+    batch: TKeys = []
+    for item in items:
+        batch.append(item._get_keys())  # pylint: disable=protected-access
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def delete(
+    *,
+    model: typing.Type[models.Model],
+    items: typing.Iterable[models.Model],
+    workers: int = DEFAULT_WORKERS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_backoff: float = DEFAULT_BASE_BACKOFF,
+    on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+) -> types.BulkDeleteCounts:
+    """
+    Delete items using concurrent batch writes.
+
+    The items are grouped into batches of BATCH_SIZE as they are retrieved, for
+    example page by page from a query, and each batch is deleted by one of the
+    workers. At most twice as many batches as there are workers are held in memory
+    at any time. Unprocessed items are retried with exponential backoff and jitter.
+
+    Raises BulkDeleteError if any items could not be deleted, no further batches are
+    started in that case.
+
+    Args:
+        model: The model of the items.
+        items: The items to delete, only their keys are used.
+        workers: The number of batches that are deleted concurrently.
+        max_retries: The maximum number of times unprocessed items are retried.
+        base_backoff: The maximum delay in seconds before the first retry which is
+            doubled for every following retry.
+        on_progress: Called with the counts whenever items are queued, deleted or
+            retried.
+
+    Returns:
+        The counts of the bulk delete.
+
+    """
+    tracker = _Tracker(on_progress=on_progress)
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: typing.Set["futures.Future[None]"] = set()
+        try:
+            for keys in _batch_keys(items):
+                if len(pending) >= 2 * workers:
+                    done, pending = futures.wait(
+                        pending, return_when=futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        future.result()
+                tracker.record(queued=len(keys))
+                # Run in a copy of the context so that the deletes are included in
+                # the metrics of the call, if it is instrumented
+                pending.add(
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        _delete_batch,
+                        model=model,
+                        keys=keys,
+                        tracker=tracker,
+                        max_retries=max_retries,
+                        base_backoff=base_backoff,
+                    )
+                )
+            for future in futures.as_completed(pending):
+                future.result()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    return tracker.counts
@@ -0,0 +1,127 @@
+"""Retrieve many items using retrying batch gets."""
+
+import random
+import time
+import typing
+
+from pynamodb import constants
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import models
+
+from . import exceptions
+
+BATCH_SIZE = constants.BATCH_GET_PAGE_LIMIT
+DEFAULT_MAX_RETRIES = 8
+DEFAULT_BASE_BACKOFF = 0.05
+
+TKey = typing.Dict[str, typing.Any]
+TKeys = typing.List[TKey]
+TModel = typing.TypeVar("TModel", bound=models.Model)
+
+
+def _get_batch(
+    *,
+    model: typing.Type[TModel],
+    keys: TKeys,
+    attributes_to_get: typing.Optional[typing.Sequence[str]],
+    consistent_read: bool,
+    max_retries: int,
+    base_backoff: float,
+) -> typing.Iterator[TModel]:
+    """
+    Retrieve a batch of items, retrying unprocessed keys with exponential backoff.
+
+    Raises BulkGetError if the items could not be retrieved.
+
+    Args:
+        model: The model of the items.
+        keys: The keys of the items, at most BATCH_SIZE.
+        attributes_to_get: The attributes to retrieve, all if None.
+        consistent_read: Whether to use strongly consistent reads.
+        max_retries: The maximum number of times unprocessed keys are retried.
+        base_backoff: The maximum delay in seconds before the first retry which is
+            doubled for every following retry.
+
+    Returns:
+        The items that exist.
+
+    """
+    connection = model._get_connection()  # pylint: disable=protected-access
+    table_name = model.Meta.table_name
+
+    retries = 0
+    while True:
+        try:
+            data = connection.batch_get_item(
+                # PynamoDB annotates the keys as strings, they are the key attributes
+                keys,  # type: ignore
+                consistent_read=consistent_read,
+                attributes_to_get=attributes_to_get,
+            )
+        except pynamodb_exceptions.GetError as exc:
+            raise exceptions.BulkGetError(
+                f"failed to get items from {table_name}"
+            ) from exc
+        for item_data in data.get(constants.RESPONSES, {}).get(table_name, []):
+            yield model.from_raw_data(item_data)
+        unprocessed_keys = (
+            data.get(constants.UNPROCESSED_KEYS, {})
+            .get(table_name, {})
+            .get(constants.KEYS, [])
+        )
+        if not unprocessed_keys:
+            return
+
+        if retries >= max_retries:
+            raise exceptions.BulkGetError(
+                f"could not get {len(unprocessed_keys)} items from {table_name} "
+                f"after {retries} retries"
+            )
+        time.sleep(random.uniform(0, base_backoff * 2**retries))
+        retries += 1
+        keys = unprocessed_keys
+
+
+def get(
+    *,
+    model: typing.Type[TModel],
+    keys: typing.Iterable[TKey],
+    attributes_to_get: typing.Optional[typing.Sequence[str]] = None,
+    consistent_read: bool = False,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_backoff: float = DEFAULT_BASE_BACKOFF,
+) -> typing.Iterator[TModel]:
+    """
+    Retrieve items using batch gets.
+
+    Duplicate keys are only retrieved once since DynamoDB rejects batches with
+    duplicate keys. The keys are grouped into batches of BATCH_SIZE and unprocessed
+    keys are retried with exponential backoff and jitter. Items that do not exist
+    are skipped and the items are returned in no particular order.
+
+    Raises BulkGetError if any items could not be retrieved.
+
+    Args:
+        model: The model of the items.
+        keys: The keys of the items mapping the attribute names of the primary key
+            to their values.
+        attributes_to_get: The attributes to retrieve, all if None.
+        consistent_read: Whether to use strongly consistent reads.
+        max_retries: The maximum number of times unprocessed keys are retried.
+        base_backoff: The maximum delay in seconds before the first retry which is
+            doubled for every following retry.
+
+    Returns:
+        The items that exist.
+
+    """
+    unique_keys = list({tuple(sorted(key.items())): key for key in keys}.values())
+    for start in range(0, len(unique_keys), BATCH_SIZE):
+        yield from _get_batch(
+            model=model,
+            keys=unique_keys[start : start + BATCH_SIZE],
+            attributes_to_get=attributes_to_get,
+            consistent_read=consistent_read,
+            max_retries=max_retries,
+            base_backoff=base_backoff,
+        )
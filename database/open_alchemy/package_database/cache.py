@@ -0,0 +1,205 @@
+"""DynamoDB implementation of the database facade that caches spec listings."""
+
+import collections
+import copy
+import threading
+import typing
+
+from . import catalog, config, dynamodb, exceptions, instrumentation, models, types
+
+TCacheKey = typing.Tuple[str, ...]
+TValue = typing.TypeVar("TValue")
+
+
+class _Entry(typing.NamedTuple):
+    """A cached value and the generation of the customer it was read at."""
+
+    generation: int
+    value: typing.Any
+
+
+class CacheInfo(typing.NamedTuple):
+    """
+    The statistics of the cache.
+
+    Attrs:
+        hits: The number of reads that were served from the cache.
+        misses: The number of reads that were not served from the cache.
+        size: The number of cached values.
+
+    """
+
+    hits: int
+    misses: int
+    size: int
+
+
+class _Cache:
+    """The values cached by the process and the statistics of the cache."""
+
+    def __init__(self) -> None:
+        """Construct."""
+        self.entries: "collections.OrderedDict[TCacheKey, _Entry]" = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+
+_CACHE = _Cache()
+
+
+def info() -> CacheInfo:
+    """Retrieve the statistics of the cache."""
+    with _CACHE.lock:
+        return CacheInfo(
+            hits=_CACHE.hits, misses=_CACHE.misses, size=len(_CACHE.entries)
+        )
+
+
+def clear() -> None:
+    """Remove all cached values and reset the statistics of the cache."""
+    with _CACHE.lock:
+        _CACHE.entries.clear()
+        _CACHE.hits = 0
+        _CACHE.misses = 0
+
+
+def _cached(
+    *,
+    sub: types.TSub,
+    key: TCacheKey,
+    load: typing.Callable[[], TValue],
+) -> TValue:
+    """
+    Retrieve a value from the cache or load it if it is not current.
+
+    Args:
+        sub: Unique identifier for the customer the value belongs to.
+        key: Identifies the value for the customer.
+        load: Reads the value from the database.
+
+    Returns:
+        A copy of the value.
+
+    """
+    generation = catalog.get_generation(sub=sub)
+    cache_key = (sub, *key)
+
+    with _CACHE.lock:
+        entry = _CACHE.entries.get(cache_key)
+        if (
+            entry is not None
+            and generation is not None
+            and entry.generation == generation
+        ):
+            _CACHE.entries.move_to_end(cache_key)
+            _CACHE.hits += 1
+            return copy.deepcopy(entry.value)
+        _CACHE.misses += 1
+
+    value = load()
+    if generation is None:
+        return value
+
+    size = config.get().cache_size
+    with _CACHE.lock:
+        _CACHE.entries[cache_key] = _Entry(
+            generation=generation, value=copy.deepcopy(value)
+        )
+        _CACHE.entries.move_to_end(cache_key)
+        while len(_CACHE.entries) > size:
+            _CACHE.entries.popitem(last=False)
+    return value
+
+
+class Database(dynamodb.Database):
+    """
+    Interface for DynamoDB database that caches the lists of specs and versions.
+
+    The results of list_specs, list_specs_json and list_spec_versions are kept for
+    the life of the process in a least recently used cache that is shared by all
+    instances. Every write to the specs of a customer changes the generation of the
+    customer, which is read using a strongly consistent GetItem before a cached
+    value is returned. A cached value is only used if it was read at the current
+    generation, so a value is never stale after a write, including writes by other
+    processes. Values are read using strongly consistent reads after the generation
+    so that they are at least as recent as the generation they are cached for.
+
+    The specs of customers without a spec catalog are listed using a query, which
+    a cache hit replaces. For customers with a spec catalog, a cache hit reads the
+    generation instead of the whole catalog. get_spec is not cached since it is a
+    single GetItem, which is what reading the generation costs.
+
+    """
+
+    @staticmethod
+    @instrumentation.instrument
+    def list_specs(*, sub: types.TSub) -> types.TSpecInfoList:
+        """
+        List all available specs for a customer.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            List of all spec id for the customer.
+
+        """
+        return _cached(
+            sub=sub,
+            key=("list_specs",),
+            load=lambda: models.Spec.list_(sub=sub, consistent_read=True),
+        )
+
+    @staticmethod
+    @instrumentation.instrument
+    def list_specs_json(*, sub: types.TSub) -> str:
+        """
+        List all available specs for a customer serialized as JSON.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            The JSON array of all specs for the customer.
+
+        """
+        return _cached(
+            sub=sub,
+            key=("list_specs_json",),
+            load=lambda: models.Spec.list_json(sub=sub, consistent_read=True),
+        )
+
+    @staticmethod
+    @instrumentation.instrument
+    def list_spec_versions(
+        *, sub: types.TSub, name: types.TSpecId
+    ) -> types.TSpecInfoList:
+        """
+        List all available versions for a spec for a customer.
+
+        Raises NotFoundError if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            List of information for all versions of a spec for the customer.
+
+        """
+
+        def load() -> types.TSpecInfoList:
+            """Read the versions of the spec."""
+            spec_infos = models.Spec.list_versions(
+                sub=sub, name=name, consistent_read=True
+            )
+            if not spec_infos:
+                raise exceptions.NotFoundError(f"could not find spec id {name}")
+            return spec_infos
+
+        return _cached(
+            sub=sub, key=("list_spec_versions", models.Spec.calc_id(name)), load=load
+        )
@@ -0,0 +1,464 @@
+"""The model count aggregate and the spec catalog of customers."""
+
+import json
+import time
+import typing
+
+from pynamodb import attributes, constants
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import models, transactions
+from pynamodb.expressions import update as pynamodb_update
+
+from . import config, types, version_times
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from . import models as package_models  # pylint: disable=cyclic-import
+
+_CONFIG = config.get()
+
+# The number of times a catalog rebuild is attempted if the specs change meanwhile
+MAX_REBUILD_ATTEMPTS = 5
+# The number of times removing a spec from the catalog is attempted if the catalog
+# changes meanwhile
+MAX_REMOVE_ATTEMPTS = 5
+
+
+class CustomerModelCount(models.Model):
+    """
+    The sum of the model count over the latest version of all specs of a customer.
+
+    Stored in the specs table alongside the Spec items of the customer.
+
+    Attrs:
+        UPDATED_AT_ID: The sort key value of the aggregate item
+
+        sub: Unique identifier for a customer
+        updated_at_id: Always set to UPDATED_AT_ID
+        model_count: The sum of the model count of the latest version of each spec
+        generation: Changed by every write to the specs of the customer, starts at
+            the time the aggregate item was created in microseconds since epoch
+            and is incremented by 1 for every write
+        catalog_size: The size of the entries of the spec catalog of the customer
+            in bytes, only set while the customer has a spec catalog
+        spec_shards: The number of partitions the versions of the specs of the
+            customer are spread over, only set once the customer is sharded
+        spec_shards_at: The time spec_shards was last increased in seconds since
+            epoch
+
+    """
+
+    UPDATED_AT_ID = "model_count"
+
+    class Meta:
+        """Meta class."""
+
+        table_name = _CONFIG.tables.specs_table_name
+
+        if _CONFIG.stage == config.Stage.TEST:
+            host = "http://localhost:8000"
+
+        max_pool_connections = _CONFIG.connection.max_pool_connections
+        connect_timeout_seconds = _CONFIG.connection.connect_timeout_seconds
+        read_timeout_seconds = _CONFIG.connection.read_timeout_seconds
+        max_retry_attempts = _CONFIG.connection.max_retry_attempts
+        base_backoff_ms = _CONFIG.connection.base_backoff_ms
+
+    sub = attributes.UnicodeAttribute(hash_key=True)
+    updated_at_id = attributes.UnicodeAttribute(range_key=True)
+
+    model_count = attributes.NumberAttribute()
+    generation = attributes.NumberAttribute(null=True)
+    catalog_size = attributes.NumberAttribute(null=True)
+    spec_shards = attributes.NumberAttribute(null=True)
+    spec_shards_at = attributes.NumberAttribute(null=True)
+
+    @classmethod
+    def next_generation(cls) -> pynamodb_update.SetAction:
+        """
+        Calculate the action that changes the generation of a customer.
+
+        Starting at the current time makes sure that an aggregate item that is
+        deleted and created again does not repeat the generations of the deleted
+        item.
+
+        Returns:
+            The action that increments the generation or initializes it.
+
+        """
+        return cls.generation.set(
+            (cls.generation | int(time.time() * version_times.MICROSECONDS)) + 1
+        )
+
+
+class CustomerSpecCatalog(models.Model):
+    """
+    The information about the latest version of all specs of a customer.
+
+    Stored in the specs table alongside the Spec items of the customer. The
+    information about each spec is stored serialized as JSON so that listing the
+    specs of a customer is a single read that does not need to serialize anything.
+
+    Attrs:
+        UPDATED_AT_ID: The sort key value of the catalog item
+        MAX_SIZE: The largest catalog_size of the model count aggregate that is
+            allowed, leaves room below the DynamoDB item size limit of 400 KB
+
+        sub: Unique identifier for a customer
+        updated_at_id: Always set to UPDATED_AT_ID
+        infos: Maps the id of each spec to its information serialized as JSON
+
+    """
+
+    UPDATED_AT_ID = "catalog"
+    MAX_SIZE = 350_000
+
+    class Meta:
+        """Meta class."""
+
+        table_name = _CONFIG.tables.specs_table_name
+
+        if _CONFIG.stage == config.Stage.TEST:
+            host = "http://localhost:8000"
+
+        max_pool_connections = _CONFIG.connection.max_pool_connections
+        connect_timeout_seconds = _CONFIG.connection.connect_timeout_seconds
+        read_timeout_seconds = _CONFIG.connection.read_timeout_seconds
+        max_retry_attempts = _CONFIG.connection.max_retry_attempts
+        base_backoff_ms = _CONFIG.connection.base_backoff_ms
+
+    sub = attributes.UnicodeAttribute(hash_key=True)
+    updated_at_id = attributes.UnicodeAttribute(range_key=True)
+
+    # The values are the information serialized as JSON on items and paths that
+    # expressions are built from on the class
+    infos: attributes.MapAttribute[types.TSpecId, typing.Any] = attributes.MapAttribute(
+        default=dict
+    )
+
+    @staticmethod
+    def calc_entry_size(id_: types.TSpecId, info_json: str) -> int:
+        """Calculate the size of the entry of a spec in bytes."""
+        return len(id_.encode()) + len(info_json.encode())
+
+    @classmethod
+    def get_entry(cls, *, sub: types.TSub, id_: types.TSpecId) -> typing.Optional[str]:
+        """
+        Retrieve the entry of a spec in the spec catalog of a customer.
+
+        Uses a strongly consistent read that only projects the entry.
+
+        Args:
+            sub: Unique identifier for the customer.
+            id_: Unique identifier for the spec.
+
+        Returns:
+            The information about the spec serialized as JSON or None if the
+            catalog does not contain the spec.
+
+        """
+        data = cls._get_connection().get_item(
+            sub,
+            cls.UPDATED_AT_ID,
+            consistent_read=True,
+            attributes_to_get=[cls.infos[id_]],
+        )
+        try:
+            return data[constants.ITEM]["infos"][constants.MAP][id_][constants.STRING]
+        except KeyError:
+            return None
+
+
+def get_generation(*, sub: types.TSub) -> typing.Optional[int]:
+    """
+    Retrieve the generation of the specs of a customer using a consistent read.
+
+    Args:
+        sub: Unique identifier for the customer.
+
+    Returns:
+        The generation or None if the customer does not have one yet.
+
+    """
+    try:
+        item = CustomerModelCount.get(
+            hash_key=sub,
+            range_key=CustomerModelCount.UPDATED_AT_ID,
+            consistent_read=True,
+            attributes_to_get=["generation"],
+        )
+    except CustomerModelCount.DoesNotExist:
+        # Also raised when the item exists without the generation since nothing is
+        # projected
+        return None
+    return None if item.generation is None else int(item.generation)
+
+
+def get_infos(
+    *, sub: types.TSub, consistent_read: bool
+) -> typing.Optional[typing.List[str]]:
+    """
+    Retrieve the entries of the spec catalog of a customer.
+
+    Args:
+        sub: Unique identifier for the customer.
+        consistent_read: Whether to use a strongly consistent read.
+
+    Returns:
+        The information about the specs serialized as JSON ordered by id or None if
+        the customer does not have a spec catalog.
+
+    """
+    try:
+        item = CustomerSpecCatalog.get(
+            hash_key=sub,
+            range_key=CustomerSpecCatalog.UPDATED_AT_ID,
+            consistent_read=consistent_read,
+        )
+    except CustomerSpecCatalog.DoesNotExist:
+        return None
+    infos = item.infos.as_dict()
+    return [infos[id_] for id_ in sorted(infos)]
+
+
+def update_model_count(
+    *,
+    sub: types.TSub,
+    delta: int,
+    removed_id: typing.Optional[types.TSpecId] = None,
+) -> bool:
+    """
+    Add a change in the model count to the model count aggregate of a customer.
+
+    Also changes the generation of the customer. If the spec is removed from the
+    spec catalog, the size of its entry is subtracted from the catalog_size of the
+    aggregate in the same transaction, which is retried if the catalog or the
+    aggregate changed in the meantime.
+
+    Args:
+        sub: Unique identifier for the customer.
+        delta: The change in the model count of the customer.
+        removed_id: The spec whose latest item was deleted, is also removed from
+            the spec catalog of the customer.
+
+    Returns:
+        Whether the aggregate was updated, it does not exist otherwise.
+
+    """
+    attempts = 1
+    while True:
+        try:
+            return _update_model_count(sub=sub, delta=delta, removed_id=removed_id)
+        except pynamodb_exceptions.TransactWriteError as exc:
+            if (
+                exc.cause_response_code != "TransactionCanceledException"
+                or attempts >= MAX_REMOVE_ATTEMPTS
+            ):
+                raise
+        attempts += 1
+
+
+def _update_model_count(
+    *, sub: types.TSub, delta: int, removed_id: typing.Optional[types.TSpecId]
+) -> bool:
+    """Attempt to update the model count aggregate, see update_model_count."""
+    actions = [
+        CustomerModelCount.model_count.add(delta),
+        CustomerModelCount.next_generation(),
+    ]
+    condition = CustomerModelCount.model_count.exists()
+    aggregate_item = CustomerModelCount(
+        sub=sub, updated_at_id=CustomerModelCount.UPDATED_AT_ID
+    )
+    info_json = (
+        None
+        if removed_id is None
+        else CustomerSpecCatalog.get_entry(sub=sub, id_=removed_id)
+    )
+    if removed_id is None or info_json is None:
+        try:
+            aggregate_item.update(actions=actions, condition=condition)
+        except pynamodb_exceptions.UpdateError:
+            return False
+        return True
+
+    catalog = CustomerSpecCatalog(
+        sub=sub, updated_at_id=CustomerSpecCatalog.UPDATED_AT_ID
+    )
+    catalog_actions = [CustomerSpecCatalog.infos[removed_id].remove()]
+    catalog_condition = CustomerSpecCatalog.infos[removed_id] == info_json
+    try:
+        catalog_size = CustomerModelCount.get(
+            hash_key=sub,
+            range_key=CustomerModelCount.UPDATED_AT_ID,
+            consistent_read=True,
+            attributes_to_get=["model_count", "catalog_size"],
+        ).catalog_size
+    except CustomerModelCount.DoesNotExist:
+        # Without the aggregate there is no catalog_size to keep consistent
+        try:
+            catalog.update(actions=catalog_actions, condition=catalog_condition)
+        except pynamodb_exceptions.UpdateError:
+            pass
+        return False
+
+    if catalog_size is None:
+        # The catalog was dropped in the meantime
+        condition &= CustomerModelCount.catalog_size.does_not_exist()
+    else:
+        actions.append(
+            CustomerModelCount.catalog_size.add(
+                -CustomerSpecCatalog.calc_entry_size(removed_id, info_json)
+            )
+        )
+        condition &= CustomerModelCount.catalog_size.exists()
+    # pylint: disable=protected-access
+    connection = CustomerModelCount._get_connection().connection
+    transaction_write = transactions.TransactWrite(connection=connection)
+    with transaction_write:
+        transaction_write.update(
+            catalog, actions=catalog_actions, condition=catalog_condition
+        )
+        transaction_write.update(aggregate_item, actions=actions, condition=condition)
+    return True
+
+
+def add_spec_update(
+    transaction_write: transactions.TransactWrite,
+    *,
+    id_: types.TSpecId,
+    info_json: str,
+    previous_info_json: typing.Optional[str],
+    aggregate_item: CustomerModelCount,
+    delta: int,
+    max_model_count: types.TOptMaxModelCount,
+) -> None:
+    """
+    Add the updates of the aggregate and catalog for a write of a spec to a write.
+
+    If the customer has a spec catalog, the information about the spec is updated in
+    the catalog, unless the catalog would grow beyond its MAX_SIZE in which case the
+    catalog is deleted.
+
+    Args:
+        transaction_write: The transaction that writes the spec.
+        id_: Unique identifier for the spec.
+        info_json: The information about the spec serialized as JSON.
+        previous_info_json: The information about the spec before the write
+            serialized as JSON, if it existed.
+        aggregate_item: The model count aggregate of the customer.
+        delta: The change in the model count of the customer.
+        max_model_count: The maximum model count of the customer.
+
+    """
+    actions = [
+        CustomerModelCount.model_count.add(delta),
+        CustomerModelCount.next_generation(),
+    ]
+    condition = CustomerModelCount.model_count.exists()
+    if max_model_count is not None:
+        condition &= CustomerModelCount.model_count <= max_model_count - delta
+
+    catalog = CustomerSpecCatalog(
+        sub=aggregate_item.sub, updated_at_id=CustomerSpecCatalog.UPDATED_AT_ID
+    )
+    size_delta = CustomerSpecCatalog.calc_entry_size(id_, info_json)
+    if previous_info_json is not None:
+        size_delta -= CustomerSpecCatalog.calc_entry_size(id_, previous_info_json)
+    max_catalog_size = CustomerSpecCatalog.MAX_SIZE - size_delta
+    if aggregate_item.catalog_size is None:
+        # Makes sure that a catalog rebuilt in the meantime is updated
+        condition &= CustomerModelCount.catalog_size.does_not_exist()
+    elif int(aggregate_item.catalog_size) <= max_catalog_size:
+        actions.append(CustomerModelCount.catalog_size.add(size_delta))
+        condition &= CustomerModelCount.catalog_size <= max_catalog_size
+        transaction_write.update(
+            catalog,
+            actions=[CustomerSpecCatalog.infos[id_].set(info_json)],
+            condition=CustomerSpecCatalog.infos.exists(),
+        )
+    else:
+        # The specs are listed using the latest items from now on
+        actions.append(CustomerModelCount.catalog_size.remove())
+        transaction_write.delete(catalog)
+    transaction_write.update(
+        CustomerModelCount(
+            sub=aggregate_item.sub, updated_at_id=CustomerModelCount.UPDATED_AT_ID
+        ),
+        actions=actions,
+        condition=condition,
+    )
+
+
+def rebuild(*, model: typing.Type["package_models.Spec"], sub: types.TSub) -> bool:
+    """
+    Rebuild the spec catalog of a customer from the latest specs.
+
+    The model count aggregate is rebuilt in the same transaction. If the information
+    about the specs is larger than MAX_SIZE of the catalog, the catalog is deleted
+    instead so that the specs are listed by querying the latest items. The rebuild is
+    only written if the generation of the customer did not change while the latest
+    items were read and is retried otherwise.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+
+    Returns:
+        Whether the customer has a spec catalog.
+
+    """
+    attempts = 1
+    while True:
+        try:
+            return _rebuild(model=model, sub=sub)
+        except pynamodb_exceptions.TransactWriteError as exc:
+            if (
+                exc.cause_response_code != "TransactionCanceledException"
+                or attempts >= MAX_REBUILD_ATTEMPTS
+            ):
+                raise
+        attempts += 1
+
+
+def _rebuild(*, model: typing.Type["package_models.Spec"], sub: types.TSub) -> bool:
+    """Attempt to rebuild the spec catalog of a customer, see rebuild."""
+    generation = get_generation(sub=sub)
+    items = list(model.query_latest(sub=sub, consistent_read=True))
+    infos = {item.id: json.dumps(model.item_to_info(item)) for item in items}
+    catalog_size = sum(
+        CustomerSpecCatalog.calc_entry_size(id_, info_json)
+        for id_, info_json in infos.items()
+    )
+    has_catalog = catalog_size <= CustomerSpecCatalog.MAX_SIZE
+
+    actions = [
+        CustomerModelCount.model_count.set(
+            sum(int(item.model_count) for item in items)
+        ),
+        CustomerModelCount.next_generation(),
+        (
+            CustomerModelCount.catalog_size.set(catalog_size)
+            if has_catalog
+            else CustomerModelCount.catalog_size.remove()
+        ),
+    ]
+    catalog = CustomerSpecCatalog(
+        sub=sub, updated_at_id=CustomerSpecCatalog.UPDATED_AT_ID, infos=infos
+    )
+    connection = model._get_connection().connection  # pylint: disable=protected-access
+    transaction_write = transactions.TransactWrite(connection=connection)
+    with transaction_write:
+        if has_catalog:
+            transaction_write.save(catalog)
+        else:
+            transaction_write.delete(catalog)
+        transaction_write.update(
+            CustomerModelCount(sub=sub, updated_at_id=CustomerModelCount.UPDATED_AT_ID),
+            actions=actions,
+            condition=(
+                CustomerModelCount.generation.does_not_exist()
+                if generation is None
+                else CustomerModelCount.generation == generation
+            ),
+        )
+    return has_catalog
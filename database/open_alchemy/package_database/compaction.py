@@ -0,0 +1,141 @@
+"""Delete the versions of specs that are not kept by a retention policy."""
+
+import itertools
+import time
+import typing
+
+from . import bulk_delete, catalog, shards, types, version_times
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from . import models  # pylint: disable=cyclic-import
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def calc_expired(
+    *,
+    updated_at_ids: typing.Sequence["models.TSpecUpdatedAtId"],
+    target_updated_at_id: typing.Optional["models.TSpecUpdatedAtId"],
+    retention: types.SpecRetention,
+) -> typing.Set["models.TSpecUpdatedAtId"]:
+    """
+    Calculate which versions of a spec are not kept by a retention policy.
+
+    Args:
+        updated_at_ids: The sort keys of the versions of the spec.
+        target_updated_at_id: The sort key of the version the latest item is a copy
+            of, the most recent version if it is not known.
+        retention: Which versions to keep.
+
+    Returns:
+        The sort keys of the versions that are not kept.
+
+    """
+    if retention.keep_last is None and retention.max_age_days is None:
+        return set()
+
+    ordered_updated_at_ids = sorted(updated_at_ids)
+    kept = (
+        {target_updated_at_id}
+        if target_updated_at_id is not None
+        else set(ordered_updated_at_ids[-1:])
+    )
+    if retention.keep_last is not None and retention.keep_last > 0:
+        kept.update(ordered_updated_at_ids[-retention.keep_last :])
+    if retention.max_age_days is not None:
+        min_version_time = int(
+            (time.time() - retention.max_age_days * SECONDS_PER_DAY)
+            * version_times.MICROSECONDS
+        )
+        kept.update(
+            updated_at_id
+            for updated_at_id in ordered_updated_at_ids
+            if version_times.parse(updated_at_id) >= min_version_time
+        )
+    return set(ordered_updated_at_ids) - kept
+
+
+def compact(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    retention: types.SpecRetention,
+) -> types.SpecCompaction:
+    """
+    Delete the versions of a spec that are not kept by a retention policy.
+
+    Raises BulkDeleteError if not all versions could be deleted.
+
+    The version the latest item is a copy of is never deleted. Nothing is deleted if
+    the spec does not have a latest item. Once versions were deleted, the generation
+    of the customer is changed and the versions that are still referred to are read
+    again so that versions written in the meantime are not reported as expired.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for a cutsomer.
+        name: The display name of the spec.
+        retention: Which versions to keep.
+
+    Returns:
+        The number of deleted versions and the versions that are no longer referred
+        to.
+
+    """
+    id_ = model.calc_id(name)
+    latest_updated_at_id = model.calc_index_values(
+        updated_at=model.UPDATED_AT_LATEST, id_=id_
+    ).updated_at_id
+
+    def query_items() -> typing.List["models.Spec"]:
+        """Retrieve the keys and versions of all items of the spec."""
+        return list(
+            itertools.chain.from_iterable(
+                model.id_updated_at_index.query(
+                    shard_sub,
+                    model.id_updated_at.startswith(f"{id_}#"),
+                    consistent_read=True,
+                    attributes_to_get=[
+                        *model.KEY_ATTRIBUTES,
+                        "version",
+                        "version_updated_at_id",
+                    ],
+                )
+                # Versions are only written to and moved into new shards once every
+                # process uses the new number of shards
+                for shard_sub in shards.calc_shard_subs(sub=sub)
+            )
+        )
+
+    items = query_items()
+    latest_items = [
+        item for item in items if item.updated_at_id == latest_updated_at_id
+    ]
+    if not latest_items:
+        return types.SpecCompaction(deleted=0, expired_versions=[])
+    version_items = [
+        item for item in items if item.updated_at_id != latest_updated_at_id
+    ]
+    expired_updated_at_ids = calc_expired(
+        updated_at_ids=[item.updated_at_id for item in version_items],
+        target_updated_at_id=latest_items[0].version_updated_at_id,
+        retention=retention,
+    )
+    if not expired_updated_at_ids:
+        return types.SpecCompaction(deleted=0, expired_versions=[])
+
+    expired_items = [
+        item for item in version_items if item.updated_at_id in expired_updated_at_ids
+    ]
+    counts = bulk_delete.delete(model=model, items=expired_items)
+    # The model count does not change, only the generation of the customer
+    catalog.update_model_count(sub=sub, delta=0)
+
+    referred_versions = {item.version for item in query_items()}
+    return types.SpecCompaction(
+        deleted=counts.deleted,
+        expired_versions=sorted(
+            {item.version for item in expired_items} - referred_versions
+        ),
+    )
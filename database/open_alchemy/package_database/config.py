@@ -3,6 +3,7 @@
 import dataclasses
 import enum
 import os
+import typing
 
 
 class Stage(str, enum.Enum):
@@ -15,28 +16,117 @@ class Stage(str, enum.Enum):
 _STAGES = {item.value for item in Stage}
 
 
-@dataclasses.dataclass
-class TConfig:
+class Backend(str, enum.Enum):
+    """The implementation of the database facade."""
+
+    DYNAMODB = "DYNAMODB"
+    MEMORY = "MEMORY"
+
+
+_BACKENDS = {item.value for item in Backend}
+
+# The default maximum number of reads of spec information cached by each process
+DEFAULT_CACHE_SIZE = 1024
+
+
+class TTableSettings(typing.NamedTuple):
     """
-    The configuration variables.
+    The names of the tables and indexes.
 
     Attrs:
-        stage: The stage the application is running in
         specs_table_name: The name of the specs table
         specs_local_secondary_index_name: The name of the specs local secondary index
         credentials_table_name: The name of the credentials table
-        credentials_local_secondary_index_name: The name of the credentials global
+        credentials_global_secondary_index_name: The name of the credentials global
             secondary index
 
     """
 
-    stage: Stage
     specs_table_name: str
     specs_local_secondary_index_name: str
     credentials_table_name: str
     credentials_global_secondary_index_name: str
 
 
+class TConnectionSettings(typing.NamedTuple):
+    """
+    The settings of the connections of the models to DynamoDB.
+
+    Attrs:
+        max_pool_connections: The maximum number of connections kept open to
+            DynamoDB by each model
+        connect_timeout_seconds: The timeout for establishing a connection to
+            DynamoDB
+        read_timeout_seconds: The timeout for reading a response from DynamoDB
+        max_retry_attempts: The maximum number of times a failed request to DynamoDB
+            is retried
+        base_backoff_ms: The base delay in milliseconds before retrying a request,
+            doubled for each retry
+
+    """
+
+    max_pool_connections: int
+    connect_timeout_seconds: float
+    read_timeout_seconds: float
+    max_retry_attempts: int
+    base_backoff_ms: int
+
+
+@dataclasses.dataclass
+class TConfig:
+    """
+    The configuration variables.
+
+    Attrs:
+        stage: The stage the application is running in
+        backend: The implementation of the database facade to use
+        tables: The names of the tables and indexes
+        connection: The settings of the connections to DynamoDB
+        cache_size: The maximum number of reads of spec information that are
+            cached, 0 disables the cache
+
+    """
+
+    stage: Stage
+    backend: Backend
+    tables: TTableSettings
+    connection: TConnectionSettings
+
+    cache_size: int
+
+
+TNumber = typing.TypeVar("TNumber", int, float)
+
+
+def _get_number(key: str, default: TNumber, minimum: TNumber) -> TNumber:
+    """
+    Read a numeric configuration variable.
+
+    Args:
+        key: The name of the environment variable.
+        default: The value if the environment variable is not set.
+        minimum: The smallest allowed value.
+
+    Returns:
+        The value of the environment variable converted to the type of the default.
+
+    """
+    value_str = os.getenv(key)
+    if value_str is None:
+        return default
+
+    try:
+        value = type(default)(value_str)
+    except ValueError as exc:
+        raise AssertionError(
+            f"{key} environment variable must be a number, {value_str=}"
+        ) from exc
+    assert (
+        value >= minimum
+    ), f"{key} environment variable must be at least {minimum}, {value=}"
+    return value
+
+
 def _get() -> TConfig:
     """Read the configuration variables."""
     stage_key = "STAGE"
@@ -47,30 +137,62 @@ def _get() -> TConfig:
     ), f"{stage_key} environment variable must be one of {_STAGES=}, {stage_str=}"
     stage = Stage[stage_str]
 
-    specs_table_name = "package.specs"
-    specs_local_secondary_index_name = "idUpdatedAt"
+    backend_key = "DATABASE_BACKEND"
+    backend_str = os.getenv(backend_key, Backend.DYNAMODB.value)
+    assert (
+        backend_str in _BACKENDS
+    ), f"{backend_key} environment variable must be one of {_BACKENDS=}, {backend_str=}"
+    backend = Backend[backend_str]
+
+    tables = TTableSettings(
+        specs_table_name="package.specs",
+        specs_local_secondary_index_name="idUpdatedAt",
+        credentials_table_name="package.credentials",
+        credentials_global_secondary_index_name="publicKey",
+    )
 
-    credentials_table_name = "package.credentials"
-    credentials_global_secondary_index_name = "publicKey"
+    # The defaults are the PynamoDB defaults
+    connection = TConnectionSettings(
+        max_pool_connections=_get_number("DATABASE_MAX_POOL_CONNECTIONS", 10, 1),
+        connect_timeout_seconds=_get_number(
+            "DATABASE_CONNECT_TIMEOUT_SECONDS", 15.0, 0.0
+        ),
+        read_timeout_seconds=_get_number("DATABASE_READ_TIMEOUT_SECONDS", 30.0, 0.0),
+        max_retry_attempts=_get_number("DATABASE_MAX_RETRY_ATTEMPTS", 3, 0),
+        base_backoff_ms=_get_number("DATABASE_BASE_BACKOFF_MS", 25, 0),
+    )
+
+    cache_size = _get_number("DATABASE_CACHE_SIZE", DEFAULT_CACHE_SIZE, 0)
 
     return TConfig(
         stage=stage,
-        specs_table_name=specs_table_name,
-        specs_local_secondary_index_name=specs_local_secondary_index_name,
-        credentials_table_name=credentials_table_name,
-        credentials_global_secondary_index_name=credentials_global_secondary_index_name,
+        backend=backend,
+        tables=tables,
+        connection=connection,
+        cache_size=cache_size,
     )
 
 
-_CONFIG = _get()
+class TCache(typing.TypedDict, total=True):
+    """Cache for the configuration."""
+
+    config: typing.Optional[TConfig]
+
+
+_CACHE: TCache = {"config": None}
 
 
 def get() -> TConfig:
     """
     Get the value of configuration variables.
 
+    The environment variables are read on first use.
+
     Returns:
         The configuration variables.
 
     """
-    return _CONFIG
+    if _CACHE["config"] is None:
+        _CACHE["config"] = _get()
+    assert _CACHE["config"] is not None
+    return _CACHE["config"]
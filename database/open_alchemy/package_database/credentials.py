@@ -0,0 +1,435 @@
+"""Database models of credentials."""
+
+import typing
+
+from pynamodb import attributes
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import indexes, models, transactions
+
+from . import bulk_delete, config, exceptions, types
+
+_CONFIG = config.get()
+
+# The sort key value of the lookup items of credentials by their public key
+PUBLIC_KEY_ID = "public_key"
+# The number of times writing credentials is attempted if they change meanwhile
+MAX_WRITE_ATTEMPTS = 5
+
+
+class PublicKeyIndex(indexes.GlobalSecondaryIndex):
+    """Global secondary index for querying based on the public key."""
+
+    class Meta:
+        """Meta class."""
+
+        projection = indexes.AllProjection()
+        index_name = _CONFIG.tables.credentials_global_secondary_index_name
+
+        read_capacity_units = 1
+        write_capacity_units = 1
+
+        if _CONFIG.stage == config.Stage.TEST:
+            host = "http://localhost:8000"
+
+    public_key = attributes.UnicodeAttribute(hash_key=True)
+
+
+class CredentialsPublicKey(models.Model):
+    """
+    The lookup of credentials by their public key.
+
+    Stored in the credentials table alongside the Credentials items so that the user
+    can be retrieved using a single strongly consistent read.
+
+    Attrs:
+        SUB_PREFIX: The prefix of the partition key value of lookup items
+
+        sub: SUB_PREFIX followed by the public key of the credentials
+        id: Always set to PUBLIC_KEY_ID
+        credentials_sub: Unique identifier for the customer of the credentials
+        credentials_id: Unique identifier for the credentials
+
+        secret_key_hash: Value derived from the secret key that is safe to store.
+        salt: Random value used to generate the credentials.
+
+    """
+
+    SUB_PREFIX = "public_key#"
+
+    class Meta:
+        """Meta class."""
+
+        table_name = _CONFIG.tables.credentials_table_name
+
+        if _CONFIG.stage == config.Stage.TEST:
+            host = "http://localhost:8000"
+
+        max_pool_connections = _CONFIG.connection.max_pool_connections
+        connect_timeout_seconds = _CONFIG.connection.connect_timeout_seconds
+        read_timeout_seconds = _CONFIG.connection.read_timeout_seconds
+        max_retry_attempts = _CONFIG.connection.max_retry_attempts
+        base_backoff_ms = _CONFIG.connection.base_backoff_ms
+
+    sub = attributes.UnicodeAttribute(hash_key=True)
+    id = attributes.UnicodeAttribute(range_key=True)
+    credentials_sub = attributes.UnicodeAttribute()
+    credentials_id = attributes.UnicodeAttribute()
+
+    secret_key_hash = attributes.BinaryAttribute()
+    salt = attributes.BinaryAttribute()
+
+    @classmethod
+    def calc_sub(cls, public_key: types.TCredentialsPublicKey) -> types.TSub:
+        """Calculate the partition key value of the lookup item for a public key."""
+        return f"{cls.SUB_PREFIX}{public_key}"
+
+    @classmethod
+    def from_credentials(cls, item: "Credentials") -> "CredentialsPublicKey":
+        """Construct the lookup item for credentials."""
+        return cls(
+            sub=cls.calc_sub(item.public_key),
+            id=PUBLIC_KEY_ID,
+            credentials_sub=item.sub,
+            credentials_id=item.id,
+            secret_key_hash=item.secret_key_hash,
+            salt=item.salt,
+        )
+
+
+class Credentials(models.Model):
+    """
+    Information about credentials.
+
+    Attrs:
+        sub: Unique identifier for a customer
+        id: Unique identifier for particular credentials
+
+        public_key: Public identifier for the credentials.
+        secret_key_hash: Value derived from the secret key that is safe to store.
+        salt: Random value used to generate the credentials.
+
+    """
+
+    class Meta:
+        """Meta class."""
+
+        table_name = _CONFIG.tables.credentials_table_name
+
+        if _CONFIG.stage == config.Stage.TEST:
+            host = "http://localhost:8000"
+
+        max_pool_connections = _CONFIG.connection.max_pool_connections
+        connect_timeout_seconds = _CONFIG.connection.connect_timeout_seconds
+        read_timeout_seconds = _CONFIG.connection.read_timeout_seconds
+        max_retry_attempts = _CONFIG.connection.max_retry_attempts
+        base_backoff_ms = _CONFIG.connection.base_backoff_ms
+
+    sub = attributes.UnicodeAttribute(hash_key=True)
+    id = attributes.UnicodeAttribute(range_key=True)
+
+    public_key = attributes.UnicodeAttribute()
+    secret_key_hash = attributes.BinaryAttribute()
+    salt = attributes.BinaryAttribute()
+
+    public_key_index = PublicKeyIndex()
+
+    @staticmethod
+    def item_to_info(item: "Credentials") -> types.TCredentialsInfo:
+        """Convert item to dict with information about the credentials."""
+        info: types.TCredentialsInfo = {
+            "id": item.id,
+            "public_key": item.public_key,
+            "salt": item.salt,
+        }
+        return info
+
+    @classmethod
+    def list_(cls, *, sub: types.TSub) -> types.TCredentialsInfoList:
+        """
+        List all available credentials for a user.
+
+        Filters for a customer and returns all credentials.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            List of information for all credentials of the customer.
+
+        """
+        return list(map(cls.item_to_info, cls.query(sub)))
+
+    @classmethod
+    def create_update_item(
+        cls,
+        *,
+        sub: types.TSub,
+        id_: types.TCredentialsId,
+        public_key: types.TCredentialsPublicKey,
+        secret_key_hash: types.TCredentialsSecretKeyHash,
+        salt: types.TCredentialsSalt,
+    ) -> None:
+        """
+        Create or update a spec.
+
+        Raises ConflictError if the credentials kept changing after
+        MAX_WRITE_ATTEMPTS attempts.
+
+        Writes the credentials and the lookup item for the public key in a single
+        transaction, deleting the lookup item of the previous public key if it has
+        changed. The transaction is conditional on the public key of the credentials
+        not having changed since it was read and is retried otherwise so that no
+        lookup item is left behind.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            id_: Unique identifier for the credentials.
+            public_key: Public identifier for the credentials.
+            secret_key_hash: Value derived from the secret key that is safe to store.
+            salt: Random value used to generate the credentials.
+
+        """
+        item = cls(
+            sub=sub,
+            id=id_,
+            public_key=public_key,
+            secret_key_hash=secret_key_hash,
+            salt=salt,
+        )
+        cls._retry_conflicts(
+            write=lambda: cls._create_update(item=item),
+            description=f"the credentials {id_=} for customer {sub=}",
+        )
+
+    @classmethod
+    def _create_update(cls, *, item: "Credentials") -> None:
+        """Attempt to write the credentials and lookup item, see create_update_item."""
+        previous_public_key: typing.Optional[types.TCredentialsPublicKey] = None
+        try:
+            previous_public_key = cls.get(
+                hash_key=item.sub,
+                range_key=item.id,
+                consistent_read=True,
+                attributes_to_get=["public_key"],
+            ).public_key
+        except cls.DoesNotExist:
+            pass
+
+        connection = cls._get_connection().connection
+        transaction_write = transactions.TransactWrite(connection=connection)
+        with transaction_write:
+            transaction_write.save(
+                item,
+                condition=(
+                    cls.public_key.does_not_exist()
+                    if previous_public_key is None
+                    else cls.public_key == previous_public_key
+                ),
+            )
+            transaction_write.save(CredentialsPublicKey.from_credentials(item))
+            if (
+                previous_public_key is not None
+                and previous_public_key != item.public_key
+            ):
+                transaction_write.delete(
+                    CredentialsPublicKey(
+                        sub=CredentialsPublicKey.calc_sub(previous_public_key),
+                        id=PUBLIC_KEY_ID,
+                    )
+                )
+
+    @staticmethod
+    def _retry_conflicts(
+        *, write: typing.Callable[[], None], description: str
+    ) -> None:
+        """
+        Retry a write whose transaction is cancelled by concurrent writes.
+
+        Raises ConflictError if the transaction is still cancelled after
+        MAX_WRITE_ATTEMPTS attempts.
+
+        Args:
+            write: Reads the credentials and writes them in a transaction.
+            description: Describes the credentials for the error.
+
+        """
+        attempts = 1
+        while True:
+            try:
+                write()
+                return
+            except pynamodb_exceptions.TransactWriteError as exc:
+                if exc.cause_response_code != "TransactionCanceledException":
+                    raise
+                if attempts >= MAX_WRITE_ATTEMPTS:
+                    raise exceptions.ConflictError(
+                        f"could not write {description} after {attempts} attempts "
+                        "due to concurrent writes"
+                    ) from exc
+            attempts += 1
+
+    @classmethod
+    def get_item(
+        cls, *, sub: types.TSub, id_: types.TCredentialsId
+    ) -> typing.Optional[types.TCredentialsInfo]:
+        """
+        Retrieve credentials.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            id_: Unique identifier for the credentials.
+
+        Returns:
+            Information about the credentials.
+
+        """
+        try:
+            item = cls.get(hash_key=sub, range_key=id_)
+        except cls.DoesNotExist:
+            return None
+
+        return cls.item_to_info(item)
+
+    @classmethod
+    def get_user(
+        cls, *, public_key: types.TCredentialsPublicKey
+    ) -> typing.Optional[types.CredentialsAuthInfo]:
+        """
+        Retrieve a user and information to authenticate the user.
+
+        Reads the lookup item for the public key. Credentials written before the
+        lookup items were introduced are retrieved using the public key index
+        instead and their lookup item is written.
+
+        Args:
+            public_key: Public identifier for the credentials.
+
+        Returns:
+            Information needed to authenticate the user.
+
+        """
+        try:
+            lookup_item = CredentialsPublicKey.get(
+                hash_key=CredentialsPublicKey.calc_sub(public_key),
+                range_key=PUBLIC_KEY_ID,
+                consistent_read=True,
+            )
+        except CredentialsPublicKey.DoesNotExist:
+            pass
+        else:
+            return types.CredentialsAuthInfo(
+                sub=lookup_item.credentials_sub,
+                secret_key_hash=lookup_item.secret_key_hash,
+                salt=lookup_item.salt,
+            )
+
+        item = next(cls.public_key_index.query(hash_key=public_key), None)
+
+        if item is None:
+            return None
+
+        cls._backfill_public_key(item)
+        return types.CredentialsAuthInfo(
+            sub=item.sub, secret_key_hash=item.secret_key_hash, salt=item.salt
+        )
+
+    @classmethod
+    def _backfill_public_key(cls, item: "Credentials") -> None:
+        """Write the lookup item for credentials if they have not changed."""
+        connection = cls._get_connection().connection
+        try:
+            transaction_write = transactions.TransactWrite(connection=connection)
+            with transaction_write:
+                transaction_write.condition_check(
+                    cls, item.sub, item.id, condition=cls.public_key == item.public_key
+                )
+                transaction_write.save(CredentialsPublicKey.from_credentials(item))
+        except pynamodb_exceptions.TransactWriteError:
+            # The credentials were changed or deleted in the meantime
+            pass
+
+    @classmethod
+    def delete_item(cls, *, sub: types.TSub, id_: types.TCredentialsId) -> None:
+        """
+        Delete the credentials.
+
+        Raises ConflictError if the credentials kept changing after
+        MAX_WRITE_ATTEMPTS attempts.
+
+        Deletes the credentials and the lookup item for the public key in a single
+        transaction that is conditional on the public key not having changed since
+        it was read and is retried otherwise.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            id_: Unique identifier for the credentials.
+
+        """
+        cls._retry_conflicts(
+            write=lambda: cls._delete(sub=sub, id_=id_),
+            description=f"the credentials {id_=} for customer {sub=}",
+        )
+
+    @classmethod
+    def _delete(cls, *, sub: types.TSub, id_: types.TCredentialsId) -> None:
+        """Attempt to delete credentials and their lookup item, see delete_item."""
+        try:
+            item = cls.get(
+                hash_key=sub,
+                range_key=id_,
+                consistent_read=True,
+                attributes_to_get=["sub", "id", "public_key"],
+            )
+        except cls.DoesNotExist:
+            return
+
+        connection = cls._get_connection().connection
+        transaction_write = transactions.TransactWrite(connection=connection)
+        with transaction_write:
+            transaction_write.delete(item, condition=cls.public_key == item.public_key)
+            transaction_write.delete(
+                CredentialsPublicKey(
+                    sub=CredentialsPublicKey.calc_sub(item.public_key),
+                    id=PUBLIC_KEY_ID,
+                )
+            )
+
+    @classmethod
+    def delete_all(
+        cls,
+        *,
+        sub: types.TSub,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
+        """
+        Delete all the credentials for a user.
+
+        The lookup items for the public keys of the credentials are deleted
+        alongside the credentials and are included in the counts.
+
+        Raises BulkDeleteError if not all items could be deleted.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            on_progress: Called with the counts as the items are deleted.
+
+        Returns:
+            The counts of the deletion.
+
+        """
+
+        def with_lookup_items(
+            items: typing.Iterable["Credentials"],
+        ) -> typing.Iterator[models.Model]:
+            """Add the lookup item of each of the credentials."""
+            for item in items:
+                yield item
+                yield CredentialsPublicKey(
+                    sub=CredentialsPublicKey.calc_sub(item.public_key),
+                    id=PUBLIC_KEY_ID,
+                )
+
+        items = cls.query(hash_key=sub, attributes_to_get=["sub", "id", "public_key"])
+        return bulk_delete.delete(
+            model=cls, items=with_lookup_items(items), on_progress=on_progress
+        )
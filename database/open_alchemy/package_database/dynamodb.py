@@ -2,13 +2,14 @@
 
 import typing
 
-from . import exceptions, models, types
+from . import credentials, exceptions, instrumentation, models, types
 
 
-class Database:
+class Database:  # pylint: disable=too-many-public-methods
     """Interface for DynamoDB database."""
 
     @staticmethod
+    @instrumentation.instrument
     def count_customer_models(*, sub: types.TSub) -> int:
         """
         Count the number of models a customer has stored.
@@ -23,6 +24,7 @@ class Database:
         return models.Spec.count_customer_models(sub=sub)
 
     @staticmethod
+    @instrumentation.instrument
     def create_update_spec(
         *,
         sub: types.TSub,
@@ -31,10 +33,16 @@ class Database:
         model_count: types.TSpecModelCount,
         title: types.TOptSpecTitle = None,
         description: types.TOptSpecDescription = None,
+        max_model_count: types.TOptMaxModelCount = None,
     ) -> None:
         """
         Create or update a spec.
 
+        Raises ConflictError if the spec could not be written due to concurrent
+        writes.
+        Raises ModelCountExceededError if the model count of the customer would
+        exceed max_model_count.
+
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
@@ -42,6 +50,8 @@ class Database:
             model_count: The number of models in the spec.
             title: The title of a spec.
             description: The description of a spec.
+            max_model_count: The maximum model count of the customer including the
+                spec, not checked if None.
 
         """
         models.Spec.create_update_item(
@@ -51,9 +61,11 @@ class Database:
             model_count=model_count,
             title=title,
             description=description,
+            max_model_count=max_model_count,
         )
 
     @staticmethod
+    @instrumentation.instrument
     def get_latest_spec_version(
         *, sub: types.TSub, name: types.TSpecId
     ) -> types.TSpecVersion:
@@ -73,6 +85,7 @@ class Database:
         return models.Spec.get_latest_version(sub=sub, name=name)
 
     @staticmethod
+    @instrumentation.instrument
     def list_specs(*, sub: types.TSub) -> types.TSpecInfoList:
         """
         List all available specs for a customer.
@@ -87,6 +100,61 @@ class Database:
         return models.Spec.list_(sub=sub)
 
     @staticmethod
+    @instrumentation.instrument
+    def list_specs_json(*, sub: types.TSub) -> str:
+        """
+        List all available specs for a customer serialized as JSON.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            The JSON array of all specs for the customer.
+
+        """
+        return models.Spec.list_json(sub=sub)
+
+    @staticmethod
+    @instrumentation.instrument
+    def list_specs_page(
+        *,
+        sub: types.TSub,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """
+        List a page of the available specs for a customer.
+
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            limit: The maximum number of specs on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            The specs on the page and the cursor for the next page.
+
+        """
+        return models.Spec.list_page(sub=sub, limit=limit, cursor=cursor)
+
+    @staticmethod
+    @instrumentation.instrument_iterator
+    def iter_specs(*, sub: types.TSub) -> types.TSpecInfoIterator:
+        """
+        Iterate over all available specs for a customer.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            Iterator over all specs for the customer.
+
+        """
+        return models.Spec.iter_(sub=sub)
+
+    @staticmethod
+    @instrumentation.instrument
     def get_spec(*, sub: types.TSub, name: types.TSpecName) -> types.TSpecInfo:
         """
         Retrieve a spec from the database.
@@ -104,18 +172,72 @@ class Database:
         return models.Spec.get_item(sub=sub, name=name)
 
     @staticmethod
-    def delete_spec(*, sub: types.TSub, name: types.TSpecId) -> None:
+    @instrumentation.instrument
+    def get_specs(
+        *, sub: types.TSub, names: typing.Sequence[types.TSpecName]
+    ) -> types.TSpecInfoList:
+        """
+        Retrieve multiple specs from the database.
+
+        Specs that do not exist are skipped.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            names: The display names of the specs.
+
+        Returns:
+            Information about the specs in the order of the names, each spec at
+            most once.
+
+        """
+        return models.Spec.get_items(sub=sub, names=names)
+
+    @staticmethod
+    @instrumentation.instrument
+    def get_latest_spec(
+        *, sub: types.TSub, name: types.TSpecName
+    ) -> types.LatestSpecInfo:
+        """
+        Retrieve the latest version of a spec and information about it.
+
+        Raises NotFoundError if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            The latest version and information about the spec.
+
+        """
+        return models.Spec.get_latest_item(sub=sub, name=name)
+
+    @staticmethod
+    @instrumentation.instrument
+    def delete_spec(
+        *,
+        sub: types.TSub,
+        name: types.TSpecId,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
         """
         Delete a spec from the database.
 
+        Raises BulkDeleteError if not all items could be deleted.
+
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
+            on_progress: Called with the counts as the items are deleted.
+
+        Returns:
+            The counts of the deletion.
 
         """
-        models.Spec.delete_item(sub=sub, name=name)
+        return models.Spec.delete_item(sub=sub, name=name, on_progress=on_progress)
 
     @staticmethod
+    @instrumentation.instrument
     def list_spec_versions(
         *, sub: types.TSub, name: types.TSpecId
     ) -> types.TSpecInfoList:
@@ -138,17 +260,115 @@ class Database:
         return spec_infos
 
     @staticmethod
-    def delete_all_specs(*, sub: types.TSub) -> None:
+    @instrumentation.instrument
+    def list_spec_versions_page(
+        *,
+        sub: types.TSub,
+        name: types.TSpecId,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """
+        List a page of the available versions for a spec for a customer.
+
+        Raises NotFoundError if the first page is empty.
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            limit: The maximum number of versions on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            The versions on the page and the cursor for the next page.
+
+        """
+        page = models.Spec.list_versions_page(
+            sub=sub, name=name, limit=limit, cursor=cursor
+        )
+        if cursor is None and not page.items:
+            raise exceptions.NotFoundError(f"could not find spec id {name}")
+        return page
+
+    @staticmethod
+    @instrumentation.instrument_iterator
+    def iter_spec_versions(
+        *, sub: types.TSub, name: types.TSpecId
+    ) -> types.TSpecInfoIterator:
+        """
+        Iterate over all available versions for a spec for a customer.
+
+        The iterator is empty if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            Iterator over all versions of a spec for the customer.
+
+        """
+        return models.Spec.iter_versions(sub=sub, name=name)
+
+    @staticmethod
+    @instrumentation.instrument
+    def delete_all_specs(
+        *,
+        sub: types.TSub,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
         """
         Delete all the specs for a user.
 
+        Raises BulkDeleteError if not all items could be deleted.
+
         Args:
             sub: Unique identifier for a cutsomer.
+            on_progress: Called with the counts as the items are deleted.
+
+        Returns:
+            The counts of the deletion.
+
+        """
+        return models.Spec.delete_all(sub=sub, on_progress=on_progress)
+
+    @staticmethod
+    @instrumentation.instrument
+    def list_spec_subs() -> typing.List[types.TSub]:
+        """
+        List all customers that have specs.
+
+        Returns:
+            The unique identifiers of the customers.
 
         """
-        models.Spec.delete_all(sub=sub)
+        return models.Spec.list_subs()
 
     @staticmethod
+    @instrumentation.instrument
+    def compact_spec_versions(
+        *, sub: types.TSub, name: types.TSpecName, retention: types.SpecRetention
+    ) -> types.SpecCompaction:
+        """
+        Delete the versions of a spec that are not kept by the retention policy.
+
+        Raises BulkDeleteError if not all versions could be deleted.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            retention: Which versions to keep.
+
+        Returns:
+            The number of deleted versions and the versions that are no longer
+            referred to.
+
+        """
+        return models.Spec.compact_versions(sub=sub, name=name, retention=retention)
+
+    @staticmethod
+    @instrumentation.instrument
     def list_credentials(*, sub: types.TSub) -> types.TCredentialsInfoList:
         """
         List all available credentials for a user.
@@ -162,9 +382,10 @@ class Database:
             List of information for all credentials of the customer.
 
         """
-        return models.Credentials.list_(sub=sub)
+        return credentials.Credentials.list_(sub=sub)
 
     @staticmethod
+    @instrumentation.instrument
     def create_update_credentials(
         *,
         sub: types.TSub,
@@ -176,6 +397,9 @@ class Database:
         """
         Create or update a spec.
 
+        Raises ConflictError if the credentials could not be written due to
+        concurrent writes.
+
         Args:
             sub: Unique identifier for a cutsomer.
             id_: Unique identifier for the credentials.
@@ -184,7 +408,7 @@ class Database:
             salt: Random value used to generate the credentials.
 
         """
-        models.Credentials.create_update_item(
+        credentials.Credentials.create_update_item(
             sub=sub,
             id_=id_,
             public_key=public_key,
@@ -193,6 +417,7 @@ class Database:
         )
 
     @staticmethod
+    @instrumentation.instrument
     def get_credentials(
         *, sub: types.TSub, id_: types.TCredentialsId
     ) -> typing.Optional[types.TCredentialsInfo]:
@@ -207,9 +432,10 @@ class Database:
             Information about the credentials.
 
         """
-        return models.Credentials.get_item(sub=sub, id_=id_)
+        return credentials.Credentials.get_item(sub=sub, id_=id_)
 
     @staticmethod
+    @instrumentation.instrument
     def get_user(
         *, public_key: types.TCredentialsPublicKey
     ) -> typing.Optional[types.CredentialsAuthInfo]:
@@ -223,21 +449,26 @@ class Database:
             Information needed to authenticate the user.
 
         """
-        return models.Credentials.get_user(public_key=public_key)
+        return credentials.Credentials.get_user(public_key=public_key)
 
     @staticmethod
+    @instrumentation.instrument
     def delete_credentials(*, sub: types.TSub, id_: types.TCredentialsId) -> None:
         """
         Delete the credentials.
 
+        Raises ConflictError if the credentials could not be deleted due to
+        concurrent writes.
+
         Args:
             sub: Unique identifier for a cutsomer.
             id_: Unique identifier for the credentials.
 
         """
-        models.Credentials.delete_item(sub=sub, id_=id_)
+        credentials.Credentials.delete_item(sub=sub, id_=id_)
 
     @staticmethod
+    @instrumentation.instrument
     def delete_all_credentials(*, sub: types.TSub) -> None:
         """
         Delete all the credentials for a user.
@@ -246,9 +477,10 @@ class Database:
             sub: Unique identifier for a cutsomer.
 
         """
-        models.Credentials.delete_all(sub=sub)
+        credentials.Credentials.delete_all(sub=sub)
 
     @classmethod
+    @instrumentation.instrument
     def delete_all(cls, *, sub: types.TSub) -> None:
         """
         Delete all the items for a user.
@@ -7,3 +7,23 @@ class BaseError(Exception):
 
 class NotFoundError(BaseError):
     """When an item was not found in the database."""
+
+
+class InvalidCursorError(BaseError):
+    """When a pagination cursor is malformed or does not belong to the customer."""
+
+
+class BulkDeleteError(BaseError):
+    """When items could not be deleted from the database."""
+
+
+class BulkGetError(BaseError):
+    """When items could not be retrieved from the database."""
+
+
+class ConflictError(BaseError):
+    """When a write kept conflicting with concurrent writes."""
+
+
+class ModelCountExceededError(BaseError):
+    """When a write would exceed the maximum model count of a customer."""
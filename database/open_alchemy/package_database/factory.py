@@ -2,7 +2,7 @@
 
 import factory
 
-from . import models
+from . import credentials, models
 
 
 def spec_calc_id(number: int) -> str:
@@ -53,7 +53,7 @@ class CredentialsFactory(factory.Factory):
     class Meta:
         """Meta class."""
 
-        model = models.Credentials
+        model = credentials.Credentials
 
     sub = factory.Sequence(lambda n: f"sub {n}")
     id = factory.Sequence(lambda n: f"credentials id {n}")
@@ -0,0 +1,344 @@
+"""Record the latency and cost of calls to the database facade."""
+
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import threading
+import time
+import typing
+
+TFunc = typing.TypeVar("TFunc", bound=typing.Callable[..., typing.Any])
+
+
+@dataclasses.dataclass
+class Metrics:
+    """
+    The cost of a call to the database facade.
+
+    Attrs:
+        operation: The name of the method of the facade that was called.
+        duration: The wall time of the call in seconds.
+        requests: The number of requests sent to DynamoDB.
+        pages: The number of pages returned by queries and scans.
+        items: The number of items read.
+        consumed_capacity: The capacity units consumed by the requests.
+        error: The name of the exception the call raised, if any.
+
+    """
+
+    operation: str
+    duration: float = 0.0
+    requests: int = 0
+    pages: int = 0
+    items: int = 0
+    consumed_capacity: float = 0.0
+    error: typing.Optional[str] = None
+
+
+THook = typing.Callable[[Metrics], None]
+
+
+class TSummaryDict(typing.TypedDict, total=True):
+    """The totals of the calls to the database facade as a dictionary."""
+
+    calls: int
+    duration_ms: float
+    requests: int
+    pages: int
+    items: int
+    consumed_capacity: float
+    errors: int
+    operations: typing.Dict[str, int]
+
+
+class Summary:
+    """
+    The totals of the calls to the database facade, for example for a request.
+
+    Attrs:
+        metrics: The metrics of each call in the order they finished.
+
+    """
+
+    def __init__(self) -> None:
+        """Construct."""
+        self.metrics: typing.List[Metrics] = []
+        self._lock = threading.Lock()
+
+    def record(self, metrics: Metrics) -> None:
+        """Add the metrics of a call."""
+        with self._lock:
+            self.metrics.append(metrics)
+
+    def as_dict(self) -> TSummaryDict:
+        """
+        Calculate the totals of the calls.
+
+        Returns:
+            The totals and the number of calls of each operation.
+
+        """
+        with self._lock:
+            metrics = list(self.metrics)
+
+        operations: typing.Dict[str, int] = {}
+        for item in metrics:
+            operations[item.operation] = operations.get(item.operation, 0) + 1
+        return {
+            "calls": len(metrics),
+            "duration_ms": sum(item.duration for item in metrics) * 1000,
+            "requests": sum(item.requests for item in metrics),
+            "pages": sum(item.pages for item in metrics),
+            "items": sum(item.items for item in metrics),
+            "consumed_capacity": sum(item.consumed_capacity for item in metrics),
+            "errors": sum(1 for item in metrics if item.error is not None),
+            "operations": operations,
+        }
+
+
+_HOOKS: typing.List[THook] = []
+_SUMMARY: "contextvars.ContextVar[typing.Optional[Summary]]" = contextvars.ContextVar(
+    "package_database_summary", default=None
+)
+_METRICS: "contextvars.ContextVar[typing.Optional[Metrics]]" = contextvars.ContextVar(
+    "package_database_metrics", default=None
+)
+_LOCK = threading.Lock()
+_INSTALLED = {"dispatch": False}
+
+
+def add_hook(hook: THook) -> None:
+    """
+    Call a function with the metrics of every call to the database facade.
+
+    Args:
+        hook: Called with the metrics after each call has finished.
+
+    """
+    _HOOKS.append(hook)
+
+
+def remove_hook(hook: THook) -> None:
+    """
+    Stop calling a function that was added using add_hook.
+
+    Args:
+        hook: The function to remove.
+
+    """
+    _HOOKS.remove(hook)
+
+
+@contextlib.contextmanager
+def summarize() -> typing.Iterator[Summary]:
+    """
+    Collect the metrics of the calls to the database facade within the context.
+
+    Calls made from other threads are only included if they run in a copy of the
+    context, for example using contextvars.copy_context().
+
+    Returns:
+        The summary that the metrics are added to.
+
+    """
+    summary = Summary()
+    token = _SUMMARY.set(summary)
+    try:
+        yield summary
+    finally:
+        _SUMMARY.reset(token)
+
+
+def _capacity_units(consumed_capacity: typing.Any) -> float:
+    """Calculate the total capacity units of a ConsumedCapacity response value."""
+    if isinstance(consumed_capacity, list):
+        return sum(map(_capacity_units, consumed_capacity))
+    if isinstance(consumed_capacity, dict):
+        return float(consumed_capacity.get("CapacityUnits", 0.0))
+    return 0.0
+
+
+def record_response(
+    *, metrics: Metrics, operation_name: str, data: typing.Optional[typing.Dict]
+) -> None:
+    """
+    Add a DynamoDB response to the metrics.
+
+    Args:
+        metrics: The metrics of the call that sent the request.
+        operation_name: The name of the DynamoDB operation, for example Query.
+        data: The response to the request.
+
+    """
+    data = data or {}
+    pages = 0
+    items = 0
+    if operation_name in {"Query", "Scan"}:
+        pages = 1
+        items = data.get("Count", 0)
+    elif operation_name == "GetItem":
+        items = 1 if "Item" in data else 0
+    elif operation_name == "BatchGetItem":
+        items = sum(map(len, data.get("Responses", {}).values()))
+    elif operation_name == "TransactGetItems":
+        items = sum(1 for response in data.get("Responses", []) if "Item" in response)
+
+    with _LOCK:
+        metrics.pages += pages
+        metrics.items += items
+        metrics.consumed_capacity += _capacity_units(data.get("ConsumedCapacity"))
+
+
+def _install() -> None:
+    """
+    Record every request that PynamoDB sends to DynamoDB on the current metrics.
+
+    PynamoDB requests the total consumed capacity for all item operations and
+    sends every request through Connection.dispatch. PynamoDB is only imported once
+    instrumentation is first used.
+
+    """
+    if _INSTALLED["dispatch"]:
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from pynamodb.connection import base
+
+    dispatch = base.Connection.dispatch
+
+    @functools.wraps(dispatch)
+    def instrumented_dispatch(
+        self: typing.Any, operation_name: str, *args: typing.Any, **kwargs: typing.Any
+    ) -> typing.Dict:
+        """Dispatch the request and add the response to the current metrics."""
+        metrics = _METRICS.get()
+        if metrics is None:
+            return dispatch(self, operation_name, *args, **kwargs)
+
+        with _LOCK:
+            metrics.requests += 1
+        data = dispatch(self, operation_name, *args, **kwargs)
+        record_response(metrics=metrics, operation_name=operation_name, data=data)
+        return data
+
+    base.Connection.dispatch = instrumented_dispatch  # type: ignore
+    _INSTALLED["dispatch"] = True
+
+
+def _should_record() -> bool:
+    """
+    Check whether the metrics of a call should be recorded.
+
+    Returns:
+        Whether a hook was added or a summary is collected and the call is not made
+        by another instrumented call.
+
+    """
+    if (not _HOOKS and _SUMMARY.get() is None) or _METRICS.get() is not None:
+        return False
+    _install()
+    return True
+
+
+@contextlib.contextmanager
+def _measure(metrics: Metrics) -> typing.Iterator[None]:
+    """Add the wall time of and the requests sent within the context to the metrics."""
+    token = _METRICS.set(metrics)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        metrics.error = type(exc).__name__
+        raise
+    finally:
+        metrics.duration += time.perf_counter() - start
+        _METRICS.reset(token)
+
+
+def _finish(metrics: Metrics, summary: typing.Optional[Summary]) -> None:
+    """Pass the metrics of a finished call to the summary and the hooks."""
+    if summary is not None:
+        summary.record(metrics)
+    for hook in list(_HOOKS):
+        hook(metrics)
+
+
+def instrument(func: TFunc) -> TFunc:
+    """
+    Record the metrics of calls to a method of the database facade.
+
+    The metrics are only recorded if a hook was added or the call is made within
+    summarize, otherwise the method is called directly. Calls made by an instrumented
+    method, for example to other methods of the facade, are included in its metrics.
+
+    Args:
+        func: The method to instrument.
+
+    Returns:
+        The instrumented method.
+
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        """Call the method and record its metrics."""
+        if not _should_record():
+            return func(*args, **kwargs)
+
+        metrics = Metrics(operation=func.__name__)
+        summary = _SUMMARY.get()
+        try:
+            with _measure(metrics):
+                return func(*args, **kwargs)
+        finally:
+            _finish(metrics, summary)
+
+    return typing.cast(TFunc, wrapper)
+
+
+def instrument_iterator(func: TFunc) -> TFunc:
+    """
+    Record the metrics of calls to a method of the database facade for iterators.
+
+    Like instrument except that the metrics include retrieving the items from the
+    iterator but not the time the caller spends between items. The metrics are
+    recorded once the iterator is exhausted or closed.
+
+    Args:
+        func: The method to instrument.
+
+    Returns:
+        The instrumented method.
+
+    """
+
+    def iterate(
+        metrics: Metrics,
+        summary: typing.Optional[Summary],
+        args: typing.Tuple[typing.Any, ...],
+        kwargs: typing.Dict[str, typing.Any],
+    ) -> typing.Iterator[typing.Any]:
+        """Retrieve the items of the iterator and record the metrics."""
+        try:
+            with _measure(metrics):
+                iterator = iter(func(*args, **kwargs))
+            while True:
+                with _measure(metrics):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+        finally:
+            _finish(metrics, summary)
+
+    @functools.wraps(func)
+    def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        """Call the method and record its metrics while the items are retrieved."""
+        if not _should_record():
+            return func(*args, **kwargs)
+
+        return iterate(Metrics(operation=func.__name__), _SUMMARY.get(), args, kwargs)
+
+    return typing.cast(TFunc, wrapper)
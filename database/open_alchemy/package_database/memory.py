@@ -0,0 +1,885 @@
+"""Memory implementation of the database facade."""
+
+import dataclasses
+import json
+import math
+import threading
+import typing
+
+from . import (
+    bulk_delete,
+    compaction,
+    exceptions,
+    models,
+    pagination,
+    types,
+    version_times,
+)
+
+TSortKey = typing.Tuple[str, ...]
+
+
+@dataclasses.dataclass
+class _SpecItem:  # pylint: disable=too-many-instance-attributes
+    """A spec item in the specs table."""
+
+    sub: types.TSub
+    id: types.TSpecId  # pylint: disable=invalid-name
+    name: types.TSpecName
+    updated_at: types.TSpecUpdatedAt
+
+    version: types.TSpecVersion
+    title: types.TOptSpecTitle
+    description: types.TOptSpecDescription
+    model_count: types.TSpecModelCount
+
+    updated_at_id: str
+    id_updated_at: str
+    version_updated_at_id: typing.Optional[str] = None
+
+
+@dataclasses.dataclass
+class _CredentialsItem:
+    """A credentials item in the credentials table."""
+
+    sub: types.TSub
+    id: types.TCredentialsId  # pylint: disable=invalid-name
+
+    public_key: types.TCredentialsPublicKey
+    secret_key_hash: types.TCredentialsSecretKeyHash
+    salt: types.TCredentialsSalt
+
+
+# The attributes that make up the key of the table and the local secondary index in
+# the order the items are sorted by
+_TABLE_KEY_NAMES = ("updated_at_id",)
+_INDEX_KEY_NAMES = ("id_updated_at", "updated_at_id")
+
+
+@dataclasses.dataclass
+class _Tables:
+    """The items of the tables of the memory database."""
+
+    specs: typing.Dict[types.TSub, typing.Dict[str, _SpecItem]] = dataclasses.field(
+        default_factory=dict
+    )
+    credentials: typing.Dict[
+        types.TSub, typing.Dict[types.TCredentialsId, _CredentialsItem]
+    ] = dataclasses.field(default_factory=dict)
+    public_keys: typing.Dict[
+        types.TCredentialsPublicKey, _CredentialsItem
+    ] = dataclasses.field(default_factory=dict)
+    # Re-entrant so that writes can use the reads that take the lock
+    lock: threading.RLock = dataclasses.field(default_factory=threading.RLock)
+
+
+_TABLES = _Tables()
+
+
+class Database:  # pylint: disable=too-many-public-methods
+    """
+    Interface for memory database.
+
+    Follows the DynamoDB implementation including the order of the items returned by
+    the table and the local secondary index, the latest item of each spec and the
+    behaviour of the limit and cursor of pages. Like the DynamoDB tables, the items
+    are kept for the life of the process and are shared by all instances. Every
+    write, and every read that iterates over the items, holds a lock so that
+    writing a spec is atomic like the DynamoDB transaction.
+
+    """
+
+    @staticmethod
+    def _spec_item_to_info(item: _SpecItem) -> types.TSpecInfo:
+        """Convert item to dict with information about the spec."""
+        info: types.TSpecInfo = {
+            "name": item.name,
+            "id": item.id,
+            "updated_at": int(item.updated_at),
+            "version": item.version,
+            "model_count": item.model_count,
+        }
+        if item.title is not None:
+            info["title"] = item.title
+        if item.description is not None:
+            info["description"] = item.description
+        return info
+
+    @staticmethod
+    def _decode_start_key(
+        *,
+        cursor: types.TOptCursor,
+        sub: types.TSub,
+        key_prefixes: typing.Mapping[str, str],
+        key_names: typing.Tuple[str, ...],
+    ) -> typing.Optional[TSortKey]:
+        """
+        Decode a cursor into the sort key of the item to start after.
+
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            cursor: The cursor returned with the previous page.
+            sub: Unique identifier for a cutsomer.
+            key_prefixes: The names of the attributes of the key mapped to the prefix
+                their values must start with.
+            key_names: The names of the attributes the items are sorted by.
+
+        Returns:
+            The sort key of the last item of the previous page or None if there is no
+            cursor.
+
+        """
+        key = pagination.decode(cursor=cursor, sub=sub, key_prefixes=key_prefixes)
+        if key is None:
+            return None
+        return tuple(key[name]["S"] for name in key_names)
+
+    @staticmethod
+    def _encode_cursor(
+        *, item: typing.Optional[_SpecItem], key_names: typing.Tuple[str, ...]
+    ) -> types.TOptCursor:
+        """Encode the key of the last evaluated item as a cursor."""
+        if item is None:
+            return None
+        key: pagination.TKey = {"sub": {"S": item.sub}}
+        for name in key_names:
+            key[name] = {"S": getattr(item, name)}
+        return pagination.encode(key=key)
+
+    @staticmethod
+    def _query(
+        *,
+        items: typing.Iterable[_SpecItem],
+        key_names: typing.Tuple[str, ...],
+        start_key: typing.Optional[TSortKey],
+        limit: types.TOptLimit,
+    ) -> typing.Tuple[typing.List[_SpecItem], typing.Optional[_SpecItem]]:
+        """
+        Evaluate items like a DynamoDB query.
+
+        Args:
+            items: The items that match the key condition.
+            key_names: The names of the attributes the items are sorted by.
+            start_key: The sort key of the item to start after.
+            limit: The maximum number of items to evaluate.
+
+        Returns:
+            The evaluated items and the last evaluated item if the limit was reached.
+
+        """
+
+        def calc_sort_key(item: _SpecItem) -> TSortKey:
+            """Calculate the value the items are sorted by."""
+            return tuple(getattr(item, name) for name in key_names)
+
+        evaluated_items = [
+            item
+            for item in sorted(items, key=calc_sort_key)
+            if start_key is None or calc_sort_key(item) > start_key
+        ]
+        if limit is None or len(evaluated_items) < limit:
+            return evaluated_items, None
+        evaluated_items = evaluated_items[:limit]
+        return evaluated_items, evaluated_items[-1]
+
+    @staticmethod
+    def _latest_items(*, sub: types.TSub) -> typing.List[_SpecItem]:
+        """Retrieve the latest items of a customer."""
+        with _TABLES.lock:
+            return [
+                item
+                for updated_at_id, item in _TABLES.specs.get(sub, {}).items()
+                if updated_at_id.startswith(f"{models.Spec.UPDATED_AT_LATEST}#")
+            ]
+
+    @staticmethod
+    def _spec_items(
+        *, sub: types.TSub, name: types.TSpecName
+    ) -> typing.List[_SpecItem]:
+        """Retrieve all items of a spec of a customer."""
+        id_ = models.Spec.calc_id(name)
+        with _TABLES.lock:
+            return [
+                item
+                for item in _TABLES.specs.get(sub, {}).values()
+                if item.id_updated_at.startswith(f"{id_}#")
+            ]
+
+    @staticmethod
+    def count_customer_models(*, sub: types.TSub) -> int:
+        """
+        Count the number of models a customer has stored.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            The number of models the customer has stored.
+
+        """
+        return sum(item.model_count for item in Database._latest_items(sub=sub))
+
+    @staticmethod
+    def _check_model_count(
+        *,
+        sub: types.TSub,
+        model_count: types.TSpecModelCount,
+        previous_item: typing.Optional[_SpecItem],
+        max_model_count: int,
+    ) -> None:
+        """
+        Check that the model count of a customer does not exceed the maximum.
+
+        Raises ModelCountExceededError if the model count of the customer would
+        exceed max_model_count.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            model_count: The number of models in the spec.
+            previous_item: The latest item of the spec before it is written.
+            max_model_count: The maximum model count of the customer including the
+                spec.
+
+        """
+        new_model_count = (
+            sum(item.model_count for item in Database._latest_items(sub=sub))
+            + model_count
+        )
+        if previous_item is not None:
+            new_model_count -= previous_item.model_count
+        if new_model_count > max_model_count:
+            raise exceptions.ModelCountExceededError(
+                f"the model count of customer {sub=} would be "
+                f"{new_model_count} which exceeds {max_model_count=}"
+            )
+
+    @staticmethod
+    def create_update_spec(
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        version: types.TSpecVersion,
+        model_count: types.TSpecModelCount,
+        title: types.TOptSpecTitle = None,
+        description: types.TOptSpecDescription = None,
+        max_model_count: types.TOptMaxModelCount = None,
+    ) -> None:
+        """
+        Create or update a spec.
+
+        Raises ModelCountExceededError if the model count of the customer would
+        exceed max_model_count.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            version: The version of the spec.
+            model_count: The number of models in the spec.
+            title: The title of a spec.
+            description: The description of a spec.
+            max_model_count: The maximum model count of the customer including the
+                spec, not checked if None.
+
+        """
+        with _TABLES.lock:
+            id_ = models.Spec.calc_id(name)
+            customer_specs = _TABLES.specs.setdefault(sub, {})
+            index_values_latest = models.Spec.calc_index_values(
+                updated_at=models.Spec.UPDATED_AT_LATEST, id_=id_
+            )
+            previous_item = customer_specs.get(index_values_latest.updated_at_id)
+            if max_model_count is not None:
+                Database._check_model_count(
+                    sub=sub,
+                    model_count=model_count,
+                    previous_item=previous_item,
+                    max_model_count=max_model_count,
+                )
+            version_time = version_times.calc(
+                previous_updated_at_id=(
+                    previous_item.version_updated_at_id
+                    if previous_item is not None
+                    else None
+                )
+            )
+            index_values_version = models.Spec.calc_index_values(
+                updated_at=version_time.updated_at,
+                id_=id_,
+                microseconds=version_time.microseconds,
+            )
+
+            for index_values, version_updated_at_id in (
+                (index_values_version, None),
+                (index_values_latest, index_values_version.updated_at_id),
+            ):
+                customer_specs[index_values.updated_at_id] = _SpecItem(
+                    sub=sub,
+                    id=id_,
+                    name=name,
+                    updated_at=version_time.updated_at,
+                    version=version,
+                    title=title,
+                    description=description,
+                    model_count=model_count,
+                    updated_at_id=index_values.updated_at_id,
+                    id_updated_at=index_values.id_updated_at,
+                    version_updated_at_id=version_updated_at_id,
+                )
+
+    @staticmethod
+    def get_latest_spec_version(
+        *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecVersion:
+        """
+        Get the latest version for a spec.
+
+        Raises NotFoundError if the spec is not found in the database.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            The latest version of the spec.
+
+        """
+        return Database.get_latest_spec(sub=sub, name=name).version
+
+    @staticmethod
+    def list_specs(*, sub: types.TSub) -> types.TSpecInfoList:
+        """
+        List all available specs for a customer.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            List of all spec id for the customer.
+
+        """
+        return list(Database.iter_specs(sub=sub))
+
+    @staticmethod
+    def list_specs_json(*, sub: types.TSub) -> str:
+        """
+        List all available specs for a customer serialized as JSON.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            The JSON array of all specs for the customer.
+
+        """
+        return json.dumps(Database.list_specs(sub=sub))
+
+    @staticmethod
+    def list_specs_page(
+        *,
+        sub: types.TSub,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """
+        List a page of the available specs for a customer.
+
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            limit: The maximum number of specs on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            The specs on the page and the cursor for the next page.
+
+        """
+        start_key = Database._decode_start_key(
+            cursor=cursor,
+            sub=sub,
+            key_prefixes={"updated_at_id": f"{models.Spec.UPDATED_AT_LATEST}#"},
+            key_names=_TABLE_KEY_NAMES,
+        )
+        items, last_item = Database._query(
+            items=Database._latest_items(sub=sub),
+            key_names=_TABLE_KEY_NAMES,
+            start_key=start_key,
+            limit=limit,
+        )
+        return types.SpecInfoPage(
+            items=list(map(Database._spec_item_to_info, items)),
+            cursor=Database._encode_cursor(item=last_item, key_names=_TABLE_KEY_NAMES),
+        )
+
+    @staticmethod
+    def iter_specs(*, sub: types.TSub) -> types.TSpecInfoIterator:
+        """
+        Iterate over all available specs for a customer.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            Iterator over all specs for the customer.
+
+        """
+        return iter(Database.list_specs_page(sub=sub).items)
+
+    @staticmethod
+    def get_spec(*, sub: types.TSub, name: types.TSpecName) -> types.TSpecInfo:
+        """
+        Retrieve a spec from the database.
+
+        Raises NotFoundError if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            Information about the spec
+
+        """
+        return Database.get_latest_spec(sub=sub, name=name).info
+
+    @staticmethod
+    def get_specs(
+        *, sub: types.TSub, names: typing.Sequence[types.TSpecName]
+    ) -> types.TSpecInfoList:
+        """
+        Retrieve multiple specs from the database.
+
+        Specs that do not exist are skipped.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            names: The display names of the specs.
+
+        Returns:
+            Information about the specs in the order of the names, each spec at
+            most once.
+
+        """
+        spec_infos: types.TSpecInfoList = []
+        ids: typing.Set[types.TSpecId] = set()
+        for name in names:
+            id_ = models.Spec.calc_id(name)
+            if id_ in ids:
+                continue
+            ids.add(id_)
+            try:
+                spec_infos.append(Database.get_spec(sub=sub, name=name))
+            except exceptions.NotFoundError:
+                pass
+        return spec_infos
+
+    @staticmethod
+    def get_latest_spec(
+        *, sub: types.TSub, name: types.TSpecName
+    ) -> types.LatestSpecInfo:
+        """
+        Retrieve the latest version of a spec and information about it.
+
+        Raises NotFoundError if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            The latest version and information about the spec.
+
+        """
+        id_ = models.Spec.calc_id(name)
+        updated_at_id = models.Spec.calc_index_values(
+            updated_at=models.Spec.UPDATED_AT_LATEST, id_=id_
+        ).updated_at_id
+        item = _TABLES.specs.get(sub, {}).get(updated_at_id)
+        if item is None:
+            raise exceptions.NotFoundError(
+                f"could not find spec {name=} for user {sub=} in the database"
+            )
+        return types.LatestSpecInfo(
+            version=item.version,
+            info=Database._spec_item_to_info(item),
+            version_time=version_times.parse_latest(
+                updated_at=item.updated_at,
+                version_updated_at_id=item.version_updated_at_id,
+            ),
+        )
+
+    @staticmethod
+    def _delete_counts(
+        *,
+        deleted: int,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback],
+    ) -> types.BulkDeleteCounts:
+        """Calculate the counts of deleting items in batches like DynamoDB."""
+        counts = types.BulkDeleteCounts(
+            queued=deleted,
+            deleted=deleted,
+            batches=math.ceil(deleted / bulk_delete.BATCH_SIZE),
+        )
+        if on_progress is not None and deleted:
+            on_progress(counts)
+        return counts
+
+    @staticmethod
+    def delete_spec(
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
+        """
+        Delete a spec from the database.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            on_progress: Called with the counts once the items are deleted.
+
+        Returns:
+            The counts of the deletion.
+
+        """
+        with _TABLES.lock:
+            customer_specs = _TABLES.specs.get(sub, {})
+            items = Database._spec_items(sub=sub, name=name)
+            for item in items:
+                del customer_specs[item.updated_at_id]
+        return Database._delete_counts(deleted=len(items), on_progress=on_progress)
+
+    @staticmethod
+    def list_spec_versions(
+        *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecInfoList:
+        """
+        List all available versions for a spec for a customer.
+
+        Raises NotFoundError if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            List of information for all versions of a spec for the customer.
+
+        """
+        return Database.list_spec_versions_page(sub=sub, name=name).items
+
+    @staticmethod
+    def list_spec_versions_page(
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """
+        List a page of the available versions for a spec for a customer.
+
+        Raises NotFoundError if the first page is empty.
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            limit: The maximum number of versions on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            The versions on the page and the cursor for the next page.
+
+        """
+        start_key = Database._decode_start_key(
+            cursor=cursor,
+            sub=sub,
+            key_prefixes={
+                "updated_at_id": "",
+                "id_updated_at": f"{models.Spec.calc_id(name)}#",
+            },
+            key_names=_INDEX_KEY_NAMES,
+        )
+        version_items = filter(
+            lambda item: not item.updated_at_id.startswith(
+                f"{models.Spec.UPDATED_AT_LATEST}#"
+            ),
+            Database._spec_items(sub=sub, name=name),
+        )
+        items, _ = Database._query(
+            items=version_items,
+            key_names=_INDEX_KEY_NAMES,
+            start_key=start_key,
+            limit=None if limit is None else limit + 1,
+        )
+        last_item: typing.Optional[_SpecItem] = None
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            last_item = items[-1]
+        page = types.SpecInfoPage(
+            items=list(map(Database._spec_item_to_info, items)),
+            cursor=Database._encode_cursor(item=last_item, key_names=_INDEX_KEY_NAMES),
+        )
+        if cursor is None and not page.items:
+            raise exceptions.NotFoundError(f"could not find spec id {name}")
+        return page
+
+    @staticmethod
+    def iter_spec_versions(
+        *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecInfoIterator:
+        """
+        Iterate over all available versions for a spec for a customer.
+
+        The iterator is empty if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            Iterator over all versions of a spec for the customer.
+
+        """
+        try:
+            return iter(Database.list_spec_versions(sub=sub, name=name))
+        except exceptions.NotFoundError:
+            return iter([])
+
+    @staticmethod
+    def delete_all_specs(
+        *,
+        sub: types.TSub,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
+        """
+        Delete all the specs for a user.
+
+        Unlike DynamoDB, the counts do not include the model count aggregate and
+        the spec catalog of the customer since they are not stored.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            on_progress: Called with the counts once the items are deleted.
+
+        Returns:
+            The counts of the deletion.
+
+        """
+        with _TABLES.lock:
+            customer_specs = _TABLES.specs.pop(sub, {})
+        return Database._delete_counts(
+            deleted=len(customer_specs), on_progress=on_progress
+        )
+
+    @staticmethod
+    def list_spec_subs() -> typing.List[types.TSub]:
+        """
+        List all customers that have specs.
+
+        Returns:
+            The unique identifiers of the customers.
+
+        """
+        with _TABLES.lock:
+            return sorted(
+                sub for sub, customer_specs in _TABLES.specs.items() if customer_specs
+            )
+
+    @staticmethod
+    def compact_spec_versions(
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        retention: types.SpecRetention,
+    ) -> types.SpecCompaction:
+        """
+        Delete the versions of a spec that are not kept by the retention policy.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            retention: Which versions to keep.
+
+        Returns:
+            The number of deleted versions and the versions that are no longer
+            referred to.
+
+        """
+        with _TABLES.lock:
+            id_ = models.Spec.calc_id(name)
+            latest_updated_at_id = models.Spec.calc_index_values(
+                updated_at=models.Spec.UPDATED_AT_LATEST, id_=id_
+            ).updated_at_id
+            customer_specs = _TABLES.specs.get(sub, {})
+            latest_item = customer_specs.get(latest_updated_at_id)
+            if latest_item is None:
+                return types.SpecCompaction(deleted=0, expired_versions=[])
+            version_items = [
+                item
+                for item in Database._spec_items(sub=sub, name=name)
+                if item.updated_at_id != latest_updated_at_id
+            ]
+            expired_updated_at_ids = compaction.calc_expired(
+                updated_at_ids=[item.updated_at_id for item in version_items],
+                target_updated_at_id=latest_item.version_updated_at_id,
+                retention=retention,
+            )
+            for updated_at_id in expired_updated_at_ids:
+                del customer_specs[updated_at_id]
+
+            referred_versions = {
+                item.version for item in Database._spec_items(sub=sub, name=name)
+            }
+            return types.SpecCompaction(
+                deleted=len(expired_updated_at_ids),
+                expired_versions=sorted(
+                    {
+                        item.version
+                        for item in version_items
+                        if item.updated_at_id in expired_updated_at_ids
+                    }
+                    - referred_versions
+                ),
+            )
+
+    @staticmethod
+    def list_credentials(*, sub: types.TSub) -> types.TCredentialsInfoList:
+        """
+        List all available credentials for a user.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            List of information for all credentials of the customer.
+
+        """
+        with _TABLES.lock:
+            customer_credentials = dict(_TABLES.credentials.get(sub, {}))
+        return [
+            {
+                "id": item.id,
+                "public_key": item.public_key,
+                "salt": item.salt,
+            }
+            for _, item in sorted(customer_credentials.items())
+        ]
+
+    @staticmethod
+    def create_update_credentials(
+        *,
+        sub: types.TSub,
+        id_: types.TCredentialsId,
+        public_key: types.TCredentialsPublicKey,
+        secret_key_hash: types.TCredentialsSecretKeyHash,
+        salt: types.TCredentialsSalt,
+    ) -> None:
+        """
+        Create or update credentials.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            id_: Unique identifier for the credentials.
+            public_key: Public identifier for the credentials.
+            secret_key_hash: Value derived from the secret key that is safe to store.
+            salt: Random value used to generate the credentials.
+
+        """
+        item = _CredentialsItem(
+            sub=sub,
+            id=id_,
+            public_key=public_key,
+            secret_key_hash=secret_key_hash,
+            salt=salt,
+        )
+        with _TABLES.lock:
+            previous_item = _TABLES.credentials.setdefault(sub, {}).get(id_)
+            if previous_item is not None:
+                _TABLES.public_keys.pop(previous_item.public_key, None)
+            _TABLES.credentials[sub][id_] = item
+            _TABLES.public_keys[public_key] = item
+
+    @staticmethod
+    def get_credentials(
+        *, sub: types.TSub, id_: types.TCredentialsId
+    ) -> typing.Optional[types.TCredentialsInfo]:
+        """
+        Retrieve credentials.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            id_: Unique identifier for the credentials.
+
+        Returns:
+            Information about the credentials.
+
+        """
+        item = _TABLES.credentials.get(sub, {}).get(id_)
+        if item is None:
+            return None
+        return {"id": item.id, "public_key": item.public_key, "salt": item.salt}
+
+    @staticmethod
+    def get_user(
+        *, public_key: types.TCredentialsPublicKey
+    ) -> typing.Optional[types.CredentialsAuthInfo]:
+        """
+        Retrieve a user and information to authenticate the user.
+
+        Args:
+            public_key: Public identifier for the credentials.
+
+        Returns:
+            Information needed to authenticate the user.
+
+        """
+        item = _TABLES.public_keys.get(public_key)
+        if item is None:
+            return None
+        return types.CredentialsAuthInfo(
+            sub=item.sub, secret_key_hash=item.secret_key_hash, salt=item.salt
+        )
+
+    @staticmethod
+    def delete_credentials(*, sub: types.TSub, id_: types.TCredentialsId) -> None:
+        """
+        Delete the credentials.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            id_: Unique identifier for the credentials.
+
+        """
+        with _TABLES.lock:
+            item = _TABLES.credentials.get(sub, {}).pop(id_, None)
+            if item is not None:
+                _TABLES.public_keys.pop(item.public_key, None)
+
+    @staticmethod
+    def delete_all_credentials(*, sub: types.TSub) -> None:
+        """
+        Delete all the credentials for a user.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        """
+        with _TABLES.lock:
+            for item in _TABLES.credentials.pop(sub, {}).values():
+                _TABLES.public_keys.pop(item.public_key, None)
+
+    @staticmethod
+    def delete_all(*, sub: types.TSub) -> None:
+        """
+        Delete all the items for a user.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        """
+        Database.delete_all_specs(sub=sub)
+        Database.delete_all_credentials(sub=sub)
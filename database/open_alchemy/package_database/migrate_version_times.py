@@ -0,0 +1,40 @@
+"""Migrate the versions of specs to sub-second version times."""
+
+import argparse
+import typing
+
+from . import models, version_times
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Migrate the versions of specs.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Migrate the versions of the specs of customers written before sub-second "
+            "version times were introduced."
+        )
+    )
+    parser.add_argument(
+        "--sub",
+        action="append",
+        help="the customer to migrate, can be repeated, defaults to all customers",
+    )
+    parsed_args = parser.parse_args(args)
+
+    subs: typing.Sequence[str] = parsed_args.sub
+    if subs is None:
+        subs = models.Spec.list_subs()
+
+    for sub in subs:
+        migrated = version_times.migrate(model=models.Spec, sub=sub)
+        print(f"{sub=}, {migrated=}")  # allow-print
+
+
+if __name__ == "__main__":
+    main()
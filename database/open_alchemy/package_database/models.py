@@ -1,12 +1,29 @@
 """Database models."""
 
-import time
+import itertools
+import json
 import typing
 
 from packaging import utils
 from pynamodb import attributes, indexes, models
-
-from . import config, exceptions, types
+from pynamodb import pagination as pynamodb_pagination
+
+from . import (
+    bulk_delete,
+    bulk_get,
+    catalog,
+    compaction,
+    config,
+    exceptions,
+    pagination,
+    shards,
+    types,
+    version_times,
+    versions,
+    writes,
+)
+
+_CONFIG = config.get()
 
 TSpecUpdatedAtId = str
 TSpecIdUpdatedAt = str
@@ -26,22 +43,25 @@ class IdUpdatedAtIndex(indexes.LocalSecondaryIndex):
         """Meta class."""
 
         projection = indexes.AllProjection()
-        index_name = config.get().specs_local_secondary_index_name
+        index_name = _CONFIG.tables.specs_local_secondary_index_name
 
-        if config.get().stage == config.Stage.TEST:
+        if _CONFIG.stage == config.Stage.TEST:
             host = "http://localhost:8000"
 
     sub = attributes.UnicodeAttribute(hash_key=True)
     id_updated_at = attributes.UnicodeAttribute(range_key=True)
 
 
-class Spec(models.Model):
+class Spec(models.Model):  # pylint: disable=too-many-public-methods
     """
     Information about a spec.
 
     Attrs:
         UPDATED_AT_LATEST: Constant for what to set updated_at to to indicate it is the
             latest record
+        INFO_ATTRIBUTES: The attributes needed to construct the information about a
+            spec
+        KEY_ATTRIBUTES: The attributes that make up the primary key of an item
 
         sub: Unique identifier for a customer
         id: Unique identifier for a spec for a package derrived from the name
@@ -55,23 +75,43 @@ class Spec(models.Model):
         description: The description of a spec
         model_count: The number of 'x-tablename' and 'x-inherits' in a spec
 
-        updated_at_id: Combination of 'updated_at' and 'id' separeted with #
+        updated_at_id: Combination of 'updated_at' and 'id' separeted with #, for
+            versions written since sub-second version times were introduced
+            updated_at is followed by . and the microseconds of the version time
         id_updated_at: Combination of 'id' and 'updated_at' separeted with #
+        version_updated_at_id: For the copy of the latest version of the spec, the
+            updated_at_id of the version it is a copy of
 
         id_updated_at_index: Index for querying id_updated_at efficiently
 
     """
 
     UPDATED_AT_LATEST = "latest"
+    INFO_ATTRIBUTES = (
+        "name",
+        "id",
+        "updated_at",
+        "version",
+        "model_count",
+        "title",
+        "description",
+    )
+    KEY_ATTRIBUTES = ("sub", "updated_at_id")
 
     class Meta:
         """Meta class."""
 
-        table_name = config.get().specs_table_name
+        table_name = _CONFIG.tables.specs_table_name
 
-        if config.get().stage == config.Stage.TEST:
+        if _CONFIG.stage == config.Stage.TEST:
             host = "http://localhost:8000"
 
+        max_pool_connections = _CONFIG.connection.max_pool_connections
+        connect_timeout_seconds = _CONFIG.connection.connect_timeout_seconds
+        read_timeout_seconds = _CONFIG.connection.read_timeout_seconds
+        max_retry_attempts = _CONFIG.connection.max_retry_attempts
+        base_backoff_ms = _CONFIG.connection.base_backoff_ms
+
     sub = attributes.UnicodeAttribute(hash_key=True)
     id = attributes.UnicodeAttribute()
     name = attributes.UnicodeAttribute()
@@ -84,16 +124,17 @@ class Spec(models.Model):
 
     updated_at_id = attributes.UnicodeAttribute(range_key=True)
     id_updated_at = attributes.UnicodeAttribute()
+    version_updated_at_id = attributes.UnicodeAttribute(null=True)
 
     id_updated_at_index = IdUpdatedAtIndex()
 
     @classmethod
-    def count_customer_models(cls, *, sub: types.TSub) -> int:
+    def sum_customer_models(cls, *, sub: types.TSub) -> int:
         """
-        Count the number of models on the latest specs for a customer.
+        Sum the number of models on the latest specs for a customer.
 
         Filters for a particular customer and updated_at_id to start with
-        'latest#' and sums over model_count.
+        'latest#' and sums over model_count. Only model_count is retrieved.
 
         Args:
             sub: Unique identifier for the customer.
@@ -109,10 +150,104 @@ class Spec(models.Model):
                 cls.query(
                     sub,
                     cls.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
+                    attributes_to_get=["model_count"],
                 ),
             )
         )
 
+    @classmethod
+    def count_customer_models(cls, *, sub: types.TSub) -> int:
+        """
+        Count the number of models on the latest specs for a customer.
+
+        Retrieves the model count aggregate item for the customer. Falls back to
+        summing over the latest specs if the aggregate item does not exist.
+
+        Args:
+            sub: Unique identifier for the customer.
+
+        Returns:
+            The sum of the model count on the latest version of each unique spec for
+            the customer.
+
+        """
+        try:
+            item = catalog.CustomerModelCount.get(
+                hash_key=sub,
+                range_key=catalog.CustomerModelCount.UPDATED_AT_ID,
+                attributes_to_get=["model_count"],
+            )
+            return int(item.model_count)
+        except catalog.CustomerModelCount.DoesNotExist:
+            return cls.sum_customer_models(sub=sub)
+
+    @classmethod
+    def reconcile_customer_models(cls, *, sub: types.TSub) -> int:
+        """
+        Rebuild the model count aggregate item for a customer from the latest specs.
+
+        Args:
+            sub: Unique identifier for the customer.
+
+        Returns:
+            The model count that was written to the aggregate item.
+
+        """
+        model_count = cls.sum_customer_models(sub=sub)
+        item = catalog.CustomerModelCount(
+            sub=sub, updated_at_id=catalog.CustomerModelCount.UPDATED_AT_ID
+        )
+        item.update(
+            actions=[
+                catalog.CustomerModelCount.model_count.set(model_count),
+                catalog.CustomerModelCount.next_generation(),
+            ]
+        )
+        return model_count
+
+    @classmethod
+    def list_subs(cls) -> typing.List[types.TSub]:
+        """
+        List all customers that have items in the specs table.
+
+        Returns:
+            The unique identifiers of all customers in the table, shards are
+            reported as their customer.
+
+        """
+        return sorted(
+            {shards.calc_sub(item.sub) for item in cls.scan(attributes_to_get=["sub"])}
+        )
+
+    @classmethod
+    def _update_customer_models(
+        cls,
+        *,
+        sub: types.TSub,
+        delta: int,
+        removed_id: typing.Optional[types.TSpecId] = None,
+    ) -> None:
+        """
+        Add a change in the model count to the model count aggregate for a customer.
+
+        Also changes the generation of the customer. If the aggregate does not exist
+        yet or could not be updated and the model count changed, it is rebuilt from
+        the latest specs.
+
+        Args:
+            sub: Unique identifier for the customer.
+            delta: The change in the model count of the customer.
+            removed_id: The spec whose latest item was deleted, is also removed
+                from the spec catalog of the customer.
+
+        """
+        updated = catalog.update_model_count(
+            sub=sub, delta=delta, removed_id=removed_id
+        )
+        # Without the aggregate there is no generation to change
+        if not updated and delta != 0:
+            cls.reconcile_customer_models(sub=sub)
+
     @staticmethod
     def calc_id(name: types.TSpecName) -> types.TSpecId:
         """Calculate the id based on the name."""
@@ -120,14 +255,24 @@ class Spec(models.Model):
 
     @classmethod
     def calc_index_values(
-        cls, *, updated_at: types.TSpecUpdatedAt, id_: types.TSpecId
+        cls,
+        *,
+        updated_at: types.TSpecUpdatedAt,
+        id_: types.TSpecId,
+        microseconds: typing.Optional[int] = None,
     ) -> TSpecIndexValues:
         """
         Calculate the updated_at_id value.
 
+        The zero padded updated_at of versions without microseconds sorts before the
+        updated_at of any version with microseconds in the same second, so that
+        versions written before and after sub-second version times were introduced
+        are ordered correctly.
+
         Args:
             updated_at: The value for updated_at
             id_: The value for id
+            microseconds: The microseconds of the version time within updated_at
 
         Returns:
             The value for updated_at_id
@@ -136,6 +281,8 @@ class Spec(models.Model):
         # Zero pad updated_at if it is not latest
         if updated_at != cls.UPDATED_AT_LATEST:
             updated_at = updated_at.zfill(20)
+            if microseconds is not None:
+                updated_at = f"{updated_at}.{str(microseconds).zfill(6)}"
 
         return TSpecIndexValues(
             updated_at_id=f"{updated_at}#{id_}",
@@ -152,14 +299,36 @@ class Spec(models.Model):
         model_count: types.TSpecModelCount,
         title: types.TSpecTitle = None,
         description: types.TSpecDescription = None,
+        max_model_count: types.TOptMaxModelCount = None,
     ) -> None:
         """
         Create or update an item.
 
-        Creates or updates 2 items in the database. The updated_at attribute for the
-        first is calculated based on seconds since epoch and for the second is set to
-        'latest'. Also computes the sort key updated_at_id based on updated_at and
-        id.
+        Raises ConflictError if the write still conflicts with other writes after
+        writes.MAX_CREATE_UPDATE_ATTEMPTS attempts.
+        Raises ModelCountExceededError if the model count of the customer would
+        exceed max_model_count.
+
+        Creates or updates 2 items in the database in a single transaction. The
+        updated_at attribute for the first is calculated based on seconds since epoch
+        and for the second is set to 'latest'. Also computes the sort key
+        updated_at_id based on the version time in microseconds and id. The change in
+        the model count compared to the previous latest item is added to the model
+        count aggregate of the customer and the generation of the customer is
+        changed in the same transaction. If the customer has a spec catalog, the
+        information about the spec is updated in the catalog in the same
+        transaction, unless the catalog would grow beyond its MAX_SIZE in which case
+        the catalog is deleted. If the versions of the customer are sharded, the
+        version is written to a random shard.
+
+        The writes are optimistic. The version is only written if no version with
+        the same sort key exists and the latest item is only written if it still
+        points to the version that was read. If max_model_count is set, the model
+        count aggregate is only updated if the model count of the customer
+        including the change is at most max_model_count. If any of the conditions
+        fail because of another writer, the write is retried with exponential
+        backoff and jitter based on what the other writer wrote so that concurrent
+        writes do not overwrite each other.
 
         Args:
             sub: Unique identifier for a cutsomer.
@@ -168,45 +337,20 @@ class Spec(models.Model):
             model_count: The number of models in the spec.
             title: The title of a spec
             description: The description of a spec
+            max_model_count: The maximum model count of the customer including the
+                spec.
 
         """
-        id_ = cls.calc_id(name)
-
-        # Write item
-        updated_at = str(int(time.time()))
-        index_values = cls.calc_index_values(updated_at=updated_at, id_=id_)
-        item = cls(
+        writes.create_update(
+            model=cls,
             sub=sub,
-            id=id_,
             name=name,
-            updated_at=updated_at,
             version=version,
-            title=title,
-            description=description,
             model_count=model_count,
-            updated_at_id=index_values.updated_at_id,
-            id_updated_at=index_values.id_updated_at,
-        )
-        item.save()
-
-        # Write latest item
-        updated_at_latest = cls.UPDATED_AT_LATEST
-        index_values_latest = cls.calc_index_values(
-            updated_at=updated_at_latest, id_=id_
-        )
-        item_latest = cls(
-            sub=sub,
-            id=id_,
-            name=name,
-            version=version,
-            updated_at=updated_at,
             title=title,
             description=description,
-            model_count=model_count,
-            updated_at_id=index_values_latest.updated_at_id,
-            id_updated_at=index_values_latest.id_updated_at,
+            max_model_count=max_model_count,
         )
-        item_latest.save()
 
     @classmethod
     def get_latest_version(
@@ -218,7 +362,8 @@ class Spec(models.Model):
         Raises NotFoundError if the spec is not found in the database.
 
         Calculates updated_at_id by setting updated_at to latest and using the
-        id. Tries to retrieve an item for a customer based on the sort key.
+        id. Tries to retrieve the version of an item for a customer based on the sort
+        key.
 
         Args:
             sub: Unique identifier for a cutsomer.
@@ -235,6 +380,7 @@ class Spec(models.Model):
                 range_key=cls.calc_index_values(
                     updated_at=cls.UPDATED_AT_LATEST, id_=id_
                 ).updated_at_id,
+                attributes_to_get=["version"],
             )
             return item.version
         except cls.DoesNotExist as exc:
@@ -259,31 +405,136 @@ class Spec(models.Model):
         return info
 
     @classmethod
-    def list_(cls, *, sub: types.TSub) -> types.TSpecInfoList:
+    def query_latest(
+        cls,
+        *,
+        sub: types.TSub,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+        consistent_read: bool = False,
+    ) -> pynamodb_pagination.ResultIterator["Spec"]:
+        """Query for the information of the latest items of a customer."""
+        return cls.query(
+            sub,
+            cls.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
+            consistent_read=consistent_read,
+            limit=limit,
+            attributes_to_get=list(cls.INFO_ATTRIBUTES),
+            last_evaluated_key=pagination.decode(
+                cursor=cursor,
+                sub=sub,
+                key_prefixes={"updated_at_id": f"{cls.UPDATED_AT_LATEST}#"},
+            ),
+        )
+
+    @classmethod
+    def iter_(cls, *, sub: types.TSub) -> types.TSpecInfoIterator:
+        """
+        Iterate over all available specs for a customer.
+
+        Items are retrieved from the database page by page as the iterator is
+        consumed.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            Iterator over information for all specs for the customer.
+
+        """
+        return map(cls.item_to_info, cls.query_latest(sub=sub))
+
+    @classmethod
+    def list_(
+        cls, *, sub: types.TSub, consistent_read: bool = False
+    ) -> types.TSpecInfoList:
         """
         List all available specs for a customer.
 
-        Filters for a customer and for updated_at_id to start with latest.
+        Reads the spec catalog of the customer. Falls back to filtering for a
+        customer and for updated_at_id to start with latest if the customer does not
+        have a spec catalog.
 
         Args:
             sub: Unique identifier for a cutsomer.
+            consistent_read: Whether to use a strongly consistent read.
 
         Returns:
             List of information for all specs for the customer.
 
         """
+        info_jsons = catalog.get_infos(sub=sub, consistent_read=consistent_read)
+        if info_jsons is not None:
+            return list(map(json.loads, info_jsons))
         return list(
             map(
                 cls.item_to_info,
-                cls.query(
-                    sub,
-                    cls.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
-                ),
+                cls.query_latest(sub=sub, consistent_read=consistent_read),
             )
         )
 
     @classmethod
-    def get_item(cls, *, sub: types.TSub, name: types.TSpecName) -> types.TSpecInfo:
+    def list_json(cls, *, sub: types.TSub, consistent_read: bool = False) -> str:
+        """
+        List all available specs for a customer serialized as JSON.
+
+        The information in the spec catalog of the customer is returned without
+        deserializing it. Falls back to serializing the latest items if the customer
+        does not have a spec catalog.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            consistent_read: Whether to use a strongly consistent read.
+
+        Returns:
+            The JSON array of the information for all specs for the customer.
+
+        """
+        info_jsons = catalog.get_infos(sub=sub, consistent_read=consistent_read)
+        if info_jsons is not None:
+            return f"[{', '.join(info_jsons)}]"
+        return json.dumps(
+            list(
+                map(
+                    cls.item_to_info,
+                    cls.query_latest(sub=sub, consistent_read=consistent_read),
+                )
+            )
+        )
+
+    @classmethod
+    def list_page(
+        cls,
+        *,
+        sub: types.TSub,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
+        """
+        List a page of the available specs for a customer.
+
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            limit: The maximum number of specs on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            Information for the specs on the page and the cursor for the next page.
+
+        """
+        items = cls.query_latest(sub=sub, limit=limit, cursor=cursor)
+        with pagination.check_query(cursor=cursor):
+            page_items = list(map(cls.item_to_info, items))
+        return types.SpecInfoPage(
+            items=page_items, cursor=pagination.encode(key=items.last_evaluated_key)
+        )
+
+    @classmethod
+    def get_item(
+        cls, *, sub: types.TSub, name: types.TSpecName, consistent_read: bool = False
+    ) -> types.TSpecInfo:
         """
         Retrieve a spec from the database.
 
@@ -292,260 +543,294 @@ class Spec(models.Model):
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
+            consistent_read: Whether to use a strongly consistent read.
 
         Returns:
             Information about the spec
 
         """
+        return cls.item_to_info(
+            cls._get_latest(
+                sub=sub,
+                name=name,
+                consistent_read=consistent_read,
+                attributes_to_get=cls.INFO_ATTRIBUTES,
+            )
+        )
+
+    @classmethod
+    def _get_latest(
+        cls,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        consistent_read: bool,
+        attributes_to_get: typing.Sequence[str],
+    ) -> "Spec":
+        """Retrieve the latest item of a spec or raise NotFoundError if missing."""
         id_ = cls.calc_id(name)
         updated_at_id = cls.calc_index_values(
             updated_at=cls.UPDATED_AT_LATEST, id_=id_
         ).updated_at_id
         try:
-            item = cls.get(hash_key=sub, range_key=updated_at_id)
-            return cls.item_to_info(item)
+            return cls.get(
+                hash_key=sub,
+                range_key=updated_at_id,
+                consistent_read=consistent_read,
+                attributes_to_get=list(attributes_to_get),
+            )
         except cls.DoesNotExist as exc:
             raise exceptions.NotFoundError(
                 f"could not find spec {name=} for user {sub=} in the database"
             ) from exc
 
     @classmethod
-    def delete_item(cls, *, sub: types.TSub, name: types.TSpecName) -> None:
+    def get_items(
+        cls,
+        *,
+        sub: types.TSub,
+        names: typing.Sequence[types.TSpecName],
+        consistent_read: bool = False,
+    ) -> types.TSpecInfoList:
         """
-        Delete a spec from the database.
+        Retrieve multiple specs from the database using batch gets.
+
+        Raises BulkGetError if the specs could not be retrieved.
 
         Args:
             sub: Unique identifier for a cutsomer.
-            name: The display name of the spec.
+            names: The display names of the specs.
+            consistent_read: Whether to use strongly consistent reads.
+
+        Returns:
+            Information about the specs that exist in the order of the names, each
+            spec at most once.
 
         """
-        id_ = cls.calc_id(name)
-        items = cls.id_updated_at_index.query(
-            sub, cls.id_updated_at.startswith(f"{id_}#")
+        ids = list(dict.fromkeys(cls.calc_id(name) for name in names))
+        items = bulk_get.get(
+            model=cls,
+            keys=(
+                {
+                    "sub": sub,
+                    "updated_at_id": cls.calc_index_values(
+                        updated_at=cls.UPDATED_AT_LATEST, id_=id_
+                    ).updated_at_id,
+                }
+                for id_ in ids
+            ),
+            attributes_to_get=list(cls.INFO_ATTRIBUTES),
+            consistent_read=consistent_read,
         )
-        with cls.batch_write() as batch:
-            for item in items:
-                batch.delete(item)
+        infos = {item.id: cls.item_to_info(item) for item in items}
+        return [infos[id_] for id_ in ids if id_ in infos]
 
     @classmethod
-    def list_versions(
+    def get_latest_item(
         cls, *, sub: types.TSub, name: types.TSpecName
-    ) -> types.TSpecInfoList:
+    ) -> types.LatestSpecInfo:
         """
-        List all available versions for a spec for a customer.
+        Retrieve the latest version of a spec and information about it.
 
-        Filters for a customer and for updated_at_id to start with latest.
+        Raises NotFoundError if the spec was not found.
+
+        Reads the latest item once and derives the version, the information and the
+        version time from it.
 
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
 
         Returns:
-            List of information for all versions of a spec for the customer.
+            The latest version and information about the spec.
 
         """
-        id_ = cls.calc_id(name)
-        items = cls.id_updated_at_index.query(
-            sub,
-            cls.id_updated_at.startswith(f"{id_}#"),
+        item = cls._get_latest(
+            sub=sub,
+            name=name,
+            consistent_read=False,
+            attributes_to_get=(*cls.INFO_ATTRIBUTES, "version_updated_at_id"),
         )
-        items_no_latest = filter(
-            lambda item: not item.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"),
-            items,
+        return types.LatestSpecInfo(
+            version=item.version,
+            info=cls.item_to_info(item),
+            version_time=version_times.parse_latest(
+                updated_at=item.updated_at,
+                version_updated_at_id=item.version_updated_at_id,
+            ),
         )
-        return list(map(cls.item_to_info, items_no_latest))
 
     @classmethod
-    def delete_all(cls, *, sub: types.TSub) -> None:
-        """
-        Delete all the specs for a user.
-
-        Args:
-            sub: Unique identifier for a cutsomer.
-
+    def delete_item(
+        cls,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
         """
-        items = cls.query(hash_key=sub)
-        with cls.batch_write() as batch:
-            for item in items:
-                batch.delete(item)
-
-
-class PublicKeyIndex(indexes.GlobalSecondaryIndex):
-    """Global secondary index for querying based on the public key."""
-
-    class Meta:
-        """Meta class."""
-
-        projection = indexes.AllProjection()
-        index_name = config.get().credentials_global_secondary_index_name
-
-        read_capacity_units = 1
-        write_capacity_units = 1
-
-        if config.get().stage == config.Stage.TEST:
-            host = "http://localhost:8000"
-
-    public_key = attributes.UnicodeAttribute(hash_key=True)
-
-
-class Credentials(models.Model):
-    """
-    Information about credentials.
-
-    Attrs:
-        sub: Unique identifier for a customer
-        id: Unique identifier for particular credentials
-
-        public_key: Public identifier for the credentials.
-        secret_key_hash: Value derived from the secret key that is safe to store.
-        salt: Random value used to generate the credentials.
+        Delete a spec from the database.
 
-    """
+        Raises BulkDeleteError if not all items could be deleted.
 
-    class Meta:
-        """Meta class."""
+        Deletes the versions of the spec in all shards using concurrent batch
+        writes. If any were deleted, also removes the model count of the latest item
+        from the model count aggregate, removes the spec from the spec catalog and
+        changes the generation of the customer.
 
-        table_name = config.get().credentials_table_name
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            on_progress: Called with the counts as the items are deleted.
 
-        if config.get().stage == config.Stage.TEST:
-            host = "http://localhost:8000"
+        Returns:
+            The counts of the deletion.
 
-    sub = attributes.UnicodeAttribute(hash_key=True)
-    id = attributes.UnicodeAttribute(range_key=True)
+        """
+        id_ = cls.calc_id(name)
+        items = itertools.chain.from_iterable(
+            cls.id_updated_at_index.query(
+                shard_sub,
+                cls.id_updated_at.startswith(f"{id_}#"),
+                attributes_to_get=[*cls.KEY_ATTRIBUTES, "model_count"],
+            )
+            for shard_sub in shards.calc_shard_subs(sub=sub)
+        )
+        latest_model_counts: typing.List[int] = []
 
-    public_key = attributes.UnicodeAttribute()
-    secret_key_hash = attributes.BinaryAttribute()
-    salt = attributes.BinaryAttribute()
+        def record_latest(item: "Spec") -> "Spec":
+            """Record the model count of the latest item."""
+            if item.updated_at_id.startswith(f"{cls.UPDATED_AT_LATEST}#"):
+                latest_model_counts.append(int(item.model_count))
+            return item
 
-    public_key_index = PublicKeyIndex()
+        counts = bulk_delete.delete(
+            model=cls, items=map(record_latest, items), on_progress=on_progress
+        )
 
-    @staticmethod
-    def item_to_info(item: "Credentials") -> types.TCredentialsInfo:
-        """Convert item to dict with information about the credentials."""
-        info: types.TCredentialsInfo = {
-            "id": item.id,
-            "public_key": item.public_key,
-            "salt": item.salt,
-        }
-        return info
+        if counts.deleted:
+            cls._update_customer_models(
+                sub=sub,
+                delta=-sum(latest_model_counts),
+                removed_id=id_ if latest_model_counts else None,
+            )
+        return counts
 
     @classmethod
-    def list_(cls, *, sub: types.TSub) -> types.TCredentialsInfoList:
+    def compact_versions(
+        cls, *, sub: types.TSub, name: types.TSpecName, retention: types.SpecRetention
+    ) -> types.SpecCompaction:
         """
-        List all available credentials for a user.
+        Delete the versions of a spec that are not kept by a retention policy.
 
-        Filters for a customer and returns all credentials.
+        Raises BulkDeleteError if not all versions could be deleted.
 
         Args:
             sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            retention: Which versions to keep.
 
         Returns:
-            List of information for all credentials of the customer.
+            The number of deleted versions and the versions that are no longer
+            referred to.
 
         """
-        return list(map(cls.item_to_info, cls.query(sub)))
+        return compaction.compact(model=cls, sub=sub, name=name, retention=retention)
 
     @classmethod
-    def create_update_item(
-        cls,
-        *,
-        sub: types.TSub,
-        id_: types.TCredentialsId,
-        public_key: types.TCredentialsPublicKey,
-        secret_key_hash: types.TCredentialsSecretKeyHash,
-        salt: types.TCredentialsSalt,
-    ) -> None:
+    def iter_versions(
+        cls, *, sub: types.TSub, name: types.TSpecName
+    ) -> types.TSpecInfoIterator:
         """
-        Create or update a spec.
+        Iterate over all available versions for a spec for a customer.
 
         Args:
             sub: Unique identifier for a cutsomer.
-            id_: Unique identifier for the credentials.
-            public_key: Public identifier for the credentials.
-            secret_key_hash: Value derived from the secret key that is safe to store.
-            salt: Random value used to generate the credentials.
+            name: The display name of the spec.
+
+        Returns:
+            Iterator over information for all versions of a spec for the customer.
 
         """
-        item = cls(
-            sub=sub,
-            id=id_,
-            public_key=public_key,
-            secret_key_hash=secret_key_hash,
-            salt=salt,
-        )
-        item.save()
+        return versions.iter_(model=cls, sub=sub, name=name)
 
     @classmethod
-    def get_item(
-        cls, *, sub: types.TSub, id_: types.TCredentialsId
-    ) -> typing.Optional[types.TCredentialsInfo]:
+    def list_versions(
+        cls, *, sub: types.TSub, name: types.TSpecName, consistent_read: bool = False
+    ) -> types.TSpecInfoList:
         """
-        Retrieve credentials.
+        List all available versions for a spec for a customer.
 
         Args:
             sub: Unique identifier for a cutsomer.
-            id_: Unique identifier for the credentials.
+            name: The display name of the spec.
+            consistent_read: Whether to use a strongly consistent read.
 
         Returns:
-            Information about the credentials.
+            List of information for all versions of a spec for the customer.
 
         """
-        try:
-            item = cls.get(hash_key=sub, range_key=id_)
-        except cls.DoesNotExist:
-            return None
-
-        return cls.item_to_info(item)
+        return versions.list_(
+            model=cls, sub=sub, name=name, consistent_read=consistent_read
+        )
 
     @classmethod
-    def get_user(
-        cls, *, public_key: types.TCredentialsPublicKey
-    ) -> typing.Optional[types.CredentialsAuthInfo]:
+    def list_versions_page(
+        cls,
+        *,
+        sub: types.TSub,
+        name: types.TSpecName,
+        limit: types.TOptLimit = None,
+        cursor: types.TOptCursor = None,
+    ) -> types.SpecInfoPage:
         """
-        Retrieve a user and information to authenticate the user.
+        List a page of the available versions for a spec for a customer.
+
+        Raises InvalidCursorError if the cursor is not valid.
 
         Args:
-            public_key: Public identifier for the credentials.
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            limit: The maximum number of versions on the page.
+            cursor: The cursor returned with the previous page.
 
         Returns:
-            Information needed to authenticate the user.
+            Information for the versions on the page and the cursor for the next
+            page.
 
         """
-        item = next(cls.public_key_index.query(hash_key=public_key), None)
-
-        if item is None:
-            return None
-
-        return types.CredentialsAuthInfo(
-            sub=item.sub, secret_key_hash=item.secret_key_hash, salt=item.salt
+        return versions.list_page(
+            model=cls, sub=sub, name=name, limit=limit, cursor=cursor
         )
 
     @classmethod
-    def delete_item(cls, *, sub: types.TSub, id_: types.TCredentialsId) -> None:
+    def delete_all(
+        cls,
+        *,
+        sub: types.TSub,
+        on_progress: typing.Optional[types.TBulkDeleteProgressCallback] = None,
+    ) -> types.BulkDeleteCounts:
         """
-        Delete the credentials.
+        Delete all the specs for a user.
 
-        Args:
-            sub: Unique identifier for a cutsomer.
-            id_: Unique identifier for the credentials.
+        Raises BulkDeleteError if not all items could be deleted.
 
-        """
-        try:
-            item = cls.get(hash_key=sub, range_key=id_)
-            item.delete()
-        except cls.DoesNotExist:
-            pass
-
-    @classmethod
-    def delete_all(cls, *, sub: types.TSub) -> None:
-        """
-        Delete all the credentials for a user.
+        Deletes the items page by page using concurrent batch writes, including the
+        versions in the shards of the customer. Also deletes the model count
+        aggregate and the spec catalog of the customer since they are stored in the
+        same partition.
 
         Args:
             sub: Unique identifier for a cutsomer.
+            on_progress: Called with the counts as the items are deleted.
+
+        Returns:
+            The counts of the deletion.
 
         """
-        items = cls.query(hash_key=sub)
-        with cls.batch_write() as batch:
-            for item in items:
-                batch.delete(item)
+        # The shards are retrieved before the aggregate that records them is deleted
+        items = itertools.chain.from_iterable(
+            cls.query(hash_key=shard_sub, attributes_to_get=list(cls.KEY_ATTRIBUTES))
+            for shard_sub in shards.calc_shard_subs(sub=sub, consistent_read=True)
+        )
+        return bulk_delete.delete(model=cls, items=items, on_progress=on_progress)
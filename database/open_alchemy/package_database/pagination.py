@@ -0,0 +1,103 @@
+"""Convert between DynamoDB last evaluated keys and opaque cursors."""
+
+import base64
+import binascii
+import contextlib
+import json
+import typing
+
+from pynamodb import exceptions as pynamodb_exceptions
+
+from . import exceptions, types
+
+TKey = typing.Dict[str, typing.Dict[str, typing.Any]]
+
+
+def encode(*, key: typing.Optional[TKey]) -> types.TOptCursor:
+    """
+    Encode a last evaluated key as a cursor.
+
+    Args:
+        key: The last evaluated key returned by a query.
+
+    Returns:
+        The cursor or None if there is no key.
+
+    """
+    if key is None:
+        return None
+    key_str = json.dumps(key, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(key_str.encode()).decode()
+
+
+def decode(
+    *,
+    cursor: types.TOptCursor,
+    sub: types.TSub,
+    key_prefixes: typing.Mapping[str, str],
+) -> typing.Optional[TKey]:
+    """
+    Decode a cursor into the key to start a query from.
+
+    Raises InvalidCursorError if the cursor is malformed, does not belong to the
+    customer or is not a key of the query.
+
+    Args:
+        cursor: The cursor to decode.
+        sub: Unique identifier for the customer the query is for.
+        key_prefixes: The names of the string attributes of the key other than the
+            sub mapped to the prefix their values must start with.
+
+    Returns:
+        The key to start the query from or None if there is no cursor.
+
+    """
+    if cursor is None:
+        return None
+
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise exceptions.InvalidCursorError(f"malformed cursor {cursor=}") from exc
+
+    if not isinstance(key, dict) or key.get("sub") != {"S": sub}:
+        raise exceptions.InvalidCursorError(
+            f"the cursor does not belong to the customer {cursor=}, {sub=}"
+        )
+
+    start_key: TKey = {"sub": {"S": sub}}
+    for name, prefix in key_prefixes.items():
+        value = key.get(name)
+        if (
+            not isinstance(value, dict)
+            or list(value) != ["S"]
+            or not isinstance(value["S"], str)
+            or not value["S"].startswith(prefix)
+        ):
+            raise exceptions.InvalidCursorError(
+                f"the cursor is not for this query {cursor=}"
+            )
+        start_key[name] = value
+    return start_key
+
+
+@contextlib.contextmanager
+def check_query(*, cursor: types.TOptCursor) -> typing.Iterator[None]:
+    """
+    Raise InvalidCursorError if the database rejects the key in a cursor.
+
+    Only validation errors of queries started from a cursor are converted, any other
+    error is raised as is.
+
+    Args:
+        cursor: The cursor the query was started from.
+
+    """
+    try:
+        yield
+    except pynamodb_exceptions.QueryError as exc:
+        if cursor is None or exc.cause_response_code != "ValidationException":
+            raise
+        raise exceptions.InvalidCursorError(
+            f"the database rejected the cursor {cursor=}"
+        ) from exc
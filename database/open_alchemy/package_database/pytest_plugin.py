@@ -4,7 +4,7 @@ import pathlib
 import subprocess
 
 import pytest
-from open_alchemy.package_database import models
+from open_alchemy.package_database import cache, credentials, models, shards
 from pynamodb import connection, exceptions
 
 
@@ -70,19 +70,23 @@ def _clean_specs_table(_specs_table):
     with models.Spec.batch_write() as batch:
         for item in models.Spec.scan():
             batch.delete(item)
+    shards.clear_count_cache()
+    cache.clear()
 
     yield
 
     with models.Spec.batch_write() as batch:
         for item in models.Spec.scan():
             batch.delete(item)
+    shards.clear_count_cache()
+    cache.clear()
 
 
 @pytest.fixture(scope="session")
 def _credentials_table(_database):
     """Create the credentials table and empty it after every test."""
-    assert not models.Credentials.exists()
-    models.Credentials.create_table(
+    assert not credentials.Credentials.exists()
+    credentials.Credentials.create_table(
         read_capacity_units=1,
         write_capacity_units=1,
         wait=True,
@@ -90,18 +94,18 @@ def _credentials_table(_database):
 
     yield
 
-    models.Credentials.delete_table()
+    credentials.Credentials.delete_table()
 
 
 @pytest.fixture()
 def _clean_credentials_table(_credentials_table):
     """Create the credentials table and empty it after every test."""
-    with models.Credentials.batch_write() as batch:
-        for item in models.Credentials.scan():
+    with credentials.Credentials.batch_write() as batch:
+        for item in credentials.Credentials.scan():
             batch.delete(item)
 
     yield
 
-    with models.Credentials.batch_write() as batch:
-        for item in models.Credentials.scan():
+    with credentials.Credentials.batch_write() as batch:
+        for item in credentials.Credentials.scan():
             batch.delete(item)
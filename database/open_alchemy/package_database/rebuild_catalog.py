@@ -0,0 +1,41 @@
+"""Rebuild the spec catalogs of customers from the latest spec items."""
+
+import argparse
+import typing
+
+from . import catalog, models
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Rebuild the spec catalogs.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Rebuild the spec catalog of customers from the latest version of their "
+            "specs. Customers whose specs do not fit into a catalog are left without "
+            "one."
+        )
+    )
+    parser.add_argument(
+        "--sub",
+        action="append",
+        help="the customer to rebuild, can be repeated, defaults to all customers",
+    )
+    parsed_args = parser.parse_args(args)
+
+    subs: typing.Sequence[str] = parsed_args.sub
+    if subs is None:
+        subs = models.Spec.list_subs()
+
+    for sub in subs:
+        has_catalog = catalog.rebuild(model=models.Spec, sub=sub)
+        print(f"{sub=}, {has_catalog=}")  # allow-print
+
+
+if __name__ == "__main__":
+    main()
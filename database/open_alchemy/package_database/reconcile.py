@@ -0,0 +1,40 @@
+"""Rebuild the model count aggregates of customers from the latest spec items."""
+
+import argparse
+import typing
+
+from . import models
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Rebuild the model count aggregates.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Rebuild the model count aggregate of customers from the latest version "
+            "of their specs."
+        )
+    )
+    parser.add_argument(
+        "--sub",
+        action="append",
+        help="the customer to reconcile, can be repeated, defaults to all customers",
+    )
+    parsed_args = parser.parse_args(args)
+
+    subs: typing.Sequence[str] = parsed_args.sub
+    if subs is None:
+        subs = models.Spec.list_subs()
+
+    for sub in subs:
+        model_count = models.Spec.reconcile_customer_models(sub=sub)
+        print(f"{sub=}, {model_count=}")  # allow-print
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Spread the spec versions of large customers over multiple partitions."""
+
+import argparse
+import typing
+
+from . import models, shards
+
+
+def main(args: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Shard the spec versions.
+
+    Args:
+        args: The command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Spread the versions of the specs of customers over multiple partitions "
+            "so that their writes are not limited by the throughput of a single "
+            "partition. The number of shards of a customer is never decreased."
+        )
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        required=True,
+        help="the number of partitions to spread the versions over",
+    )
+    parser.add_argument(
+        "--min-versions",
+        type=int,
+        default=0,
+        help="only shard customers with at least this many versions",
+    )
+    parser.add_argument(
+        "--sub",
+        action="append",
+        help="the customer to shard, can be repeated, defaults to all customers",
+    )
+    parsed_args = parser.parse_args(args)
+    if parsed_args.shards < 1:
+        parser.error("--shards must be at least 1")
+
+    subs: typing.Sequence[str] = parsed_args.sub
+    if subs is None:
+        subs = models.Spec.list_subs()
+
+    version_counts = {
+        sub: shards.count_versions(model=models.Spec, sub=sub) for sub in subs
+    }
+    subs = [
+        sub
+        for sub, version_count in version_counts.items()
+        if version_count >= parsed_args.min_versions
+    ]
+    # Increasing the number of shards of all customers first means that only the
+    # first customer waits for the processes to use the new number of shards
+    for sub in subs:
+        shards.increase_count(model=models.Spec, sub=sub, shards=parsed_args.shards)
+
+    for sub in subs:
+        version_count = version_counts[sub]
+        moved = shards.shard_versions(
+            model=models.Spec, sub=sub, shards=parsed_args.shards
+        )
+        shard_count = shards.get_count(sub=sub, consistent_read=True)
+        print(  # allow-print
+            f"{sub=}, versions={version_count}, shards={shard_count}, {moved=}"
+        )
+
+
+if __name__ == "__main__":
+    main()
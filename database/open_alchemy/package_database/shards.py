@@ -0,0 +1,286 @@
+"""Spread the versions of the specs of customers over multiple partitions."""
+
+import collections
+import random
+import threading
+import time
+import typing
+import zlib
+
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import transactions
+from pynamodb.expressions import update as pynamodb_update
+
+from . import bulk_delete, catalog, types
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from . import models  # pylint: disable=cyclic-import
+
+# Separates the customer from the shard in the partition key of sharded versions
+SHARD_SEPARATOR = "#shard-"
+# The number of seconds a process uses the number of shards of a customer it read
+# for reads that are not strongly consistent. New versions are written to shard 0
+# and no versions are moved for that long after the number of shards is increased
+# so that no process misses them.
+COUNT_CACHE_SECONDS = 60
+# The maximum number of customers whose number of shards is cached by a process
+MAX_CACHED_COUNTS = 10_000
+
+
+class _CachedCount(typing.NamedTuple):
+    """The number of shards of a customer and the monotonic time it was read at."""
+
+    shards: int
+    read_at: float
+
+
+_COUNTS: "collections.OrderedDict[types.TSub, _CachedCount]" = (
+    collections.OrderedDict()
+)
+_COUNTS_LOCK = threading.Lock()
+
+
+def calc_shard_sub(sub: types.TSub, shard: int) -> types.TSub:
+    """
+    Calculate the partition key of a shard of the versions of a customer.
+
+    Shard 0 is the partition of the customer itself so that the versions of
+    customers that are not sharded are where they have always been.
+
+    Args:
+        sub: Unique identifier for the customer.
+        shard: The index of the shard.
+
+    Returns:
+        The partition key of the shard.
+
+    """
+    if shard == 0:
+        return sub
+    return f"{sub}{SHARD_SEPARATOR}{shard}"
+
+
+def calc_sub(shard_sub: types.TSub) -> types.TSub:
+    """Calculate the customer of the partition key of a shard."""
+    return shard_sub.split(SHARD_SEPARATOR, 1)[0]
+
+
+def clear_count_cache() -> None:
+    """Remove the number of shards of all customers cached by the process."""
+    with _COUNTS_LOCK:
+        _COUNTS.clear()
+
+
+def _cache_count(*, sub: types.TSub, count: int, read_at: float) -> None:
+    """Cache the number of shards of a customer and evict the oldest counts."""
+    with _COUNTS_LOCK:
+        _COUNTS[sub] = _CachedCount(shards=count, read_at=read_at)
+        _COUNTS.move_to_end(sub)
+        while len(_COUNTS) > MAX_CACHED_COUNTS:
+            _COUNTS.popitem(last=False)
+
+
+def get_count(*, sub: types.TSub, consistent_read: bool = False) -> int:
+    """
+    Retrieve the number of shards the versions of a customer are spread over.
+
+    Reads that are not strongly consistent use the number of shards read by the
+    process within COUNT_CACHE_SECONDS so that customers that are not sharded do
+    not read the model count aggregate for every read of their versions.
+
+    Args:
+        sub: Unique identifier for the customer.
+        consistent_read: Whether to use a strongly consistent read.
+
+    Returns:
+        The number of shards, 1 if the customer is not sharded.
+
+    """
+    read_at = time.monotonic()
+    if not consistent_read:
+        with _COUNTS_LOCK:
+            cached = _COUNTS.get(sub)
+        if cached is not None and read_at < cached.read_at + COUNT_CACHE_SECONDS:
+            return cached.shards
+
+    try:
+        item = catalog.CustomerModelCount.get(
+            hash_key=sub,
+            range_key=catalog.CustomerModelCount.UPDATED_AT_ID,
+            consistent_read=consistent_read,
+            attributes_to_get=["spec_shards"],
+        )
+    except catalog.CustomerModelCount.DoesNotExist:
+        # Also raised when the item exists without spec_shards
+        count = 1
+    else:
+        count = 1 if item.spec_shards is None else int(item.spec_shards)
+
+    _cache_count(sub=sub, count=count, read_at=read_at)
+    return count
+
+
+def calc_shard_subs(
+    *, sub: types.TSub, consistent_read: bool = False
+) -> typing.List[types.TSub]:
+    """Calculate the partition keys of all shards of the versions of a customer."""
+    return [
+        calc_shard_sub(sub, shard)
+        for shard in range(get_count(sub=sub, consistent_read=consistent_read))
+    ]
+
+
+def choose_shard_sub(
+    *, sub: types.TSub, aggregate_item: typing.Optional[catalog.CustomerModelCount]
+) -> types.TSub:
+    """
+    Choose the partition a new version of a spec of a customer is written to.
+
+    Args:
+        sub: Unique identifier for the customer.
+        aggregate_item: The model count aggregate of the customer, if any.
+
+    Returns:
+        The partition key of a random shard of the versions of the customer, shard 0
+        while processes may still use the number of shards from before it was last
+        increased.
+
+    """
+    if aggregate_item is None or aggregate_item.spec_shards is None:
+        return sub
+    if (
+        aggregate_item.spec_shards_at is not None
+        and time.time() < aggregate_item.spec_shards_at + COUNT_CACHE_SECONDS
+    ):
+        return sub
+    return calc_shard_sub(sub, random.randrange(int(aggregate_item.spec_shards)))
+
+
+def count_versions(*, model: typing.Type["models.Spec"], sub: types.TSub) -> int:
+    """
+    Count the versions of all specs of a customer in all shards.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+
+    Returns:
+        The number of version items of the customer.
+
+    """
+    return sum(
+        model.count(shard_sub, model.updated_at_id.startswith("0"))
+        for shard_sub in calc_shard_subs(sub=sub)
+    )
+
+
+def increase_count(
+    *, model: typing.Type["models.Spec"], sub: types.TSub, shards: int
+) -> catalog.CustomerModelCount:
+    """
+    Increase the number of shards recorded on the model count aggregate of a customer.
+
+    The number of shards is never decreased. The time it was increased is recorded
+    so that new versions are only written to a random shard once
+    COUNT_CACHE_SECONDS have passed. The model count aggregate is rebuilt if it
+    does not exist since writes only use the shards recorded on it.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+        shards: The number of shards.
+
+    Returns:
+        The model count aggregate with the number of shards and the time it was
+        last increased.
+
+    """
+    previous_shards = get_count(sub=sub, consistent_read=True)
+    shards = max(shards, previous_shards)
+    aggregate_item = catalog.CustomerModelCount(
+        sub=sub, updated_at_id=catalog.CustomerModelCount.UPDATED_AT_ID
+    )
+    actions: typing.List[pynamodb_update.Action] = [
+        catalog.CustomerModelCount.spec_shards.set(shards)
+    ]
+    if shards > previous_shards:
+        actions.append(catalog.CustomerModelCount.spec_shards_at.set(time.time()))
+    try:
+        aggregate_item.update(
+            actions=actions,
+            condition=catalog.CustomerModelCount.model_count.exists()
+            & (
+                catalog.CustomerModelCount.spec_shards.does_not_exist()
+                | (catalog.CustomerModelCount.spec_shards <= shards)
+            ),
+        )
+    except pynamodb_exceptions.UpdateError:
+        if get_count(sub=sub, consistent_read=True) > shards:
+            # Another migration increased the number of shards further
+            return increase_count(model=model, sub=sub, shards=shards)
+        model.reconcile_customer_models(sub=sub)
+        return increase_count(model=model, sub=sub, shards=shards)
+
+    _cache_count(sub=sub, count=shards, read_at=time.monotonic())
+    return aggregate_item
+
+
+def shard_versions(
+    *, model: typing.Type["models.Spec"], sub: types.TSub, shards: int
+) -> int:
+    """
+    Spread the versions of the specs of a customer over multiple partitions.
+
+    Increases the number of shards of the customer, new versions are written to a
+    random shard once COUNT_CACHE_SECONDS have passed. After waiting for the same
+    time, the versions in the partition of the customer are moved to a shard based
+    on a hash of their sort key. Each version is first copied, only if it still
+    exists, and deleted once all versions are copied. Since reads merge the shards
+    and skip duplicates, it is safe to run repeatedly and alongside writes.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+        shards: The number of shards.
+
+    Returns:
+        The number of versions that were moved.
+
+    """
+    aggregate_item = increase_count(model=model, sub=sub, shards=shards)
+    shards = int(aggregate_item.spec_shards)
+    # Processes that still use the previous number of shards would miss the moved
+    # versions
+    if aggregate_item.spec_shards_at is not None:
+        time.sleep(
+            max(
+                aggregate_item.spec_shards_at + COUNT_CACHE_SECONDS - time.time(), 0
+            )
+        )
+
+    connection = model._get_connection().connection  # pylint: disable=protected-access
+    copied: typing.List["models.Spec"] = []
+    for item in model.query(
+        sub, model.updated_at_id.startswith("0"), consistent_read=True
+    ):
+        shard = zlib.crc32(item.updated_at_id.encode()) % shards
+        if shard == 0:
+            continue
+        updated_at_id = item.updated_at_id
+        item.sub = calc_shard_sub(sub, shard)
+        transaction_write = transactions.TransactWrite(connection=connection)
+        try:
+            with transaction_write:
+                transaction_write.condition_check(
+                    model, sub, updated_at_id, condition=model.updated_at_id.exists()
+                )
+                transaction_write.save(
+                    item, condition=model.updated_at_id.does_not_exist()
+                )
+        except pynamodb_exceptions.TransactWriteError as exc:
+            if exc.cause_response_code != "TransactionCanceledException":
+                raise
+            # The version was deleted or already copied in the meantime
+        copied.append(model(sub=sub, updated_at_id=updated_at_id))
+
+    return bulk_delete.delete(model=model, items=copied).deleted
@@ -14,6 +14,11 @@ TSpecDescription = str
 TOptSpecDescription = typing.Optional[TSpecDescription]
 TSpecUpdatedAt = str
 TSpecModelCount = int
+TOptMaxModelCount = typing.Optional[int]
+
+TCursor = str
+TOptCursor = typing.Optional[TCursor]
+TOptLimit = typing.Optional[int]
 
 TCredentialsId = str
 TCredentialsPublicKey = str
@@ -48,6 +53,42 @@ class TSpecInfo(_TSpecInfoBase, total=True):
 
 
 TSpecInfoList = typing.List[TSpecInfo]
+TSpecInfoIterator = typing.Iterator[TSpecInfo]
+TSpecInfoAsyncIterator = typing.AsyncIterator[TSpecInfo]
+
+
+@dataclasses.dataclass
+class SpecInfoPage:
+    """
+    A page of information about specs.
+
+    Attrs:
+        items: The information about the specs on the page.
+        cursor: Opaque value to retrieve the next page or None if there are no more
+            pages.
+
+    """
+
+    items: TSpecInfoList
+    cursor: TOptCursor
+
+
+@dataclasses.dataclass
+class LatestSpecInfo:
+    """
+    The latest version of a spec together with information about it.
+
+    Attrs:
+        version: The latest version of the spec.
+        info: The information about the latest version of the spec.
+        version_time: The time the latest version was written in microseconds since
+            epoch, which changes with every write of the spec.
+
+    """
+
+    version: TSpecVersion
+    info: TSpecInfo
+    version_time: int
 
 
 class TCredentialsInfo(typing.TypedDict, total=True):
@@ -86,7 +127,64 @@ class CredentialsAuthInfo:
     salt: TCredentialsSalt
 
 
-class TDatabase(typing.Protocol):
+@dataclasses.dataclass
+class BulkDeleteCounts:
+    """
+    The progress of deleting many items.
+
+    Attrs:
+        queued: The number of items that have been queued for deletion.
+        deleted: The number of items that have been deleted.
+        batches: The number of batch writes that deleted items.
+        retries: The number of times unprocessed items were retried.
+
+    """
+
+    queued: int = 0
+    deleted: int = 0
+    batches: int = 0
+    retries: int = 0
+
+
+TBulkDeleteProgressCallback = typing.Callable[[BulkDeleteCounts], None]
+
+
+@dataclasses.dataclass
+class SpecRetention:
+    """
+    Which versions of a spec to keep when the versions are compacted.
+
+    A version is kept if it is one of the keep_last most recent versions or if it is
+    newer than max_age_days. The version the latest item is a copy of is always
+    kept. No versions are removed if neither is set.
+
+    Attrs:
+        keep_last: The number of most recent versions to keep.
+        max_age_days: The age in days below which versions are kept.
+
+    """
+
+    keep_last: typing.Optional[int] = None
+    max_age_days: typing.Optional[int] = None
+
+
+@dataclasses.dataclass
+class SpecCompaction:
+    """
+    The outcome of compacting the versions of a spec.
+
+    Attrs:
+        deleted: The number of versions that were deleted.
+        expired_versions: The versions of the spec that are no longer referred to by
+            any item, their stored specs can be removed.
+
+    """
+
+    deleted: int
+    expired_versions: typing.List[TSpecVersion]
+
+
+class TDatabase(typing.Protocol):  # pylint: disable=too-many-public-methods
     """Interface for database."""
 
     @staticmethod
@@ -111,11 +209,17 @@ class TDatabase(typing.Protocol):
         version: TSpecVersion,
         model_count: TSpecModelCount,
         title: TOptSpecTitle = None,
-        description: TSpecDescription = None
+        description: TSpecDescription = None,
+        max_model_count: TOptMaxModelCount = None
     ) -> None:
         """
         Create or update a spec.
 
+        Raises ConflictError if the spec could not be written due to concurrent
+        writes.
+        Raises ModelCountExceededError if the model count of the customer would
+        exceed max_model_count.
+
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
@@ -123,6 +227,8 @@ class TDatabase(typing.Protocol):
             model_count: The number of models in the spec.
             title: The title of a spec.
             description: The description of a spec.
+            max_model_count: The maximum model count of the customer including the
+                spec, not checked if None.
 
         """
         ...
@@ -158,6 +264,54 @@ class TDatabase(typing.Protocol):
         """
         ...
 
+    @staticmethod
+    def list_specs_json(*, sub: TSub) -> str:
+        """
+        List all available specs for a customer serialized as JSON.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            The JSON array of all specs for the customer.
+
+        """
+        ...
+
+    @staticmethod
+    def list_specs_page(
+        *, sub: TSub, limit: TOptLimit = None, cursor: TOptCursor = None
+    ) -> SpecInfoPage:
+        """
+        List a page of the available specs for a customer.
+
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            limit: The maximum number of specs on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            The specs on the page and the cursor for the next page.
+
+        """
+        ...
+
+    @staticmethod
+    def iter_specs(*, sub: TSub) -> TSpecInfoIterator:
+        """
+        Iterate over all available specs for a customer.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+
+        Returns:
+            Iterator over all specs for the customer.
+
+        """
+        ...
+
     @staticmethod
     def get_spec(*, sub: TSub, name: TSpecName) -> TSpecInfo:
         """
@@ -176,13 +330,59 @@ class TDatabase(typing.Protocol):
         ...
 
     @staticmethod
-    def delete_spec(*, sub: TSub, name: TSpecName) -> None:
+    def get_specs(*, sub: TSub, names: typing.Sequence[TSpecName]) -> TSpecInfoList:
+        """
+        Retrieve multiple specs from the database.
+
+        Specs that do not exist are skipped.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            names: The display names of the specs.
+
+        Returns:
+            Information about the specs in the order of the names, each spec at
+            most once.
+
+        """
+        ...
+
+    @staticmethod
+    def get_latest_spec(*, sub: TSub, name: TSpecName) -> LatestSpecInfo:
+        """
+        Retrieve the latest version of a spec and information about it.
+
+        Raises NotFoundError if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            The latest version and information about the spec.
+
+        """
+        ...
+
+    @staticmethod
+    def delete_spec(
+        *,
+        sub: TSub,
+        name: TSpecName,
+        on_progress: typing.Optional[TBulkDeleteProgressCallback] = None
+    ) -> BulkDeleteCounts:
         """
         Delete a spec from the database.
 
+        Raises BulkDeleteError if not all items could be deleted.
+
         Args:
             sub: Unique identifier for a cutsomer.
             name: The display name of the spec.
+            on_progress: Called with the counts as the items are deleted.
+
+        Returns:
+            The counts of the deletion.
 
         """
         ...
@@ -205,12 +405,93 @@ class TDatabase(typing.Protocol):
         ...
 
     @staticmethod
-    def delete_all_specs(*, sub: TSub) -> None:
+    def list_spec_versions_page(
+        *,
+        sub: TSub,
+        name: TSpecName,
+        limit: TOptLimit = None,
+        cursor: TOptCursor = None
+    ) -> SpecInfoPage:
+        """
+        List a page of the available versions for a spec for a customer.
+
+        Raises NotFoundError if the first page is empty.
+        Raises InvalidCursorError if the cursor is not valid.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            limit: The maximum number of versions on the page.
+            cursor: The cursor returned with the previous page.
+
+        Returns:
+            The versions on the page and the cursor for the next page.
+
+        """
+        ...
+
+    @staticmethod
+    def iter_spec_versions(*, sub: TSub, name: TSpecName) -> TSpecInfoIterator:
+        """
+        Iterate over all available versions for a spec for a customer.
+
+        The iterator is empty if the spec does not exist.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+
+        Returns:
+            Iterator over all versions of a spec for the customer.
+
+        """
+        ...
+
+    @staticmethod
+    def delete_all_specs(
+        *, sub: TSub, on_progress: typing.Optional[TBulkDeleteProgressCallback] = None
+    ) -> BulkDeleteCounts:
         """
         Delete all the specs for a user.
 
+        Raises BulkDeleteError if not all items could be deleted.
+
         Args:
             sub: Unique identifier for a cutsomer.
+            on_progress: Called with the counts as the items are deleted.
+
+        Returns:
+            The counts of the deletion.
+
+        """
+        ...
+
+    @staticmethod
+    def list_spec_subs() -> typing.List[TSub]:
+        """
+        List all customers that have specs.
+
+        Returns:
+            The unique identifiers of the customers.
+
+        """
+        ...
+
+    @staticmethod
+    def compact_spec_versions(
+        *, sub: TSub, name: TSpecName, retention: SpecRetention
+    ) -> SpecCompaction:
+        """
+        Delete the versions of a spec that are not kept by the retention policy.
+
+        Args:
+            sub: Unique identifier for a cutsomer.
+            name: The display name of the spec.
+            retention: Which versions to keep.
+
+        Returns:
+            The number of deleted versions and the versions that are no longer
+            referred to.
 
         """
         ...
@@ -243,6 +524,9 @@ class TDatabase(typing.Protocol):
         """
         Create or update a spec.
 
+        Raises ConflictError if the credentials could not be written due to
+        concurrent writes.
+
         Args:
             sub: Unique identifier for a cutsomer.
             id_: Unique identifier for the credentials.
@@ -291,6 +575,9 @@ class TDatabase(typing.Protocol):
         """
         Delete the credentials.
 
+        Raises ConflictError if the credentials could not be deleted due to
+        concurrent writes.
+
         Args:
             sub: Unique identifier for a cutsomer.
             id_: Unique identifier for the credentials.
@@ -319,3 +606,163 @@ class TDatabase(typing.Protocol):
 
         """
         ...
+
+
+class TAsyncDatabase(typing.Protocol):  # pylint: disable=too-many-public-methods
+    """
+    Asynchronous interface for database.
+
+    Each method is the asynchronous version of the method of TDatabase with the
+    same name, see TDatabase for the arguments and return values.
+
+    """
+
+    async def count_customer_models(self, *, sub: TSub) -> int:
+        """Count the number of models a customer has stored."""
+        ...
+
+    async def create_update_spec(
+        self,
+        *,
+        sub: TSub,
+        name: TSpecName,
+        version: TSpecVersion,
+        model_count: TSpecModelCount,
+        title: TOptSpecTitle = None,
+        description: TSpecDescription = None,
+        max_model_count: TOptMaxModelCount = None
+    ) -> None:
+        """Create or update a spec."""
+        ...
+
+    async def get_latest_spec_version(
+        self, *, sub: TSub, name: TSpecName
+    ) -> TSpecVersion:
+        """Get the latest version for a spec."""
+        ...
+
+    async def list_specs(self, *, sub: TSub) -> TSpecInfoList:
+        """List all available specs for a customer."""
+        ...
+
+    async def list_specs_json(self, *, sub: TSub) -> str:
+        """List all available specs for a customer serialized as JSON."""
+        ...
+
+    async def list_specs_page(
+        self, *, sub: TSub, limit: TOptLimit = None, cursor: TOptCursor = None
+    ) -> SpecInfoPage:
+        """List a page of the available specs for a customer."""
+        ...
+
+    def iter_specs(self, *, sub: TSub) -> TSpecInfoAsyncIterator:
+        """Iterate over all available specs for a customer."""
+        ...
+
+    async def get_spec(self, *, sub: TSub, name: TSpecName) -> TSpecInfo:
+        """Retrieve a spec from the database."""
+        ...
+
+    async def get_specs(
+        self, *, sub: TSub, names: typing.Sequence[TSpecName]
+    ) -> TSpecInfoList:
+        """Retrieve multiple specs from the database."""
+        ...
+
+    async def get_latest_spec(self, *, sub: TSub, name: TSpecName) -> LatestSpecInfo:
+        """Retrieve the latest version of a spec and information about it."""
+        ...
+
+    async def delete_spec(
+        self,
+        *,
+        sub: TSub,
+        name: TSpecName,
+        on_progress: typing.Optional[TBulkDeleteProgressCallback] = None
+    ) -> BulkDeleteCounts:
+        """Delete a spec from the database."""
+        ...
+
+    async def list_spec_versions(self, *, sub: TSub, name: TSpecName) -> TSpecInfoList:
+        """List all available versions for a spec for a customer."""
+        ...
+
+    async def list_spec_versions_page(
+        self,
+        *,
+        sub: TSub,
+        name: TSpecName,
+        limit: TOptLimit = None,
+        cursor: TOptCursor = None
+    ) -> SpecInfoPage:
+        """List a page of the available versions for a spec for a customer."""
+        ...
+
+    def iter_spec_versions(
+        self, *, sub: TSub, name: TSpecName
+    ) -> TSpecInfoAsyncIterator:
+        """Iterate over all available versions for a spec for a customer."""
+        ...
+
+    async def delete_all_specs(
+        self,
+        *,
+        sub: TSub,
+        on_progress: typing.Optional[TBulkDeleteProgressCallback] = None
+    ) -> BulkDeleteCounts:
+        """Delete all the specs for a user."""
+        ...
+
+    async def list_spec_subs(self) -> typing.List[TSub]:
+        """List all customers that have specs."""
+        ...
+
+    async def compact_spec_versions(
+        self, *, sub: TSub, name: TSpecName, retention: SpecRetention
+    ) -> SpecCompaction:
+        """Delete the versions of a spec that are not kept by the retention policy."""
+        ...
+
+    async def list_credentials(self, *, sub: TSub) -> TCredentialsInfoList:
+        """List all available credentials for a user."""
+        ...
+
+    async def create_update_credentials(
+        self,
+        *,
+        sub: TSub,
+        id_: TCredentialsId,
+        public_key: TCredentialsPublicKey,
+        secret_key_hash: TCredentialsSecretKeyHash,
+        salt: TCredentialsSalt
+    ) -> None:
+        """Create or update credentials."""
+        ...
+
+    async def get_credentials(
+        self, *, sub: TSub, id_: TCredentialsId
+    ) -> typing.Optional[TCredentialsInfo]:
+        """Retrieve credentials."""
+        ...
+
+    async def get_user(
+        self, *, public_key: TCredentialsPublicKey
+    ) -> typing.Optional[CredentialsAuthInfo]:
+        """Retrieve a user and information to authenticate the user."""
+        ...
+
+    async def delete_credentials(self, *, sub: TSub, id_: TCredentialsId) -> None:
+        """Delete the credentials."""
+        ...
+
+    async def delete_all_credentials(self, *, sub: TSub) -> None:
+        """Delete all the credentials for a user."""
+        ...
+
+    async def delete_all(self, *, sub: TSub) -> None:
+        """Delete all the items for a user."""
+        ...
+
+    def close(self) -> None:
+        """Wait for the pending calls and release the resources of the facade."""
+        ...
@@ -0,0 +1,156 @@
+"""Calculate the times of the versions of specs and migrate versions to them."""
+
+import time
+import typing
+
+from pynamodb import exceptions as pynamodb_exceptions
+
+from . import types
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from . import models  # pylint: disable=cyclic-import
+
+# The resolution of the version timestamps in the sort keys of spec items
+MICROSECONDS = 1_000_000
+
+
+class TSpecVersionTime(typing.NamedTuple):
+    """The time of a version of a spec."""
+
+    updated_at: types.TSpecUpdatedAt
+    microseconds: int
+
+
+def parse(updated_at_id: "models.TSpecUpdatedAtId") -> int:
+    """
+    Calculate the version time of a version of a spec from its updated_at_id.
+
+    Args:
+        updated_at_id: The sort key of the version.
+
+    Returns:
+        The version time in microseconds since epoch.
+
+    """
+    updated_at, _, microseconds = updated_at_id.split("#", 1)[0].partition(".")
+    return int(updated_at) * MICROSECONDS + int(microseconds or 0)
+
+
+
+def parse_latest(
+    *,
+    updated_at: types.TSpecUpdatedAt,
+    version_updated_at_id: typing.Optional["models.TSpecUpdatedAtId"],
+) -> int:
+    """
+    Calculate the version time of the version a latest item is a copy of.
+
+    Latest items written before sub-second version times were introduced do not
+    refer to their version, their version time is the start of the second they were
+    updated in.
+
+    Args:
+        updated_at: The updated_at of the latest item.
+        version_updated_at_id: The version_updated_at_id of the latest item, if any.
+
+    Returns:
+        The version time in microseconds since epoch.
+
+    """
+    if version_updated_at_id is None:
+        return int(updated_at) * MICROSECONDS
+    return parse(version_updated_at_id)
+
+def calc(
+    *, previous_updated_at_id: typing.Optional["models.TSpecUpdatedAtId"]
+) -> TSpecVersionTime:
+    """
+    Calculate the time of a new version of a spec.
+
+    The time is the current time in microseconds since epoch. It is moved to after
+    the time of the previous version if the clock has not moved past it, so that the
+    versions of a spec are strictly increasing even when they are written in quick
+    succession.
+
+    Args:
+        previous_updated_at_id: The updated_at_id of the previous version of the
+            spec, if any.
+
+    Returns:
+        The version time split into updated_at in seconds and microseconds.
+
+    """
+    version_time = int(time.time() * MICROSECONDS)
+    if previous_updated_at_id is not None:
+        version_time = max(version_time, parse(previous_updated_at_id) + 1)
+    return TSpecVersionTime(
+        updated_at=str(version_time // MICROSECONDS),
+        microseconds=version_time % MICROSECONDS,
+    )
+
+
+def migrate(*, model: typing.Type["models.Spec"], sub: types.TSub) -> int:
+    """
+    Migrate the versions of a customer to sub-second version times.
+
+    Versions written before sub-second version times were introduced are copied to
+    a sort key with 0 microseconds and then deleted, and the latest items without
+    version_updated_at_id are pointed at the last version of their spec. It is safe
+    to run repeatedly and alongside writes since both kinds of sort key are ordered
+    correctly.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+
+    Returns:
+        The number of versions that were migrated.
+
+    """
+    last_version_updated_at_ids: typing.Dict[
+        types.TSpecId, "models.TSpecUpdatedAtId"
+    ] = {}
+    migrated = 0
+    with model.batch_write() as batch:
+        for item in model.query(sub, model.updated_at_id.startswith("0")):
+            updated_at_id = item.updated_at_id
+            updated_at = updated_at_id.split("#", 1)[0]
+            if "." not in updated_at:
+                index_values = model.calc_index_values(
+                    updated_at=updated_at, id_=item.id, microseconds=0
+                )
+                batch.delete(model(sub=sub, updated_at_id=updated_at_id))
+                item.updated_at_id = index_values.updated_at_id
+                item.id_updated_at = index_values.id_updated_at
+                batch.save(item)
+                migrated += 1
+            last_version_updated_at_ids[item.id] = max(
+                last_version_updated_at_ids.get(item.id, item.updated_at_id),
+                item.updated_at_id,
+            )
+
+    latest_items = model.query(
+        sub,
+        model.updated_at_id.startswith(f"{model.UPDATED_AT_LATEST}#"),
+        attributes_to_get=[*model.KEY_ATTRIBUTES, "id", "version_updated_at_id"],
+    )
+    for item in latest_items:
+        if (
+            item.version_updated_at_id is not None
+            or item.id not in last_version_updated_at_ids
+        ):
+            continue
+        try:
+            item.update(
+                actions=[
+                    model.version_updated_at_id.set(
+                        last_version_updated_at_ids[item.id]
+                    )
+                ],
+                condition=model.version_updated_at_id.does_not_exist(),
+            )
+        except pynamodb_exceptions.UpdateError:
+            # A newer version was written in the meantime
+            pass
+
+    return migrated
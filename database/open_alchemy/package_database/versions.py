@@ -0,0 +1,345 @@
+"""Query the versions of specs over all shards of customers."""
+
+import contextvars
+import heapq
+import itertools
+import typing
+from concurrent import futures
+
+from pynamodb import pagination as pynamodb_pagination
+from pynamodb.expressions import condition as pynamodb_condition
+
+from . import pagination, shards, types
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from . import models  # pylint: disable=cyclic-import
+
+# The maximum number of shards that are queried at the same time
+MAX_SHARD_WORKERS = 16
+
+
+def _query_shard(
+    *,
+    model: typing.Type["models.Spec"],
+    shard_sub: types.TSub,
+    range_key_condition: pynamodb_condition.Condition,
+    sharded: bool,
+    limit: types.TOptLimit = None,
+    last_evaluated_key: typing.Optional[pagination.TKey] = None,
+    consistent_read: bool = False,
+) -> pynamodb_pagination.ResultIterator["models.Spec"]:
+    """
+    Query for the information of the versions of a spec in a shard.
+
+    The latest item is filtered out. For sharded customers the sort key to merge
+    the shards by is included.
+
+    """
+    attributes_to_get = list(model.INFO_ATTRIBUTES)
+    if sharded:
+        attributes_to_get.append("id_updated_at")
+    else:
+        # The sort keys of the table and index to construct the cursor from
+        attributes_to_get.extend(("updated_at_id", "id_updated_at"))
+    return model.id_updated_at_index.query(
+        shard_sub,
+        range_key_condition,
+        filter_condition=~model.updated_at_id.startswith(f"{model.UPDATED_AT_LATEST}#"),
+        consistent_read=consistent_read,
+        limit=limit,
+        attributes_to_get=attributes_to_get,
+        last_evaluated_key=last_evaluated_key,
+    )
+
+
+def _merge(
+    shard_items: typing.Iterable[typing.Iterable["models.Spec"]],
+) -> typing.Iterator["models.Spec"]:
+    """
+    Merge the versions of a spec from each shard ordered by id_updated_at.
+
+    Versions that are in multiple shards while they are moved are returned once.
+    """
+    previous: typing.Optional[str] = None
+    for item in heapq.merge(*shard_items, key=lambda item: item.id_updated_at):
+        if item.id_updated_at != previous:
+            yield item
+        previous = item.id_updated_at
+
+
+def _gather(
+    *,
+    model: typing.Type["models.Spec"],
+    shard_subs: typing.Sequence[types.TSub],
+    range_key_condition: pynamodb_condition.Condition,
+    limit: types.TOptLimit = None,
+    consistent_read: bool = False,
+) -> typing.Iterator["models.Spec"]:
+    """Query the versions of a spec in all shards at the same time and merge them."""
+    if len(shard_subs) == 1:
+        return iter(
+            _query_shard(
+                model=model,
+                shard_sub=shard_subs[0],
+                range_key_condition=range_key_condition,
+                sharded=False,
+                limit=limit,
+                consistent_read=consistent_read,
+            )
+        )
+
+    def query_shard(
+        context: contextvars.Context, shard_sub: types.TSub
+    ) -> typing.List["models.Spec"]:
+        """Retrieve the versions of the spec in a shard."""
+        return context.run(
+            list,
+            _query_shard(
+                model=model,
+                shard_sub=shard_sub,
+                range_key_condition=range_key_condition,
+                sharded=True,
+                limit=limit,
+                consistent_read=consistent_read,
+            ),
+        )
+
+    # Each query runs in a copy of the context so that it is instrumented
+    contexts = [contextvars.copy_context() for _ in shard_subs]
+    with futures.ThreadPoolExecutor(
+        max_workers=min(len(shard_subs), MAX_SHARD_WORKERS)
+    ) as executor:
+        shard_items = list(executor.map(query_shard, contexts, shard_subs))
+    return _merge(shard_items)
+
+
+def query(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    consistent_read: bool = False,
+) -> typing.Iterator["models.Spec"]:
+    """
+    Query for the information of all versions of a spec.
+
+    The items of each shard are retrieved page by page as they are merged.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+        name: The display name of the spec.
+        consistent_read: Whether to use strongly consistent reads.
+
+    Returns:
+        The versions of the spec ordered by their version time.
+
+    """
+    id_ = model.calc_id(name)
+    shard_subs = shards.calc_shard_subs(sub=sub, consistent_read=consistent_read)
+    queries = [
+        _query_shard(
+            model=model,
+            shard_sub=shard_sub,
+            range_key_condition=model.id_updated_at.startswith(f"{id_}#"),
+            sharded=len(shard_subs) > 1,
+            consistent_read=consistent_read,
+        )
+        for shard_sub in shard_subs
+    ]
+    if len(queries) == 1:
+        return iter(queries[0])
+    return _merge(queries)
+
+
+def iter_(
+    *, model: typing.Type["models.Spec"], sub: types.TSub, name: types.TSpecName
+) -> types.TSpecInfoIterator:
+    """
+    Iterate over all available versions for a spec for a customer.
+
+    Items are retrieved from the database page by page as the iterator is consumed.
+    The versions of sharded customers are merged from all shards.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for a cutsomer.
+        name: The display name of the spec.
+
+    Returns:
+        Iterator over information for all versions of a spec for the customer.
+
+    """
+    return map(model.item_to_info, query(model=model, sub=sub, name=name))
+
+
+def list_(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    consistent_read: bool = False,
+) -> types.TSpecInfoList:
+    """
+    List all available versions for a spec for a customer.
+
+    Filters for a customer and for updated_at_id to start with latest. The shards
+    of sharded customers are queried at the same time and merged by the sort key.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for a cutsomer.
+        name: The display name of the spec.
+        consistent_read: Whether to use a strongly consistent read.
+
+    Returns:
+        List of information for all versions of a spec for the customer.
+
+    """
+    id_ = model.calc_id(name)
+    return list(
+        map(
+            model.item_to_info,
+            _gather(
+                model=model,
+                shard_subs=shards.calc_shard_subs(
+                    sub=sub, consistent_read=consistent_read
+                ),
+                range_key_condition=model.id_updated_at.startswith(f"{id_}#"),
+                consistent_read=consistent_read,
+            ),
+        )
+    )
+
+
+def _list_page_unsharded(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    id_: types.TSpecId,
+    limit: types.TOptLimit,
+    cursor: types.TOptCursor,
+) -> types.SpecInfoPage:
+    """List a page of the versions of a spec of a customer that is not sharded."""
+    key = pagination.decode(
+        cursor=cursor,
+        sub=sub,
+        key_prefixes={"updated_at_id": "", "id_updated_at": f"{id_}#"},
+    )
+    # DynamoDB applies the limit before the filter that drops the latest item, the
+    # iterator keeps reading pages until it has the versions of the page and one
+    # more that shows whether there is a next page
+    versions = _query_shard(
+        model=model,
+        shard_sub=sub,
+        range_key_condition=model.id_updated_at.startswith(f"{id_}#"),
+        sharded=False,
+        limit=None if limit is None else limit + 1,
+        last_evaluated_key=key,
+    )
+    with pagination.check_query(cursor=cursor):
+        page_items = list(itertools.islice(versions, limit))
+        has_next = next(versions, None) is not None
+    next_key: typing.Optional[pagination.TKey] = None
+    if has_next:
+        next_key = {
+            "sub": {"S": sub},
+            "updated_at_id": {"S": page_items[-1].updated_at_id},
+            "id_updated_at": {"S": page_items[-1].id_updated_at},
+        }
+    return types.SpecInfoPage(
+        items=list(map(model.item_to_info, page_items)),
+        cursor=pagination.encode(key=next_key),
+    )
+
+
+def _list_page_sharded(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    id_: types.TSpecId,
+    shard_subs: typing.Sequence[types.TSub],
+    limit: types.TOptLimit,
+    start: typing.Optional[str],
+) -> types.SpecInfoPage:
+    """List a page of the versions of a spec of a sharded customer."""
+    range_key_condition: pynamodb_condition.Condition = (
+        model.id_updated_at.startswith(f"{id_}#")
+        if start is None
+        # $ follows # so that the range ends after the last version of the spec
+        else model.id_updated_at.between(start, f"{id_}$")
+    )
+    versions = (
+        item
+        for item in _gather(
+            model=model,
+            shard_subs=shard_subs,
+            range_key_condition=range_key_condition,
+            # One more for the version in the cursor and one to detect more pages
+            limit=None if limit is None else limit + 2,
+        )
+        if item.id_updated_at != start
+    )
+    page_items = list(itertools.islice(versions, None if limit is None else limit + 1))
+    next_key: typing.Optional[pagination.TKey] = None
+    if limit is not None and len(page_items) > limit:
+        page_items = page_items[:limit]
+        next_key = {
+            "sub": {"S": sub},
+            "id_updated_at": {"S": page_items[-1].id_updated_at},
+        }
+    return types.SpecInfoPage(
+        items=list(map(model.item_to_info, page_items)),
+        cursor=pagination.encode(key=next_key),
+    )
+
+
+def list_page(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    limit: types.TOptLimit = None,
+    cursor: types.TOptCursor = None,
+) -> types.SpecInfoPage:
+    """
+    List a page of the available versions for a spec for a customer.
+
+    Raises InvalidCursorError if the cursor is not valid.
+
+    For sharded customers, each shard is queried for the versions after the
+    id_updated_at in the cursor, the shards are merged and the cursor of the next
+    page is the id_updated_at of the last version on the page.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for a cutsomer.
+        name: The display name of the spec.
+        limit: The maximum number of versions on the page.
+        cursor: The cursor returned with the previous page.
+
+    Returns:
+        Information for the versions on the page and the cursor for the next page.
+
+    """
+    id_ = model.calc_id(name)
+    shard_subs = shards.calc_shard_subs(sub=sub)
+    if len(shard_subs) == 1:
+        return _list_page_unsharded(
+            model=model, sub=sub, id_=id_, limit=limit, cursor=cursor
+        )
+
+    key = pagination.decode(
+        cursor=cursor, sub=sub, key_prefixes={"id_updated_at": f"{id_}#"}
+    )
+    start: typing.Optional[str] = None
+    if key is not None:
+        start = key["id_updated_at"]["S"]
+    return _list_page_sharded(
+        model=model,
+        sub=sub,
+        id_=id_,
+        shard_subs=shard_subs,
+        limit=limit,
+        start=start,
+    )
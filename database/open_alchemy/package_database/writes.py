@@ -0,0 +1,332 @@
+"""Write versions of specs with optimistic concurrency control."""
+
+import json
+import random
+import time
+import typing
+
+from pynamodb import exceptions as pynamodb_exceptions
+from pynamodb import transactions
+from pynamodb.expressions import condition as pynamodb_condition
+
+from . import catalog, exceptions, shards, types, version_times
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from . import models  # pylint: disable=cyclic-import
+
+# The number of times a spec write is attempted if it conflicts with other writes
+MAX_CREATE_UPDATE_ATTEMPTS = 10
+# The maximum delay in seconds before retrying a spec write, doubled for each retry
+CREATE_UPDATE_BASE_BACKOFF = 0.01
+
+
+def create_update(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    version: types.TSpecVersion,
+    model_count: types.TSpecModelCount,
+    title: types.TOptSpecTitle = None,
+    description: types.TOptSpecDescription = None,
+    max_model_count: types.TOptMaxModelCount = None,
+) -> None:
+    """
+    Create or update a spec, retrying writes that conflict with other writes.
+
+    Raises ConflictError if the write still conflicts with other writes after
+    MAX_CREATE_UPDATE_ATTEMPTS attempts.
+    Raises ModelCountExceededError if the model count of the customer would exceed
+    max_model_count.
+
+    Conflicting writes are retried with exponential backoff and jitter.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for a cutsomer.
+        name: The display name of the spec.
+        version: The version of the spec.
+        model_count: The number of models in the spec.
+        title: The title of a spec
+        description: The description of a spec
+        max_model_count: The maximum model count of the customer including the
+            spec.
+
+    """
+    attempts = 1
+    while True:
+        try:
+            _create_update(
+                model=model,
+                sub=sub,
+                name=name,
+                version=version,
+                model_count=model_count,
+                title=title,
+                description=description,
+                max_model_count=max_model_count,
+            )
+            return
+        except pynamodb_exceptions.TransactWriteError as exc:
+            if exc.cause_response_code != "TransactionCanceledException":
+                raise
+            if attempts >= MAX_CREATE_UPDATE_ATTEMPTS:
+                raise exceptions.ConflictError(
+                    f"could not write the spec {name=} for customer {sub=} "
+                    f"after {attempts} attempts due to concurrent writes"
+                ) from exc
+        time.sleep(random.uniform(0, CREATE_UPDATE_BASE_BACKOFF * 2 ** attempts))
+        attempts += 1
+
+
+def _create_update(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    version: types.TSpecVersion,
+    model_count: types.TSpecModelCount,
+    title: types.TOptSpecTitle,
+    description: types.TOptSpecDescription,
+    max_model_count: types.TOptMaxModelCount,
+) -> None:
+    """Attempt to create or update a spec, see create_update."""
+    previous_item, aggregate_item = _get_latest_and_aggregate(
+        model=model, sub=sub, id_=model.calc_id(name)
+    )
+
+    # Check the model count of the customer
+    delta = model_count - (
+        0 if previous_item is None else int(previous_item.model_count)
+    )
+    if max_model_count is not None:
+        aggregate_item = _check_model_count(
+            model=model,
+            sub=sub,
+            delta=delta,
+            aggregate_item=aggregate_item,
+            max_model_count=max_model_count,
+        )
+
+    item, item_latest = _construct_items(
+        model=model,
+        sub=sub,
+        name=name,
+        version=version,
+        model_count=model_count,
+        title=title,
+        description=description,
+        previous_item=previous_item,
+        aggregate_item=aggregate_item,
+    )
+
+    # Write the items, the change in the model count and the spec catalog
+    connection = model._get_connection().connection  # pylint: disable=protected-access
+    transaction_write = transactions.TransactWrite(connection=connection)
+    with transaction_write:
+        transaction_write.save(item, condition=model.updated_at_id.does_not_exist())
+        transaction_write.save(
+            item_latest,
+            condition=_calc_latest_condition(model=model, previous_item=previous_item),
+        )
+        if aggregate_item is not None:
+            catalog.add_spec_update(
+                transaction_write,
+                id_=item_latest.id,
+                info_json=json.dumps(model.item_to_info(item_latest)),
+                previous_info_json=(
+                    None
+                    if previous_item is None
+                    else json.dumps(model.item_to_info(previous_item))
+                ),
+                aggregate_item=aggregate_item,
+                delta=delta,
+                max_model_count=max_model_count,
+            )
+
+    if aggregate_item is None:
+        model.reconcile_customer_models(sub=sub)
+
+
+def _get_latest_and_aggregate(
+    *, model: typing.Type["models.Spec"], sub: types.TSub, id_: types.TSpecId
+) -> typing.Tuple[
+    typing.Optional["models.Spec"], typing.Optional[catalog.CustomerModelCount]
+]:
+    """
+    Retrieve the latest item of a spec and the model count aggregate together.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+        id_: Unique identifier for the spec.
+
+    Returns:
+        The latest item of the spec and the model count aggregate of the customer,
+        None for the items that do not exist.
+
+    """
+    connection = model._get_connection().connection  # pylint: disable=protected-access
+    transaction_get: "transactions.TransactGet[typing.Any]" = transactions.TransactGet(
+        connection=connection
+    )
+    with transaction_get:
+        previous_item_future = transaction_get.get(
+            model,
+            sub,
+            model.calc_index_values(
+                updated_at=model.UPDATED_AT_LATEST, id_=id_
+            ).updated_at_id,
+        )
+        aggregate_item_future = transaction_get.get(
+            catalog.CustomerModelCount, sub, catalog.CustomerModelCount.UPDATED_AT_ID
+        )
+
+    previous_item: typing.Optional["models.Spec"] = None
+    try:
+        previous_item = previous_item_future.get()
+    except model.DoesNotExist:
+        pass
+    aggregate_item: typing.Optional[catalog.CustomerModelCount] = None
+    try:
+        aggregate_item = aggregate_item_future.get()
+    except catalog.CustomerModelCount.DoesNotExist:
+        pass
+    return previous_item, aggregate_item
+
+
+def _check_model_count(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    delta: int,
+    aggregate_item: typing.Optional[catalog.CustomerModelCount],
+    max_model_count: int,
+) -> catalog.CustomerModelCount:
+    """
+    Check that a change in the model count keeps the customer within its limit.
+
+    Raises ModelCountExceededError if the model count of the customer would exceed
+    max_model_count.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+        delta: The change in the model count of the customer.
+        aggregate_item: The model count aggregate of the customer, if it exists.
+        max_model_count: The maximum model count of the customer.
+
+    Returns:
+        The model count aggregate of the customer, which is built if it did not
+        exist since the limit can only be enforced using the aggregate.
+
+    """
+    if aggregate_item is None:
+        model.reconcile_customer_models(sub=sub)
+        aggregate_item = catalog.CustomerModelCount.get(
+            hash_key=sub,
+            range_key=catalog.CustomerModelCount.UPDATED_AT_ID,
+            consistent_read=True,
+        )
+    if int(aggregate_item.model_count) + delta > max_model_count:
+        raise exceptions.ModelCountExceededError(
+            f"the model count of customer {sub=} would be "
+            f"{int(aggregate_item.model_count) + delta} which exceeds "
+            f"{max_model_count=}"
+        )
+    return aggregate_item
+
+
+def _construct_items(
+    *,
+    model: typing.Type["models.Spec"],
+    sub: types.TSub,
+    name: types.TSpecName,
+    version: types.TSpecVersion,
+    model_count: types.TSpecModelCount,
+    title: types.TOptSpecTitle,
+    description: types.TOptSpecDescription,
+    previous_item: typing.Optional["models.Spec"],
+    aggregate_item: typing.Optional[catalog.CustomerModelCount],
+) -> typing.Tuple["models.Spec", "models.Spec"]:
+    """
+    Construct the version of a spec and the copy of it as the latest item.
+
+    Args:
+        model: The model of the specs.
+        sub: Unique identifier for the customer.
+        name: The display name of the spec.
+        version: The version of the spec.
+        model_count: The number of models in the spec.
+        title: The title of the spec.
+        description: The description of the spec.
+        previous_item: The latest item that is replaced, if any.
+        aggregate_item: The model count aggregate of the customer, if any.
+
+    Returns:
+        The version and the latest item.
+
+    """
+    id_ = model.calc_id(name)
+    version_time = version_times.calc(
+        previous_updated_at_id=(
+            None if previous_item is None else previous_item.version_updated_at_id
+        )
+    )
+    index_values = model.calc_index_values(
+        updated_at=version_time.updated_at,
+        id_=id_,
+        microseconds=version_time.microseconds,
+    )
+    index_values_latest = model.calc_index_values(
+        updated_at=model.UPDATED_AT_LATEST, id_=id_
+    )
+    item = model(
+        sub=shards.choose_shard_sub(sub=sub, aggregate_item=aggregate_item),
+        id=id_,
+        name=name,
+        updated_at=version_time.updated_at,
+        version=version,
+        title=title,
+        description=description,
+        model_count=model_count,
+        updated_at_id=index_values.updated_at_id,
+        id_updated_at=index_values.id_updated_at,
+    )
+    item_latest = model(
+        sub=sub,
+        id=id_,
+        name=name,
+        version=version,
+        updated_at=version_time.updated_at,
+        title=title,
+        description=description,
+        model_count=model_count,
+        updated_at_id=index_values_latest.updated_at_id,
+        id_updated_at=index_values_latest.id_updated_at,
+        version_updated_at_id=index_values.updated_at_id,
+    )
+    return item, item_latest
+
+
+def _calc_latest_condition(
+    *, model: typing.Type["models.Spec"], previous_item: typing.Optional["models.Spec"]
+) -> pynamodb_condition.Condition:
+    """
+    Calculate the condition that only replaces the latest item that was read.
+
+    Args:
+        model: The model of the specs.
+        previous_item: The latest item that was read, if any.
+
+    Returns:
+        The condition for writing the latest item.
+
+    """
+    if previous_item is None:
+        return model.updated_at_id.does_not_exist()
+    if previous_item.version_updated_at_id is None:
+        return (
+            model.updated_at_id.exists() & model.version_updated_at_id.does_not_exist()
+        )
+    return model.version_updated_at_id == previous_item.version_updated_at_id
@@ -0,0 +1,255 @@
+"""Tests for the asynchronous database facade against DynamoDB."""
+
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+from open_alchemy import package_database
+from open_alchemy.package_database import aio, dynamodb, instrumentation, types
+
+SUB = "sub 1"
+RETENTION = types.SpecRetention(keep_last=1, max_age_days=None)
+
+
+async def collect(iterator):
+    """Retrieve all items from an asynchronous iterator."""
+    return [item async for item in iterator]
+
+
+def seed(database_instance):
+    """Create specs with multiple versions and credentials."""
+    for name, versions in (("spec 1", ("1", "2")), ("spec 2", ("1",))):
+        for version in versions:
+            database_instance.create_update_spec(
+                sub=SUB,
+                name=name,
+                version=version,
+                model_count=int(version),
+                title=f"title {version}",
+            )
+    database_instance.create_update_credentials(
+        sub=SUB,
+        id_="id 1",
+        public_key="public key 1",
+        secret_key_hash=b"secret key hash 1",
+        salt=b"salt 1",
+    )
+
+
+READ_TESTS = [
+    pytest.param("count_customer_models", {"sub": SUB}, id="count_customer_models"),
+    pytest.param(
+        "get_latest_spec_version",
+        {"sub": SUB, "name": "spec 1"},
+        id="get_latest_spec_version",
+    ),
+    pytest.param("list_specs", {"sub": SUB}, id="list_specs"),
+    pytest.param("list_specs_json", {"sub": SUB}, id="list_specs_json"),
+    pytest.param("list_specs_page", {"sub": SUB, "limit": 1}, id="list_specs_page"),
+    pytest.param("get_spec", {"sub": SUB, "name": "spec 1"}, id="get_spec"),
+    pytest.param(
+        "get_specs", {"sub": SUB, "names": ["spec 2", "spec 1"]}, id="get_specs"
+    ),
+    pytest.param(
+        "get_latest_spec", {"sub": SUB, "name": "spec 1"}, id="get_latest_spec"
+    ),
+    pytest.param(
+        "list_spec_versions", {"sub": SUB, "name": "spec 1"}, id="list_spec_versions"
+    ),
+    pytest.param(
+        "list_spec_versions_page",
+        {"sub": SUB, "name": "spec 1", "limit": 1},
+        id="list_spec_versions_page",
+    ),
+    pytest.param("list_spec_subs", {}, id="list_spec_subs"),
+    pytest.param("list_credentials", {"sub": SUB}, id="list_credentials"),
+    pytest.param("get_credentials", {"sub": SUB, "id_": "id 1"}, id="get_credentials"),
+    pytest.param("get_user", {"public_key": "public key 1"}, id="get_user"),
+]
+
+
+@pytest.mark.parametrize("method, kwargs", READ_TESTS)
+def test_read(_clean_specs_table, _clean_credentials_table, method, kwargs):
+    """
+    GIVEN DynamoDB with specs and credentials
+    WHEN a read method is called on the asynchronous database
+    THEN the same result as the blocking database is returned.
+    """
+    database_instance = dynamodb.Database()
+    seed(database_instance)
+    async_database_instance = aio.Database(database=database_instance)
+
+    returned_value = asyncio.run(getattr(async_database_instance, method)(**kwargs))
+
+    assert returned_value == getattr(database_instance, method)(**kwargs)
+    async_database_instance.close()
+
+
+@pytest.mark.parametrize(
+    "method, kwargs",
+    [
+        pytest.param("iter_specs", {"sub": SUB}, id="iter_specs"),
+        pytest.param(
+            "iter_spec_versions",
+            {"sub": SUB, "name": "spec 1"},
+            id="iter_spec_versions",
+        ),
+        pytest.param(
+            "iter_spec_versions",
+            {"sub": SUB, "name": "spec 3"},
+            id="iter_spec_versions empty",
+        ),
+    ],
+)
+def test_iterate(_clean_specs_table, _clean_credentials_table, method, kwargs):
+    """
+    GIVEN DynamoDB with specs
+    WHEN an iterator method is called on the asynchronous database
+    THEN the same items as the blocking database are returned.
+    """
+    database_instance = dynamodb.Database()
+    seed(database_instance)
+    async_database_instance = aio.Database(database=database_instance)
+
+    returned_items = asyncio.run(
+        collect(getattr(async_database_instance, method)(**kwargs))
+    )
+
+    assert returned_items == list(getattr(database_instance, method)(**kwargs))
+    async_database_instance.close()
+
+
+def test_write(_clean_specs_table, _clean_credentials_table):
+    """
+    GIVEN empty DynamoDB
+    WHEN the write methods are called on the asynchronous database
+    THEN the items are written and deleted.
+    """
+    database_instance = dynamodb.Database()
+    async_database_instance = aio.Database(database=database_instance)
+
+    async def write():
+        """Write and delete specs and credentials."""
+        await asyncio.gather(
+            *(
+                async_database_instance.create_update_spec(
+                    sub=SUB, name=name, version="1", model_count=1, title="title 1"
+                )
+                for name in ("spec 1", "spec 2", "spec 3")
+            ),
+            async_database_instance.create_update_credentials(
+                sub=SUB,
+                id_="id 1",
+                public_key="public key 1",
+                secret_key_hash=b"secret key hash 1",
+                salt=b"salt 1",
+            ),
+        )
+        await async_database_instance.create_update_spec(
+            sub=SUB, name="spec 1", version="2", model_count=2
+        )
+        compaction = await async_database_instance.compact_spec_versions(
+            sub=SUB, name="spec 1", retention=RETENTION
+        )
+        await async_database_instance.delete_spec(sub=SUB, name="spec 2")
+        return compaction
+
+    compaction = asyncio.run(write())
+
+    assert compaction.deleted == 1
+    assert database_instance.count_customer_models(sub=SUB) == 3
+    assert [info["name"] for info in database_instance.list_specs(sub=SUB)] == [
+        "spec 1",
+        "spec 3",
+    ]
+    assert database_instance.get_user(public_key="public key 1") is not None
+
+    async def delete():
+        """Delete the remaining items."""
+        await async_database_instance.delete_credentials(sub=SUB, id_="id 1")
+        await async_database_instance.delete_all_specs(sub=SUB)
+        await async_database_instance.delete_all_credentials(sub=SUB)
+        await async_database_instance.delete_all(sub=SUB)
+
+    asyncio.run(delete())
+
+    assert database_instance.list_specs(sub=SUB) == []
+    assert database_instance.list_credentials(sub=SUB) == []
+    async_database_instance.close()
+
+
+def test_error(_clean_specs_table):
+    """
+    GIVEN empty DynamoDB
+    WHEN get_spec is called on the asynchronous database
+    THEN NotFoundError is raised.
+    """
+    async_database_instance = aio.Database(database=dynamodb.Database())
+
+    with pytest.raises(package_database.exceptions.NotFoundError):
+        asyncio.run(async_database_instance.get_spec(sub=SUB, name="spec 1"))
+
+    async_database_instance.close()
+
+
+def test_concurrent():
+    """
+    GIVEN blocking database whose calls only finish once two are in progress
+    WHEN two calls are awaited at the same time on the asynchronous database
+    THEN both calls finish.
+    """
+    barrier = threading.Barrier(2, timeout=5)
+    mock_database = mock.MagicMock()
+    mock_database.get_spec.side_effect = lambda **_: barrier.wait()
+    mock_database.count_customer_models.side_effect = lambda **_: barrier.wait()
+    async_database_instance = aio.Database(database=mock_database, max_workers=2)
+
+    async def read():
+        """Read the spec and the model count at the same time."""
+        return await asyncio.gather(
+            async_database_instance.get_spec(sub=SUB, name="spec 1"),
+            async_database_instance.count_customer_models(sub=SUB),
+        )
+
+    assert sorted(asyncio.run(read())) == [0, 1]
+    async_database_instance.close()
+
+
+def test_instrumentation(_clean_specs_table):
+    """
+    GIVEN empty DynamoDB
+    WHEN calls on the asynchronous database are awaited within summarize
+    THEN the calls are added to the summary.
+    """
+    async_database_instance = aio.Database(database=dynamodb.Database())
+
+    async def read():
+        """Read the specs and the model count at the same time."""
+        await asyncio.gather(
+            async_database_instance.list_specs(sub=SUB),
+            async_database_instance.count_customer_models(sub=SUB),
+        )
+
+    with instrumentation.summarize() as summary:
+        asyncio.run(read())
+
+    assert sorted(metrics.operation for metrics in summary.metrics) == [
+        "count_customer_models",
+        "list_specs",
+    ]
+    async_database_instance.close()
+
+
+def test_get_async(monkeypatch):
+    """
+    GIVEN asynchronous database facade that has not been constructed
+    WHEN get_async is called multiple times
+    THEN the facade is constructed once and calls the database facade.
+    """
+    monkeypatch.setitem(package_database._CACHE, "async_database", None)
+
+    returned_database = package_database.get_async()
+
+    assert returned_database is package_database.get_async()
+    assert returned_database.database is package_database.get()
@@ -0,0 +1,124 @@
+"""Tests for the bulk delete."""
+
+from unittest import mock
+
+import pytest
+from open_alchemy.package_database import (
+    bulk_delete,
+    exceptions,
+    factory,
+    models,
+    types,
+)
+from pynamodb import exceptions as pynamodb_exceptions
+
+
+@pytest.mark.models
+def test_delete(_clean_specs_table):
+    """
+    GIVEN more items in the database than fit into the pending batches
+    WHEN delete is called with the items
+    THEN the items are deleted and the progress and counts are reported.
+    """
+    sub = "sub 1"
+    for idx in range(4 * bulk_delete.BATCH_SIZE + 1):
+        factory.SpecFactory(sub=sub, updated_at_id=f"{idx}#name").save()
+    mock_on_progress = mock.MagicMock()
+
+    counts = bulk_delete.delete(
+        model=models.Spec,
+        items=models.Spec.query(sub),
+        workers=1,
+        on_progress=mock_on_progress,
+    )
+
+    assert list(models.Spec.query(sub)) == []
+    assert counts.queued == 4 * bulk_delete.BATCH_SIZE + 1
+    assert counts.deleted == 4 * bulk_delete.BATCH_SIZE + 1
+    assert counts.batches == 5
+    assert counts.retries == 0
+    assert mock_on_progress.call_count == 10
+    assert mock_on_progress.call_args.args[0] == counts
+
+
+def _items(count):
+    """Create items without saving them."""
+    return [
+        models.Spec(sub="sub 1", updated_at_id=f"{idx}#name") for idx in range(count)
+    ]
+
+
+def _unprocessed(keys):
+    """Construct a response with unprocessed items."""
+    return {
+        "UnprocessedItems": {
+            models.Spec.Meta.table_name: [
+                {"DeleteRequest": {"Key": key}} for key in keys
+            ]
+        }
+    }
+
+
+def test_delete_unprocessed_retry(monkeypatch):
+    """
+    GIVEN batch write that does not process some items the first time
+    WHEN delete is called
+    THEN the unprocessed items are retried.
+    """
+    mock_connection = mock.MagicMock()
+    mock_connection.batch_write_item.side_effect = [
+        _unprocessed([{"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#name"}}]),
+        {},
+    ]
+    monkeypatch.setattr(
+        models.Spec, "_get_connection", mock.MagicMock(return_value=mock_connection)
+    )
+    mock_sleep = mock.MagicMock()
+    monkeypatch.setattr(bulk_delete.time, "sleep", mock_sleep)
+
+    counts = bulk_delete.delete(model=models.Spec, items=_items(2))
+
+    assert counts == types.BulkDeleteCounts(queued=2, deleted=2, batches=2, retries=1)
+    mock_sleep.assert_called_once()
+    assert mock_connection.batch_write_item.call_args.kwargs == {
+        "delete_items": [{"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#name"}}]
+    }
+
+
+def test_delete_unprocessed_retries_exceeded(monkeypatch):
+    """
+    GIVEN batch write that never processes an item
+    WHEN delete is called
+    THEN BulkDeleteError is raised after the maximum number of retries.
+    """
+    mock_connection = mock.MagicMock()
+    mock_connection.batch_write_item.return_value = _unprocessed(
+        [{"sub": {"S": "sub 1"}, "updated_at_id": {"S": "0#name"}}]
+    )
+    monkeypatch.setattr(
+        models.Spec, "_get_connection", mock.MagicMock(return_value=mock_connection)
+    )
+    monkeypatch.setattr(bulk_delete.time, "sleep", mock.MagicMock())
+
+    with pytest.raises(exceptions.BulkDeleteError):
+        bulk_delete.delete(model=models.Spec, items=_items(1), max_retries=2)
+
+    assert mock_connection.batch_write_item.call_count == 3
+
+
+def test_delete_error(monkeypatch):
+    """
+    GIVEN batch write that raises an error
+    WHEN delete is called with more batches than are pending at once
+    THEN BulkDeleteError is raised.
+    """
+    mock_connection = mock.MagicMock()
+    mock_connection.batch_write_item.side_effect = pynamodb_exceptions.PutError
+    monkeypatch.setattr(
+        models.Spec, "_get_connection", mock.MagicMock(return_value=mock_connection)
+    )
+
+    with pytest.raises(exceptions.BulkDeleteError):
+        bulk_delete.delete(
+            model=models.Spec, items=_items(4 * bulk_delete.BATCH_SIZE), workers=1
+        )
@@ -0,0 +1,109 @@
+"""Tests for the bulk get."""
+
+from unittest import mock
+
+import pytest
+from open_alchemy.package_database import bulk_get, exceptions, factory, models
+from pynamodb import exceptions as pynamodb_exceptions
+
+
+def _key(idx):
+    """Construct the key of an item."""
+    return {"sub": "sub 1", "updated_at_id": f"{idx}#name"}
+
+
+@pytest.mark.models
+def test_get(_clean_specs_table):
+    """
+    GIVEN more items in the database than fit into a batch
+    WHEN get is called with the keys of the items, duplicate keys and missing keys
+    THEN each existing item is returned once.
+    """
+    count = 2 * bulk_get.BATCH_SIZE + 1
+    for idx in range(count):
+        factory.SpecFactory(**_key(idx)).save()
+    keys = [_key(idx) for idx in range(count + 1)]
+
+    returned_items = list(
+        bulk_get.get(
+            model=models.Spec,
+            keys=keys + keys[:10],
+            attributes_to_get=["updated_at_id"],
+            consistent_read=True,
+        )
+    )
+
+    assert sorted(item.updated_at_id for item in returned_items) == sorted(
+        f"{idx}#name" for idx in range(count)
+    )
+    assert all(item.version is None for item in returned_items)
+
+
+def _unprocessed(keys):
+    """Construct a response with unprocessed keys."""
+    return {
+        "Responses": {models.Spec.Meta.table_name: []},
+        "UnprocessedKeys": {models.Spec.Meta.table_name: {"Keys": keys}},
+    }
+
+
+def test_get_unprocessed_retry(monkeypatch):
+    """
+    GIVEN batch get that does not process some keys the first time
+    WHEN get is called
+    THEN the unprocessed keys are retried.
+    """
+    unprocessed_key = {"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#name"}}
+    mock_connection = mock.MagicMock()
+    mock_connection.batch_get_item.side_effect = [
+        _unprocessed([unprocessed_key]),
+        {"Responses": {models.Spec.Meta.table_name: [unprocessed_key]}},
+    ]
+    monkeypatch.setattr(
+        models.Spec, "_get_connection", mock.MagicMock(return_value=mock_connection)
+    )
+    mock_sleep = mock.MagicMock()
+    monkeypatch.setattr(bulk_get.time, "sleep", mock_sleep)
+
+    returned_items = list(bulk_get.get(model=models.Spec, keys=[_key(0), _key(1)]))
+
+    assert [item.updated_at_id for item in returned_items] == ["1#name"]
+    mock_sleep.assert_called_once()
+    assert mock_connection.batch_get_item.call_args.args == ([unprocessed_key],)
+
+
+def test_get_unprocessed_retries_exceeded(monkeypatch):
+    """
+    GIVEN batch get that never processes a key
+    WHEN get is called
+    THEN BulkGetError is raised after the maximum number of retries.
+    """
+    mock_connection = mock.MagicMock()
+    mock_connection.batch_get_item.return_value = _unprocessed(
+        [{"sub": {"S": "sub 1"}, "updated_at_id": {"S": "0#name"}}]
+    )
+    monkeypatch.setattr(
+        models.Spec, "_get_connection", mock.MagicMock(return_value=mock_connection)
+    )
+    monkeypatch.setattr(bulk_get.time, "sleep", mock.MagicMock())
+
+    with pytest.raises(exceptions.BulkGetError):
+        list(bulk_get.get(model=models.Spec, keys=[_key(0)], max_retries=2))
+
+    assert mock_connection.batch_get_item.call_count == 3
+
+
+def test_get_error(monkeypatch):
+    """
+    GIVEN batch get that raises an error
+    WHEN get is called
+    THEN BulkGetError is raised.
+    """
+    mock_connection = mock.MagicMock()
+    mock_connection.batch_get_item.side_effect = pynamodb_exceptions.GetError
+    monkeypatch.setattr(
+        models.Spec, "_get_connection", mock.MagicMock(return_value=mock_connection)
+    )
+
+    with pytest.raises(exceptions.BulkGetError):
+        list(bulk_get.get(model=models.Spec, keys=[_key(0)]))
@@ -0,0 +1,273 @@
+"""Tests for the caching DynamoDB database facade."""
+
+import json
+
+import pytest
+from open_alchemy.package_database import cache, catalog, config, exceptions, models
+
+pytestmark = pytest.mark.models
+
+
+@pytest.fixture
+def database_instance(monkeypatch, _clean_specs_table):
+    """Construct the caching database facade with an empty cache."""
+    monkeypatch.setattr(config.get(), "cache_size", 10)
+    cache.clear()
+    yield cache.Database()
+    cache.clear()
+
+
+def _list_versions(database_instance):
+    """List the versions of spec 1 of sub 1, an empty list if there are none."""
+    try:
+        return database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+    except exceptions.NotFoundError:
+        return []
+
+
+def test_list_spec_versions(database_instance):
+    """
+    GIVEN database with a spec
+    WHEN list_spec_versions is called for a missing spec and twice for the spec and
+        the result is changed in between
+    THEN NotFoundError is raised for the missing spec and the second call is served
+        from the cache and returns the original result.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+
+    with pytest.raises(exceptions.NotFoundError):
+        database_instance.list_spec_versions(sub="sub 1", name="spec 2")
+    first_infos = database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+    first_infos[0]["version"] = "changed"
+    second_infos = database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+
+    assert [info["version"] for info in second_infos] == ["1"]
+    assert cache.info() == cache.CacheInfo(hits=1, misses=2, size=1)
+
+
+def test_shared(database_instance):
+    """
+    GIVEN database with a spec whose versions were listed
+    WHEN the versions are listed using another instance
+    THEN the call is served from the cache.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+
+    cache.Database().list_spec_versions(sub="sub 1", name="spec 1")
+
+    assert cache.info().hits == 1
+
+
+def test_get_spec_not_cached(database_instance):
+    """
+    GIVEN database with a spec
+    WHEN the spec is retrieved twice
+    THEN the cache is not used.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+
+    for _ in range(2):
+        database_instance.get_spec(sub="sub 1", name="spec 1")
+
+    assert cache.info() == cache.CacheInfo(hits=0, misses=0, size=0)
+
+
+@pytest.mark.parametrize("with_catalog", [False, True], ids=["query", "catalog"])
+@pytest.mark.parametrize(
+    "method_name, to_names",
+    [
+        pytest.param(
+            "list_specs",
+            lambda infos: [info["name"] for info in infos],
+            id="list_specs",
+        ),
+        pytest.param(
+            "list_specs_json",
+            lambda infos: [info["name"] for info in json.loads(infos)],
+            id="list_specs_json",
+        ),
+    ],
+)
+def test_list_specs(database_instance, with_catalog, method_name, to_names):
+    """
+    GIVEN database with a spec with and without a spec catalog
+    WHEN the specs are listed twice, another spec is written and the specs are
+        listed again
+    THEN the second call is served from the cache and the third call returns both
+        specs.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    if with_catalog:
+        catalog.rebuild(model=models.Spec, sub="sub 1")
+    method = getattr(database_instance, method_name)
+
+    assert to_names(method(sub="sub 1")) == ["spec 1"]
+    assert to_names(method(sub="sub 1")) == ["spec 1"]
+    assert cache.info() == cache.CacheInfo(hits=1, misses=1, size=1)
+
+    models.Spec.create_update_item(
+        sub="sub 1", name="spec 2", version="1", model_count=1
+    )
+
+    assert to_names(method(sub="sub 1")) == ["spec 1", "spec 2"]
+    assert cache.info().hits == 1
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        pytest.param(
+            lambda database_instance: database_instance.create_update_spec(
+                sub="sub 1", name="spec 1", version="2", model_count=1
+            ),
+            id="create_update_spec same model count",
+        ),
+        pytest.param(
+            lambda database_instance: database_instance.create_update_spec(
+                sub="sub 1", name="spec 2", version="1", model_count=2
+            ),
+            id="create_update_spec other spec",
+        ),
+        pytest.param(
+            lambda database_instance: database_instance.delete_spec(
+                sub="sub 1", name="spec 1"
+            ),
+            id="delete_spec",
+        ),
+        pytest.param(
+            lambda database_instance: database_instance.delete_all_specs(sub="sub 1"),
+            id="delete_all_specs",
+        ),
+        pytest.param(
+            lambda _: models.Spec.create_update_item(
+                sub="sub 1", name="spec 1", version="2", model_count=1
+            ),
+            id="other process create_update_item",
+        ),
+        pytest.param(
+            lambda _: models.Spec.reconcile_customer_models(sub="sub 1"),
+            id="other process reconcile_customer_models",
+        ),
+        pytest.param(
+            lambda _: catalog.rebuild(model=models.Spec, sub="sub 1"),
+            id="other process rebuild_catalog",
+        ),
+    ],
+)
+def test_write_invalidates(database_instance, write):
+    """
+    GIVEN database with a spec whose versions are cached
+    WHEN the specs of the customer are written
+    THEN the versions are read from the database again.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+
+    write(database_instance)
+    returned_infos = _list_versions(database_instance)
+
+    assert returned_infos == models.Spec.list_versions(
+        sub="sub 1", name="spec 1", consistent_read=True
+    )
+    assert cache.info().hits == 0
+    assert cache.info().misses == 2
+
+
+def test_delete_all_recreate_not_stale(database_instance):
+    """
+    GIVEN database with a spec whose versions are cached
+    WHEN all specs are deleted and as many versions are written again
+    THEN the versions are read from the database again.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="2", model_count=1
+    )
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+
+    database_instance.delete_all_specs(sub="sub 1")
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="3", model_count=1
+    )
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="4", model_count=1
+    )
+
+    assert [info["version"] for info in _list_versions(database_instance)] == [
+        "3",
+        "4",
+    ]
+
+
+def test_no_generation(database_instance):
+    """
+    GIVEN database with a spec and a model count aggregate without a generation
+    WHEN list_spec_versions is called twice
+    THEN neither call is served from the cache.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    catalog.CustomerModelCount(
+        sub="sub 1",
+        updated_at_id=catalog.CustomerModelCount.UPDATED_AT_ID,
+        model_count=1,
+    ).save()
+
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+
+    assert cache.info() == cache.CacheInfo(hits=0, misses=2, size=0)
+
+
+def test_least_recently_used_evicted(monkeypatch, database_instance):
+    """
+    GIVEN cache with space for 2 values
+    WHEN 3 values are read and the first is read again after reading the second
+    THEN the least recently used value is evicted.
+    """
+    monkeypatch.setattr(config.get(), "cache_size", 2)
+    for name in ("spec 1", "spec 2", "spec 3"):
+        database_instance.create_update_spec(
+            sub="sub 1", name=name, version="1", model_count=1
+        )
+
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+    database_instance.list_spec_versions(sub="sub 1", name="spec 2")
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+    database_instance.list_spec_versions(sub="sub 1", name="spec 3")
+    assert cache.info().hits == 1
+
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+    assert cache.info().hits == 2
+    database_instance.list_spec_versions(sub="sub 1", name="spec 2")
+    assert cache.info() == cache.CacheInfo(hits=2, misses=4, size=2)
+
+
+def test_clear(database_instance):
+    """
+    GIVEN cache with a value
+    WHEN clear is called
+    THEN the value and the statistics are removed.
+    """
+    database_instance.create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    database_instance.list_spec_versions(sub="sub 1", name="spec 1")
+
+    cache.clear()
+
+    assert cache.info() == cache.CacheInfo(hits=0, misses=0, size=0)
@@ -0,0 +1,143 @@
+"""Tests for the configuration."""
+
+import operator
+
+import pytest
+from open_alchemy.package_database import config
+from pynamodb import settings
+
+
+@pytest.mark.parametrize(
+    "config_name",
+    [
+        pytest.param("max_pool_connections", id="max_pool_connections"),
+        pytest.param("connect_timeout_seconds", id="connect_timeout_seconds"),
+        pytest.param("read_timeout_seconds", id="read_timeout_seconds"),
+        pytest.param("max_retry_attempts", id="max_retry_attempts"),
+        pytest.param("base_backoff_ms", id="base_backoff_ms"),
+    ],
+)
+def test_config_env_default(monkeypatch, config_name):
+    """
+    GIVEN connection configuration where the environment variable is not set
+    WHEN the configuration is read
+    THEN the PynamoDB default is returned.
+    """
+    monkeypatch.delenv(f"DATABASE_{config_name.upper()}", raising=False)
+
+    returned_config = config._get()  # pylint: disable=protected-access
+
+    assert getattr(
+        returned_config.connection, config_name
+    ) == settings.get_settings_value(config_name)
+
+
+def test_config_cache_size_default(monkeypatch):
+    """
+    GIVEN the cache size environment variable is not set
+    WHEN the configuration is read
+    THEN the default cache size is returned.
+    """
+    monkeypatch.delenv("DATABASE_CACHE_SIZE", raising=False)
+
+    returned_config = config._get()  # pylint: disable=protected-access
+
+    assert returned_config.cache_size == config.DEFAULT_CACHE_SIZE
+
+
+@pytest.mark.parametrize(
+    "env_name, env_value, config_name, expected_value",
+    [
+        pytest.param("DATABASE_BACKEND", "MEMORY", "backend", config.Backend.MEMORY),
+        pytest.param(
+            "DATABASE_MAX_POOL_CONNECTIONS", "50", "connection.max_pool_connections", 50
+        ),
+        pytest.param(
+            "DATABASE_CONNECT_TIMEOUT_SECONDS",
+            "0.5",
+            "connection.connect_timeout_seconds",
+            0.5,
+        ),
+        pytest.param(
+            "DATABASE_READ_TIMEOUT_SECONDS", "2", "connection.read_timeout_seconds", 2.0
+        ),
+        pytest.param(
+            "DATABASE_MAX_RETRY_ATTEMPTS", "0", "connection.max_retry_attempts", 0
+        ),
+        pytest.param(
+            "DATABASE_BASE_BACKOFF_MS", "10", "connection.base_backoff_ms", 10
+        ),
+        pytest.param("DATABASE_CACHE_SIZE", "10", "cache_size", 10),
+    ],
+)
+def test_config_env(monkeypatch, env_name, env_value, config_name, expected_value):
+    """
+    GIVEN environment variable is set
+    WHEN the configuration is read
+    THEN the value of the environment variable is returned.
+    """
+    monkeypatch.setenv(env_name, env_value)
+
+    returned_config = config._get()  # pylint: disable=protected-access
+
+    assert operator.attrgetter(config_name)(returned_config) == expected_value
+
+
+@pytest.mark.parametrize(
+    "env_name, env_value",
+    [
+        pytest.param("DATABASE_BACKEND", "invalid", id="backend invalid"),
+        pytest.param(
+            "DATABASE_MAX_POOL_CONNECTIONS", "invalid", id="max_pool_connections"
+        ),
+        pytest.param(
+            "DATABASE_MAX_POOL_CONNECTIONS", "0", id="max_pool_connections too small"
+        ),
+        pytest.param("DATABASE_MAX_RETRY_ATTEMPTS", "1.5", id="max_retry_attempts"),
+        pytest.param(
+            "DATABASE_READ_TIMEOUT_SECONDS", "-1", id="read_timeout_seconds too small"
+        ),
+        pytest.param("DATABASE_CACHE_SIZE", "-1", id="cache_size too small"),
+    ],
+)
+def test_config_env_invalid(monkeypatch, env_name, env_value):
+    """
+    GIVEN environment variable with an invalid value
+    WHEN the configuration is read
+    THEN AssertionError is raised.
+    """
+    monkeypatch.setenv(env_name, env_value)
+
+    with pytest.raises(AssertionError):
+        config._get()  # pylint: disable=protected-access
+
+
+def test_models_meta():
+    """
+    GIVEN models
+    WHEN the connection settings of the models are read
+    THEN they are set to the configuration.
+    """
+    # pylint: disable=import-outside-toplevel
+    from open_alchemy.package_database import catalog, credentials, models
+
+    config_instance = config.get()
+    for model in (models.Spec, catalog.CustomerModelCount, credentials.Credentials):
+        connection = model._get_connection()  # pylint: disable=protected-access
+        connection_settings = connection.connection
+
+        assert connection_settings._max_pool_connections == (
+            config_instance.connection.max_pool_connections
+        )
+        assert connection_settings._connect_timeout_seconds == (
+            config_instance.connection.connect_timeout_seconds
+        )
+        assert connection_settings._read_timeout_seconds == (
+            config_instance.connection.read_timeout_seconds
+        )
+        assert connection_settings._max_retry_attempts_exception == (
+            config_instance.connection.max_retry_attempts
+        )
+        assert connection_settings._base_backoff_ms == (
+            config_instance.connection.base_backoff_ms
+        )
@@ -1,5 +1,6 @@
 """Tests for database facade."""
 
+import json
 import time
 from unittest import mock
 
@@ -127,10 +128,12 @@ def test_list_delete_all_spec(_clean_specs_table):
     assert spec_info["version"] == version_2
     assert spec_info["model_count"] == model_count_2
     assert "updated_at" in spec_info
+    assert json.loads(database_instance.list_specs_json(sub=sub)) == spec_infos
 
     database_instance.delete_all_specs(sub=sub)
 
     assert database_instance.list_specs(sub=sub) == []
+    assert database_instance.list_specs_json(sub=sub) == "[]"
 
 
 def test_get_spec(_clean_specs_table):
@@ -160,6 +163,52 @@ def test_get_spec(_clean_specs_table):
     assert returned_info["model_count"] == model_count
 
 
+def test_get_specs(_clean_specs_table):
+    """
+    GIVEN specs in the database
+    WHEN get_specs is called with existing, missing and duplicate names
+    THEN the infos of the existing specs are returned once in the order of the names.
+    """
+    sub = "sub 1"
+    database_instance = package_database.get()
+    for name, model_count in (("name 1", 1), ("name 2", 2)):
+        database_instance.create_update_spec(
+            sub=sub, name=name, version="version 1", model_count=model_count
+        )
+
+    returned_infos = database_instance.get_specs(
+        sub=sub, names=["name 2", "name 3", "Name 1", "name 2"]
+    )
+
+    assert [info["name"] for info in returned_infos] == ["name 2", "name 1"]
+    assert [info["model_count"] for info in returned_infos] == [2, 1]
+
+
+def test_get_latest_spec(_clean_specs_table):
+    """
+    GIVEN sub, name, version and model count
+    WHEN create_update_spec is called with the spec info and get_latest_spec is called
+    THEN the latest version and the spec info are returned.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    database_instance = package_database.get()
+
+    with pytest.raises(package_database.exceptions.NotFoundError):
+        database_instance.get_latest_spec(sub=sub, name=name)
+
+    version = "version 1"
+    model_count = 1
+    database_instance.create_update_spec(
+        sub=sub, name=name, version=version, model_count=model_count
+    )
+
+    returned_latest = database_instance.get_latest_spec(sub=sub, name=name)
+
+    assert returned_latest.version == version
+    assert returned_latest.info == database_instance.get_spec(sub=sub, name=name)
+
+
 def test_delete_spec(_clean_specs_table):
     """
     GIVEN sub, name, version and model count
@@ -179,14 +228,41 @@ def test_delete_spec(_clean_specs_table):
     assert database_instance.count_customer_models(sub=sub) == model_count
     assert database_instance.get_latest_spec_version(sub=sub, name=name) == version
 
-    database_instance.delete_spec(sub=sub, name=name)
+    progress = []
+    counts = database_instance.delete_spec(
+        sub=sub, name=name, on_progress=progress.append
+    )
 
+    assert counts.deleted == 2
+    assert progress[-1] == counts
     assert len(database_instance.list_specs(sub=sub)) == 0
     assert database_instance.count_customer_models(sub=sub) == 0
     with pytest.raises(package_database.exceptions.NotFoundError):
         database_instance.get_latest_spec_version(sub=sub, name=name)
 
 
+def test_delete_all_specs(_clean_specs_table):
+    """
+    GIVEN database with specs
+    WHEN delete_all_specs is called
+    THEN the specs are deleted and the counts of the deletion are returned.
+    """
+    sub = "sub 1"
+    database_instance = package_database.get()
+    for name in ("name 1", "name 2"):
+        database_instance.create_update_spec(
+            sub=sub, name=name, version="version 1", model_count=1
+        )
+
+    progress = []
+    counts = database_instance.delete_all_specs(sub=sub, on_progress=progress.append)
+
+    # The versions, the latest items and the model count aggregate
+    assert counts.deleted == 5
+    assert progress[-1] == counts
+    assert database_instance.list_specs(sub=sub) == []
+
+
 def test_list_spec_versions(monkeypatch, _clean_specs_table):
     """
     GIVEN sub, name, version and model count
@@ -247,6 +323,85 @@ def test_list_spec_versions(monkeypatch, _clean_specs_table):
     assert "updated_at" in spec_info
 
 
+def test_list_specs_page_iter_specs(_clean_specs_table):
+    """
+    GIVEN multiple specs
+    WHEN list_specs_page and iter_specs are called
+    THEN the specs are returned in pages and as an iterator.
+    """
+    sub = "sub 1"
+    database_instance = package_database.get()
+
+    page = database_instance.list_specs_page(sub=sub, limit=1)
+    assert page.items == []
+    assert page.cursor is None
+
+    for idx in range(3):
+        database_instance.create_update_spec(
+            sub=sub, name=f"name {idx}", version="version 1", model_count=1
+        )
+
+    names = []
+    cursor = None
+    while True:
+        page = database_instance.list_specs_page(sub=sub, limit=2, cursor=cursor)
+        assert len(page.items) <= 2
+        names.extend(spec_info["name"] for spec_info in page.items)
+        cursor = page.cursor
+        if cursor is None:
+            break
+    assert names == ["name 0", "name 1", "name 2"]
+
+    assert [
+        spec_info["name"] for spec_info in database_instance.iter_specs(sub=sub)
+    ] == names
+
+    with pytest.raises(package_database.exceptions.InvalidCursorError):
+        database_instance.list_specs_page(sub=sub, limit=1, cursor="invalid")
+
+
+def test_list_spec_versions_page_iter_spec_versions(monkeypatch, _clean_specs_table):
+    """
+    GIVEN multiple versions of a spec
+    WHEN list_spec_versions_page and iter_spec_versions are called
+    THEN the versions are returned in pages and as an iterator or NotFoundError is
+        raised.
+    """
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+    sub = "sub 1"
+    name = "name 1"
+    database_instance = package_database.get()
+
+    with pytest.raises(package_database.exceptions.NotFoundError):
+        database_instance.list_spec_versions_page(sub=sub, name=name, limit=1)
+    assert list(database_instance.iter_spec_versions(sub=sub, name=name)) == []
+
+    for idx in range(3):
+        mock_time.return_value = 1000000 * (idx + 1)
+        database_instance.create_update_spec(
+            sub=sub, name=name, version=f"version {idx}", model_count=1
+        )
+
+    versions = []
+    cursor = None
+    while True:
+        page = database_instance.list_spec_versions_page(
+            sub=sub, name=name, limit=2, cursor=cursor
+        )
+        assert len(page.items) <= 2
+        versions.extend(spec_info["version"] for spec_info in page.items)
+        cursor = page.cursor
+        if cursor is None:
+            break
+    assert versions == ["version 0", "version 1", "version 2"]
+
+    assert [
+        spec_info["version"]
+        for spec_info in database_instance.iter_spec_versions(sub=sub, name=name)
+    ] == versions
+
+
 def test_create_list_delete_all_credentials(_clean_credentials_table):
     """
     GIVE multiple credentials
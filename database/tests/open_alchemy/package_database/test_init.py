@@ -0,0 +1,39 @@
+"""Tests for the database facade construction."""
+
+import subprocess
+import sys
+
+from open_alchemy import package_database
+
+
+def test_import_lazy():
+    """
+    GIVEN new interpreter
+    WHEN the database facade package is imported
+    THEN PynamoDB and the models are not imported.
+    """
+    statement = (
+        "import sys; "
+        "from open_alchemy import package_database; "
+        "print(sorted(name for name in sys.modules "
+        "if name.startswith('pynamodb') or name.endswith('.models')))"
+    )
+
+    process = subprocess.run(
+        [sys.executable, "-c", statement], capture_output=True, check=True, text=True
+    )
+
+    assert process.stdout.strip() == "[]"
+
+
+def test_get_cached(monkeypatch):
+    """
+    GIVEN database facade that has not been constructed
+    WHEN get is called multiple times
+    THEN the database facade is constructed once.
+    """
+    monkeypatch.setitem(package_database._CACHE, "database", None)
+
+    returned_database = package_database.get()
+
+    assert returned_database is package_database.get()
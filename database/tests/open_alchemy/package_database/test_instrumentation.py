@@ -0,0 +1,284 @@
+"""Tests for the instrumentation of the database facade."""
+
+import pytest
+from open_alchemy.package_database import cache, config, dynamodb, instrumentation
+
+SUB = "sub 1"
+
+
+@pytest.mark.parametrize(
+    "operation_name, data, expected_pages, expected_items, expected_capacity",
+    [
+        pytest.param("PutItem", None, 0, 0, 0.0, id="no data"),
+        pytest.param(
+            "PutItem",
+            {"ConsumedCapacity": {"CapacityUnits": 1.0}},
+            0,
+            0,
+            1.0,
+            id="write",
+        ),
+        pytest.param(
+            "GetItem",
+            {"ConsumedCapacity": {"CapacityUnits": 0.5}},
+            0,
+            0,
+            0.5,
+            id="get item missing",
+        ),
+        pytest.param(
+            "GetItem",
+            {"Item": {}, "ConsumedCapacity": {"CapacityUnits": 0.5}},
+            0,
+            1,
+            0.5,
+            id="get item",
+        ),
+        pytest.param(
+            "Query",
+            {"Count": 3, "ConsumedCapacity": {"CapacityUnits": 1.5}},
+            1,
+            3,
+            1.5,
+            id="query",
+        ),
+        pytest.param("Scan", {"Count": 2}, 1, 2, 0.0, id="scan"),
+        pytest.param(
+            "BatchGetItem",
+            {
+                "Responses": {"table 1": [{}, {}], "table 2": [{}]},
+                "ConsumedCapacity": [
+                    {"CapacityUnits": 1.0},
+                    {"CapacityUnits": 0.5},
+                ],
+            },
+            0,
+            3,
+            1.5,
+            id="batch get item",
+        ),
+        pytest.param(
+            "TransactGetItems",
+            {
+                "Responses": [{"Item": {}}, {}],
+                "ConsumedCapacity": [{"CapacityUnits": 4.0}],
+            },
+            0,
+            1,
+            4.0,
+            id="transact get items",
+        ),
+    ],
+)
+def test_record_response(
+    operation_name, data, expected_pages, expected_items, expected_capacity
+):
+    """
+    GIVEN metrics, operation name and response
+    WHEN record_response is called with the metrics, operation name and response
+    THEN the pages, items and consumed capacity are added to the metrics.
+    """
+    metrics = instrumentation.Metrics(operation="operation 1", pages=1, items=1)
+
+    instrumentation.record_response(
+        metrics=metrics, operation_name=operation_name, data=data
+    )
+
+    assert metrics.pages == 1 + expected_pages
+    assert metrics.items == 1 + expected_items
+    assert metrics.consumed_capacity == expected_capacity
+
+
+def test_summary_as_dict():
+    """
+    GIVEN summary with metrics
+    WHEN as_dict is called
+    THEN the totals of the metrics are returned.
+    """
+    summary = instrumentation.Summary()
+    summary.record(
+        instrumentation.Metrics(
+            operation="operation 1",
+            duration=0.5,
+            requests=1,
+            pages=1,
+            items=2,
+            consumed_capacity=0.5,
+        )
+    )
+    summary.record(
+        instrumentation.Metrics(
+            operation="operation 2",
+            duration=0.25,
+            requests=2,
+            items=1,
+            consumed_capacity=1.0,
+            error="NotFoundError",
+        )
+    )
+    summary.record(instrumentation.Metrics(operation="operation 1"))
+
+    assert summary.as_dict() == {
+        "calls": 3,
+        "duration_ms": 750.0,
+        "requests": 3,
+        "pages": 1,
+        "items": 3,
+        "consumed_capacity": 1.5,
+        "errors": 1,
+        "operations": {"operation 1": 2, "operation 2": 1},
+    }
+
+
+def test_summarize(_clean_specs_table):
+    """
+    GIVEN database with a spec
+    WHEN methods of the database are called within summarize
+    THEN the metrics of each call are recorded on the summary.
+    """
+    database_instance = dynamodb.Database()
+    database_instance.create_update_spec(
+        sub=SUB, name="spec 1", version="1", model_count=1
+    )
+
+    with instrumentation.summarize() as summary:
+        database_instance.list_specs(sub=SUB)
+        with pytest.raises(dynamodb.exceptions.NotFoundError):
+            database_instance.get_spec(sub=SUB, name="spec 2")
+    database_instance.list_specs(sub=SUB)
+
+    assert [metrics.operation for metrics in summary.metrics] == [
+        "list_specs",
+        "get_spec",
+    ]
+    list_specs_metrics, get_spec_metrics = summary.metrics
+    assert list_specs_metrics.requests >= 1
+    assert list_specs_metrics.pages >= 1
+    assert list_specs_metrics.items >= 1
+    assert list_specs_metrics.duration > 0
+    assert list_specs_metrics.error is None
+    assert get_spec_metrics.requests == 1
+    assert get_spec_metrics.items == 0
+    assert get_spec_metrics.error == "NotFoundError"
+
+
+def test_hook(_clean_specs_table):
+    """
+    GIVEN hook that was added
+    WHEN methods of the database are called before and after the hook is removed
+    THEN the hook is called with the metrics of the calls before it was removed.
+    """
+    database_instance = dynamodb.Database()
+    recorded = []
+
+    instrumentation.add_hook(recorded.append)
+    try:
+        database_instance.count_customer_models(sub=SUB)
+    finally:
+        instrumentation.remove_hook(recorded.append)
+    database_instance.count_customer_models(sub=SUB)
+
+    assert len(recorded) == 1
+    assert recorded[0].operation == "count_customer_models"
+    assert recorded[0].requests >= 1
+
+
+def test_nested_calls(_clean_specs_table, _clean_credentials_table):
+    """
+    GIVEN database with specs and credentials
+    WHEN delete_all, which calls other methods of the database, is called within
+        summarize
+    THEN a single call including the requests of the nested calls is recorded.
+    """
+    database_instance = dynamodb.Database()
+    for idx in range(30):
+        database_instance.create_update_spec(
+            sub=SUB, name="spec 1", version=str(idx), model_count=1
+        )
+    database_instance.create_update_credentials(
+        sub=SUB,
+        id_="id 1",
+        public_key="public key 1",
+        secret_key_hash=b"secret key hash 1",
+        salt=b"salt 1",
+    )
+
+    with instrumentation.summarize() as summary:
+        database_instance.delete_all(sub=SUB)
+
+    assert len(summary.metrics) == 1
+    assert summary.metrics[0].operation == "delete_all"
+    # The 32 spec items need at least 2 batch writes from the bulk delete workers
+    assert summary.metrics[0].requests >= 4
+    assert summary.metrics[0].items >= 32
+
+
+@pytest.mark.parametrize("close", [False, True], ids=["exhausted", "closed"])
+def test_iterator(_clean_specs_table, close):
+    """
+    GIVEN database with specs
+    WHEN iter_specs is called within summarize and the iterator is exhausted or
+        closed
+    THEN the metrics are recorded once the iterator is exhausted or closed.
+    """
+    database_instance = dynamodb.Database()
+    for name in ("spec 1", "spec 2"):
+        database_instance.create_update_spec(
+            sub=SUB, name=name, version="1", model_count=1
+        )
+
+    with instrumentation.summarize() as summary:
+        iterator = database_instance.iter_specs(sub=SUB)
+        next(iterator)
+        assert not summary.metrics
+        if close:
+            iterator.close()
+        else:
+            assert len(list(iterator)) == 1
+
+    assert len(summary.metrics) == 1
+    assert summary.metrics[0].operation == "iter_specs"
+    assert summary.metrics[0].requests >= 1
+    assert summary.metrics[0].pages >= 1
+
+
+def test_iterator_not_instrumented(_clean_specs_table):
+    """
+    GIVEN no hook and no summary
+    WHEN iter_specs is called
+    THEN the specs are returned.
+    """
+    database_instance = dynamodb.Database()
+    database_instance.create_update_spec(
+        sub=SUB, name="spec 1", version="1", model_count=1
+    )
+
+    assert [info["name"] for info in database_instance.iter_specs(sub=SUB)] == [
+        "spec 1"
+    ]
+
+
+def test_cache(monkeypatch, _clean_specs_table):
+    """
+    GIVEN cached database with a spec
+    WHEN list_spec_versions is called twice within summarize
+    THEN the second call only sends the request for the generation.
+    """
+    monkeypatch.setattr(config.get(), "cache_size", 10)
+    cache.clear()
+    database_instance = cache.Database()
+    database_instance.create_update_spec(
+        sub=SUB, name="spec 1", version="1", model_count=1
+    )
+
+    with instrumentation.summarize() as summary:
+        database_instance.list_spec_versions(sub=SUB, name="spec 1")
+        database_instance.list_spec_versions(sub=SUB, name="spec 1")
+    cache.clear()
+
+    assert [metrics.operation for metrics in summary.metrics] == [
+        "list_spec_versions",
+        "list_spec_versions",
+    ]
+    assert summary.metrics[0].requests > summary.metrics[1].requests
+    assert summary.metrics[1].requests == 1
@@ -0,0 +1,573 @@
+"""Tests for the memory database facade."""
+
+import time
+from concurrent import futures
+from unittest import mock
+
+import pytest
+from open_alchemy import package_database
+from open_alchemy.package_database import (
+    cache,
+    catalog,
+    config,
+    dynamodb,
+    memory,
+    models,
+    pagination,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_memory_tables(monkeypatch):
+    """Start each test with empty memory tables."""
+    # pylint: disable=protected-access
+    monkeypatch.setattr(memory, "_TABLES", memory._Tables())
+
+
+def _call(database_instance, method_name, **kwargs):
+    """Call a method on the database and return the result or the exception type."""
+    try:
+        result = getattr(database_instance, method_name)(**kwargs)
+    except package_database.exceptions.BaseError as exc:
+        return type(exc)
+    if method_name.startswith("iter_"):
+        return list(result)
+    return result
+
+
+def _list_pages(database_instance, method_name, limit, **kwargs):
+    """Retrieve all pages and return the items on them or the exception type."""
+    items = []
+    cursor = None
+    while True:
+        page = _call(
+            database_instance, method_name, limit=limit, cursor=cursor, **kwargs
+        )
+        if not isinstance(page, package_database.types.SpecInfoPage):
+            return page
+        assert limit is None or len(page.items) <= limit
+        items.extend(page.items)
+        cursor = page.cursor
+        if cursor is None:
+            return items
+
+
+def _read_specs(database_instance, *, sub, names):
+    """Call all the spec read methods of the database."""
+    results = [
+        _call(database_instance, "count_customer_models", sub=sub),
+        _call(database_instance, "list_specs", sub=sub),
+        _call(database_instance, "list_specs_json", sub=sub),
+        _call(database_instance, "iter_specs", sub=sub),
+        _call(
+            database_instance,
+            "get_specs",
+            sub=sub,
+            names=[*reversed(names), "name 4", *names],
+        ),
+    ]
+    results.extend(
+        _list_pages(database_instance, "list_specs_page", sub=sub, limit=limit)
+        for limit in (None, 1, 2, 3)
+    )
+    for name in names:
+        results.extend(
+            [
+                _call(database_instance, "get_spec", sub=sub, name=name),
+                _call(database_instance, "get_latest_spec", sub=sub, name=name),
+                _call(database_instance, "get_latest_spec_version", sub=sub, name=name),
+                _call(database_instance, "list_spec_versions", sub=sub, name=name),
+                _call(database_instance, "iter_spec_versions", sub=sub, name=name),
+            ]
+        )
+        results.extend(
+            _list_pages(
+                database_instance,
+                "list_spec_versions_page",
+                sub=sub,
+                name=name,
+                limit=limit,
+            )
+            for limit in (None, 1, 2, 3)
+        )
+    return results
+
+
+def _write_read_specs(database_instance, mock_time):
+    """Write specs to the database and read them after each write."""
+    sub = "sub 1"
+    names = ["Name 1", "name 2", "name-3"]
+    results = [_read_specs(database_instance, sub=sub, names=names)]
+
+    writes = [
+        (1000, "Name 1", "1", 1, None, None),
+        (1000, "name 2", "1", 2, "title 2", None),
+        (2000, "Name 1", "2", 3, "title 1", "description 1"),
+        (2000, "name_3", "1", 4, None, "description 3"),
+        (2000, "name 2", "2", 5, None, None),
+        (3000, "Name 1", "3", 6, None, None),
+        (3000, "name 1", "4", 7, None, None),
+    ]
+    for updated_at, name, version, model_count, title, description in writes:
+        mock_time.return_value = updated_at
+        database_instance.create_update_spec(
+            sub=sub,
+            name=name,
+            version=version,
+            model_count=model_count,
+            title=title,
+            description=description,
+        )
+        results.append(_read_specs(database_instance, sub=sub, names=names))
+    results.append(_read_specs(database_instance, sub="sub 2", names=names))
+
+    database_instance.delete_spec(sub=sub, name="name 2")
+    results.append(_read_specs(database_instance, sub=sub, names=names))
+
+    database_instance.delete_all_specs(sub=sub)
+    results.append(_read_specs(database_instance, sub=sub, names=names))
+
+    return results
+
+
+def test_specs_match_dynamodb(monkeypatch, _clean_specs_table):
+    """
+    GIVEN memory and DynamoDB database
+    WHEN the same specs are written and read from both
+    THEN the same results are returned.
+    """
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+
+    memory_results = _write_read_specs(memory.Database(), mock_time)
+    dynamodb_results = _write_read_specs(dynamodb.Database(), mock_time)
+
+    assert memory_results == dynamodb_results
+
+
+def test_specs_with_catalog_match_dynamodb(monkeypatch, _clean_specs_table):
+    """
+    GIVEN memory database and DynamoDB database where the customer has a spec
+        catalog
+    WHEN the same specs are written and read from both
+    THEN the same results are returned.
+    """
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+    catalog.rebuild(model=models.Spec, sub="sub 1")
+
+    memory_results = _write_read_specs(memory.Database(), mock_time)
+    dynamodb_results = _write_read_specs(dynamodb.Database(), mock_time)
+
+    assert memory_results == dynamodb_results
+
+
+def _write_specs_max_model_count(database_instance):
+    """Write specs with a maximum model count and return the outcomes."""
+    results = []
+    for name, model_count in (
+        ("name 1", 2),
+        ("name 2", 3),
+        ("name 1", 3),
+        ("name 1", 1),
+        ("name 3", 2),
+        ("name 3", 1),
+    ):
+        try:
+            database_instance.create_update_spec(
+                sub="sub 1",
+                name=name,
+                version="1",
+                model_count=model_count,
+                max_model_count=5,
+            )
+            results.append(None)
+        except package_database.exceptions.BaseError as exc:
+            results.append(type(exc))
+        results.append(database_instance.count_customer_models(sub="sub 1"))
+    return results
+
+
+def test_max_model_count_match_dynamodb(_clean_specs_table):
+    """
+    GIVEN memory and DynamoDB database
+    WHEN the same specs are written with a maximum model count to both
+    THEN the same results are returned.
+    """
+    memory_results = _write_specs_max_model_count(memory.Database())
+    dynamodb_results = _write_specs_max_model_count(dynamodb.Database())
+
+    assert memory_results == dynamodb_results
+    assert package_database.exceptions.ModelCountExceededError in memory_results
+
+
+def _write_compact_specs(database_instance, mock_time):
+    """Write versions of specs, compact them and read them."""
+    sub = "sub 1"
+    for updated_at, name, version in (
+        (1000, "name 1", "1"),
+        (2000, "name 1", "2"),
+        (3000, "name 1", "1"),
+        (4000, "name 1", "3"),
+        (1000, "name 2", "1"),
+    ):
+        mock_time.return_value = updated_at
+        database_instance.create_update_spec(
+            sub=sub, name=name, version=version, model_count=1
+        )
+
+    results = [database_instance.list_spec_subs()]
+    for name, keep_last in (
+        ("name 1", None),
+        ("name 1", 2),
+        ("name 1", 1),
+        ("name 2", 0),
+        ("name 3", 0),
+    ):
+        results.append(
+            database_instance.compact_spec_versions(
+                sub=sub,
+                name=name,
+                retention=package_database.types.SpecRetention(keep_last=keep_last),
+            )
+        )
+        results.append(_read_specs(database_instance, sub=sub, names=["name 1"]))
+    return results
+
+
+def test_compact_specs_match_dynamodb(monkeypatch, _clean_specs_table):
+    """
+    GIVEN memory and DynamoDB database
+    WHEN the same specs are written and compacted in both
+    THEN the same results are returned.
+    """
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+
+    memory_results = _write_compact_specs(memory.Database(), mock_time)
+    dynamodb_results = _write_compact_specs(dynamodb.Database(), mock_time)
+
+    assert memory_results == dynamodb_results
+
+
+def _write_read_credentials(database_instance):
+    """Write credentials to the database and read them after each write."""
+    results = []
+
+    def read():
+        """Call all credentials read methods of the database."""
+        results.append(
+            [
+                _call(database_instance, "list_credentials", sub=sub)
+                for sub in ("sub 1", "sub 2")
+            ]
+            + [
+                _call(database_instance, "get_credentials", sub=sub, id_=id_)
+                for sub in ("sub 1", "sub 2")
+                for id_ in ("id 1", "id 2")
+            ]
+            + [
+                _call(database_instance, "get_user", public_key=public_key)
+                for public_key in (
+                    "public key 1",
+                    "public key 2",
+                    "public key 3",
+                    "public key 4",
+                )
+            ]
+        )
+
+    read()
+    writes = [
+        ("sub 1", "id 2", "public key 2"),
+        ("sub 1", "id 1", "public key 1"),
+        ("sub 2", "id 1", "public key 3"),
+        ("sub 2", "id 1", "public key 4"),
+    ]
+    for sub, id_, public_key in writes:
+        database_instance.create_update_credentials(
+            sub=sub,
+            id_=id_,
+            public_key=public_key,
+            secret_key_hash=f"secret key hash {public_key}".encode(),
+            salt=f"salt {public_key}".encode(),
+        )
+        read()
+
+    database_instance.delete_credentials(sub="sub 1", id_="id 2")
+    read()
+    database_instance.delete_credentials(sub="sub 1", id_="id 3")
+    read()
+    database_instance.delete_all_credentials(sub="sub 1")
+    read()
+    database_instance.create_update_spec(
+        sub="sub 2", name="name 1", version="1", model_count=1
+    )
+    database_instance.delete_all(sub="sub 2")
+    read()
+    results.append(_call(database_instance, "list_specs", sub="sub 2"))
+
+    return results
+
+
+def test_credentials_match_dynamodb(_clean_specs_table, _clean_credentials_table):
+    """
+    GIVEN memory and DynamoDB database
+    WHEN the same credentials are written and read from both
+    THEN the same results are returned.
+    """
+    memory_results = _write_read_credentials(memory.Database())
+    dynamodb_results = _write_read_credentials(dynamodb.Database())
+
+    assert memory_results == dynamodb_results
+
+
+def test_instances_share_tables():
+    """
+    GIVEN spec and credentials written using a memory database
+    WHEN they are read using another memory database
+    THEN they are returned.
+    """
+    memory.Database().create_update_spec(
+        sub="sub 1", name="spec 1", version="1", model_count=1
+    )
+    memory.Database().create_update_credentials(
+        sub="sub 1",
+        id_="id 1",
+        public_key="public key 1",
+        secret_key_hash=b"secret key hash 1",
+        salt=b"salt 1",
+    )
+
+    database_instance = memory.Database()
+    assert database_instance.get_latest_spec_version(sub="sub 1", name="spec 1") == "1"
+    assert database_instance.get_user(public_key="public key 1") is not None
+
+
+def test_delete_counts():
+    """
+    GIVEN memory database with specs
+    WHEN a spec and then all specs are deleted
+    THEN the counts of the deleted items are returned and reported.
+    """
+    database_instance = memory.Database()
+    for name in ("spec 1", "spec 2"):
+        database_instance.create_update_spec(
+            sub="sub 1", name=name, version="1", model_count=1
+        )
+    progress = []
+
+    spec_counts = database_instance.delete_spec(
+        sub="sub 1", name="spec 1", on_progress=progress.append
+    )
+    all_counts = database_instance.delete_all_specs(
+        sub="sub 1", on_progress=progress.append
+    )
+    empty_counts = database_instance.delete_all_specs(
+        sub="sub 1", on_progress=progress.append
+    )
+
+    assert spec_counts == package_database.types.BulkDeleteCounts(
+        queued=2, deleted=2, batches=1
+    )
+    assert all_counts == spec_counts
+    assert empty_counts == package_database.types.BulkDeleteCounts()
+    assert progress == [spec_counts, all_counts]
+
+
+def test_credentials_concurrent():
+    """
+    GIVEN memory database
+    WHEN credentials are created, updated and deleted in parallel
+    THEN every remaining credentials can be looked up by its public key only.
+    """
+    database_instance = memory.Database()
+
+    def write(idx):
+        """Create, update and delete credentials."""
+        for key_idx in range(3):
+            database_instance.create_update_credentials(
+                sub="sub 1",
+                id_=f"id {idx % 10}",
+                public_key=f"public key {idx} {key_idx}",
+                secret_key_hash=b"secret key hash",
+                salt=b"salt",
+            )
+        if idx % 3 == 0:
+            database_instance.delete_credentials(sub="sub 1", id_=f"id {idx % 10}")
+
+    with futures.ThreadPoolExecutor(max_workers=32) as executor:
+        list(executor.map(write, range(200)))
+
+    public_keys = [
+        f"public key {idx} {key_idx}" for idx in range(200) for key_idx in range(3)
+    ]
+    found_public_keys = [
+        public_key
+        for public_key in public_keys
+        if database_instance.get_user(public_key=public_key) is not None
+    ]
+    credentials = database_instance.list_credentials(sub="sub 1")
+    assert sorted(found_public_keys) == sorted(
+        info["public_key"] for info in credentials
+    )
+
+
+def test_create_update_spec_concurrent(monkeypatch):
+    """
+    GIVEN memory database with a spec and a clock that does not advance
+    WHEN create_update_spec is called for the spec hundreds of times in parallel
+    THEN every version is stored with a unique and increasing sort key.
+    """
+    monkeypatch.setattr(time, "time", mock.MagicMock(return_value=1000))
+    count = 200
+    database = memory.Database()
+    database.create_update_spec(
+        sub="sub 1", name="spec 1", version="initial", model_count=1
+    )
+
+    with futures.ThreadPoolExecutor(max_workers=32) as executor:
+        list(
+            executor.map(
+                lambda idx: database.create_update_spec(
+                    sub="sub 1", name="spec 1", version=str(idx), model_count=1
+                ),
+                range(count),
+            )
+        )
+
+    versions = database.list_spec_versions(sub="sub 1", name="spec 1")
+    assert len(versions) == count + 1
+    assert {version["version"] for version in versions} == {"initial"} | {
+        str(idx) for idx in range(count)
+    }
+    # pylint: disable=protected-access
+    updated_at_ids = sorted(
+        item.updated_at_id
+        for item in memory._TABLES.specs["sub 1"].values()
+        if not item.updated_at_id.startswith(models.Spec.UPDATED_AT_LATEST)
+    )
+    assert updated_at_ids[-1] == f"{'1000'.zfill(20)}.{str(count).zfill(6)}#spec 1"
+    assert (
+        database.get_latest_spec(sub="sub 1", name="spec 1").version
+        == versions[-1]["version"]
+    )
+
+
+INVALID_CURSOR_TESTS = [
+    pytest.param("list_specs_page", {}, "invalid", id="specs malformed"),
+    pytest.param(
+        "list_specs_page",
+        {},
+        pagination.encode(key={"sub": {"S": "sub 2"}, "updated_at_id": {"S": "a"}}),
+        id="specs different sub",
+    ),
+    pytest.param(
+        "list_specs_page",
+        {},
+        pagination.encode(key={"sub": {"S": "sub 1"}}),
+        id="specs key missing",
+    ),
+    pytest.param(
+        "list_specs_page",
+        {},
+        pagination.encode(key={"sub": {"S": "sub 1"}, "updated_at_id": "a"}),
+        id="specs key wrong type",
+    ),
+    pytest.param(
+        "list_specs_page",
+        {},
+        pagination.encode(key={"sub": {"S": "sub 1"}, "updated_at_id": {"S": 1}}),
+        id="specs key value wrong type",
+    ),
+    pytest.param(
+        "list_specs_page",
+        {},
+        pagination.encode(
+            key={"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#spec 1"}}
+        ),
+        id="specs key not latest",
+    ),
+    pytest.param(
+        "list_spec_versions_page",
+        {"name": "name 1"},
+        pagination.encode(key={"sub": {"S": "sub 1"}, "updated_at_id": {"S": "a"}}),
+        id="versions key missing",
+    ),
+    pytest.param(
+        "list_spec_versions_page",
+        {"name": "name 1"},
+        pagination.encode(
+            key={
+                "sub": {"S": "sub 1"},
+                "updated_at_id": {"S": "a"},
+                "id_updated_at": {"S": f"{models.Spec.calc_id('name 2')}#a"},
+            }
+        ),
+        id="versions key of other spec",
+    ),
+]
+
+
+def test_list_spec_versions_page_limit(monkeypatch):
+    """
+    GIVEN memory database with versions of a spec
+    WHEN pages of versions are listed
+    THEN the pages are filled up to the limit and there is only a cursor when more
+        versions follow.
+    """
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+    database_instance = memory.Database()
+    for updated_at in (1000, 2000):
+        mock_time.return_value = updated_at
+        database_instance.create_update_spec(
+            sub="sub 1", name="name 1", version=str(updated_at), model_count=1
+        )
+
+    page_1 = database_instance.list_spec_versions_page(
+        sub="sub 1", name="name 1", limit=1
+    )
+    assert [item["version"] for item in page_1.items] == ["1000"]
+    assert page_1.cursor is not None
+
+    page_2 = database_instance.list_spec_versions_page(
+        sub="sub 1", name="name 1", limit=1, cursor=page_1.cursor
+    )
+    assert [item["version"] for item in page_2.items] == ["2000"]
+    assert page_2.cursor is None
+
+
+@pytest.mark.parametrize("method_name, kwargs, cursor", INVALID_CURSOR_TESTS)
+def test_invalid_cursor(method_name, kwargs, cursor):
+    """
+    GIVEN memory database and invalid cursor
+    WHEN a page is listed with the cursor
+    THEN InvalidCursorError is raised.
+    """
+    database_instance = memory.Database()
+
+    with pytest.raises(package_database.exceptions.InvalidCursorError):
+        getattr(database_instance, method_name)(
+            sub="sub 1", limit=1, cursor=cursor, **kwargs
+        )
+
+
+@pytest.mark.parametrize(
+    "backend, cache_size, expected_type",
+    [
+        pytest.param(config.Backend.DYNAMODB, 0, dynamodb.Database, id="dynamodb"),
+        pytest.param(config.Backend.DYNAMODB, 10, cache.Database, id="dynamodb cache"),
+        pytest.param(config.Backend.MEMORY, 10, memory.Database, id="memory"),
+    ],
+)
+def test_construct(monkeypatch, backend, cache_size, expected_type):
+    """
+    GIVEN backend and cache size in the configuration
+    WHEN the database facade is constructed
+    THEN the database for the backend is returned.
+    """
+    monkeypatch.setattr(config.get(), "backend", backend)
+    monkeypatch.setattr(config.get(), "cache_size", cache_size)
+
+    assert type(package_database._construct()) is expected_type
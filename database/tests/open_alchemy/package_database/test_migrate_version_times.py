@@ -0,0 +1,142 @@
+"""Tests for the migrate version times command."""
+
+import pytest
+from open_alchemy.package_database import (
+    factory,
+    migrate_version_times,
+    models,
+    version_times,
+)
+
+
+def save_spec(*, sub, updated_ats, version_updated_at_id=None):
+    """Save versions without microseconds and the latest item of a spec."""
+    for updated_at in updated_ats:
+        index_values = models.Spec.calc_index_values(updated_at=updated_at, id_="spec1")
+        factory.SpecFactory(
+            sub=sub,
+            id="spec1",
+            name="spec1",
+            updated_at=updated_at,
+            version=updated_at,
+            updated_at_id=index_values.updated_at_id,
+            id_updated_at=index_values.id_updated_at,
+        ).save()
+    index_values = models.Spec.calc_index_values(
+        updated_at=models.Spec.UPDATED_AT_LATEST, id_="spec1"
+    )
+    factory.SpecFactory(
+        sub=sub,
+        id="spec1",
+        name="spec1",
+        updated_at=updated_ats[-1],
+        version=updated_ats[-1],
+        updated_at_id=index_values.updated_at_id,
+        id_updated_at=index_values.id_updated_at,
+        version_updated_at_id=version_updated_at_id,
+    ).save()
+
+
+def version_updated_at_ids(sub):
+    """Retrieve the sort keys of the versions of a customer."""
+    return [
+        item.updated_at_id
+        for item in models.Spec.query(sub, models.Spec.updated_at_id.startswith("0"))
+    ]
+
+
+def latest_item(sub):
+    """Retrieve the latest item of the spec."""
+    return models.Spec.get(
+        hash_key=sub, range_key=f"{models.Spec.UPDATED_AT_LATEST}#spec1"
+    )
+
+
+@pytest.mark.models
+def test_migrate_version_times(_clean_specs_table):
+    """
+    GIVEN versions of a spec without microseconds
+    WHEN migrate is called twice
+    THEN the versions are moved to sort keys with microseconds
+    AND the latest item points to the last version.
+    """
+    sub = "sub 1"
+    save_spec(sub=sub, updated_ats=["1000", "2000"])
+
+    assert version_times.migrate(model=models.Spec, sub=sub) == 2
+    assert version_times.migrate(model=models.Spec, sub=sub) == 0
+
+    expected_updated_at_ids = [
+        f"{'1000'.zfill(20)}.000000#spec1",
+        f"{'2000'.zfill(20)}.000000#spec1",
+    ]
+    assert version_updated_at_ids(sub) == expected_updated_at_ids
+    assert [
+        item["version"] for item in models.Spec.list_versions(sub=sub, name="spec1")
+    ] == ["1000", "2000"]
+    assert latest_item(sub).version_updated_at_id == expected_updated_at_ids[-1]
+
+
+@pytest.mark.models
+def test_migrate_version_times_latest_updated(_clean_specs_table):
+    """
+    GIVEN a spec whose latest item already points to a version
+    WHEN migrate is called
+    THEN the latest item is not changed.
+    """
+    sub = "sub 1"
+    save_spec(sub=sub, updated_ats=["1000"], version_updated_at_id="other")
+
+    version_times.migrate(model=models.Spec, sub=sub)
+
+    assert latest_item(sub).version_updated_at_id == "other"
+
+
+@pytest.mark.models
+def test_migrate_version_times_latest_changed(_clean_specs_table, monkeypatch):
+    """
+    GIVEN a spec whose latest item is pointed to a version by another writer during
+        the migration
+    WHEN migrate is called
+    THEN the latest item is not changed.
+    """
+    sub = "sub 1"
+    save_spec(sub=sub, updated_ats=["1000"])
+    original_query = models.Spec.query
+
+    def query(*args, **kwargs):
+        """Update the latest item before it is retrieved."""
+        if "attributes_to_get" in kwargs:
+            item = latest_item(sub)
+            item.version_updated_at_id = "other"
+            item.save()
+            monkeypatch.setattr(models.Spec, "query", original_query)
+            return [models.Spec(sub=sub, updated_at_id=item.updated_at_id, id="spec1")]
+        return original_query(*args, **kwargs)
+
+    monkeypatch.setattr(models.Spec, "query", query)
+
+    version_times.migrate(model=models.Spec, sub=sub)
+
+    assert latest_item(sub).version_updated_at_id == "other"
+
+
+@pytest.mark.models
+def test_main(_clean_specs_table):
+    """
+    GIVEN versions without microseconds for multiple customers
+    WHEN main is called with and without subs
+    THEN the versions of the customers are migrated.
+    """
+    save_spec(sub="sub 1", updated_ats=["1000"])
+    save_spec(sub="sub 2", updated_ats=["1000"])
+    expected_updated_at_ids = [f"{'1000'.zfill(20)}.000000#spec1"]
+
+    migrate_version_times.main(["--sub", "sub 2"])
+
+    assert version_updated_at_ids("sub 1") == [f"{'1000'.zfill(20)}#spec1"]
+    assert version_updated_at_ids("sub 2") == expected_updated_at_ids
+
+    migrate_version_times.main([])
+
+    assert version_updated_at_ids("sub 1") == expected_updated_at_ids
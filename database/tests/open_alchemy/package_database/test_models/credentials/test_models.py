@@ -1,7 +1,10 @@
 """Tests for the models."""
 
+from unittest import mock
+
 import pytest
-from open_alchemy.package_database import factory, models, types
+from open_alchemy.package_database import credentials, exceptions, factory, types
+from pynamodb import exceptions as pynamodb_exceptions
 
 LIST_TESTS = [
     pytest.param([], "sub 1", [], id="empty"),
@@ -67,23 +70,35 @@ def test_list_(items, sub, expected_idx_list):
     for item in items:
         item.save()
 
-    returned_infos = models.Credentials.list_(sub=sub)
+    returned_infos = credentials.Credentials.list_(sub=sub)
 
     expected_infos = list(
         map(
-            models.Credentials.item_to_info,
+            credentials.Credentials.item_to_info,
             map(lambda idx: items[idx], expected_idx_list),
         )
     )
     assert returned_infos == expected_infos
 
 
+def lookup_item_count(public_key):
+    """Count the lookup items for a public key."""
+    return len(
+        list(
+            credentials.CredentialsPublicKey.query(
+                credentials.CredentialsPublicKey.calc_sub(public_key)
+            )
+        )
+    )
+
+
 @pytest.mark.models
 def test_create_update_item():
     """
     GIVEN credentials properties and empty database
     WHEN create_update_item is called with the credentials properties and then updated
-    THEN the credentials are written to the database and can be queried using indexes.
+    THEN the credentials are written to the database and can be queried using indexes
+        and the lookup item of the public key.
     """
     sub = "sub 1"
     id_ = "id 1"
@@ -91,7 +106,7 @@ def test_create_update_item():
     secret_key_hash_1 = b"secret key hash 1"
     salt_1 = b"salt 1"
 
-    models.Credentials.create_update_item(
+    credentials.Credentials.create_update_item(
         sub=sub,
         id_=id_,
         public_key=public_key_1,
@@ -99,21 +114,23 @@ def test_create_update_item():
         salt=salt_1,
     )
 
-    created_item = models.Credentials.get(hash_key=sub, range_key=id_)
+    created_item = credentials.Credentials.get(hash_key=sub, range_key=id_)
     assert created_item.public_key == public_key_1
     assert created_item.secret_key_hash == secret_key_hash_1
     assert created_item.salt == salt_1
 
-    assert len(list(models.Credentials.scan())) == 1
+    assert len(list(credentials.Credentials.scan())) == 2
     assert (
-        len(list(models.Credentials.public_key_index.query(hash_key=public_key_1))) == 1
+        len(list(credentials.Credentials.public_key_index.query(hash_key=public_key_1)))
+        == 1
     )
+    assert lookup_item_count(public_key_1) == 1
 
     public_key_2 = "public key 2"
     secret_key_hash_2 = b"secret key hash 2"
     salt_2 = b"salt 2"
 
-    models.Credentials.create_update_item(
+    credentials.Credentials.create_update_item(
         sub=sub,
         id_=id_,
         public_key=public_key_2,
@@ -121,18 +138,122 @@ def test_create_update_item():
         salt=salt_2,
     )
 
-    updated_item = models.Credentials.get(hash_key=sub, range_key=id_)
+    updated_item = credentials.Credentials.get(hash_key=sub, range_key=id_)
     assert updated_item.public_key == public_key_2
     assert updated_item.secret_key_hash == secret_key_hash_2
     assert updated_item.salt == salt_2
 
-    assert len(list(models.Credentials.scan())) == 1
+    assert len(list(credentials.Credentials.scan())) == 2
     assert (
-        len(list(models.Credentials.public_key_index.query(hash_key=public_key_1))) == 0
+        len(list(credentials.Credentials.public_key_index.query(hash_key=public_key_1)))
+        == 0
     )
     assert (
-        len(list(models.Credentials.public_key_index.query(hash_key=public_key_2))) == 1
+        len(list(credentials.Credentials.public_key_index.query(hash_key=public_key_2)))
+        == 1
     )
+    assert lookup_item_count(public_key_1) == 0
+    assert lookup_item_count(public_key_2) == 1
+    lookup_item = credentials.CredentialsPublicKey.get(
+        hash_key=credentials.CredentialsPublicKey.calc_sub(public_key_2),
+        range_key=credentials.PUBLIC_KEY_ID,
+    )
+    assert lookup_item.credentials_sub == sub
+    assert lookup_item.credentials_id == id_
+    assert lookup_item.secret_key_hash == secret_key_hash_2
+    assert lookup_item.salt == salt_2
+
+
+def create_update(public_key):
+    """Write credentials with a public key."""
+    credentials.Credentials.create_update_item(
+        sub="sub 1",
+        id_="id 1",
+        public_key=public_key,
+        secret_key_hash=b"secret key hash 1",
+        salt=b"salt 1",
+    )
+
+
+def change_after_get(monkeypatch, public_key):
+    """Change the public key of the credentials after they are first retrieved."""
+    original_get = credentials.Credentials.get
+    changed = False
+
+    def get(*args, **kwargs):
+        """Retrieve the credentials and change them the first time."""
+        nonlocal changed
+        try:
+            return original_get(*args, **kwargs)
+        finally:
+            if not changed:
+                changed = True
+                create_update(public_key)
+
+    monkeypatch.setattr(credentials.Credentials, "get", get)
+
+
+@pytest.mark.parametrize(
+    "initial_public_key",
+    [pytest.param(None, id="create"), pytest.param("public key 1", id="update")],
+)
+@pytest.mark.models
+def test_create_update_item_concurrent(monkeypatch, initial_public_key):
+    """
+    GIVEN credentials that are regenerated after create_update_item reads them
+    WHEN create_update_item is called
+    THEN the write is retried and only the lookup item of the written public key is
+        left.
+    """
+    if initial_public_key is not None:
+        create_update(initial_public_key)
+    change_after_get(monkeypatch, "public key 2")
+
+    create_update("public key 3")
+
+    item = credentials.Credentials.get(hash_key="sub 1", range_key="id 1")
+    assert item.public_key == "public key 3"
+    assert lookup_item_count("public key 1") == 0
+    assert lookup_item_count("public key 2") == 0
+    assert lookup_item_count("public key 3") == 1
+
+
+@pytest.mark.models
+def test_create_update_item_conflict(monkeypatch):
+    """
+    GIVEN credentials whose public key keeps changing after it is read
+    WHEN create_update_item is called
+    THEN ConflictError is raised and the credentials are not changed.
+    """
+    create_update("public key 1")
+    monkeypatch.setattr(
+        credentials.Credentials,
+        "get",
+        mock.MagicMock(return_value=credentials.Credentials(public_key="stale")),
+    )
+
+    with pytest.raises(exceptions.ConflictError):
+        create_update("public key 2")
+
+    assert lookup_item_count("public key 1") == 1
+    assert lookup_item_count("public key 2") == 0
+
+
+@pytest.mark.models
+def test_create_update_item_error(monkeypatch):
+    """
+    GIVEN writing the credentials fails for a reason other than a conflict
+    WHEN create_update_item is called
+    THEN the error is raised.
+    """
+    monkeypatch.setattr(
+        credentials.Credentials,
+        "_create_update",
+        mock.MagicMock(side_effect=pynamodb_exceptions.TransactWriteError("failed")),
+    )
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        create_update("public key 1")
 
 
 PARTITION_SORT_KEY_TESTS = [
@@ -174,7 +295,7 @@ def test_partition_sort_key(items, expected_item_count):
     for item in items:
         item.save()
 
-    assert len(list(models.Credentials.scan())) == expected_item_count
+    assert len(list(credentials.Credentials.scan())) == expected_item_count
 
 
 @pytest.mark.models
@@ -186,7 +307,7 @@ def test_item_to_info():
     """
     item = factory.CredentialsFactory()
 
-    spec_info = models.Credentials.item_to_info(item)
+    spec_info = credentials.Credentials.item_to_info(item)
 
     assert spec_info["id"] == item.id
     assert spec_info["public_key"] == item.public_key
@@ -237,7 +358,7 @@ def test_get_item(item, sub, id_, expected_info):
     """
     item.save()
 
-    returned_info = models.Credentials.get_item(sub=sub, id_=id_)
+    returned_info = credentials.Credentials.get_item(sub=sub, id_=id_)
 
     assert returned_info == expected_info
 
@@ -269,15 +390,67 @@ GET_USER_TESTS = [
 @pytest.mark.models
 def test_get_user(item, public_key, expected_info):
     """
-    GIVEN database with item and public key
+    GIVEN database with item written using create_update_item and public key
     WHEN get_user is called with the public key
     THEN the expected info is returned.
     """
+    credentials.Credentials.create_update_item(
+        sub=item.sub,
+        id_=item.id,
+        public_key=item.public_key,
+        secret_key_hash=item.secret_key_hash,
+        salt=item.salt,
+    )
+
+    returned_info = credentials.Credentials.get_user(public_key=public_key)
+
+    assert returned_info == expected_info
+
+
+@pytest.mark.parametrize("item, public_key, expected_info", GET_USER_TESTS)
+@pytest.mark.models
+def test_get_user_without_lookup_item(item, public_key, expected_info):
+    """
+    GIVEN database with item without the lookup item for its public key and public
+        key
+    WHEN get_user is called with the public key
+    THEN the expected info is returned and the lookup item is written for a hit.
+    """
     item.save()
 
-    returned_info = models.Credentials.get_user(public_key=public_key)
+    returned_info = credentials.Credentials.get_user(public_key=public_key)
 
     assert returned_info == expected_info
+    assert lookup_item_count(public_key) == (0 if expected_info is None else 1)
+    assert credentials.Credentials.get_user(public_key=public_key) == expected_info
+
+
+@pytest.mark.models
+def test_get_user_without_lookup_item_changed(monkeypatch):
+    """
+    GIVEN database with credentials without the lookup item that are changed after
+        they are retrieved using the index
+    WHEN get_user is called with the public key
+    THEN the lookup item is not written.
+    """
+    item = factory.CredentialsFactory(public_key="public key 1")
+    item.save()
+    original_query = credentials.Credentials.public_key_index.query
+
+    def query(*args, **kwargs):
+        """Change the public key of the credentials after retrieving them."""
+        items = list(original_query(*args, **kwargs))
+        changed_item = credentials.Credentials.get(hash_key=item.sub, range_key=item.id)
+        changed_item.public_key = "public key 2"
+        changed_item.save()
+        return iter(items)
+
+    monkeypatch.setattr(credentials.Credentials.public_key_index, "query", query)
+
+    returned_info = credentials.Credentials.get_user(public_key="public key 1")
+
+    assert returned_info is not None
+    assert lookup_item_count("public key 1") == 0
 
 
 DELETE_ITEM_TESTS = [
@@ -323,11 +496,47 @@ def test_delete_item(item, sub, id_, expected_count):
     THEN the database contains the expected number of items.
     """
     item.save()
-    assert len(list(models.Credentials.scan())) == 1
+    assert len(list(credentials.Credentials.scan())) == 1
 
-    models.Credentials.delete_item(sub=sub, id_=id_)
+    credentials.Credentials.delete_item(sub=sub, id_=id_)
 
-    assert len(list(models.Credentials.scan())) == expected_count
+    assert len(list(credentials.Credentials.scan())) == expected_count
+
+
+@pytest.mark.models
+def test_delete_item_lookup_item():
+    """
+    GIVEN database with credentials written using create_update_item
+    WHEN delete_item is called for the credentials
+    THEN the credentials and the lookup item of the public key are deleted.
+    """
+    credentials.Credentials.create_update_item(
+        sub="sub 1",
+        id_="id 1",
+        public_key="public key 1",
+        secret_key_hash=b"secret key hash 1",
+        salt=b"salt 1",
+    )
+
+    credentials.Credentials.delete_item(sub="sub 1", id_="id 1")
+
+    assert list(credentials.Credentials.scan()) == []
+    assert credentials.Credentials.get_user(public_key="public key 1") is None
+
+
+@pytest.mark.models
+def test_delete_item_concurrent(monkeypatch):
+    """
+    GIVEN credentials that are regenerated after delete_item reads them
+    WHEN delete_item is called
+    THEN the delete is retried and the credentials and all lookup items are deleted.
+    """
+    create_update("public key 1")
+    change_after_get(monkeypatch, "public key 2")
+
+    credentials.Credentials.delete_item(sub="sub 1", id_="id 1")
+
+    assert list(credentials.Credentials.scan()) == []
 
 
 DELETE_ALL_TESTS = [
@@ -387,8 +596,38 @@ def test_delete_all(items, sub, expected_count):
     """
     for item in items:
         item.save()
-    assert len(list(models.Credentials.scan())) == len(items)
+    assert len(list(credentials.Credentials.scan())) == len(items)
+
+    credentials.Credentials.delete_all(sub=sub)
+
+    assert len(list(credentials.Credentials.scan())) == expected_count
+
+
+@pytest.mark.models
+def test_delete_all_lookup_items():
+    """
+    GIVEN database with credentials of multiple users written using
+        create_update_item
+    WHEN delete_all is called with the sub of one of the users
+    THEN the credentials and lookup items of only that user are deleted.
+    """
+    for sub, id_, public_key in (
+        ("sub 1", "id 1", "public key 1"),
+        ("sub 1", "id 2", "public key 2"),
+        ("sub 2", "id 1", "public key 3"),
+    ):
+        credentials.Credentials.create_update_item(
+            sub=sub,
+            id_=id_,
+            public_key=public_key,
+            secret_key_hash=b"secret key hash",
+            salt=b"salt",
+        )
 
-    models.Credentials.delete_all(sub=sub)
+    counts = credentials.Credentials.delete_all(sub="sub 1")
 
-    assert len(list(models.Credentials.scan())) == expected_count
+    assert counts.deleted == 4
+    assert credentials.Credentials.get_user(public_key="public key 1") is None
+    assert credentials.Credentials.get_user(public_key="public key 2") is None
+    assert credentials.Credentials.get_user(public_key="public key 3") is not None
+    assert len(list(credentials.Credentials.scan())) == 2
@@ -0,0 +1,385 @@
+"""Tests for maintaining the spec catalog."""
+
+import json
+from unittest import mock
+
+import pytest
+from open_alchemy.package_database import catalog, models
+from pynamodb import exceptions as pynamodb_exceptions
+
+SUB = "sub 1"
+
+
+def get_catalog_infos(sub):
+    """Retrieve the entries of the spec catalog."""
+    return catalog.CustomerSpecCatalog.get(
+        hash_key=sub, range_key=catalog.CustomerSpecCatalog.UPDATED_AT_ID
+    ).infos.as_dict()
+
+
+def get_aggregate(sub):
+    """Retrieve the model count aggregate."""
+    return catalog.CustomerModelCount.get(
+        hash_key=sub, range_key=catalog.CustomerModelCount.UPDATED_AT_ID
+    )
+
+
+def query_infos(sub):
+    """Retrieve the information about the specs from the latest items."""
+    return list(
+        map(
+            models.Spec.item_to_info,
+            models.Spec.query_latest(sub=sub, consistent_read=True),
+        )
+    )
+
+
+def assert_catalog_consistent(sub):
+    """Check the catalog against the latest items and the aggregate."""
+    infos = get_catalog_infos(sub)
+    assert {id_: json.loads(info_json) for id_, info_json in infos.items()} == {
+        info["id"]: info for info in query_infos(sub)
+    }
+    assert int(get_aggregate(sub).catalog_size) == sum(
+        catalog.CustomerSpecCatalog.calc_entry_size(id_, info_json)
+        for id_, info_json in infos.items()
+    )
+
+
+def create_specs(sub):
+    """Create multiple specs with and without title and description."""
+    models.Spec.create_update_item(
+        sub=sub, name="spec 2", version="1", model_count=2, title="title 2"
+    )
+    models.Spec.create_update_item(
+        sub=sub,
+        name="spec 1",
+        version="1",
+        model_count=1,
+        title="title 1",
+        description="description 1",
+    )
+
+
+@pytest.mark.models
+def test_rebuild_catalog():
+    """
+    GIVEN specs for multiple customers
+    WHEN rebuild is called with one of the subs
+    THEN the catalog of only that customer is written with the information about
+        the latest specs and the model count aggregate is rebuilt.
+    """
+    create_specs(SUB)
+    create_specs("sub 2")
+    models.Spec.reconcile_customer_models(sub=SUB)
+    get_aggregate(SUB).update(actions=[catalog.CustomerModelCount.model_count.set(0)])
+
+    returned_has_catalog = catalog.rebuild(model=models.Spec, sub=SUB)
+
+    assert returned_has_catalog is True
+    assert_catalog_consistent(SUB)
+    assert get_aggregate(SUB).model_count == 3
+    with pytest.raises(catalog.CustomerSpecCatalog.DoesNotExist):
+        get_catalog_infos("sub 2")
+    assert get_aggregate("sub 2").catalog_size is None
+
+
+@pytest.mark.models
+def test_rebuild_catalog_empty():
+    """
+    GIVEN customer without specs
+    WHEN rebuild is called
+    THEN an empty catalog is written.
+    """
+    returned_has_catalog = catalog.rebuild(model=models.Spec, sub=SUB)
+
+    assert returned_has_catalog is True
+    assert not get_catalog_infos(SUB)
+    assert get_aggregate(SUB).catalog_size == 0
+    assert models.Spec.list_(sub=SUB) == []
+    assert models.Spec.list_json(sub=SUB) == "[]"
+
+
+@pytest.mark.models
+def test_rebuild_catalog_too_large(monkeypatch):
+    """
+    GIVEN customer with a catalog whose specs no longer fit into a catalog
+    WHEN rebuild is called
+    THEN the catalog is deleted and the specs are still listed.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+    monkeypatch.setattr(catalog.CustomerSpecCatalog, "MAX_SIZE", 10)
+
+    returned_has_catalog = catalog.rebuild(model=models.Spec, sub=SUB)
+
+    assert returned_has_catalog is False
+    with pytest.raises(catalog.CustomerSpecCatalog.DoesNotExist):
+        get_catalog_infos(SUB)
+    assert get_aggregate(SUB).catalog_size is None
+    assert models.Spec.list_(sub=SUB) == query_infos(SUB)
+
+
+@pytest.mark.models
+def test_rebuild_catalog_concurrent_write(monkeypatch):
+    """
+    GIVEN customer with specs that is written to while the catalog is rebuilt
+    WHEN rebuild is called
+    THEN the rebuild is retried and the catalog includes the write.
+    """
+    create_specs(SUB)
+    original_query_latest = models.Spec.query_latest
+    calls = []
+
+    def query_latest(**kwargs):
+        """Write a spec after the first rebuild read the generation."""
+        calls.append(kwargs)
+        if len(calls) == 1:
+            models.Spec.create_update_item(
+                sub=SUB, name="spec 3", version="1", model_count=3
+            )
+        return original_query_latest(**kwargs)
+
+    monkeypatch.setattr(models.Spec, "query_latest", query_latest)
+
+    catalog.rebuild(model=models.Spec, sub=SUB)
+
+    assert len(calls) == 2
+    assert_catalog_consistent(SUB)
+    assert "spec 3" in get_catalog_infos(SUB)
+
+
+@pytest.mark.models
+def test_rebuild_catalog_attempts_exceeded(monkeypatch):
+    """
+    GIVEN customer whose generation always changes while the catalog is rebuilt
+    WHEN rebuild is called
+    THEN TransactWriteError is raised after the maximum number of attempts.
+    """
+    create_specs(SUB)
+    mock_get_generation = mock.MagicMock(return_value=1)
+    monkeypatch.setattr(catalog, "get_generation", mock_get_generation)
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        catalog.rebuild(model=models.Spec, sub=SUB)
+
+    assert mock_get_generation.call_count == catalog.MAX_REBUILD_ATTEMPTS
+
+
+@pytest.mark.models
+def test_rebuild_catalog_error(monkeypatch):
+    """
+    GIVEN rebuilding the catalog fails for a reason other than a concurrent write
+    WHEN rebuild is called
+    THEN TransactWriteError is raised without retrying.
+    """
+    mock_rebuild = mock.MagicMock(
+        side_effect=pynamodb_exceptions.TransactWriteError("failed")
+    )
+    monkeypatch.setattr(catalog, "_rebuild", mock_rebuild)
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        catalog.rebuild(model=models.Spec, sub=SUB)
+
+    assert mock_rebuild.call_count == 1
+
+
+@pytest.mark.models
+def test_writes_update_catalog():
+    """
+    GIVEN customer with a catalog
+    WHEN specs are created, updated and deleted
+    THEN the catalog is kept consistent with the latest items.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+
+    models.Spec.create_update_item(
+        sub=SUB, name="spec 1", version="2", model_count=11, title="longer title 1"
+    )
+    assert_catalog_consistent(SUB)
+    models.Spec.create_update_item(sub=SUB, name="spec 3", version="1", model_count=3)
+    assert_catalog_consistent(SUB)
+    models.Spec.delete_item(sub=SUB, name="spec 2")
+    assert_catalog_consistent(SUB)
+
+    assert set(get_catalog_infos(SUB)) == {"spec 1", "spec 3"}
+    assert models.Spec.list_(sub=SUB) == query_infos(SUB)
+    assert models.Spec.list_json(sub=SUB) == json.dumps(query_infos(SUB))
+    assert get_aggregate(SUB).model_count == 14
+
+
+@pytest.mark.models
+def test_writes_without_catalog():
+    """
+    GIVEN customer without a catalog
+    WHEN specs are created and deleted
+    THEN no catalog is created and the specs are listed from the latest items.
+    """
+    create_specs(SUB)
+    models.Spec.delete_item(sub=SUB, name="spec 2")
+
+    with pytest.raises(catalog.CustomerSpecCatalog.DoesNotExist):
+        get_catalog_infos(SUB)
+    assert get_aggregate(SUB).catalog_size is None
+    assert models.Spec.list_(sub=SUB) == query_infos(SUB)
+    assert models.Spec.list_json(sub=SUB) == json.dumps(query_infos(SUB))
+
+
+@pytest.mark.models
+def test_write_catalog_too_large(monkeypatch):
+    """
+    GIVEN customer with a catalog that is almost full
+    WHEN a spec is created that does not fit into the catalog
+    THEN the catalog is deleted and the specs are listed from the latest items.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+    monkeypatch.setattr(
+        catalog.CustomerSpecCatalog, "MAX_SIZE", int(get_aggregate(SUB).catalog_size)
+    )
+
+    models.Spec.create_update_item(sub=SUB, name="spec 3", version="1", model_count=3)
+
+    with pytest.raises(catalog.CustomerSpecCatalog.DoesNotExist):
+        get_catalog_infos(SUB)
+    assert get_aggregate(SUB).catalog_size is None
+    assert get_aggregate(SUB).model_count == 6
+    assert models.Spec.list_(sub=SUB) == query_infos(SUB)
+
+
+@pytest.mark.models
+def test_delete_item_catalog_dropped():
+    """
+    GIVEN catalog with a spec but an aggregate without a catalog size
+    WHEN the spec is deleted
+    THEN the model count aggregate is still updated.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+    get_aggregate(SUB).update(
+        actions=[catalog.CustomerModelCount.catalog_size.remove()]
+    )
+    generation = get_aggregate(SUB).generation
+
+    models.Spec.delete_item(sub=SUB, name="spec 2")
+
+    assert get_aggregate(SUB).model_count == 1
+    assert get_aggregate(SUB).generation != generation
+    assert list(get_catalog_infos(SUB)) == ["spec 1"]
+
+
+@pytest.mark.models
+def test_delete_item_catalog_concurrent_write(monkeypatch):
+    """
+    GIVEN customer with a catalog whose entry of a spec changes while the spec is
+        deleted
+    WHEN the spec is deleted
+    THEN the removal is retried and the catalog size matches the entries.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+    original_get_entry = catalog.CustomerSpecCatalog.get_entry
+    calls = []
+
+    def get_entry(**kwargs):
+        """Change the entry of the spec after the first read."""
+        calls.append(kwargs)
+        info_json = original_get_entry(**kwargs)
+        if len(calls) == 1:
+            changed_info_json = json.dumps({**json.loads(info_json), "title": "t"})
+            catalog.CustomerSpecCatalog(
+                sub=SUB, updated_at_id=catalog.CustomerSpecCatalog.UPDATED_AT_ID
+            ).update(
+                actions=[
+                    catalog.CustomerSpecCatalog.infos[kwargs["id_"]].set(
+                        changed_info_json
+                    )
+                ]
+            )
+            get_aggregate(SUB).update(
+                actions=[
+                    catalog.CustomerModelCount.catalog_size.add(
+                        len(changed_info_json) - len(info_json)
+                    )
+                ]
+            )
+        return info_json
+
+    monkeypatch.setattr(catalog.CustomerSpecCatalog, "get_entry", get_entry)
+
+    models.Spec.delete_item(sub=SUB, name="spec 2")
+
+    assert len(calls) == 2
+    assert_catalog_consistent(SUB)
+    assert get_aggregate(SUB).model_count == 1
+
+
+@pytest.mark.models
+def test_delete_item_catalog_attempts_exceeded(monkeypatch):
+    """
+    GIVEN customer whose catalog entry of a spec always changes while the spec is
+        deleted
+    WHEN the model count is updated removing the spec
+    THEN TransactWriteError is raised after the maximum number of attempts and the
+        aggregate is not changed.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+    aggregate = get_aggregate(SUB)
+    mock_get_entry = mock.MagicMock(return_value='"changed"')
+    monkeypatch.setattr(catalog.CustomerSpecCatalog, "get_entry", mock_get_entry)
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        catalog.update_model_count(sub=SUB, delta=-2, removed_id="spec 2")
+
+    assert mock_get_entry.call_count == catalog.MAX_REMOVE_ATTEMPTS
+    assert get_aggregate(SUB).generation == aggregate.generation
+    assert get_aggregate(SUB).catalog_size == aggregate.catalog_size
+
+
+@pytest.mark.models
+def test_update_model_count_error(monkeypatch):
+    """
+    GIVEN updating the model count fails for a reason other than a concurrent write
+    WHEN update_model_count is called
+    THEN TransactWriteError is raised without retrying.
+    """
+    mock_update_model_count = mock.MagicMock(
+        side_effect=pynamodb_exceptions.TransactWriteError("failed")
+    )
+    monkeypatch.setattr(catalog, "_update_model_count", mock_update_model_count)
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        catalog.update_model_count(sub=SUB, delta=-2, removed_id="spec 2")
+
+    assert mock_update_model_count.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "entry_changed, expected_ids",
+    [
+        pytest.param(False, ["spec 1"], id="entry unchanged"),
+        pytest.param(True, ["spec 1", "spec 2"], id="entry changed"),
+    ],
+)
+@pytest.mark.models
+def test_update_model_count_aggregate_missing(monkeypatch, entry_changed, expected_ids):
+    """
+    GIVEN catalog with a spec but no model count aggregate
+    WHEN the model count is updated removing the spec
+    THEN False is returned and the entry is removed unless it changed meanwhile.
+    """
+    create_specs(SUB)
+    catalog.rebuild(model=models.Spec, sub=SUB)
+    get_aggregate(SUB).delete()
+    if entry_changed:
+        monkeypatch.setattr(
+            catalog.CustomerSpecCatalog,
+            "get_entry",
+            mock.MagicMock(return_value='"changed"'),
+        )
+
+    assert not catalog.update_model_count(sub=SUB, delta=-2, removed_id="spec 2")
+
+    assert sorted(get_catalog_infos(SUB)) == expected_ids
@@ -0,0 +1,207 @@
+"""Tests for compacting the versions of a spec."""
+
+import time
+from unittest import mock
+
+import pytest
+from open_alchemy.package_database import catalog, compaction, factory, models, types
+
+DAY = compaction.SECONDS_PER_DAY
+
+
+def _updated_at_id(seconds):
+    """Calculate the sort key of a version written at a time."""
+    return models.Spec.calc_index_values(
+        updated_at=str(seconds), id_="spec1", microseconds=0
+    ).updated_at_id
+
+
+CALC_EXPIRED_TESTS = [
+    pytest.param([], None, types.SpecRetention(keep_last=1), set(), id="empty"),
+    pytest.param([1, 2, 3], None, types.SpecRetention(), set(), id="no retention"),
+    pytest.param(
+        [1, 2, 3], None, types.SpecRetention(keep_last=0), {1, 2}, id="keep none"
+    ),
+    pytest.param(
+        [1, 2, 3], None, types.SpecRetention(keep_last=2), {1}, id="keep last"
+    ),
+    pytest.param(
+        [3, 1, 2], None, types.SpecRetention(keep_last=5), set(), id="keep all"
+    ),
+    pytest.param([1, 2, 3], 1, types.SpecRetention(keep_last=1), {2}, id="keep target"),
+    pytest.param(
+        [1 * DAY, 8 * DAY, 9 * DAY, 10 * DAY],
+        None,
+        types.SpecRetention(max_age_days=1),
+        {1 * DAY, 8 * DAY},
+        id="max age",
+    ),
+    pytest.param(
+        [1 * DAY, 2 * DAY, 3 * DAY, 9 * DAY],
+        None,
+        types.SpecRetention(keep_last=2, max_age_days=2),
+        {1 * DAY, 2 * DAY},
+        id="keep last or max age",
+    ),
+    pytest.param(
+        [1 * DAY, 8 * DAY, 9 * DAY, 10 * DAY],
+        None,
+        types.SpecRetention(keep_last=3, max_age_days=2),
+        {1 * DAY},
+        id="keep last more than max age",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "times, target_time, retention, expected_times", CALC_EXPIRED_TESTS
+)
+def test_calc_expired(monkeypatch, times, target_time, retention, expected_times):
+    """
+    GIVEN the times of versions, the version the latest item is a copy of and a
+        retention policy
+    WHEN calc_expired is called
+    THEN the sort keys of the versions that are not kept are returned.
+    """
+    monkeypatch.setattr(time, "time", mock.MagicMock(return_value=10 * DAY))
+
+    returned_updated_at_ids = compaction.calc_expired(
+        updated_at_ids=list(map(_updated_at_id, times)),
+        target_updated_at_id=(
+            _updated_at_id(target_time) if target_time is not None else None
+        ),
+        retention=retention,
+    )
+
+    assert returned_updated_at_ids == set(map(_updated_at_id, expected_times))
+
+
+def _write_versions(monkeypatch, sub, versions):
+    """Write versions of spec1 a day apart."""
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+    for idx, version in enumerate(versions):
+        mock_time.return_value = (idx + 1) * DAY
+        models.Spec.create_update_item(
+            sub=sub, name="spec1", version=version, model_count=1
+        )
+    return mock_time
+
+
+@pytest.mark.models
+def test_compact_versions(monkeypatch):
+    """
+    GIVEN versions of a spec, some of which share a version
+    WHEN compact_versions is called on Spec keeping the last 2 versions
+    THEN the older versions are deleted, versions that are still referred to are
+        not expired and the latest item and generation are updated.
+    """
+    sub = "sub 1"
+    _write_versions(monkeypatch, sub, ["1", "2", "1", "3", "4"])
+    generation = catalog.get_generation(sub=sub)
+
+    spec_compaction = models.Spec.compact_versions(
+        sub=sub, name="spec1", retention=types.SpecRetention(keep_last=2)
+    )
+
+    assert spec_compaction == types.SpecCompaction(
+        deleted=3, expired_versions=["1", "2"]
+    )
+    assert [
+        info["version"] for info in models.Spec.list_versions(sub=sub, name="spec1")
+    ] == ["3", "4"]
+    assert models.Spec.get_latest_version(sub=sub, name="spec1") == "4"
+    assert catalog.get_generation(sub=sub) > generation
+    assert models.Spec.count_customer_models(sub=sub) == 1
+
+
+@pytest.mark.models
+def test_compact_versions_shared_with_kept(monkeypatch):
+    """
+    GIVEN versions of a spec where an old version is written again
+    WHEN compact_versions is called on Spec keeping the last version
+    THEN the old items are deleted but the version is not expired.
+    """
+    sub = "sub 1"
+    _write_versions(monkeypatch, sub, ["1", "2", "1"])
+
+    spec_compaction = models.Spec.compact_versions(
+        sub=sub, name="spec1", retention=types.SpecRetention(keep_last=1)
+    )
+
+    assert spec_compaction == types.SpecCompaction(deleted=2, expired_versions=["2"])
+
+
+@pytest.mark.models
+def test_compact_versions_latest_target(monkeypatch):
+    """
+    GIVEN a spec whose latest item is a copy of an older version
+    WHEN compact_versions is called on Spec keeping no versions
+    THEN the version the latest item is a copy of is kept.
+    """
+    sub = "sub 1"
+    _write_versions(monkeypatch, sub, ["1", "2"])
+    latest_item = models.Spec.get(
+        hash_key=sub, range_key=f"{models.Spec.UPDATED_AT_LATEST}#spec1"
+    )
+    latest_item.version_updated_at_id = _updated_at_id(DAY)
+    latest_item.save()
+
+    spec_compaction = models.Spec.compact_versions(
+        sub=sub, name="spec1", retention=types.SpecRetention(keep_last=0)
+    )
+
+    assert spec_compaction == types.SpecCompaction(deleted=1, expired_versions=[])
+    assert [
+        info["version"] for info in models.Spec.list_versions(sub=sub, name="spec1")
+    ] == ["1"]
+
+
+@pytest.mark.parametrize(
+    "retention",
+    [
+        pytest.param(types.SpecRetention(), id="no retention"),
+        pytest.param(types.SpecRetention(keep_last=5), id="nothing expired"),
+    ],
+)
+@pytest.mark.models
+def test_compact_versions_nothing_deleted(monkeypatch, retention):
+    """
+    GIVEN versions of a spec
+    WHEN compact_versions is called on Spec with a retention that keeps all versions
+    THEN nothing is deleted and the generation is not changed.
+    """
+    sub = "sub 1"
+    _write_versions(monkeypatch, sub, ["1", "2"])
+    generation = catalog.get_generation(sub=sub)
+
+    spec_compaction = models.Spec.compact_versions(
+        sub=sub, name="spec1", retention=retention
+    )
+
+    assert spec_compaction == types.SpecCompaction(deleted=0, expired_versions=[])
+    assert len(models.Spec.list_versions(sub=sub, name="spec1")) == 2
+    assert catalog.get_generation(sub=sub) == generation
+
+
+@pytest.mark.models
+def test_compact_versions_no_latest():
+    """
+    GIVEN version of a spec without a latest item
+    WHEN compact_versions is called on Spec
+    THEN nothing is deleted.
+    """
+    sub = "sub 1"
+    factory.SpecFactory(
+        sub=sub,
+        id="spec1",
+        updated_at_id=_updated_at_id(DAY),
+        id_updated_at=f"spec1#{DAY}",
+    ).save()
+
+    spec_compaction = models.Spec.compact_versions(
+        sub=sub, name="spec1", retention=types.SpecRetention(keep_last=0)
+    )
+
+    assert spec_compaction == types.SpecCompaction(deleted=0, expired_versions=[])
+    assert len(list(models.Spec.query(sub))) == 1
@@ -1,7 +1,7 @@
 """Tests for the models."""
 
 import pytest
-from open_alchemy.package_database import factory, models
+from open_alchemy.package_database import catalog, factory, models
 
 COUNT_CUSTOMER_MODELS_TESTS = [
     pytest.param([], "sub 2", 0, id="empty"),
@@ -110,3 +110,27 @@ def test_count_customer_models(items, sub, expected_count):
     returned_count = models.Spec.count_customer_models(sub=sub)
 
     assert returned_count == expected_count
+
+
+@pytest.mark.models
+def test_count_customer_models_aggregate():
+    """
+    GIVEN latest item and model count aggregate item with a different count
+    WHEN count_customer_models on Spec is called with the sub
+    THEN the count of the aggregate item is returned.
+    """
+    sub = "sub 1"
+    factory.SpecFactory(
+        sub=sub,
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+        model_count=12,
+    ).save()
+    catalog.CustomerModelCount(
+        sub=sub,
+        updated_at_id=catalog.CustomerModelCount.UPDATED_AT_ID,
+        model_count=13,
+    ).save()
+
+    returned_count = models.Spec.count_customer_models(sub=sub)
+
+    assert returned_count == 13
@@ -4,8 +4,16 @@ import time
 from unittest import mock
 
 import pytest
-from open_alchemy.package_database import factory, models
+from open_alchemy.package_database import (
+    catalog,
+    exceptions,
+    factory,
+    models,
+    version_times,
+    writes,
+)
 from packaging import utils
+from pynamodb import exceptions as pynamodb_exceptions
 
 
 @pytest.mark.parametrize(
@@ -41,6 +49,7 @@ def test_create_update_item_empty(sub, name, version, title, description, model_
         and model count as well as updated_at with close to the current time and a
         correct sort key value
     AND another similar record with updated_at set to latest
+    AND the model count aggregate is set to the model count.
     """
     models.Spec.create_update_item(
         sub=sub,
@@ -71,8 +80,12 @@ def test_create_update_item_empty(sub, name, version, title, description, model_
     assert not "." in item.updated_at
     assert int(item.updated_at) == pytest.approx(time.time(), abs=10)
     expected_updated_at = item.updated_at.zfill(20)
-    assert item.updated_at_id == f"{expected_updated_at}#{item.id}"
-    assert item.id_updated_at == f"{item.id}#{expected_updated_at}"
+    version_updated_at, microseconds = item.updated_at_id.split("#")[0].split(".")
+    assert version_updated_at == expected_updated_at
+    assert len(microseconds) == 6
+    assert item.updated_at_id == f"{expected_updated_at}.{microseconds}#{item.id}"
+    assert item.id_updated_at == f"{item.id}#{expected_updated_at}.{microseconds}"
+    version_updated_at_id = item.updated_at_id
 
     items = list(
         models.Spec.query(
@@ -93,9 +106,15 @@ def test_create_update_item_empty(sub, name, version, title, description, model_
     assert int(item.updated_at) == pytest.approx(time.time(), abs=10)
     assert item.updated_at_id == f"{models.Spec.UPDATED_AT_LATEST}#{item.id}"
     assert item.id_updated_at == f"{item.id}#{models.Spec.UPDATED_AT_LATEST}"
+    assert item.version_updated_at_id == version_updated_at_id
+
+    aggregate_item = catalog.CustomerModelCount.get(
+        hash_key=sub, range_key=catalog.CustomerModelCount.UPDATED_AT_ID
+    )
+    assert aggregate_item.model_count == model_count
 
     items = list(models.Spec.scan())
-    assert len(items) == 2
+    assert len(items) == 3
 
 
 @pytest.mark.models
@@ -146,7 +165,7 @@ def test_create_update_item_single():
     assert int(item.updated_at) == pytest.approx(time.time(), abs=10)
 
     items = list(models.Spec.scan())
-    assert len(items) == 3
+    assert len(items) == 4
 
 
 @pytest.mark.models
@@ -156,7 +175,8 @@ def test_create_update_item_update(monkeypatch):
     WHEN create_update_item is called on Spec multiple times with the same
         sub and spec id but different versions and model counts at different times
     THEN a record for each version is added to the database
-    AND the latest record points to the last inserted record.
+    AND the latest record points to the last inserted record
+    AND the model count aggregate reflects the last inserted record.
     """
     sub = "sub 1"
     name_1 = "name 1"
@@ -182,7 +202,7 @@ def test_create_update_item_update(monkeypatch):
     items = list(
         models.Spec.query(
             sub,
-            (models.Spec.updated_at_id.startswith(f"{str(time_1).zfill(20)}#")),
+            (models.Spec.updated_at_id.startswith(f"{str(time_1).zfill(20)}.000000#")),
         )
     )
     assert len(items) == 1
@@ -195,7 +215,7 @@ def test_create_update_item_update(monkeypatch):
     items = list(
         models.Spec.query(
             sub,
-            (models.Spec.updated_at_id.startswith(f"{str(time_2).zfill(20)}#")),
+            (models.Spec.updated_at_id.startswith(f"{str(time_2).zfill(20)}.000000#")),
         )
     )
     assert len(items) == 1
@@ -215,10 +235,15 @@ def test_create_update_item_update(monkeypatch):
     assert item.model_count == model_count_2
     assert item.version == version_2
 
+    aggregate_item = catalog.CustomerModelCount.get(
+        hash_key=sub, range_key=catalog.CustomerModelCount.UPDATED_AT_ID
+    )
+    assert aggregate_item.model_count == model_count_2
+
     items = list(models.Spec.scan())
-    assert len(items) == 3
+    assert len(items) == 4
 
-    # Call again with different name by same canonical name
+    # Call again with different name by same canonical name in the same second
     name_2 = "NAME 1"
     models.Spec.create_update_item(
         sub=sub, name=name_2, version=version_2, model_count=model_count_2
@@ -227,13 +252,358 @@ def test_create_update_item_update(monkeypatch):
     items = list(
         models.Spec.query(
             sub,
-            (models.Spec.updated_at_id.startswith(f"{str(time_2).zfill(20)}#")),
+            (models.Spec.updated_at_id.startswith(f"{str(time_2).zfill(20)}.")),
         )
     )
-    assert len(items) == 1
-    [different_item] = items
+    assert len(items) == 2
+    [item, different_item] = items
+    assert item.name == name_1
+    assert different_item.updated_at_id == f"{str(time_2).zfill(20)}.000001#{item.id}"
     assert different_item.name == name_2
     assert different_item.id == item.id
     assert different_item.model_count == model_count_2
     assert different_item.version == version_2
     assert int(different_item.updated_at) == time_2
+
+    [latest_item] = models.Spec.query(
+        sub, models.Spec.updated_at_id.startswith(f"{models.Spec.UPDATED_AT_LATEST}#")
+    )
+    assert latest_item.name == name_2
+    assert latest_item.version_updated_at_id == different_item.updated_at_id
+
+
+@pytest.mark.models
+def test_create_update_item_clock_behind(monkeypatch):
+    """
+    GIVEN a spec with a version written at a time after the current time
+    WHEN create_update_item is called on Spec for the spec
+    THEN the new version is written 1 microsecond after the previous version.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    mock_time = mock.MagicMock()
+    monkeypatch.setattr(time, "time", mock_time)
+    mock_time.return_value = 2000.5
+    models.Spec.create_update_item(
+        sub=sub, name=name, version="version 1", model_count=1
+    )
+    mock_time.return_value = 1000
+    models.Spec.create_update_item(
+        sub=sub, name=name, version="version 2", model_count=1
+    )
+
+    items = list(models.Spec.query(sub, models.Spec.updated_at_id.startswith("0")))
+    assert [item.updated_at_id for item in items] == [
+        f"{'2000'.zfill(20)}.500000#{name}",
+        f"{'2000'.zfill(20)}.500001#{name}",
+    ]
+    assert [item.version for item in items] == ["version 1", "version 2"]
+    assert [item.updated_at for item in items] == ["2000", "2000"]
+
+
+@pytest.mark.models
+def test_create_update_item_previous_without_microseconds(monkeypatch):
+    """
+    GIVEN a spec with a version written before sub-second version times were
+        introduced
+    WHEN create_update_item is called on Spec for the spec in the same second
+    THEN the new version is sorted after the previous version.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    for updated_at in ("2000", models.Spec.UPDATED_AT_LATEST):
+        index_values = models.Spec.calc_index_values(updated_at=updated_at, id_=name)
+        factory.SpecFactory(
+            sub=sub,
+            id=name,
+            name=name,
+            updated_at="2000",
+            version="version 1",
+            model_count=1,
+            updated_at_id=index_values.updated_at_id,
+            id_updated_at=index_values.id_updated_at,
+        ).save()
+    monkeypatch.setattr(time, "time", mock.MagicMock(return_value=2000))
+
+    models.Spec.create_update_item(
+        sub=sub, name=name, version="version 2", model_count=1
+    )
+
+    assert [
+        item["version"] for item in models.Spec.list_versions(sub=sub, name=name)
+    ] == [
+        "version 1",
+        "version 2",
+    ]
+
+
+@pytest.mark.models
+def test_create_update_item_taken(monkeypatch):
+    """
+    GIVEN a version that was written by another writer at the same time
+    WHEN create_update_item is called on Spec
+    THEN the write is retried with a later version time.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    monkeypatch.setattr(time, "time", mock.MagicMock(return_value=1000))
+    index_values = models.Spec.calc_index_values(
+        updated_at="1000", id_=name, microseconds=0
+    )
+    factory.SpecFactory(
+        sub=sub,
+        id=name,
+        name=name,
+        version="version 1",
+        updated_at_id=index_values.updated_at_id,
+        id_updated_at=index_values.id_updated_at,
+    ).save()
+    original_calc_version_time = version_times.calc
+    calls = []
+
+    def calc_version_time(*, previous_updated_at_id):
+        """Ignore the previous version on the first call like a concurrent writer."""
+        calls.append(previous_updated_at_id)
+        return original_calc_version_time(
+            previous_updated_at_id=(previous_updated_at_id if len(calls) > 1 else None)
+        )
+
+    monkeypatch.setattr(version_times, "calc", calc_version_time)
+    # Make the retry read the version of the other writer as the latest version
+    factory.SpecFactory(
+        sub=sub,
+        id=name,
+        name=name,
+        version="version 1",
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#{name}",
+        id_updated_at=f"{name}#{models.Spec.UPDATED_AT_LATEST}",
+        version_updated_at_id=index_values.updated_at_id,
+    ).save()
+
+    models.Spec.create_update_item(
+        sub=sub, name=name, version="version 2", model_count=1
+    )
+
+    assert len(calls) == 2
+    items = list(models.Spec.query(sub, models.Spec.updated_at_id.startswith("0")))
+    assert [item.version for item in items] == ["version 1", "version 2"]
+    assert items[1].updated_at_id == f"{'1000'.zfill(20)}.000001#{name}"
+
+
+@pytest.mark.models
+def test_create_update_item_taken_attempts_exceeded(monkeypatch):
+    """
+    GIVEN a version time that is always taken
+    WHEN create_update_item is called on Spec
+    THEN ConflictError is raised after the maximum number of attempts with backoff
+        between the attempts.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    monkeypatch.setattr(time, "time", mock.MagicMock(return_value=1000))
+    mock_sleep = mock.MagicMock()
+    monkeypatch.setattr(time, "sleep", mock_sleep)
+    index_values = models.Spec.calc_index_values(
+        updated_at="1000", id_=name, microseconds=0
+    )
+    factory.SpecFactory(
+        sub=sub,
+        id=name,
+        name=name,
+        updated_at_id=index_values.updated_at_id,
+        id_updated_at=index_values.id_updated_at,
+    ).save()
+    mock_calc_version_time = mock.MagicMock(
+        return_value=version_times.TSpecVersionTime(updated_at="1000", microseconds=0)
+    )
+    monkeypatch.setattr(version_times, "calc", mock_calc_version_time)
+
+    with pytest.raises(exceptions.ConflictError):
+        models.Spec.create_update_item(
+            sub=sub, name=name, version="version 2", model_count=1
+        )
+
+    assert mock_calc_version_time.call_count == writes.MAX_CREATE_UPDATE_ATTEMPTS
+    assert mock_sleep.call_count == writes.MAX_CREATE_UPDATE_ATTEMPTS - 1
+
+
+@pytest.mark.models
+def test_create_update_item_error(monkeypatch):
+    """
+    GIVEN writing the spec fails for a reason other than a concurrent write
+    WHEN create_update_item is called on Spec
+    THEN TransactWriteError is raised without retrying.
+    """
+    mock_create_update_item = mock.MagicMock(
+        side_effect=pynamodb_exceptions.TransactWriteError("failed")
+    )
+    monkeypatch.setattr(writes, "_create_update", mock_create_update_item)
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        models.Spec.create_update_item(
+            sub="sub 1", name="name 1", version="version 1", model_count=1
+        )
+
+    assert mock_create_update_item.call_count == 1
+
+
+@pytest.mark.models
+def test_create_update_item_latest_changed(monkeypatch):
+    """
+    GIVEN a spec whose latest item is replaced by another writer after it was read
+    WHEN create_update_item is called on Spec
+    THEN the write is retried based on the latest item of the other writer and the
+        model count aggregate reflects the last write.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    models.Spec.create_update_item(
+        sub=sub, name=name, version="version 1", model_count=1
+    )
+    original_calc_version_time = version_times.calc
+    calls = []
+
+    def calc_version_time(*, previous_updated_at_id):
+        """Write another version of the spec after the first read."""
+        calls.append(previous_updated_at_id)
+        if len(calls) == 1:
+            monkeypatch.setattr(version_times, "calc", original_calc_version_time)
+            models.Spec.create_update_item(
+                sub=sub, name=name, version="version 2", model_count=2
+            )
+            monkeypatch.setattr(version_times, "calc", calc_version_time)
+        return original_calc_version_time(previous_updated_at_id=previous_updated_at_id)
+
+    monkeypatch.setattr(version_times, "calc", calc_version_time)
+
+    models.Spec.create_update_item(
+        sub=sub, name=name, version="version 3", model_count=3
+    )
+
+    assert len(calls) == 2
+    assert calls[0] != calls[1]
+    assert [
+        info["version"] for info in models.Spec.list_versions(sub=sub, name=name)
+    ] == ["version 1", "version 2", "version 3"]
+    assert models.Spec.get_latest_version(sub=sub, name=name) == "version 3"
+    assert models.Spec.count_customer_models(sub=sub) == 3
+
+
+@pytest.mark.parametrize(
+    "model_count, max_model_count, expected_model_count",
+    [
+        pytest.param(3, 5, 4, id="below"),
+        pytest.param(4, 5, 5, id="equal"),
+        pytest.param(5, 5, None, id="above"),
+    ],
+)
+@pytest.mark.models
+def test_create_update_item_max_model_count(
+    model_count, max_model_count, expected_model_count
+):
+    """
+    GIVEN a customer with specs
+    WHEN create_update_item is called on Spec for one of the specs with a
+        max_model_count
+    THEN the spec is written if the model count of the customer stays within
+        max_model_count and ModelCountExceededError is raised otherwise.
+    """
+    sub = "sub 1"
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 1", model_count=1
+    )
+    models.Spec.create_update_item(
+        sub=sub, name="name 2", version="version 1", model_count=2
+    )
+
+    if expected_model_count is None:
+        with pytest.raises(exceptions.ModelCountExceededError):
+            models.Spec.create_update_item(
+                sub=sub,
+                name="name 2",
+                version="version 2",
+                model_count=model_count,
+                max_model_count=max_model_count,
+            )
+        assert models.Spec.get_latest_version(sub=sub, name="name 2") == "version 1"
+        assert models.Spec.count_customer_models(sub=sub) == 3
+    else:
+        models.Spec.create_update_item(
+            sub=sub,
+            name="name 2",
+            version="version 2",
+            model_count=model_count,
+            max_model_count=max_model_count,
+        )
+        assert models.Spec.get_latest_version(sub=sub, name="name 2") == "version 2"
+        assert models.Spec.count_customer_models(sub=sub) == expected_model_count
+
+
+@pytest.mark.models
+def test_create_update_item_max_model_count_no_aggregate():
+    """
+    GIVEN a latest item without a model count aggregate
+    WHEN create_update_item is called on Spec with a max_model_count that the
+        latest items would exceed
+    THEN the aggregate is rebuilt and ModelCountExceededError is raised.
+    """
+    sub = "sub 1"
+    factory.SpecFactory(
+        sub=sub,
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+        model_count=5,
+    ).save()
+
+    with pytest.raises(exceptions.ModelCountExceededError):
+        models.Spec.create_update_item(
+            sub=sub,
+            name="name 2",
+            version="version 1",
+            model_count=1,
+            max_model_count=5,
+        )
+
+    assert models.Spec.count_customer_models(sub=sub) == 5
+
+
+@pytest.mark.models
+def test_create_update_item_max_model_count_concurrent(monkeypatch):
+    """
+    GIVEN a customer whose model count is increased by another writer after it was
+        read
+    WHEN create_update_item is called on Spec with a max_model_count that the
+        other write exceeds
+    THEN ModelCountExceededError is raised when the write is retried.
+    """
+    sub = "sub 1"
+    original_calc_version_time = version_times.calc
+    calls = []
+
+    def calc_version_time(*, previous_updated_at_id):
+        """Write another spec after the first read."""
+        calls.append(previous_updated_at_id)
+        if len(calls) == 1:
+            models.Spec.create_update_item(
+                sub=sub, name="name 2", version="version 1", model_count=3
+            )
+        return original_calc_version_time(previous_updated_at_id=previous_updated_at_id)
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 1", model_count=1
+    )
+    monkeypatch.setattr(version_times, "calc", calc_version_time)
+
+    with pytest.raises(exceptions.ModelCountExceededError):
+        models.Spec.create_update_item(
+            sub=sub,
+            name="name 3",
+            version="version 1",
+            model_count=2,
+            max_model_count=5,
+        )
+
+    assert models.Spec.count_customer_models(sub=sub) == 4
+    assert [info["name"] for info in models.Spec.list_(sub=sub)] == [
+        "name 1",
+        "name 2",
+    ]
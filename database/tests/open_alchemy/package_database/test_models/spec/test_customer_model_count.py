@@ -0,0 +1,215 @@
+"""Tests for maintaining the model count aggregate."""
+
+import pytest
+from open_alchemy.package_database import catalog, factory, models
+
+
+def get_aggregate_model_count(sub):
+    """Retrieve the model count of the aggregate item."""
+    return catalog.CustomerModelCount.get(
+        hash_key=sub, range_key=catalog.CustomerModelCount.UPDATED_AT_ID
+    ).model_count
+
+
+@pytest.mark.models
+def test_reconcile_customer_models():
+    """
+    GIVEN latest items for multiple customers without aggregate items
+    WHEN reconcile_customer_models is called on Spec with one of the subs
+    THEN the aggregate item is written with the sum of the latest model counts for
+        that customer only.
+    """
+    items = [
+        factory.SpecFactory(
+            sub="sub 1",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+            model_count=12,
+        ),
+        factory.SpecFactory(
+            sub="sub 1",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 2",
+            model_count=22,
+        ),
+        factory.SpecFactory(sub="sub 1", model_count=32),
+        factory.SpecFactory(
+            sub="sub 2",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+            model_count=42,
+        ),
+    ]
+    for item in items:
+        item.save()
+
+    returned_count = models.Spec.reconcile_customer_models(sub="sub 1")
+
+    assert returned_count == 34
+    assert get_aggregate_model_count("sub 1") == 34
+    with pytest.raises(catalog.CustomerModelCount.DoesNotExist):
+        get_aggregate_model_count("sub 2")
+
+
+@pytest.mark.models
+def test_reconcile_customer_models_overwrite():
+    """
+    GIVEN latest item and aggregate item with the wrong count
+    WHEN reconcile_customer_models is called on Spec with the sub
+    THEN the aggregate item is overwritten with the sum of the latest model counts.
+    """
+    sub = "sub 1"
+    factory.SpecFactory(
+        sub=sub,
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+        model_count=12,
+    ).save()
+    catalog.CustomerModelCount(
+        sub=sub,
+        updated_at_id=catalog.CustomerModelCount.UPDATED_AT_ID,
+        model_count=100,
+    ).save()
+
+    models.Spec.reconcile_customer_models(sub=sub)
+
+    assert get_aggregate_model_count(sub) == 12
+    assert models.Spec.count_customer_models(sub=sub) == 12
+
+
+@pytest.mark.models
+def test_list_subs():
+    """
+    GIVEN items for multiple customers
+    WHEN list_subs is called on Spec
+    THEN the unique subs are returned.
+    """
+    items = [
+        factory.SpecFactory(sub="sub 2"),
+        factory.SpecFactory(sub="sub 1"),
+        factory.SpecFactory(sub="sub 2"),
+    ]
+    for item in items:
+        item.save()
+
+    returned_subs = models.Spec.list_subs()
+
+    assert returned_subs == ["sub 1", "sub 2"]
+
+
+@pytest.mark.models
+def test_create_update_delete_item_aggregate():
+    """
+    GIVEN empty database
+    WHEN specs are created, updated and deleted
+    THEN the model count aggregate tracks the sum of the latest model counts.
+    """
+    sub = "sub 1"
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 1", model_count=1
+    )
+    assert get_aggregate_model_count(sub) == 1
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 2", version="version 1", model_count=2
+    )
+    assert get_aggregate_model_count(sub) == 3
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 2", model_count=4
+    )
+    assert get_aggregate_model_count(sub) == 6
+
+    models.Spec.create_update_item(
+        sub=sub, name="name 1", version="version 3", model_count=4
+    )
+    assert get_aggregate_model_count(sub) == 6
+
+    models.Spec.delete_item(sub=sub, name="name 2")
+    assert get_aggregate_model_count(sub) == 4
+
+    models.Spec.delete_item(sub=sub, name="name 3")
+    assert get_aggregate_model_count(sub) == 4
+
+    models.Spec.delete_all(sub=sub)
+    with pytest.raises(catalog.CustomerModelCount.DoesNotExist):
+        get_aggregate_model_count(sub)
+    assert models.Spec.count_customer_models(sub=sub) == 0
+
+
+@pytest.mark.models
+def test_create_update_item_aggregate_missing():
+    """
+    GIVEN latest item without an aggregate item
+    WHEN create_update_item is called on Spec for a different spec
+    THEN the aggregate item is rebuilt from all latest items.
+    """
+    sub = "sub 1"
+    factory.SpecFactory(
+        sub=sub,
+        id="spec 1",
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+        model_count=12,
+    ).save()
+
+    models.Spec.create_update_item(
+        sub=sub, name="spec 2", version="version 1", model_count=3
+    )
+
+    assert get_aggregate_model_count(sub) == 15
+
+
+@pytest.mark.models
+def test_delete_item_aggregate_missing():
+    """
+    GIVEN latest items for multiple specs without an aggregate item
+    WHEN delete_item is called on Spec for one of the specs
+    THEN the aggregate item is rebuilt from the remaining latest items.
+    """
+    sub = "sub 1"
+    items = [
+        factory.SpecFactory(
+            sub=sub,
+            id="spec 1",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+            id_updated_at=f"spec 1#{models.Spec.UPDATED_AT_LATEST}",
+            model_count=12,
+        ),
+        factory.SpecFactory(
+            sub=sub,
+            id="spec 2",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 2",
+            id_updated_at=f"spec 2#{models.Spec.UPDATED_AT_LATEST}",
+            model_count=22,
+        ),
+    ]
+    for item in items:
+        item.save()
+
+    models.Spec.delete_item(sub=sub, name="spec 1")
+
+    assert get_aggregate_model_count(sub) == 22
+
+
+@pytest.mark.models
+def test_generation():
+    """
+    GIVEN empty database
+    WHEN specs are created, updated, deleted and reconciled
+    THEN the generation of the customer increases with every write and is not
+        changed by deleting a spec that does not exist.
+    """
+    sub = "sub 1"
+    assert catalog.get_generation(sub=sub) is None
+
+    generations = []
+    for name, version in (("name 1", "version 1"), ("name 1", "version 2")):
+        models.Spec.create_update_item(
+            sub=sub, name=name, version=version, model_count=1
+        )
+        generations.append(catalog.get_generation(sub=sub))
+    models.Spec.reconcile_customer_models(sub=sub)
+    generations.append(catalog.get_generation(sub=sub))
+    models.Spec.delete_item(sub=sub, name="name 2")
+    assert catalog.get_generation(sub=sub) == generations[-1]
+    models.Spec.delete_item(sub=sub, name="name 1")
+    generations.append(catalog.get_generation(sub=sub))
+
+    assert generations == sorted(set(generations))
@@ -0,0 +1,56 @@
+"""Tests for the models get_latest_item."""
+
+import pytest
+from open_alchemy.package_database import exceptions, factory, models
+
+
+@pytest.mark.models
+def test_get_latest_item_miss():
+    """
+    GIVEN empty database
+    WHEN get_latest_item is called on Spec
+    THEN NotFoundError is raised.
+    """
+    with pytest.raises(exceptions.NotFoundError):
+        models.Spec.get_latest_item(sub="sub 1", name="name 1")
+
+
+@pytest.mark.parametrize(
+    "version_updated_at_id, expected_version_time",
+    [
+        pytest.param(None, 12_000_000, id="before sub-second version times"),
+        pytest.param(
+            f"{'12'.zfill(20)}.000034#name 1", 12_000_034, id="sub-second version time"
+        ),
+    ],
+)
+@pytest.mark.models
+def test_get_latest_item(version_updated_at_id, expected_version_time):
+    """
+    GIVEN latest and other items in the database
+    WHEN get_latest_item is called on Spec with the sub and spec name
+    THEN the version, information and version time of the latest item are returned.
+    """
+    item = factory.SpecFactory(
+        sub="sub 1",
+        name="NAME 1",
+        id="name 1",
+        version="version 2",
+        updated_at="12",
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#name 1",
+        version_updated_at_id=version_updated_at_id,
+    )
+    item.save()
+    factory.SpecFactory(
+        sub="sub 1",
+        name="NAME 1",
+        id="name 1",
+        version="version 1",
+        updated_at_id="11#name 1",
+    ).save()
+
+    returned_latest = models.Spec.get_latest_item(sub="sub 1", name="NAME 1")
+
+    assert returned_latest.version == "version 2"
+    assert returned_latest.info == models.Spec.item_to_info(item)
+    assert returned_latest.version_time == expected_version_time
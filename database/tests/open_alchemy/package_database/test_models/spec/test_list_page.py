@@ -0,0 +1,117 @@
+"""Tests for the models."""
+
+import pytest
+from open_alchemy.package_database import exceptions, factory, models, pagination
+
+
+def create_latest_items(sub, count):
+    """Create latest items for a customer."""
+    items = [
+        factory.SpecFactory(
+            sub=sub,
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec {idx}",
+        )
+        for idx in range(count)
+    ]
+    for item in items:
+        item.save()
+    return items
+
+
+@pytest.mark.models
+def test_list_page_no_limit():
+    """
+    GIVEN latest and not latest items in the database
+    WHEN list_page is called on Spec without a limit
+    THEN all latest items are returned without a cursor.
+    """
+    sub = "sub 1"
+    items = create_latest_items(sub, 3)
+    factory.SpecFactory(sub=sub).save()
+
+    returned_page = models.Spec.list_page(sub=sub)
+
+    assert returned_page.items == list(map(models.Spec.item_to_info, items))
+    assert returned_page.cursor is None
+
+
+@pytest.mark.models
+def test_list_page_limit():
+    """
+    GIVEN latest items in the database
+    WHEN list_page is called on Spec with a limit until there is no cursor
+    THEN all latest items are returned in order in pages of at most the limit.
+    """
+    sub = "sub 1"
+    items = create_latest_items(sub, 5)
+    create_latest_items("sub 2", 2)
+
+    pages = []
+    cursor = None
+    while True:
+        page = models.Spec.list_page(sub=sub, limit=2, cursor=cursor)
+        pages.append(page.items)
+        cursor = page.cursor
+        if cursor is None:
+            break
+
+    assert [len(page_items) for page_items in pages] == [2, 2, 1]
+    assert [info for page_items in pages for info in page_items] == list(
+        map(models.Spec.item_to_info, items)
+    )
+
+
+@pytest.mark.models
+def test_list_page_invalid_cursor():
+    """
+    GIVEN cursor for a different customer
+    WHEN list_page is called on Spec with the cursor
+    THEN InvalidCursorError is raised.
+    """
+    create_latest_items("sub 2", 2)
+    cursor = models.Spec.list_page(sub="sub 2", limit=1).cursor
+
+    with pytest.raises(exceptions.InvalidCursorError):
+        models.Spec.list_page(sub="sub 1", limit=1, cursor=cursor)
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        pytest.param({"sub": {"S": "sub 1"}}, id="key missing"),
+        pytest.param(
+            {"sub": {"S": "sub 1"}, "updated_at_id": {"N": "1"}}, id="key wrong type"
+        ),
+        pytest.param(
+            {"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#id 1"}},
+            id="key outside range",
+        ),
+    ],
+)
+@pytest.mark.models
+def test_list_page_cursor_not_key(key):
+    """
+    GIVEN cursor of the customer that is not a key of the query
+    WHEN list_page is called on Spec with the cursor
+    THEN InvalidCursorError is raised.
+    """
+    create_latest_items("sub 1", 2)
+
+    with pytest.raises(exceptions.InvalidCursorError):
+        models.Spec.list_page(sub="sub 1", limit=1, cursor=pagination.encode(key=key))
+
+
+@pytest.mark.models
+def test_iter_():
+    """
+    GIVEN latest items in the database
+    WHEN iter_ is called on Spec
+    THEN an iterator over the latest items is returned.
+    """
+    sub = "sub 1"
+    items = create_latest_items(sub, 2)
+
+    returned_iterator = models.Spec.iter_(sub=sub)
+
+    assert not isinstance(returned_iterator, list)
+    assert list(returned_iterator) == list(map(models.Spec.item_to_info, items))
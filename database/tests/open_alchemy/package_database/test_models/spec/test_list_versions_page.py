@@ -0,0 +1,177 @@
+"""Tests for the models."""
+
+import pytest
+from open_alchemy.package_database import exceptions, factory, models, pagination
+
+
+def create_version_items(sub, name, count):
+    """Create version items and a latest item for a spec."""
+    items = [
+        factory.SpecFactory(
+            sub=sub,
+            id=name,
+            updated_at=str(idx + 1),
+            id_updated_at=f"{name}#{str(idx + 1).zfill(20)}",
+            updated_at_id=f"{str(idx + 1).zfill(20)}#{name}",
+        )
+        for idx in range(count)
+    ]
+    for item in items:
+        item.save()
+    factory.SpecFactory(
+        sub=sub,
+        id=name,
+        id_updated_at=f"{name}#{models.Spec.UPDATED_AT_LATEST}",
+        updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#{name}",
+    ).save()
+    return items
+
+
+@pytest.mark.models
+def test_list_versions_page_no_limit():
+    """
+    GIVEN version and latest items in the database
+    WHEN list_versions_page is called on Spec without a limit
+    THEN all version items are returned without a cursor.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    items = create_version_items(sub, name, 3)
+
+    returned_page = models.Spec.list_versions_page(sub=sub, name=name)
+
+    assert returned_page.items == list(map(models.Spec.item_to_info, items))
+    assert returned_page.cursor is None
+
+
+@pytest.mark.models
+def test_list_versions_page_limit():
+    """
+    GIVEN version and latest items in the database
+    WHEN list_versions_page is called on Spec with a limit until there is no cursor
+    THEN all version items are returned in order in pages of at most the limit.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    items = create_version_items(sub, name, 5)
+    create_version_items(sub, "name 2", 2)
+
+    pages = []
+    cursor = None
+    while True:
+        page = models.Spec.list_versions_page(
+            sub=sub, name=name, limit=2, cursor=cursor
+        )
+        pages.append(page.items)
+        cursor = page.cursor
+        if cursor is None:
+            break
+
+    assert [len(page_items) for page_items in pages] == [2, 2, 1]
+    assert [info for page_items in pages for info in page_items] == list(
+        map(models.Spec.item_to_info, items)
+    )
+
+
+@pytest.mark.models
+def test_list_versions_page_limit_before_latest():
+    """
+    GIVEN version and latest items in the database where the latest item directly
+        follows a full page of versions
+    WHEN list_versions_page is called on Spec with the limit
+    THEN all version items are returned without a cursor.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    items = create_version_items(sub, name, 2)
+
+    returned_page = models.Spec.list_versions_page(sub=sub, name=name, limit=2)
+
+    assert returned_page.items == list(map(models.Spec.item_to_info, items))
+    assert returned_page.cursor is None
+
+
+@pytest.mark.models
+def test_list_versions_page_limit_multiple_queries(monkeypatch):
+    """
+    GIVEN version and latest items in the database and queries that evaluate a
+        single item
+    WHEN list_versions_page is called on Spec with a limit
+    THEN the queries continue until the page is full.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    items = create_version_items(sub, name, 3)
+    query = models.Spec.id_updated_at_index.query
+
+    def query_single_item(*args, **kwargs):
+        """Query with a page size of 1."""
+        return query(*args, **{**kwargs, "page_size": 1})
+
+    monkeypatch.setattr(models.Spec.id_updated_at_index, "query", query_single_item)
+
+    page_1 = models.Spec.list_versions_page(sub=sub, name=name, limit=2)
+    page_2 = models.Spec.list_versions_page(
+        sub=sub, name=name, limit=2, cursor=page_1.cursor
+    )
+
+    assert page_1.items == list(map(models.Spec.item_to_info, items[:2]))
+    assert page_2.items == list(map(models.Spec.item_to_info, items[2:]))
+    assert page_2.cursor is None
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        pytest.param(
+            {"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#name 1"}},
+            id="key missing",
+        ),
+        pytest.param(
+            {
+                "sub": {"S": "sub 1"},
+                "updated_at_id": {"S": "1#name 1"},
+                "id_updated_at": {"N": "1"},
+            },
+            id="key wrong type",
+        ),
+        pytest.param(
+            {
+                "sub": {"S": "sub 1"},
+                "updated_at_id": {"S": "1#name 2"},
+                "id_updated_at": {"S": "name 2#1"},
+            },
+            id="key of other spec",
+        ),
+    ],
+)
+@pytest.mark.models
+def test_list_versions_page_cursor_not_key(key):
+    """
+    GIVEN cursor of the customer that is not a key of the query
+    WHEN list_versions_page is called on Spec with the cursor
+    THEN InvalidCursorError is raised.
+    """
+    create_version_items("sub 1", "name 1", 2)
+
+    with pytest.raises(exceptions.InvalidCursorError):
+        models.Spec.list_versions_page(
+            sub="sub 1", name="name 1", limit=1, cursor=pagination.encode(key=key)
+        )
+
+
+@pytest.mark.models
+def test_iter_versions():
+    """
+    GIVEN version and latest items in the database
+    WHEN iter_versions is called on Spec
+    THEN an iterator over the version items is returned.
+    """
+    sub = "sub 1"
+    name = "name 1"
+    items = create_version_items(sub, name, 2)
+
+    returned_iterator = models.Spec.iter_versions(sub=sub, name=name)
+
+    assert not isinstance(returned_iterator, list)
+    assert list(returned_iterator) == list(map(models.Spec.item_to_info, items))
@@ -0,0 +1,113 @@
+"""Tests for the attribute projection of the Spec reads."""
+
+import json
+
+import pytest
+from open_alchemy.package_database import factory, models
+from pynamodb.connection import base
+
+
+@pytest.fixture
+def _responses(monkeypatch):
+    """Record the responses of all calls to DynamoDB."""
+    responses = []
+    dispatch = base.Connection.dispatch
+
+    def recording_dispatch(self, operation_name, operation_kwargs, *args, **kwargs):
+        """Dispatch the call and record the response."""
+        response = dispatch(self, operation_name, operation_kwargs, *args, **kwargs)
+        responses.append(response)
+        return response
+
+    monkeypatch.setattr(base.Connection, "dispatch", recording_dispatch)
+    return responses
+
+
+def _summarize(responses):
+    """Calculate the consumed capacity and returned size of responses."""
+    capacity = sum(
+        response.get("ConsumedCapacity", {}).get("CapacityUnits", 0)
+        for response in responses
+    )
+    size = sum(
+        len(json.dumps(response.get("Items", response.get("Item", {}))))
+        for response in responses
+    )
+    return capacity, size
+
+
+def _create_items(*, sub, name, count):
+    """Create versions of a spec with large attributes not needed for the info."""
+    for idx in range(count):
+        updated_at = models.Spec.UPDATED_AT_LATEST if idx == 0 else str(idx)
+        index_values = models.Spec.calc_index_values(updated_at=updated_at, id_=name)
+        factory.SpecFactory(
+            sub=sub,
+            id=name,
+            name=name,
+            updated_at=str(idx),
+            updated_at_id=index_values.updated_at_id,
+            id_updated_at=index_values.id_updated_at,
+        ).save()
+
+
+@pytest.mark.models
+def test_count_customer_models(_responses):
+    """
+    GIVEN latest specs for a customer
+    WHEN the models are summed with and without projection
+    THEN the projected read returns less data for no more consumed capacity.
+    """
+    sub = "sub 1" * 100
+    for idx in range(5):
+        _create_items(sub=sub, name=f"name{idx}", count=1)
+
+    _responses.clear()
+    list(
+        models.Spec.query(
+            sub,
+            models.Spec.updated_at_id.startswith(f"{models.Spec.UPDATED_AT_LATEST}#"),
+        )
+    )
+    full_capacity, full_size = _summarize(_responses)
+
+    _responses.clear()
+    assert models.Spec.sum_customer_models(sub=sub) > 0
+    projected_capacity, projected_size = _summarize(_responses)
+
+    assert projected_capacity <= full_capacity
+    assert projected_size < full_size
+
+
+@pytest.mark.models
+def test_list_versions(_responses):
+    """
+    GIVEN versions of a spec for a customer
+    WHEN the versions are listed with and without projection
+    THEN the projected read returns less data for no more consumed capacity.
+    """
+    sub = "sub 1" * 100
+    name = "name1"
+    _create_items(sub=sub, name=name, count=10)
+
+    _responses.clear()
+    list(
+        models.Spec.id_updated_at_index.query(
+            sub,
+            models.Spec.id_updated_at.startswith(f"{name}#"),
+            filter_condition=~models.Spec.updated_at_id.startswith(
+                f"{models.Spec.UPDATED_AT_LATEST}#"
+            ),
+        )
+    )
+    full_capacity, full_size = _summarize(_responses)
+
+    _responses.clear()
+    assert len(models.Spec.list_versions(sub=sub, name=name)) == 9
+    # Excludes reading the number of shards of the customer
+    projected_capacity, projected_size = _summarize(
+        [response for response in _responses if "Items" in response]
+    )
+
+    assert projected_capacity <= full_capacity
+    assert projected_size < full_size
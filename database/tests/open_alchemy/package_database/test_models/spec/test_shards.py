@@ -0,0 +1,421 @@
+"""Tests for sharding the versions of the specs of a customer."""
+
+import time
+from unittest import mock
+
+import pytest
+from open_alchemy.package_database import exceptions, factory, models, shards, types
+from pynamodb import exceptions as pynamodb_exceptions
+
+SUB = "sub 1"
+SHARDS = 4
+
+
+@pytest.fixture(autouse=True)
+def _no_count_cache(monkeypatch):
+    """Use the number of shards of customers as soon as it is increased."""
+    monkeypatch.setattr(shards, "COUNT_CACHE_SECONDS", 0)
+
+
+def create_specs(sub=SUB, versions=10):
+    """Create versions of multiple specs."""
+    for idx in range(versions):
+        for name in ("spec 1", "spec 2"):
+            models.Spec.create_update_item(
+                sub=sub, name=name, version=str(idx), model_count=idx
+            )
+
+
+def count_version_items(sub):
+    """Count the version items in a partition."""
+    return len(list(models.Spec.query(sub, models.Spec.updated_at_id.startswith("0"))))
+
+
+def list_pages(sub, name, limit):
+    """List the versions of a spec page by page."""
+    items = []
+    cursor = None
+    while True:
+        page = models.Spec.list_versions_page(
+            sub=sub, name=name, limit=limit, cursor=cursor
+        )
+        assert len(page.items) <= limit
+        items.extend(page.items)
+        cursor = page.cursor
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize(
+    "shard, expected_sub",
+    [
+        pytest.param(0, SUB, id="first"),
+        pytest.param(3, f"{SUB}{shards.SHARD_SEPARATOR}3", id="other"),
+    ],
+)
+@pytest.mark.models
+def test_calc_shard_sub(shard, expected_sub):
+    """
+    GIVEN customer and shard
+    WHEN calc_shard_sub is called
+    THEN the expected partition key is returned.
+    """
+    assert shards.calc_shard_sub(SUB, shard) == expected_sub
+
+
+@pytest.mark.models
+def test_get_count_not_sharded():
+    """
+    GIVEN customer with and without the model count aggregate that is not sharded
+    WHEN get_count is called
+    THEN 1 is returned.
+    """
+    assert shards.get_count(sub=SUB) == 1
+
+    create_specs(versions=1)
+
+    assert shards.get_count(sub=SUB, consistent_read=True) == 1
+
+
+@pytest.mark.models
+def test_get_count_cached(monkeypatch):
+    """
+    GIVEN customer that is not sharded
+    WHEN get_count is called repeatedly, with a consistent read and after the cache
+        time
+    THEN the model count aggregate is only read for the first and consistent reads
+        and after the cache time.
+    """
+    monkeypatch.setattr(shards, "COUNT_CACHE_SECONDS", 60)
+    create_specs(versions=1)
+    mock_monotonic = mock.MagicMock(return_value=1000)
+    monkeypatch.setattr(shards.time, "monotonic", mock_monotonic)
+    mock_get = mock.MagicMock(side_effect=shards.catalog.CustomerModelCount.get)
+    monkeypatch.setattr(shards.catalog.CustomerModelCount, "get", mock_get)
+
+    for _ in range(2):
+        assert shards.get_count(sub=SUB) == 1
+    assert mock_get.call_count == 1
+
+    assert shards.get_count(sub=SUB, consistent_read=True) == 1
+    assert mock_get.call_count == 2
+
+    mock_monotonic.return_value = 1000 + 60
+    assert shards.get_count(sub=SUB) == 1
+    assert mock_get.call_count == 3
+
+
+@pytest.mark.models
+def test_get_count_evict(monkeypatch):
+    """
+    GIVEN cache that holds the number of shards of a single customer
+    WHEN get_count is called for two customers and then for the first again
+    THEN the model count aggregate of the first customer is read again.
+    """
+    monkeypatch.setattr(shards, "COUNT_CACHE_SECONDS", 60)
+    monkeypatch.setattr(shards, "MAX_CACHED_COUNTS", 1)
+    mock_get = mock.MagicMock(side_effect=shards.catalog.CustomerModelCount.get)
+    monkeypatch.setattr(shards.catalog.CustomerModelCount, "get", mock_get)
+
+    for sub in ("sub 1", "sub 2", "sub 1"):
+        assert shards.get_count(sub=sub) == 1
+
+    assert mock_get.call_count == 3
+
+
+@pytest.mark.models
+def test_shard_versions_cached_count(monkeypatch):
+    """
+    GIVEN customer with versions
+    WHEN shard_versions is called and versions are written before and after the
+        cache time of the number of shards
+    THEN shard_versions waits for the cache time and new versions are only written
+        to the other shards after it.
+    """
+    monkeypatch.setattr(shards, "COUNT_CACHE_SECONDS", 60)
+    create_specs(versions=1)
+    mock_sleep = mock.MagicMock()
+    monkeypatch.setattr(shards.time, "sleep", mock_sleep)
+
+    moved = shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    mock_sleep.assert_called_once()
+    assert 59 < mock_sleep.call_args.args[0] <= 60
+    assert shards.get_count(sub=SUB) == SHARDS
+
+    def count_other_shards():
+        """Count the version items in the shards other than the first."""
+        return sum(
+            count_version_items(shards.calc_shard_sub(SUB, shard))
+            for shard in range(1, SHARDS)
+        )
+
+    for idx in range(1, 10):
+        models.Spec.create_update_item(
+            sub=SUB, name="spec 1", version=str(idx), model_count=idx
+        )
+    assert count_other_shards() == moved
+
+    real_time = time.time
+    monkeypatch.setattr(shards.time, "time", lambda: real_time() + 60)
+    for idx in range(10, 30):
+        models.Spec.create_update_item(
+            sub=SUB, name="spec 1", version=str(idx), model_count=idx
+        )
+    assert count_other_shards() > moved
+    assert [
+        info["version"] for info in models.Spec.list_versions(sub=SUB, name="spec 1")
+    ] == [str(idx) for idx in range(30)]
+
+
+@pytest.mark.models
+def test_shard_versions():
+    """
+    GIVEN customer with versions of multiple specs
+    WHEN shard_versions is called
+    THEN the versions are moved to the shards and are read as before.
+    """
+    create_specs()
+    expected_versions = {
+        name: models.Spec.list_versions(sub=SUB, name=name)
+        for name in ("spec 1", "spec 2")
+    }
+    expected_specs = models.Spec.list_(sub=SUB)
+
+    moved = shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    assert moved > 0
+    assert count_version_items(SUB) == 20 - moved
+    assert shards.get_count(sub=SUB) == SHARDS
+    assert (
+        sum(
+            count_version_items(shards.calc_shard_sub(SUB, shard))
+            for shard in range(SHARDS)
+        )
+        == 20
+    )
+    for name, versions in expected_versions.items():
+        assert models.Spec.list_versions(sub=SUB, name=name) == versions
+        assert list(models.Spec.iter_versions(sub=SUB, name=name)) == versions
+        assert list_pages(SUB, name, 3) == versions
+        assert models.Spec.list_versions_page(sub=SUB, name=name).items == versions
+    assert models.Spec.list_(sub=SUB) == expected_specs
+    assert models.Spec.list_subs() == [SUB]
+
+    assert shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS) == 0
+
+
+@pytest.mark.models
+def test_shard_versions_writes():
+    """
+    GIVEN sharded customer
+    WHEN versions are written
+    THEN the versions are spread over the shards and listed in order.
+    """
+    create_specs(versions=1)
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    for idx in range(1, 20):
+        models.Spec.create_update_item(
+            sub=SUB, name="spec 1", version=str(idx), model_count=idx
+        )
+
+    versions = [
+        info["version"] for info in models.Spec.list_versions(sub=SUB, name="spec 1")
+    ]
+    assert versions == [str(idx) for idx in range(20)]
+    assert (
+        sum(
+            1
+            for shard in range(1, SHARDS)
+            if count_version_items(shards.calc_shard_sub(SUB, shard))
+        )
+        > 0
+    )
+    assert models.Spec.count_customer_models(sub=SUB) == 19
+    assert models.Spec.get_latest_version(sub=SUB, name="spec 1") == "19"
+
+
+@pytest.mark.models
+def test_shard_versions_increased_before_cache(monkeypatch):
+    """
+    GIVEN customer that was sharded before the time of increasing the number of
+        shards was recorded
+    WHEN shard_versions is called with the same number of shards
+    THEN shard_versions does not wait and new versions are written to all shards.
+    """
+    monkeypatch.setattr(shards, "COUNT_CACHE_SECONDS", 60)
+    create_specs(versions=1)
+    shards.catalog.CustomerModelCount(
+        sub=SUB, updated_at_id=shards.catalog.CustomerModelCount.UPDATED_AT_ID
+    ).update(actions=[shards.catalog.CustomerModelCount.spec_shards.set(SHARDS)])
+    mock_sleep = mock.MagicMock()
+    monkeypatch.setattr(shards.time, "sleep", mock_sleep)
+
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    mock_sleep.assert_not_called()
+    for idx in range(1, 20):
+        models.Spec.create_update_item(
+            sub=SUB, name="spec 1", version=str(idx), model_count=idx
+        )
+    assert count_version_items(SUB) < 2 + 19
+
+
+@pytest.mark.models
+def test_shard_versions_decrease():
+    """
+    GIVEN sharded customer
+    WHEN shard_versions is called with fewer shards
+    THEN the number of shards is not decreased.
+    """
+    create_specs(versions=1)
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=2)
+
+    assert shards.get_count(sub=SUB) == SHARDS
+
+
+@pytest.mark.models
+def test_shard_versions_concurrent_migration(monkeypatch):
+    """
+    GIVEN customer that is sharded further while shard_versions reads the shards
+    WHEN shard_versions is called
+    THEN the number of shards is not decreased.
+    """
+    create_specs(versions=1)
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+    get_count = shards.get_count
+    mock_get_count = mock.MagicMock(side_effect=[1, SHARDS, SHARDS])
+    monkeypatch.setattr(shards, "get_count", mock_get_count)
+
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=2)
+
+    assert get_count(sub=SUB) == SHARDS
+
+
+@pytest.mark.models
+def test_shard_versions_no_aggregate():
+    """
+    GIVEN customer with versions but without the model count aggregate
+    WHEN shard_versions is called
+    THEN the aggregate is rebuilt with the shards.
+    """
+    for idx in range(10):
+        updated_at = str(idx + 1)
+        index_values = models.Spec.calc_index_values(
+            updated_at=updated_at, id_="spec1", microseconds=0
+        )
+        factory.SpecFactory(
+            sub=SUB,
+            id="spec1",
+            updated_at=updated_at,
+            updated_at_id=index_values.updated_at_id,
+            id_updated_at=index_values.id_updated_at,
+        ).save()
+
+    moved = shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    assert moved > 0
+    assert shards.get_count(sub=SUB) == SHARDS
+    assert models.Spec.count_customer_models(sub=SUB) == 0
+
+
+@pytest.mark.models
+def test_shard_versions_already_copied():
+    """
+    GIVEN sharded customer with a version in the partition of the customer that was
+        already copied to its shard
+    WHEN the versions are listed and shard_versions is called
+    THEN the version is listed once and removed from the partition of the customer.
+    """
+    create_specs()
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+    item = next(
+        item
+        for shard in range(1, SHARDS)
+        for item in models.Spec.query(
+            shards.calc_shard_sub(SUB, shard),
+            models.Spec.updated_at_id.startswith("0"),
+        )
+    )
+    item.sub = SUB
+    item.save()
+    expected_versions = models.Spec.list_versions(sub=SUB, name=item.name)
+
+    assert len(expected_versions) == 10
+
+    assert shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS) == 1
+
+    assert models.Spec.list_versions(sub=SUB, name=item.name) == expected_versions
+    assert [
+        item_.updated_at_id
+        for item_ in models.Spec.query(SUB, models.Spec.updated_at_id.startswith("0"))
+    ].count(item.updated_at_id) == 0
+
+
+@pytest.mark.models
+def test_shard_versions_error(monkeypatch):
+    """
+    GIVEN moving a version fails for a reason other than a concurrent write
+    WHEN shard_versions is called
+    THEN TransactWriteError is raised.
+    """
+    create_specs()
+    monkeypatch.setattr(
+        shards.transactions.TransactWrite,
+        "condition_check",
+        mock.MagicMock(side_effect=pynamodb_exceptions.TransactWriteError("failed")),
+    )
+
+    with pytest.raises(pynamodb_exceptions.TransactWriteError):
+        shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+
+@pytest.mark.models
+def test_list_versions_page_invalid_cursor():
+    """
+    GIVEN sharded customer
+    WHEN list_versions_page is called on Spec with the cursor of another spec
+    THEN InvalidCursorError is raised.
+    """
+    create_specs()
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+    cursor = models.Spec.list_versions_page(sub=SUB, name="spec 1", limit=1).cursor
+
+    with pytest.raises(exceptions.InvalidCursorError):
+        models.Spec.list_versions_page(sub=SUB, name="spec 2", limit=1, cursor=cursor)
+
+
+@pytest.mark.models
+def test_delete_sharded():
+    """
+    GIVEN sharded customer
+    WHEN versions are compacted, a spec is deleted and all specs are deleted
+    THEN the versions are deleted from all shards.
+    """
+    create_specs()
+    shards.shard_versions(model=models.Spec, sub=SUB, shards=SHARDS)
+
+    compaction = models.Spec.compact_versions(
+        sub=SUB,
+        name="spec 1",
+        retention=types.SpecRetention(keep_last=2, max_age_days=None),
+    )
+
+    assert compaction.deleted == 8
+    assert [
+        info["version"] for info in models.Spec.list_versions(sub=SUB, name="spec 1")
+    ] == ["8", "9"]
+
+    models.Spec.delete_item(sub=SUB, name="spec 1")
+
+    assert models.Spec.list_versions(sub=SUB, name="spec 1") == []
+    assert len(models.Spec.list_versions(sub=SUB, name="spec 2")) == 10
+    assert models.Spec.count_customer_models(sub=SUB) == 9
+
+    counts = models.Spec.delete_all(sub=SUB)
+
+    assert counts.deleted == 10 + 1 + 1
+    assert models.Spec.list_subs() == []
@@ -0,0 +1,169 @@
+"""Tests for pagination."""
+
+import base64
+
+import pytest
+from open_alchemy.package_database import exceptions, pagination
+from pynamodb import exceptions as pynamodb_exceptions
+
+
+def test_encode_none():
+    """
+    GIVEN no key
+    WHEN encode is called with the key
+    THEN None is returned.
+    """
+    assert pagination.encode(key=None) is None
+
+
+def test_encode_decode():
+    """
+    GIVEN key
+    WHEN encode is called with the key and decode is called with the cursor
+    THEN the key is returned.
+    """
+    sub = "sub 1"
+    key = {"sub": {"S": sub}, "updated_at_id": {"S": "latest#spec 1"}}
+
+    cursor = pagination.encode(key=key)
+
+    assert isinstance(cursor, str)
+    assert (
+        pagination.decode(
+            cursor=cursor, sub=sub, key_prefixes={"updated_at_id": "latest#"}
+        )
+        == key
+    )
+
+
+def test_decode_other_keys():
+    """
+    GIVEN cursor with attributes that are not part of the key of the query
+    WHEN decode is called with the cursor
+    THEN the key without the other attributes is returned.
+    """
+    sub = "sub 1"
+    key = {"sub": {"S": sub}, "id_updated_at": {"S": "spec 1#1"}}
+
+    cursor = pagination.encode(key={**key, "updated_at_id": {"S": "1#spec 1"}})
+
+    assert (
+        pagination.decode(
+            cursor=cursor, sub=sub, key_prefixes={"id_updated_at": "spec 1#"}
+        )
+        == key
+    )
+
+
+def test_decode_none():
+    """
+    GIVEN no cursor
+    WHEN decode is called with the cursor
+    THEN None is returned.
+    """
+    assert (
+        pagination.decode(
+            cursor=None, sub="sub 1", key_prefixes={"updated_at_id": "latest#"}
+        )
+        is None
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        pytest.param("not base64!", id="not base64"),
+        pytest.param(base64.urlsafe_b64encode(b"\xff").decode(), id="not unicode"),
+        pytest.param(base64.urlsafe_b64encode(b"{").decode(), id="not JSON"),
+        pytest.param(base64.urlsafe_b64encode(b"[]").decode(), id="not object"),
+        pytest.param(
+            pagination.encode(key={"sub": {"S": "sub 2"}}), id="different sub"
+        ),
+        pytest.param(pagination.encode(key={}), id="no sub"),
+        pytest.param(pagination.encode(key={"sub": {"S": "sub 1"}}), id="no key"),
+        pytest.param(
+            pagination.encode(key={"sub": {"S": "sub 1"}, "updated_at_id": "latest#"}),
+            id="key not attribute",
+        ),
+        pytest.param(
+            pagination.encode(
+                key={"sub": {"S": "sub 1"}, "updated_at_id": {"N": "1"}}
+            ),
+            id="key wrong type",
+        ),
+        pytest.param(
+            pagination.encode(
+                key={"sub": {"S": "sub 1"}, "updated_at_id": {"S": 1}}
+            ),
+            id="key value wrong type",
+        ),
+        pytest.param(
+            pagination.encode(
+                key={"sub": {"S": "sub 1"}, "updated_at_id": {"S": "1#spec 1"}}
+            ),
+            id="key outside range",
+        ),
+        pytest.param(
+            pagination.encode(
+                key={
+                    "sub": {"S": "sub 1"},
+                    "updated_at_id": {"S": "latest#spec 1", "N": "1"},
+                }
+            ),
+            id="key multiple types",
+        ),
+    ],
+)
+def test_decode_invalid(cursor):
+    """
+    GIVEN invalid cursor
+    WHEN decode is called with the cursor
+    THEN InvalidCursorError is raised.
+    """
+    with pytest.raises(exceptions.InvalidCursorError):
+        pagination.decode(
+            cursor=cursor, sub="sub 1", key_prefixes={"updated_at_id": "latest#"}
+        )
+
+
+class _ClientError(Exception):
+    """Error of a request to the database with a response code."""
+
+    def __init__(self, code):
+        """Construct."""
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+@pytest.mark.parametrize(
+    "cursor, code, expected_exception",
+    [
+        pytest.param(
+            "cursor 1",
+            "ValidationException",
+            exceptions.InvalidCursorError,
+            id="cursor rejected",
+        ),
+        pytest.param(
+            None,
+            "ValidationException",
+            pynamodb_exceptions.QueryError,
+            id="no cursor",
+        ),
+        pytest.param(
+            "cursor 1",
+            "ProvisionedThroughputExceededException",
+            pynamodb_exceptions.QueryError,
+            id="other error",
+        ),
+    ],
+)
+def test_check_query(cursor, code, expected_exception):
+    """
+    GIVEN cursor and query that fails with an error code
+    WHEN the query is run in check_query with the cursor
+    THEN the expected exception is raised.
+    """
+    with pytest.raises(expected_exception):
+        with pagination.check_query(cursor=cursor):
+            raise pynamodb_exceptions.QueryError("failed", cause=_ClientError(code))
@@ -0,0 +1,45 @@
+"""Tests for the rebuild catalog command."""
+
+import pytest
+from open_alchemy.package_database import catalog, models, rebuild_catalog
+
+
+def get_catalog_infos(sub):
+    """Retrieve the entries of the spec catalog."""
+    return catalog.CustomerSpecCatalog.get(
+        hash_key=sub, range_key=catalog.CustomerSpecCatalog.UPDATED_AT_ID
+    ).infos.as_dict()
+
+
+@pytest.fixture(autouse=True)
+def _specs(_clean_specs_table):
+    """Create specs for multiple customers."""
+    for sub in ("sub 1", "sub 2"):
+        models.Spec.create_update_item(
+            sub=sub, name="spec 1", version="1", model_count=1
+        )
+
+
+def test_main_all():
+    """
+    GIVEN specs for multiple customers
+    WHEN main is called without subs
+    THEN the catalogs for all customers are rebuilt.
+    """
+    rebuild_catalog.main([])
+
+    assert list(get_catalog_infos("sub 1")) == ["spec 1"]
+    assert list(get_catalog_infos("sub 2")) == ["spec 1"]
+
+
+def test_main_sub():
+    """
+    GIVEN specs for multiple customers
+    WHEN main is called with a sub
+    THEN the catalog for only that customer is rebuilt.
+    """
+    rebuild_catalog.main(["--sub", "sub 2"])
+
+    with pytest.raises(catalog.CustomerSpecCatalog.DoesNotExist):
+        get_catalog_infos("sub 1")
+    assert list(get_catalog_infos("sub 2")) == ["spec 1"]
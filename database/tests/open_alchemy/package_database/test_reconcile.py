@@ -0,0 +1,55 @@
+"""Tests for the reconcile command."""
+
+import pytest
+from open_alchemy.package_database import catalog, factory, models, reconcile
+
+
+def get_aggregate_model_count(sub):
+    """Retrieve the model count of the aggregate item."""
+    return catalog.CustomerModelCount.get(
+        hash_key=sub, range_key=catalog.CustomerModelCount.UPDATED_AT_ID
+    ).model_count
+
+
+@pytest.fixture(autouse=True)
+def _items(_clean_specs_table):
+    """Save latest items for multiple customers."""
+    items = [
+        factory.SpecFactory(
+            sub="sub 1",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+            model_count=12,
+        ),
+        factory.SpecFactory(
+            sub="sub 2",
+            updated_at_id=f"{models.Spec.UPDATED_AT_LATEST}#spec 1",
+            model_count=22,
+        ),
+    ]
+    for item in items:
+        item.save()
+
+
+def test_main_all():
+    """
+    GIVEN latest items for multiple customers
+    WHEN main is called without subs
+    THEN the aggregates for all customers are rebuilt.
+    """
+    reconcile.main([])
+
+    assert get_aggregate_model_count("sub 1") == 12
+    assert get_aggregate_model_count("sub 2") == 22
+
+
+def test_main_sub():
+    """
+    GIVEN latest items for multiple customers
+    WHEN main is called with a sub
+    THEN the aggregate for only that customer is rebuilt.
+    """
+    reconcile.main(["--sub", "sub 2"])
+
+    with pytest.raises(catalog.CustomerModelCount.DoesNotExist):
+        get_aggregate_model_count("sub 1")
+    assert get_aggregate_model_count("sub 2") == 22
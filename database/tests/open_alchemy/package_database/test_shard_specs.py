@@ -0,0 +1,67 @@
+"""Tests for the shard specs command."""
+
+import pytest
+from open_alchemy.package_database import models, shard_specs, shards
+
+
+@pytest.fixture(autouse=True)
+def _no_count_cache(monkeypatch):
+    """Use the number of shards of customers as soon as it is increased."""
+    monkeypatch.setattr(shards, "COUNT_CACHE_SECONDS", 0)
+
+
+@pytest.fixture(autouse=True)
+def _specs(_clean_specs_table):
+    """Create specs with different numbers of versions for multiple customers."""
+    for sub, versions in (("sub 1", 2), ("sub 2", 6)):
+        for idx in range(versions):
+            models.Spec.create_update_item(
+                sub=sub, name="spec 1", version=str(idx), model_count=1
+            )
+
+
+def test_main_all():
+    """
+    GIVEN specs for multiple customers
+    WHEN main is called without subs
+    THEN all customers are sharded.
+    """
+    shard_specs.main(["--shards", "4"])
+
+    assert shards.get_count(sub="sub 1") == 4
+    assert shards.get_count(sub="sub 2") == 4
+    assert shards.count_versions(model=models.Spec, sub="sub 2") == 6
+
+
+def test_main_sub():
+    """
+    GIVEN specs for multiple customers
+    WHEN main is called with a sub
+    THEN only that customer is sharded.
+    """
+    shard_specs.main(["--shards", "4", "--sub", "sub 1"])
+
+    assert shards.get_count(sub="sub 1") == 4
+    assert shards.get_count(sub="sub 2") == 1
+
+
+def test_main_min_versions():
+    """
+    GIVEN specs for multiple customers
+    WHEN main is called with the minimum number of versions
+    THEN only customers with at least that many versions are sharded.
+    """
+    shard_specs.main(["--shards", "4", "--min-versions", "5"])
+
+    assert shards.get_count(sub="sub 1") == 1
+    assert shards.get_count(sub="sub 2") == 4
+
+
+def test_main_invalid_shards():
+    """
+    GIVEN specs for multiple customers
+    WHEN main is called with fewer than 1 shard
+    THEN the command exits with an error.
+    """
+    with pytest.raises(SystemExit):
+        shard_specs.main(["--shards", "0"])
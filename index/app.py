@@ -11,6 +11,7 @@ import typing
 
 import library
 from library import exceptions, types
+from open_alchemy import package_database
 
 
 @dataclasses.dataclass
@@ -165,8 +166,17 @@ def parse_event(event: typing.Dict) -> Event:
     return Event(request=request_info, request_dict=request)
 
 
-def main(event, _context):
-    """Handle request."""
+def handle(event: typing.Dict) -> typing.Dict:
+    """
+    Handle a lambda event.
+
+    Args:
+        event: The information for the lambda event.
+
+    Returns:
+        The response or the request to forward.
+
+    """
     try:
         event_info = parse_event(event)
     except AssertionError as exc:
@@ -220,3 +230,13 @@ def main(event, _context):
     request = event_info.request_dict
     request["uri"] = response.value
     return request
+
+
+def main(event, _context):
+    """Handle request and log the calls to the database it made."""
+    with package_database.instrumentation.summarize() as summary:
+        response = handle(event)
+    if summary.metrics:
+        database_summary = summary.as_dict()
+        print(f"database calls, {database_summary=}")  # allow-print
+    return response
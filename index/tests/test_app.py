@@ -128,11 +128,11 @@ def test_parse_event():
     assert returned_event.request_dict == request
 
 
-def test_main_event_invalid():
+def test_main_event_invalid(capsys):
     """
     GIVEN install event with invalid event
     WHEN main is called with an invalid event
-    THEN 401 is returned.
+    THEN 401 is returned and no calls to the database are logged.
     """
     event = {}
 
@@ -143,6 +143,7 @@ def test_main_event_invalid():
     assert returned_response["headers"]["cache-control"][0]["value"] == "max-age=0"
     assert returned_response["headers"]["content-type"][0]["value"] == "text/plain"
     assert "Records not in event" in returned_response["body"]
+    assert "database calls" not in capsys.readouterr().out
 
 
 def test_main_unauthorized(_clean_credentials_table):
@@ -172,11 +173,11 @@ def test_main_unauthorized(_clean_credentials_table):
     assert "Invalid credentials" in returned_response["body"]
 
 
-def test_main_list_not_found(_clean_credentials_table, _clean_specs_table):
+def test_main_list_not_found(_clean_credentials_table, _clean_specs_table, capsys):
     """
     GIVEN list event and empty database
     WHEN main is called with the event
-    THEN 404 is returned.
+    THEN 404 is returned and the calls to the database are logged.
     """
     secret_key = "secret key 1"
     salt = b"salt 1"
@@ -204,6 +205,10 @@ def test_main_list_not_found(_clean_credentials_table, _clean_specs_table):
     assert returned_response["headers"]["cache-control"][0]["value"] == "max-age=0"
     assert returned_response["headers"]["content-type"][0]["value"] == "text/plain"
     assert spec_id in returned_response["body"]
+    output = capsys.readouterr().out
+    assert "database calls" in output
+    assert "'get_user': 1" in output
+    assert "'list_spec_versions': 1" in output
 
 
 def test_main_list(_clean_credentials_table, _clean_specs_table):